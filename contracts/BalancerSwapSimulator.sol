@@ -36,6 +36,11 @@ contract BalancerSwapSimulator {
 	
     /// @dev reference https://github.com/balancer-labs/balancer-v2-monorepo/blob/master/pkg/pool-weighted/contracts/WeightedMath.sol#L78
     function calcOutGivenIn(ExactInQueryParam memory _query) public view returns (uint256) {	
+        return calcOutGivenInWithScaling(_query, _computeScalingFactorWeightedPool(_query.tokenIn), _computeScalingFactorWeightedPool(_query.tokenOut));
+    }
+	
+    /// @dev Same as calcOutGivenIn with the scaling factors of tokenIn & tokenOut (10**(18 - decimals)) given instead of read from the tokens
+    function calcOutGivenInWithScaling(ExactInQueryParam memory _query, uint256 _scalingFactorIn, uint256 _scalingFactorOut) public view returns (uint256) {	
         /**********************************************************************************************
         // outGivenIn                                                                                //
         // aO = amountOut                                                                            //
@@ -49,12 +54,10 @@ contract BalancerSwapSimulator {
         // upscale all balances and amounts
         _query.amountIn = _subtractSwapFeeAmount(_query.amountIn, _query.swapFeePercentage);
         
-        uint256 _scalingFactorIn = _computeScalingFactorWeightedPool(_query.tokenIn);
         _query.amountIn = BalancerMath.mul(_query.amountIn, _scalingFactorIn);
         _query.balanceIn = BalancerMath.mul(_query.balanceIn, _scalingFactorIn);
         require(_query.balanceIn > _query.amountIn, "!amtIn");
 		
-        uint256 _scalingFactorOut = _computeScalingFactorWeightedPool(_query.tokenOut);
         _query.balanceOut = BalancerMath.mul(_query.balanceOut, _scalingFactorOut);
 		
         require(_query.amountIn <= BalancerFixedPoint.mulDown(_query.balanceIn, _MAX_IN_RATIO), "!maxIn");
@@ -70,6 +73,16 @@ contract BalancerSwapSimulator {
 	
     /// @dev reference https://etherscan.io/address/0x7b50775383d3d6f0215a8f290f2c9e2eebbeceb2#code#F1#L244
     function calcOutGivenInForStable(ExactInStableQueryParam memory _query) public view returns (uint256) {
+        uint256 _tkLen = _query.tokens.length;
+        uint256[] memory _scalingFactors = new uint256[](_tkLen);
+        for (uint256 i = 0;i < _tkLen;++i){
+             _scalingFactors[i] = _computeScalingFactor(_query.tokens[i]);
+        }
+        return calcOutGivenInForStableWithScaling(_query, _scalingFactors);
+    }
+	
+    /// @dev Same as calcOutGivenInForStable with the scaling factors of the pool tokens (1e18 * 10**(18 - decimals)) given instead of read from the tokens
+    function calcOutGivenInForStableWithScaling(ExactInStableQueryParam memory _query, uint256[] memory _scalingFactors) public view returns (uint256) {
         /**************************************************************************************************************
         // outGivenIn token x for y - polynomial equation to solve                                                   //
         // ay = amount out to calculate                                                                              //
@@ -83,12 +96,6 @@ contract BalancerSwapSimulator {
         **************************************************************************************************************/
 		
         // upscale all balances and amounts
-        uint256 _tkLen = _query.tokens.length;
-        uint256[] memory _scalingFactors = new uint256[](_tkLen);
-        for (uint256 i = 0;i < _tkLen;++i){
-             _scalingFactors[i] = _computeScalingFactor(_query.tokens[i]);
-        }
-		
         _query.amountIn = _subtractSwapFeeAmount(_query.amountIn, _query.swapFeePercentage);
         _query.balances = _upscaleStableArray(_query.balances, _scalingFactors);
         _query.amountIn = _upscaleStable(_query.amountIn, _scalingFactors[_query.tokenIndexIn]);
@@ -0,0 +1,102 @@
+// SPDX-License-Identifier: MIT
+pragma solidity 0.8.10;
+
+struct CurveStableSwapQuery{
+    uint256[] balances;
+    uint256[] rates; // 10 ** (36 - decimals) for each coin
+    uint256 amp; // A() or A_precise() of the pool
+    uint256 aPrecision; // 1 if amp is A(), 100 if amp is A_precise()
+    uint256 fee;
+    uint256 i;
+    uint256 j;
+    uint256 dx;
+}
+
+/// @dev Swap Simulator for Curve StableSwap plain pools
+contract CurveSwapSimulator {
+    uint256 internal constant PRECISION = 1e18;
+    uint256 internal constant FEE_DENOMINATOR = 1e10;
+
+    /// @dev reference https://etherscan.io/address/0xbEbc44782C7dB0a1A60Cb6fe97d0b483032FF1C7#code#L361 (3pool)
+    /// @dev and https://etherscan.io/address/0xDcEF968d416a41Cdac0ED8702fAC8128A64241A2#code#L418 (FRAXBP) with A_precise
+    function get_dy(CurveStableSwapQuery memory _query) public pure returns (uint256) {
+        uint256 _n = _query.balances.length;
+        uint256[] memory xp = new uint256[](_n);
+        for (uint256 k = 0; k < _n;){
+            xp[k] = _query.rates[k] * _query.balances[k] / PRECISION;
+            unchecked { ++k; }
+        }
+
+        uint256 x = xp[_query.i] + (_query.dx * _query.rates[_query.i] / PRECISION);
+        uint256 y = _getY(_query.i, _query.j, x, xp, _query.amp, _query.aPrecision);
+        uint256 dy = xp[_query.j] - y - 1;
+        if (_query.aPrecision == 1){
+            // legacy pools without A_precise (e.g. 3pool) take the fee on the denormalized output
+            dy = dy * PRECISION / _query.rates[_query.j];
+            return dy - _query.fee * dy / FEE_DENOMINATOR;
+        }
+        uint256 _fee = _query.fee * dy / FEE_DENOMINATOR;
+        return (dy - _fee) * PRECISION / _query.rates[_query.j];
+    }
+
+    /// @dev StableSwap invariant D for given normalized balances
+    function _getD(uint256[] memory xp, uint256 amp, uint256 aPrecision) internal pure returns (uint256) {
+        uint256 _n = xp.length;
+        uint256 S;
+        for (uint256 k = 0; k < _n;){
+            S += xp[k];
+            unchecked { ++k; }
+        }
+        if (S == 0){
+            return 0;
+        }
+
+        uint256 D = S;
+        uint256 Ann = amp * _n;
+        for (uint256 _i = 0; _i < 255;){
+            uint256 D_P = D;
+            for (uint256 k = 0; k < _n;){
+                D_P = D_P * D / (xp[k] * _n);
+                unchecked { ++k; }
+            }
+            uint256 Dprev = D;
+            D = (Ann * S / aPrecision + D_P * _n) * D / ((Ann - aPrecision) * D / aPrecision + (_n + 1) * D_P);
+            if (D > Dprev ? D - Dprev <= 1 : Dprev - D <= 1){
+                return D;
+            }
+            unchecked { ++_i; }
+        }
+        revert("!D");
+    }
+
+    /// @dev new balance of coin j given new balance x of coin i, keeping D constant
+    function _getY(uint256 i, uint256 j, uint256 x, uint256[] memory xp, uint256 amp, uint256 aPrecision) internal pure returns (uint256) {
+        require(i != j, "!ij");
+        uint256 _n = xp.length;
+        uint256 D = _getD(xp, amp, aPrecision);
+        uint256 Ann = amp * _n;
+        uint256 c = D;
+        uint256 S_;
+        for (uint256 k = 0; k < _n;){
+            if (k != j){
+                uint256 _x = k == i ? x : xp[k];
+                S_ += _x;
+                c = c * D / (_x * _n);
+            }
+            unchecked { ++k; }
+        }
+        c = c * D * aPrecision / (Ann * _n);
+        uint256 b = S_ + D * aPrecision / Ann;
+
+        uint256 y = D;
+        for (uint256 _i = 0; _i < 255;){
+            uint256 yPrev = y;
+            y = (y * y + c) / (2 * y + b - D);
+            if (y > yPrev ? y - yPrev <= 1 : yPrev - y <= 1){
+                return y;
+            }
+            unchecked { ++_i; }
+        }
+        revert("!y");
+    }
+}
@@ -16,8 +16,11 @@ import "../interfaces/balancer/IBalancerV2WeightedPool.sol";
 import "../interfaces/balancer/IBalancerV2StablePool.sol";
 import "../interfaces/curve/ICurveRouter.sol";
 import "../interfaces/curve/ICurvePool.sol";
+import "../interfaces/curve/ICurveRegistry.sol";
+import "../interfaces/curve/ICurveSimulator.sol";
 import "../interfaces/uniswap/IV3Simulator.sol";
 import "../interfaces/balancer/IBalancerV2Simulator.sol";
+import "./libraries/uniswap/PoolAddress.sol";
 
 enum SwapType { 
     CURVE, //0
@@ -52,20 +55,29 @@ contract OnChainPricingMainnet {
     /// == Uni V2 Like Routers || These revert on non-existent pair == //
     // UniV2
     address public constant UNIV2_ROUTER = 0x7a250d5630B4cF539739dF2C5dAcb4c659F2488D; // Spookyswap
-    bytes public constant UNIV2_POOL_INITCODE = hex"96e8ac4277198ff8b6f785478aa9a39f403cb768dd02cbee326c3e7da348845f";
-    address public constant UNIV2_FACTORY = 0x5C69bEe701ef814a2B6a3EDD4B1652CB9cc5aA6f;
+    bytes public constant UNIV2_POOL_INITCODE = hex"96e8ac4277198ff8b6f785478aa9a39f403cb768dd02cbee326c3e7da348845f"; // same as PoolAddress.UNIV2_POOL_INITCODE
+    address public constant UNIV2_FACTORY = PoolAddress.UNIV2_FACTORY;
     // Sushi
     address public constant SUSHI_ROUTER = 0xd9e1cE17f2641f24aE83637ab66a2cca9C378B9F;
-    bytes public constant SUSHI_POOL_INITCODE = hex"e18a34eb0e04b04f7a0ac29a6e80748dca96319b42c54d679cb821dca90c6303";
-    address public constant SUSHI_FACTORY = 0xC0AEe478e3658e2610c5F7A4A2E1777cE9e4f2Ac;
+    bytes public constant SUSHI_POOL_INITCODE = hex"e18a34eb0e04b04f7a0ac29a6e80748dca96319b42c54d679cb821dca90c6303"; // same as PoolAddress.SUSHI_POOL_INITCODE
+    address public constant SUSHI_FACTORY = PoolAddress.SUSHI_FACTORY;
 
     // Curve / Doesn't revert on failure
     address public constant CURVE_ROUTER = 0x8e764bE4288B842791989DB5b8ec067279829809; // Curve quote and swaps
+    // Registries looked up by the router, only used to probe pool existence
+    address public constant CURVE_REGISTRY = 0x90E00ACe148ca3b23Ac1bC8C240C2a7Dd9c2d7f5;
+    address public constant CURVE_FACTORY_REGISTRY = 0xB9fC157394Af804a3578134A6585C0dc9cc990d4;
+    address public constant CURVE_CRYPTO_REGISTRY = 0x8F942C20D02bEfc377D41445793068908E2250D0;
+    address public constant CURVE_CRYPTO_FACTORY = 0xF18056Bbd320E96A48e3Fbf8bC061322531aac99;
+    // Curve StableSwap plain pools quoted with native math, see CurveSwapSimulator
+    address public constant CURVE_3POOL = 0xbEbc44782C7dB0a1A60Cb6fe97d0b483032FF1C7;
+    address public constant CURVE_FRAXBP = 0xDcEF968d416a41Cdac0ED8702fAC8128A64241A2;
+    address public constant CURVE_CVX_BVECVX = 0x04c90C198b2eFF55716079bc06d7CCc4aa4d7512;
 		
     // UniV3 impl credit to https://github.com/1inch/spot-price-aggregator/blob/master/contracts/oracles/UniswapV3Oracle.sol
     address public constant UNIV3_QUOTER = 0xb27308f9F90D607463bb33eA1BeBb41C27CE5AB6;
-    bytes32 public constant UNIV3_POOL_INIT_CODE_HASH = 0xe34f199b19b2b4f47f68442619d555527d244f78a3297ea89325f843f87b8b54;
-    address public constant UNIV3_FACTORY = 0x1F98431c8aD98523631AE4a59f267346ea31F984;
+    bytes32 public constant UNIV3_POOL_INIT_CODE_HASH = PoolAddress.UNIV3_POOL_INIT_CODE_HASH;
+    address public constant UNIV3_FACTORY = PoolAddress.UNIV3_FACTORY;
 
     // BalancerV2 Vault
     address public constant BALANCERV2_VAULT = 0xBA12222222228d8Ba445958a75a0704d566BF2C8;
@@ -113,16 +125,65 @@ contract OnChainPricingMainnet {
     address public constant BALWETHBPT = 0x5c6Ee304399DBdB9C8Ef030aB642B10820DB8F56;
     uint256 public constant CURVE_FEE_SCALE = 100000;
     address public constant USDT = 0xdAC17F958D2ee523a2206206994597C13D831ec7;
-    
+
+    // Can add / remove Balancer pools in the registry
+    address public constant TECH_OPS = 0x86cbD0ce0c087b482782c181dA8d191De18C8275;
+
     /// @dev helper library to simulate Uniswap V3 swap
     address public immutable uniV3Simulator;
     /// @dev helper library to simulate Balancer V2 swap
     address public immutable balancerV2Simulator;
+    /// @dev helper library to simulate Curve StableSwap swap
+    address public immutable curveSimulator;
+
+    /// @dev BalancerV2 pool registry: keccak256(token0, token1) of the sorted pair => candidate pool ids
+    ///     the first candidate is the one returned by getBalancerV2Pool, all candidates are quoted
+    mapping(bytes32 => bytes32[]) internal balancerV2Pools;
+
+    /// @dev Balancer V2 pool metadata which never changes, cached per pool so that quotes only read balances, amp & swap fee
+    struct BalancerPoolDescriptor {
+        uint8 poolType; // BALANCER_POOL_UNKNOWN until cached, then BALANCER_POOL_WEIGHTED or BALANCER_POOL_STABLE
+        uint8 nTokens;
+        uint64 decimals; // decimals of token k (vault order) at bits [8k, 8k + 8)
+        uint64[8] weights; // normalized weights of token k (vault order) for weighted pools
+    }
+
+    uint8 internal constant BALANCER_POOL_UNKNOWN = 0;
+    uint8 internal constant BALANCER_POOL_WEIGHTED = 1;
+    uint8 internal constant BALANCER_POOL_STABLE = 2;
+    uint256 internal constant BALANCER_MAX_TOKENS = 8;
+
+    /// @dev tokens & balances of a Balancer pool read from the vault, shared by the legs of connector quotes
+    struct BalancerPoolTokens {
+        bytes32 poolId;
+        address[] tokens;
+        uint256[] balances;
+    }
+
+    /// @dev Balancer pool descriptors: pool id => metadata, see cacheBalancerV2Pool
+    mapping(bytes32 => BalancerPoolDescriptor) internal balancerV2PoolDescriptors;
+
+    /// @dev Balancer pool pairs: pool id => number of pairs the pool is registered for, its descriptor is dropped at zero
+    mapping(bytes32 => uint256) internal balancerV2PoolPairs;
+
+    /// @dev Curve StableSwap pool for a pair, packed in a single slot
+    struct CurvePoolIndex {
+        address pool;
+        uint8 nCoins;
+        uint8 index0; // coin index of the lower token address of the pair
+        uint8 index1; // coin index of the higher token address of the pair
+        bool aPrecise; // A_precise() available, otherwise A() without precision
+        uint32 decimals; // decimals of coin k at bits [8k, 8k + 8)
+    }
+
+    /// @dev Curve index: keccak256(token0, token1) of the sorted pair => pool quoted with native math instead of the router
+    mapping(bytes32 => CurvePoolIndex) internal curvePools;
 
     /// UniV3, replaces an array
     /// @notice We keep above constructor, because this is a gas optimization
     ///     Saves storing fee ids in storage, saving 2.1k+ per call
     uint256 constant univ3_fees_length = 4;
+    uint256 constant Q96 = 0x1000000000000000000000000;
     function univ3_fees(uint256 i) internal pure returns (uint24) {
         if(i == 0){
             return uint24(100);
@@ -135,9 +196,38 @@ contract OnChainPricingMainnet {
         return uint24(10000);
     }
 
-    constructor(address _uniV3Simulator, address _balancerV2Simulator){
+    constructor(address _uniV3Simulator, address _balancerV2Simulator, address _curveSimulator){
         uniV3Simulator = _uniV3Simulator;
         balancerV2Simulator = _balancerV2Simulator;
+        curveSimulator = _curveSimulator;
+
+        // default Curve pools, all pairs of their coins get indexed
+        _registerCurvePool(CURVE_3POOL, 3, false);
+        _registerCurvePool(CURVE_FRAXBP, 2, true);
+        _registerCurvePool(CURVE_CVX_BVECVX, 2, true);
+
+        // default pools, selected Balancer V2 pools for given pairs on Ethereum with liquidity > $5M, cached as registered
+        _registerBalancerV2Pool(CREAM, WETH, BALANCERV2_CREAM_WETH_POOLID);
+        _registerBalancerV2Pool(GNO, WETH, BALANCERV2_GNO_WETH_POOLID);
+        _registerBalancerV2Pool(WBTC, BADGER, BALANCERV2_BADGER_WBTC_POOLID);
+        _registerBalancerV2Pool(FEI, WETH, BALANCERV2_FEI_WETH_POOLID);
+        _registerBalancerV2Pool(BAL, WETH, BALANCERV2_BAL_WETH_POOLID);
+        _registerBalancerV2Pool(USDC, WETH, BALANCERV2_USDC_WETH_POOLID);
+        _registerBalancerV2Pool(WBTC, WETH, BALANCERV2_WBTC_WETH_POOLID);
+        _registerBalancerV2Pool(WSTETH, WETH, BALANCERV2_WSTETH_WETH_POOLID);
+        _registerBalancerV2Pool(LDO, WETH, BALANCERV2_LDO_WETH_POOLID);
+        _registerBalancerV2Pool(SRM, WETH, BALANCERV2_SRM_WETH_POOLID);
+        _registerBalancerV2Pool(rETH, WETH, BALANCERV2_rETH_WETH_POOLID);
+        _registerBalancerV2Pool(AKITA, WETH, BALANCERV2_AKITA_WETH_POOLID);
+        _registerBalancerV2Pool(OHM, WETH, BALANCERV2_OHM_DAI_WETH_POOLID);
+        _registerBalancerV2Pool(OHM, DAI, BALANCERV2_OHM_DAI_WETH_POOLID);
+        _registerBalancerV2Pool(GNO, COW, BALANCERV2_COW_GNO_POOLID);
+        _registerBalancerV2Pool(WETH, COW, BALANCERV2_COW_WETH_POOLID);
+        _registerBalancerV2Pool(WETH, AURA, BALANCERV2_AURA_WETH_POOLID);
+        _registerBalancerV2Pool(BALWETHBPT, AURABAL, BALANCERV2_AURABAL_BALWETH_POOLID);
+        // TODO CHANGE
+        _registerBalancerV2Pool(AURABAL, WETH, BALANCERV2_AURABAL_GRAVIAURA_WETH_POOLID);
+        _registerBalancerV2Pool(GRAVIAURA, WETH, BALANCERV2_AURABAL_GRAVIAURA_WETH_POOLID);
     }
 
     struct Quote {
@@ -147,40 +237,125 @@ contract OnChainPricingMainnet {
         uint256[] poolFees; // specific pool fees involved in the optimal swap path, typically in Uniswap V3
     }
 
+    struct RouteQuote {
+        uint256 amountOut;
+        address connector; // address(0) for a direct swap
+        Quote firstLeg; // tokenIn to connector, or to tokenOut for a direct swap
+        Quote secondLeg; // connector to tokenOut, empty for a direct swap
+    }
+
+    /// @dev quotes memoized within one call tree, passed along in memory by the caller (e.g. a keeper checking support,
+    ///     quoting then swapping in the same transaction) as there is no transient storage on this compiler
+    /// @notice entries are keyed by (block, tokenIn, tokenOut, amountIn), a context carried over to another block never hits,
+    ///     separately for the quote and for the venue found by isPairSupportedWithContext
+    struct QuoteContext {
+        bytes32[] keys;
+        Quote[] quotes;
+        uint256 size; // number of used entries, the arrays grow by doubling
+    }
+
+    /// @dev pair quoted within one call: sorted tokens & registry key computed once, pool addresses derived on first use
+    ///     and kept for the following venues or checks of the same pair, see _newPairContext
+    struct PairContext {
+        address tokenIn;
+        address tokenOut;
+        address token0;
+        address token1;
+        bool token0Price; // token0 is tokenIn
+        bytes32 pairKey; // see _sortedPairKey, also the CREATE2 salt of UniV2 like pairs
+        address univ2Pair; // zero until derived, see _getUniV2Pair
+        address sushiPair; // zero until derived, see _getUniV2Pair
+        address[univ3_fees_length] univ3Pools; // pool of each univ3_fees, zero until derived, see _getUniV3Pool
+        PairState state; // pool state read so far, shared with the context of the reverse direction in a PairCache
+    }
+
+    /// @dev pool state of a pair read within one call, which can't change before the call returns,
+    ///     so it is read once however many quotes of the call (e.g. the requests of a batch) go through the pair
+    struct PairState {
+        uint256 reads; // bit flags of the state already read, see PAIR_READ_UNIV2, PAIR_READ_SUSHI, PAIR_READ_UNIV3, PAIR_READ_BALANCER & PAIR_READ_CURVE
+        uint256[2] univ2Reserves; // reserve of token0 & token1, zero if there is no pair
+        uint256[2] sushiReserves; // reserve of token0 & token1, zero if there is no pair
+        uint256[univ3_fees_length] univ3Liquidities; // in-range liquidity of the pool of each univ3_fees, zero if there is no pool
+        uint256[univ3_fees_length] univ3SqrtPrices; // sqrtPriceX96 of the pool of each univ3_fees, zero if no in-range liquidity
+        bytes32[] balancerPools; // registered Balancer pools of the pair
+        bool curveListed; // any Curve registry lists a pool for the pair, see checkCurvePoolsExistence
+    }
+
+    uint256 internal constant PAIR_READ_UNIV2 = 1;
+    uint256 internal constant PAIR_READ_SUSHI = 2;
+    uint256 internal constant PAIR_READ_BALANCER = 4;
+    uint256 internal constant PAIR_READ_UNIV3 = 8; // shifted left by the index of the fee in univ3_fees
+    uint256 internal constant PAIR_READ_CURVE = 128; // next to the flags of all univ3_fees
+
+    /// @dev pair contexts & Balancer pool reads of one call, shared by all its quotes (e.g. the requests of findOptimalSwapBatch 
+    ///     and their WETH legs) so that pools involved in several quotes are read once, see _getPairContext
+    struct PairCache {
+        PairContext[] pairs;
+        uint256 size; // number of used pairs, the array grows by doubling
+        BalancerPoolTokens[] balancerReads;
+        uint256 balancerSize; // number of used reads, the array grows by doubling
+    }
+
+    /// @dev route of each venue quoted by _findOptimalSwap, kept as a by-product of its quote so that the winner
+    ///     is returned ready to execute (see OnChainSwapMainnet#doOptimalSwapWithQuote) without any further lookup
+    struct VenueRoutes {
+        address curvePool;
+        uint24 univ3Fee;
+        uint24 univ3WethFeeIn; // fee of the tokenIn to WETH pool
+        uint24 univ3WethFeeOut; // fee of the WETH to tokenOut pool
+        bytes32 balancerPool;
+        bytes32 balancerWethPoolIn; // tokenIn to WETH pool
+        bytes32 balancerWethPoolOut; // WETH to tokenOut pool
+    }
+
     /// @dev Given tokenIn, out and amountIn, returns true if a quote will be non-zero
     /// @notice Doesn't guarantee optimality, just non-zero
     function isPairSupported(address tokenIn, address tokenOut, uint256 amountIn) external view returns (bool) {
+        (bool _supported, , ) = _findSupportingVenue(tokenIn, tokenOut, amountIn);
+        return _supported;
+    }
+
+    /// @dev checks of isPairSupported, stops at the first venue found
+    /// @return true if some venue supports the pair, that venue and its quote (zero if only its pools existence was checked)
+    function _findSupportingVenue(address tokenIn, address tokenOut, uint256 amountIn) internal view returns (bool, SwapType, uint256) {
         // Sorted by "assumed" reverse worst case
         // Go for higher gas cost checks assuming they are offering best precision / good price
 
         // If There's a Bal Pool, since we have to hardcode, then the price is probably non-zero
         bytes32 poolId = getBalancerV2Pool(tokenIn, tokenOut);
         if (poolId != BALANCERV2_NONEXIST_POOLID){
-            return true;
+            return (true, SwapType.BALANCER, 0);
         }
 
+        PairContext memory ctx = _newPairContext(tokenIn, tokenOut);
+
         // If no pool this is fairly cheap, else highly likely there's a price
-        if(checkUniV3PoolsExistence(tokenIn, tokenOut)) {
-            return true;
+        if(_checkUniV3PoolsExistence(ctx)) {
+            return (true, SwapType.UNIV3, 0);
         }
 
         // Highly likely to have any random token here
-        if(getUniPrice(UNIV2_ROUTER, tokenIn, tokenOut, amountIn) > 0) {
-            return true;
+        uint256 _quote = _getUniPrice(ctx, true, amountIn);
+        if(_quote > 0) {
+            return (true, SwapType.UNIV2, _quote);
         }
 
         // Otherwise it's probably on Sushi
-        if(getUniPrice(SUSHI_ROUTER, tokenIn, tokenOut, amountIn) > 0) {
-            return true;
+        _quote = _getUniPrice(ctx, false, amountIn);
+        if(_quote > 0) {
+            return (true, SwapType.SUSHI, _quote);
         }
 
-        // Curve at this time has great execution prices but low selection
-        (, uint256 curveQuote) = getCurvePrice(CURVE_ROUTER, tokenIn, tokenOut, amountIn);
+        // Curve at this time has great execution prices but low selection, indexed pool first like findOptimalSwap
+        (address curvePool, uint256 curveQuote) = getCurvePriceAnalytically(tokenIn, amountIn, tokenOut);
+        if (curvePool == address(0)){
+            (, curveQuote) = getCurvePrice(CURVE_ROUTER, tokenIn, tokenOut, amountIn);
+        }
         if (curveQuote > 0){
-            return true;
+            return (true, SwapType.CURVE, curveQuote);
         }
 
-        return false;
+        return (false, SwapType.CURVE, 0);
     }
 
     /// @dev External function, virtual so you can override, see Lenient Version
@@ -191,54 +366,369 @@ contract OnChainPricingMainnet {
         return _findOptimalSwap(tokenIn, tokenOut, amountIn);
     }
 
-    /// @dev View function for testing the routing of the strategy
-    /// See {findOptimalSwap}
-    function _findOptimalSwap(address tokenIn, address tokenOut, uint256 amountIn) internal view returns (Quote memory) {
-        bool wethInvolved = (tokenIn == WETH || tokenOut == WETH);
-        uint256 length = wethInvolved? 5 : 7; // Add length you need
+    /// @dev External function, virtual so you can override, see Lenient Version
+    /// @notice Same quote as findOptimalSwap but the Curve registries are probed for the pair before the router best rate
+    ///     search, the other venues already skip missing pools (pair code, UniV3 spot & Balancer registry checks)
+    /// @param tokenIn - The token you want to sell
+    /// @param tokenOut - The token you want to buy
+    /// @param amountIn - The amount of token you want to sell
+    function findOptimalSwapWithProbes(address tokenIn, address tokenOut, uint256 amountIn) external view virtual returns (Quote memory) {
+        return _findOptimalSwap(tokenIn, tokenOut, amountIn, true);
+    }
 
-        Quote[] memory quotes = new Quote[](length);
-        bytes32[] memory dummyPools;
-        uint256[] memory dummyPoolFees;
+    /// @dev Same checks as isPairSupported, stopping at the first venue found, answered from the context if this block
+    ///     already quoted the same request (exact then) or found a venue for it. Only the venue found is memoized,
+    ///     a following findOptimalSwapWithContext still quotes all venues once
+    /// @param ctx - The context returned by a previous *WithContext call in the same transaction, or an empty one
+    function isPairSupportedWithContext(address tokenIn, address tokenOut, uint256 amountIn, QuoteContext memory ctx) external view returns (bool, QuoteContext memory) {
+        uint256 _idx = _findInQuoteContext(ctx, _quoteContextKey(tokenIn, tokenOut, amountIn, false));
+        if (_idx < ctx.size){
+            return (ctx.quotes[_idx].amountOut > 0, ctx);
+        }
+        bytes32 _venueKey = _quoteContextKey(tokenIn, tokenOut, amountIn, true);
+        if (_findInQuoteContext(ctx, _venueKey) < ctx.size){
+            return (true, ctx);
+        }
 
-        (address curvePool, uint256 curveQuote) = getCurvePrice(CURVE_ROUTER, tokenIn, tokenOut, amountIn);
-        if (curveQuote > 0){		   
-            (bytes32[] memory curvePools, uint256[] memory curvePoolFees) = _getCurveFees(curvePool);
-            quotes[0] = Quote(SwapType.CURVE, curveQuote, curvePools, curvePoolFees);		
-        } else {
-            quotes[0] = Quote(SwapType.CURVE, curveQuote, dummyPools, dummyPoolFees);         			
+        (bool _supported, SwapType _venue, uint256 _quote) = _findSupportingVenue(tokenIn, tokenOut, amountIn);
+        if (_supported){
+            bytes32[] memory dummyPools;
+            uint256[] memory dummyPoolFees;
+            ctx = _addToQuoteContext(ctx, _venueKey, Quote(_venue, _quote, dummyPools, dummyPoolFees));
         }
+        return (_supported, ctx);
+    }
 
-        quotes[1] = Quote(SwapType.UNIV2, getUniPrice(UNIV2_ROUTER, tokenIn, tokenOut, amountIn), dummyPools, dummyPoolFees);
+    /// @dev External function, virtual so you can override, see Lenient Version
+    /// @notice Same quote as findOptimalSwap, served from the context if this block already quoted the same request
+    /// @param ctx - The context returned by a previous *WithContext call in the same transaction, or an empty one
+    function findOptimalSwapWithContext(address tokenIn, address tokenOut, uint256 amountIn, QuoteContext memory ctx) external view virtual returns (Quote memory, QuoteContext memory) {
+        return _findOptimalSwapWithContext(tokenIn, tokenOut, amountIn, ctx);
+    }
 
-        quotes[2] = Quote(SwapType.SUSHI, getUniPrice(SUSHI_ROUTER, tokenIn, tokenOut, amountIn), dummyPools, dummyPoolFees);
+    /// @dev Look up the request in the context, quote and memoize it on a miss
+    /// @return a copy of the memoized quote so callers can safely modify it in place, and the updated context
+    function _findOptimalSwapWithContext(address tokenIn, address tokenOut, uint256 amountIn, QuoteContext memory ctx) internal view returns (Quote memory, QuoteContext memory) {
+        bytes32 _key = _quoteContextKey(tokenIn, tokenOut, amountIn, false);
+        uint256 _idx = _findInQuoteContext(ctx, _key);
+        if (_idx < ctx.size){
+            Quote memory _cached = ctx.quotes[_idx];
+            return (Quote(_cached.name, _cached.amountOut, _cached.pools, _cached.poolFees), ctx);
+        }
 
-        quotes[3] = Quote(SwapType.UNIV3, getUniV3Price(tokenIn, amountIn, tokenOut), dummyPools, dummyPoolFees);
+        Quote memory q = _findOptimalSwap(tokenIn, tokenOut, amountIn);
+        ctx = _addToQuoteContext(ctx, _key, q);
+        return (Quote(q.name, q.amountOut, q.pools, q.poolFees), ctx);
+    }
 
-        quotes[4] = Quote(SwapType.BALANCER, getBalancerPriceAnalytically(tokenIn, amountIn, tokenOut), dummyPools, dummyPoolFees);
+    /// @return key of the request in a QuoteContext, for its findOptimalSwap quote or for the venue found by isPairSupportedWithContext
+    function _quoteContextKey(address tokenIn, address tokenOut, uint256 amountIn, bool _venueOnly) internal view returns (bytes32) {
+        return keccak256(abi.encode(block.number, tokenIn, tokenOut, amountIn, _venueOnly));
+    }
 
-        if(!wethInvolved){
-            quotes[5] = Quote(SwapType.UNIV3WITHWETH, (_useSinglePoolInUniV3(tokenIn, tokenOut) > 0 ? 0 : getUniV3PriceWithConnector(tokenIn, amountIn, tokenOut, WETH)), dummyPools, dummyPoolFees);	
+    /// @return index of given key in the context, its size if not found
+    function _findInQuoteContext(QuoteContext memory ctx, bytes32 _key) internal pure returns (uint256) {
+        uint256 _size = ctx.size;
+        for (uint256 i = 0; i < _size;){
+            if (ctx.keys[i] == _key){
+                return i;
+            }
+            unchecked { ++i; }
+        }
+        return _size;
+    }
 
-            quotes[6] = Quote(SwapType.BALANCERWITHWETH, getBalancerPriceWithConnectorAnalytically(tokenIn, amountIn, tokenOut, WETH), dummyPools, dummyPoolFees);		
+    /// @return the context with given entry appended, grown if full
+    function _addToQuoteContext(QuoteContext memory ctx, bytes32 _key, Quote memory q) internal pure returns (QuoteContext memory) {
+        uint256 _size = ctx.size;
+        if (_size == ctx.keys.length){
+            ctx = _growQuoteContext(ctx);
         }
+        ctx.keys[_size] = _key;
+        ctx.quotes[_size] = q;
+        ctx.size = _size + 1;
+        return ctx;
+    }
 
-        // Because this is a generalized contract, it is best to just loop,
-        // Ideally we have a hierarchy for each chain to save some extra gas, but I think it's ok
-        // O(n) complexity and each check is like 9 gas
-        Quote memory bestQuote = quotes[0];
-        unchecked {
-            for(uint256 x = 1; x < length; ++x) {
-                if(quotes[x].amountOut > bestQuote.amountOut) {
-                    bestQuote = quotes[x];
+    /// @return a context with the same entries and twice the capacity (at least 4)
+    function _growQuoteContext(QuoteContext memory ctx) internal pure returns (QuoteContext memory) {
+        uint256 _size = ctx.size;
+        uint256 _capacity = _size < 2? 4 : _size * 2;
+        QuoteContext memory _grown = QuoteContext(new bytes32[](_capacity), new Quote[](_capacity), _size);
+        for (uint256 i = 0; i < _size;){
+            _grown.keys[i] = ctx.keys[i];
+            _grown.quotes[i] = ctx.quotes[i];
+            unchecked { ++i; }
+        }
+        return _grown;
+    }
+
+    /// @dev External function, virtual so you can override, see Lenient Version
+    /// @notice Batched version of findOptimalSwap, quote many (tokenIn, tokenOut, amountIn) in a single call
+    /// @param tokensIn - The tokens you want to sell
+    /// @param tokensOut - The tokens you want to buy, one for each tokenIn
+    /// @param amountsIn - The amounts you want to sell, one for each tokenIn
+    function findOptimalSwapBatch(address[] calldata tokensIn, address[] calldata tokensOut, uint256[] calldata amountsIn) external view virtual returns (Quote[] memory) {
+        return _findOptimalSwapBatch(tokensIn, tokensOut, amountsIn);
+    }
+
+    /// @dev Loop over the requests and quote each of them
+    /// @notice Identical requests within the batch are quoted only once, and pool state shared by several requests
+    ///     (UniV2 like reserves, UniV3 spot price & liquidity, Balancer pool ids & balances, e.g. of a common WETH leg) is read once
+    /// See {findOptimalSwapBatch}
+    function _findOptimalSwapBatch(address[] calldata tokensIn, address[] calldata tokensOut, uint256[] calldata amountsIn) internal view returns (Quote[] memory) {
+        uint256 length = tokensIn.length;
+        require(length == tokensOut.length && length == amountsIn.length, "!len");
+
+        Quote[] memory quotes = new Quote[](length);
+        PairCache memory _cache;
+        for (uint256 i = 0; i < length;){
+            uint256 _sameIdx = _findSameRequestInBatch(tokensIn, tokensOut, amountsIn, i);
+            if (_sameIdx < i){
+                // copy instead of aliasing so callers can safely modify each quote in place
+                Quote memory _sameQuote = quotes[_sameIdx];
+                quotes[i] = Quote(_sameQuote.name, _sameQuote.amountOut, _sameQuote.pools, _sameQuote.poolFees);
+            } else {
+                quotes[i] = _findOptimalSwap(_cache, _getPairContext(_cache, tokensIn[i], tokensOut[i]), amountsIn[i], false);
+            }
+            unchecked { ++i; }
+        }
+        return quotes;
+    }
+
+    /// @return the index of the first request in the batch before given index with the same (tokenIn, tokenOut, amountIn), or given index if none
+    function _findSameRequestInBatch(address[] calldata tokensIn, address[] calldata tokensOut, uint256[] calldata amountsIn, uint256 idx) internal pure returns (uint256) {
+        for (uint256 j = 0; j < idx;){
+            if (tokensIn[j] == tokensIn[idx] && tokensOut[j] == tokensOut[idx] && amountsIn[j] == amountsIn[idx]){
+                return j;
+            }
+            unchecked { ++j; }
+        }
+        return idx;
+    }
+
+    /// @dev Route of tokenIn to tokenOut via given connector, or the direct swap for address(0), each leg can be on any venue,
+    ///     see OnChainQuoterMainnet#findOptimalRoute which keeps the best of the direct swap & all its connectors
+    /// @notice the connector is skipped after cheap existence checks of its pools to tokenOut before quoting the first leg,
+    ///     the second leg is then quoted from the pool state read by its checks. The first leg is quoted without checks as
+    ///     its quote reads the same state, so a connector without pools only costs the storage reads, pool code checks &
+    ///     Curve registry lookups of its checks
+    /// @return route with both legs, zero amountOut & connector if there is no route via the connector
+    function findOptimalRouteViaConnector(address tokenIn, address tokenOut, uint256 amountIn, address connector) external view returns (RouteQuote memory _route) {
+        if (connector == address(0)){
+            _route.firstLeg = _findOptimalDirectSwap(_newPairContext(tokenIn, tokenOut), amountIn);
+            _route.amountOut = _route.firstLeg.amountOut;
+            return _route;
+        }
+
+        PairContext memory _ctxOut = _newPairContext(connector, tokenOut);
+        if (_checkDirectPoolsExistence(_ctxOut)){
+            Quote memory _firstLeg = _findOptimalDirectSwap(_newPairContext(tokenIn, connector), amountIn);
+            if (_firstLeg.amountOut > 0){
+                Quote memory _secondLeg = _findOptimalDirectSwap(_ctxOut, _firstLeg.amountOut);
+                if (_secondLeg.amountOut > 0){
+                    _route = RouteQuote(_secondLeg.amountOut, connector, _firstLeg, _secondLeg);
                 }
             }
         }
+    }
+
+    /// @dev best swap through a single pool of Curve, UniV2, Sushi, UniV3 or Balancer
+    /// @return quote with the pools & fees needed to execute it, in the same shape as findOptimalSwap, see _buildQuote
+    function _findOptimalDirectSwap(PairContext memory ctx, uint256 amountIn) internal view returns (Quote memory) {
+        VenueRoutes memory _routes;
+        SwapType _bestType = SwapType.CURVE;
+        uint256 _bestOut;
 
+        {
+            (address curvePool, uint256 curveQuote) = getCurvePriceAnalytically(ctx.tokenIn, amountIn, ctx.tokenOut);
+            if (curvePool == address(0) && _checkCurvePoolsExistence(ctx)){
+                (curvePool, curveQuote) = getCurvePrice(CURVE_ROUTER, ctx.tokenIn, ctx.tokenOut, amountIn);
+            }
+            _routes.curvePool = curvePool;
+            _bestOut = curveQuote;
+        }
+
+        {
+            uint256 _quote = _getUniPrice(ctx, true, amountIn);
+            if (_quote > _bestOut){
+                (_bestType, _bestOut) = (SwapType.UNIV2, _quote);
+            }
+            _quote = _getUniPrice(ctx, false, amountIn);
+            if (_quote > _bestOut){
+                (_bestType, _bestOut) = (SwapType.SUSHI, _quote);
+            }
+        }
 
-        return bestQuote;
+        {
+            uint256 _quote;
+            (_quote, _routes.univ3Fee) = _sortUniV3Pools(ctx, amountIn);
+            if (_quote > _bestOut){
+                (_bestType, _bestOut) = (SwapType.UNIV3, _quote);
+            }
+        }
+
+        {
+            PairCache memory _cache;
+            uint256 _quote;
+            (_quote, _routes.balancerPool) = _getBalancerBestQuoteWithReads(_getBalancerPools(ctx), ctx.tokenIn, amountIn, ctx.tokenOut, _cache);
+            if (_quote > _bestOut){
+                (_bestType, _bestOut) = (SwapType.BALANCER, _quote);
+            }
+        }
+
+        return _buildQuote(ctx, _bestType, _bestOut, _routes);
+    }
+
+    /// @dev Cheap probe of direct pools for the pair, cheapest checks first
+    /// @return true if the Balancer registry, the Curve index, UniV2, Sushi, UniV3 (with liquidity) or Curve registries have a pool for the pair
+    function checkDirectPoolsExistence(address tokenA, address tokenB) public view returns (bool) {
+        return _checkDirectPoolsExistence(_newPairContext(tokenA, tokenB));
+    }
+
+    /// @dev same as checkDirectPoolsExistence for the pair of given context: registries of this contract first, then the pools
+    ///     whose state is kept in the context for a following quote of the pair, external Curve registries last
+    function _checkDirectPoolsExistence(PairContext memory ctx) internal view returns (bool) {
+        if (_getBalancerPools(ctx).length > 0 || curvePools[ctx.pairKey].pool != address(0)){
+            return true;
+        }
+        (uint256 _reserveIn, ) = _getUniV2Reserves(ctx, true);
+        if (_reserveIn > 0){
+            return true;
+        }
+        (_reserveIn, ) = _getUniV2Reserves(ctx, false);
+        if (_reserveIn > 0){
+            return true;
+        }
+        for (uint256 i = 0; i < univ3_fees_length;){
+            (uint256 _liquidity, ) = _getUniV3Spot(ctx, i);
+            if (_liquidity > 0){
+                return true;
+            }
+            unchecked { ++i; }
+        }
+        return _checkCurvePoolsExistence(ctx);
+    }
+
+    /// @dev View function for testing the routing of the strategy
+    /// See {findOptimalSwap}
+    function _findOptimalSwap(address tokenIn, address tokenOut, uint256 amountIn) internal view returns (Quote memory) {
+        return _findOptimalSwap(tokenIn, tokenOut, amountIn, false);
+    }
+
+    /// @param withProbes - skip the Curve router when no Curve registry lists the pair, see {findOptimalSwapWithProbes}
+    /// @notice UniV2 like, UniV3, Balancer & connector legs already check pool existence before quoting
+    function _findOptimalSwap(address tokenIn, address tokenOut, uint256 amountIn, bool withProbes) internal view returns (Quote memory) {
+        PairCache memory _cache;
+        return _findOptimalSwap(_cache, _getPairContext(_cache, tokenIn, tokenOut), amountIn, withProbes);
+    }
+
+    /// @dev same as above for the pair of given context, the pool state of the pair & of its WETH legs is looked up in
+    ///     (or added to) given cache, see {findOptimalSwapBatch}
+    function _findOptimalSwap(PairCache memory cache, PairContext memory ctx, uint256 amountIn, bool withProbes) internal view returns (Quote memory) {
+        VenueRoutes memory _routes;
+
+        // running best quote instead of a buffer of all quotes, venues are compared in the order Curve, UniV2, Sushi, UniV3,
+        // Balancer, UniV3 & Balancer via WETH so the first best one wins ties, and only the winner is assembled into a Quote
+        SwapType _bestType = SwapType.CURVE;
+        uint256 _bestOut;
+
+        // scoped to avoid stack too deep
+        {
+            (address curvePool, uint256 curveQuote) = getCurvePriceAnalytically(ctx.tokenIn, amountIn, ctx.tokenOut);
+            if (curvePool == address(0) && (!withProbes || _checkCurvePoolsExistence(ctx))){
+                (curvePool, curveQuote) = getCurvePrice(CURVE_ROUTER, ctx.tokenIn, ctx.tokenOut, amountIn);
+            }
+            _routes.curvePool = curvePool;
+            _bestOut = curveQuote;
+        }
+
+        {
+            uint256 _quote = _getUniPrice(ctx, true, amountIn);
+            if (_quote > _bestOut){
+                (_bestType, _bestOut) = (SwapType.UNIV2, _quote);
+            }
+            _quote = _getUniPrice(ctx, false, amountIn);
+            if (_quote > _bestOut){
+                (_bestType, _bestOut) = (SwapType.SUSHI, _quote);
+            }
+        }
+
+        {
+            // no probe needed, pools without code get a zero spot bound and are never simulated
+            uint256 _quote;
+            (_quote, _routes.univ3Fee) = _sortUniV3Pools(ctx, amountIn);
+            if (_quote > _bestOut){
+                (_bestType, _bestOut) = (SwapType.UNIV3, _quote);
+            }
+        }
+
+        if(ctx.tokenIn != WETH && ctx.tokenOut != WETH){
+            uint256 _univ3WithWethQuote;
+            if (useSinglePoolInUniV3(ctx.token0, ctx.token1) == 0){
+                (_univ3WithWethQuote, _routes.univ3WethFeeIn, _routes.univ3WethFeeOut) = _getUniV3PriceAndFeesWithConnector(cache, ctx.tokenIn, amountIn, ctx.tokenOut, WETH);
+            }
+
+            // direct & WETH legs share their Balancer pool reads, scoped to avoid stack too deep
+            {
+                (uint256 _balancerQuote, uint256 _balancerWithWethQuote) = _getBalancerPricesAndPoolsWithConnector(cache, ctx.tokenIn, amountIn, ctx.tokenOut, WETH, _routes);
+                if (_balancerQuote > _bestOut){
+                    (_bestType, _bestOut) = (SwapType.BALANCER, _balancerQuote);
+                }
+                if (_univ3WithWethQuote > _bestOut){
+                    (_bestType, _bestOut) = (SwapType.UNIV3WITHWETH, _univ3WithWethQuote);
+                }
+                if (_balancerWithWethQuote > _bestOut){
+                    (_bestType, _bestOut) = (SwapType.BALANCERWITHWETH, _balancerWithWethQuote);
+                }
+            }
+        } else {
+            uint256 _quote;
+            (_quote, _routes.balancerPool) = _getBalancerBestQuoteWithReads(_getBalancerPools(ctx), ctx.tokenIn, amountIn, ctx.tokenOut, cache);
+            if (_quote > _bestOut){
+                (_bestType, _bestOut) = (SwapType.BALANCER, _quote);
+            }
+        }
+
+        return _buildQuote(ctx, _bestType, _bestOut, _routes);
     }    
 
+    /// @return quote of given venue for the pair of given context with its route taken from given venue routes:
+    ///     Curve pool & fee, UniV2 like pair, UniV3 pool & fee of each hop or Balancer pool id of each hop
+    function _buildQuote(PairContext memory ctx, SwapType _name, uint256 _amountOut, VenueRoutes memory _routes) internal view returns (Quote memory q) {
+        q.name = _name;
+        q.amountOut = _amountOut;
+        if (_name == SwapType.CURVE){
+            if (_amountOut > 0){
+                (q.pools, q.poolFees) = _getCurveFees(_routes.curvePool);
+            }
+        } else if (_name == SwapType.UNIV2 || _name == SwapType.SUSHI){
+            q.pools = new bytes32[](1);
+            q.pools[0] = convertToBytes32(_getUniV2Pair(ctx, _name == SwapType.UNIV2));
+        } else if (_name == SwapType.UNIV3){
+            q.pools = new bytes32[](1);
+            q.pools[0] = convertToBytes32(_getUniV3Pool(ctx, _univ3FeeIndex(_routes.univ3Fee)));
+            q.poolFees = new uint256[](1);
+            q.poolFees[0] = _routes.univ3Fee;
+        } else if (_name == SwapType.UNIV3WITHWETH){
+            q.pools = new bytes32[](2);
+            (address token0, address token1, ) = _ifUniV3Token0Price(ctx.tokenIn, WETH);
+            q.pools[0] = convertToBytes32(_getUniV3PoolAddress(token0, token1, _routes.univ3WethFeeIn));
+            (token0, token1, ) = _ifUniV3Token0Price(WETH, ctx.tokenOut);
+            q.pools[1] = convertToBytes32(_getUniV3PoolAddress(token0, token1, _routes.univ3WethFeeOut));
+            q.poolFees = new uint256[](2);
+            q.poolFees[0] = _routes.univ3WethFeeIn;
+            q.poolFees[1] = _routes.univ3WethFeeOut;
+        } else if (_name == SwapType.BALANCER){
+            q.pools = new bytes32[](1);
+            q.pools[0] = _routes.balancerPool;
+        } else if (_name == SwapType.BALANCERWITHWETH){
+            q.pools = new bytes32[](2);
+            q.pools[0] = _routes.balancerWethPoolIn;
+            q.pools[1] = _routes.balancerWethPoolOut;
+        }
+    }
+
     /// === Component Functions === /// 
     /// Why bother?
     /// Because each chain is slightly different but most use similar tech / forks
@@ -249,20 +739,32 @@ contract OnChainPricingMainnet {
 
     /// @dev Given the address of the UniV2Like Router, the input amount, and the path, returns the quote for it
     function getUniPrice(address router, address tokenIn, address tokenOut, uint256 amountIn) public view returns (uint256) {
+        return _getUniPrice(_newPairContext(tokenIn, tokenOut), (router == UNIV2_ROUTER), amountIn);
+    }
 	
-        // check pool existence first before quote against it
-        bool _univ2 = (router == UNIV2_ROUTER);
-        
-        (address _pool, address _token0, ) = pairForUniV2((_univ2? UNIV2_FACTORY : SUSHI_FACTORY), tokenIn, tokenOut, (_univ2? UNIV2_POOL_INITCODE : SUSHI_POOL_INITCODE));
-        if (!_pool.isContract()){
-            return 0;
-        }
-		
-        bool _zeroForOne = (_token0 == tokenIn);
-        (uint256 _t0Balance, uint256 _t1Balance, ) = IUniswapV2Pool(_pool).getReserves();
+    /// @dev same as getUniPrice for the pair of given context, in UniV2 if _univ2 otherwise in Sushi
+    function _getUniPrice(PairContext memory ctx, bool _univ2, uint256 amountIn) internal view returns (uint256) {
+        (uint256 _reserveIn, uint256 _reserveOut) = _getUniV2Reserves(ctx, _univ2);
         // Use dummy magic number as a quick-easy substitute for liquidity (to avoid one SLOAD) since we have pool reserve check in it
-        bool _basicCheck = _checkPoolLiquidityAndBalances(1, (_zeroForOne? _t0Balance : _t1Balance), amountIn);
-        return _basicCheck? getUniV2AmountOutAnalytically(amountIn, (_zeroForOne? _t0Balance : _t1Balance), (_zeroForOne? _t1Balance : _t0Balance)) : 0;
+        bool _basicCheck = _checkPoolLiquidityAndBalances(1, _reserveIn, amountIn);
+        return _basicCheck? getUniV2AmountOutAnalytically(amountIn, _reserveIn, _reserveOut) : 0;
+    }
+
+    /// @return reserves of tokenIn & tokenOut in the UniV2 (if _univ2) or Sushi pair of the context, zero if there is no pair
+    /// @notice read once per pair state, see PairState
+    function _getUniV2Reserves(PairContext memory ctx, bool _univ2) internal view returns (uint256, uint256) {
+        PairState memory _state = ctx.state;
+        uint256[2] memory _reserves = _univ2? _state.univ2Reserves : _state.sushiReserves;
+        uint256 _read = _univ2? PAIR_READ_UNIV2 : PAIR_READ_SUSHI;
+        if ((_state.reads & _read) == 0){
+            // check pool existence first before reading it
+            address _pool = _getUniV2Pair(ctx, _univ2);
+            if (_pool.isContract()){
+                (_reserves[0], _reserves[1], ) = IUniswapV2Pool(_pool).getReserves();
+            }
+            _state.reads |= _read;
+        }
+        return ctx.token0Price? (_reserves[0], _reserves[1]) : (_reserves[1], _reserves[0]);
     }
 	
     /// @dev reference https://etherscan.io/address/0xd9e1cE17f2641f24aE83637ab66a2cca9C378B9F#code#L122
@@ -273,90 +775,150 @@ contract OnChainPricingMainnet {
         amountOut = numerator / denominator;
     }
 	
+    /// @notice quotes derive their pairs with PoolAddress instead, see _getUniV2Pair
     function pairForUniV2(address factory, address tokenA, address tokenB, bytes memory _initCode) public pure returns (address, address, address) {
         (address token0, address token1) = tokenA < tokenB ? (tokenA, tokenB) : (tokenB, tokenA);		
         address pair = getAddressFromBytes32Lsb(keccak256(abi.encodePacked(
                 hex"ff",
                 factory,
-                keccak256(abi.encodePacked(token0, token1)),
+                _pairKey(token0, token1),
                 _initCode // init code hash
         )));
         return (pair, token0, token1);
     }
 	
+    /// @return UniV2 (if _univ2) or Sushi pair of the context, derived once
+    function _getUniV2Pair(PairContext memory ctx, bool _univ2) internal pure returns (address _pair) {
+        _pair = _univ2? ctx.univ2Pair : ctx.sushiPair;
+        if (_pair == address(0)){
+            _pair = PoolAddress.computeCreate2Address((_univ2? UNIV2_FACTORY : SUSHI_FACTORY), ctx.pairKey, (_univ2? PoolAddress.UNIV2_POOL_INITCODE : PoolAddress.SUSHI_POOL_INITCODE));
+            if (_univ2){
+                ctx.univ2Pair = _pair;
+            } else {
+                ctx.sushiPair = _pair;
+            }
+        }
+    }
+	
     /// === UNIV3 === ///
 	
     /// @dev explore Uniswap V3 pools to check if there is a chance to resolve the swap with in-range liquidity (i.e., without crossing ticks)
     /// @dev check helper UniV3SwapSimulator for more
     /// @return maximum output (with current in-range liquidity & spot price) and according pool fee
     function sortUniV3Pools(address tokenIn, uint256 amountIn, address tokenOut) public view returns (uint256, uint24){
-        uint256 _maxQuote;
-        uint24 _maxQuoteFee;
-		
-        {
-            // Heuristic: If we already know high TVL Pools, use those
-            uint24 _bestFee = _useSinglePoolInUniV3(tokenIn, tokenOut);
-            (address token0, address token1, bool token0Price) = _ifUniV3Token0Price(tokenIn, tokenOut);
-			
-            {
-                if (_bestFee > 0) {
-                    (,uint256 _bestOutAmt) = _checkSimulationInUniV3(token0, token1, amountIn, _bestFee, token0Price);
-                    return (_bestOutAmt, _bestFee);
-                }
-            }
-			
-            (uint256 _maxQAmt, uint24 _maxQFee) = _simLoopAllUniV3Pools(token0, token1, amountIn, token0Price); 
-            _maxQuote = _maxQAmt;
-            _maxQuoteFee = _maxQFee;
+        return _sortUniV3Pools(_newPairContext(tokenIn, tokenOut), amountIn);
+    }
+	
+    /// @dev same as sortUniV3Pools for the pair of given context
+    function _sortUniV3Pools(PairContext memory ctx, uint256 amountIn) internal view returns (uint256, uint24){
+        // Heuristic: If we already know high TVL Pools, use those
+        uint24 _bestFee = useSinglePoolInUniV3(ctx.token0, ctx.token1);
+        if (_bestFee > 0) {
+            (,uint256 _bestOutAmt) = _checkSimulationInUniV3(ctx, amountIn, _univ3FeeIndex(_bestFee));
+            return (_bestOutAmt, _bestFee);
         }
 		
-        return (_maxQuote, _maxQuoteFee);
+        return _simLoopAllUniV3Pools(ctx, amountIn);
     }	
 	
-    /// @dev loop over all possible Uniswap V3 pools to find a proper quote
-    function _simLoopAllUniV3Pools(address token0, address token1, uint256 amountIn, bool token0Price) internal view returns (uint256, uint24) {		
+    /// @dev loop over all possible Uniswap V3 pools to find a proper quote, result is the same as fully quoting all pools
+    /// @dev best-first: every pool starts with an upper bound from its spot price (slot0 & liquidity only), then the pool with the highest bound 
+    /// @dev which may still beat the best quote is quoted with a single fused simulation (see simulateUniV3SwapFused) until no pool may beat it
+    function _simLoopAllUniV3Pools(PairContext memory ctx, uint256 amountIn) internal view returns (uint256, uint24) {		
         uint256 _maxQuote;
         uint24 _maxQuoteFee;
-        uint256 feeTypes = univ3_fees_length;		
-	
-        for (uint256 i = 0; i < feeTypes;){
-            uint24 _fee = univ3_fees(i);
-                
-            {			 
-                // TODO: Partial rewrite to perform initial comparison against all simulations based on "liquidity in range"
-                // If liq is in range, then lowest fee auto-wins
-                // Else go down fee range with liq in range 
-                // NOTE: A tick is like a ratio, so technically X ticks can offset a fee
-                // Meaning we prob don't need full quote in majority of cases, but can compare number of ticks
-                // per pool per fee and pre-rank based on that
-                (, uint256 _outAmt) = _checkSimulationInUniV3(token0, token1, amountIn, _fee, token0Price);
-                if (_outAmt > _maxQuote){
-                    _maxQuote = _outAmt;
-                    _maxQuoteFee = _fee;
-                }
-                unchecked { ++i; }	
+        // upper bound of each pool quote, zero once the pool is quoted
+        uint256[] memory _upperBounds = new uint256[](univ3_fees_length);
+	
+        for (uint256 i = 0; i < univ3_fees_length;){
+            _upperBounds[i] = _getUniV3SpotUpperBound(ctx, i, amountIn);
+            unchecked { ++i; }
+        }
+
+        while (true){
+            uint256 _best = _pickUniV3PoolToQuote(_upperBounds, _maxQuote, _maxQuoteFee);
+            if (_best == univ3_fees_length){
+                break;
+            }
+
+            _upperBounds[_best] = 0;
+            (, uint256 _outAmt) = _checkSimulationInUniV3(ctx, amountIn, _best);
+
+            // lower fee wins ties, same as looping over fees in ascending order
+            uint24 _fee = univ3_fees(_best);
+            if (_outAmt > _maxQuote || (_outAmt == _maxQuote && _outAmt > 0 && _fee < _maxQuoteFee)){
+                _maxQuote = _outAmt;
+                _maxQuoteFee = _fee;
             }
         }
 		
         return (_maxQuote, _maxQuoteFee);		
     }
 	
+    /// @return index of the pool with the highest upper bound which may still beat (or tie with a lower fee) the best quote, lower fee first on ties
+    /// @return univ3_fees_length if none
+    function _pickUniV3PoolToQuote(uint256[] memory _upperBounds, uint256 _maxQuote, uint24 _maxQuoteFee) internal pure returns (uint256) {
+        uint256 _best = univ3_fees_length;
+        for (uint256 i = 0; i < univ3_fees_length;){
+            uint256 _bound = _upperBounds[i];
+            bool _mayWin = _bound > _maxQuote || (_bound == _maxQuote && _bound > 0 && univ3_fees(i) < _maxQuoteFee);
+            if (_mayWin && (_best == univ3_fees_length || _bound > _upperBounds[_best])){
+                _best = i;
+            }
+            unchecked { ++i; }
+        }
+        return _best;
+    }
+	
+    /// @dev upper bound of the quote in the Uniswap V3 pool of the context for the fee univ3_fees(i) using only its spot price, 
+    /// @dev since the price only gets worse along a swap
+    /// @return zero if the pool doesn't exist or has no in-range liquidity (quoted zero anyway) otherwise amountIn less fee at spot price, plus one
+    function _getUniV3SpotUpperBound(PairContext memory ctx, uint256 i, uint256 amountIn) internal view returns (uint256) {
+        (uint256 _liquidity, uint256 _sqrtPriceX96) = _getUniV3Spot(ctx, i);
+        if (_liquidity == 0) {
+            return 0;
+        }
+
+        uint256 _amountInLessFee = _mulDivRoundingUp(amountIn, 1e6 - univ3_fees(i), 1e6);
+        uint256 _bound = ctx.token0Price
+            ? _mulDivRoundingUp(_mulDivRoundingUp(_amountInLessFee, _sqrtPriceX96, Q96), _sqrtPriceX96, Q96)
+            : _mulDivRoundingUp(_mulDivRoundingUp(_amountInLessFee, Q96, _sqrtPriceX96), Q96, _sqrtPriceX96);
+        return _bound == type(uint256).max ? _bound : _bound + 1;
+    }
+
+    /// @return in-range liquidity & sqrtPriceX96 of the Uniswap V3 pool of the context for the fee univ3_fees(i), zero if there is no pool
+    /// @notice read once per pair state, see PairState
+    function _getUniV3Spot(PairContext memory ctx, uint256 i) internal view returns (uint256, uint256) {
+        PairState memory _state = ctx.state;
+        uint256 _read = PAIR_READ_UNIV3 << i;
+        if ((_state.reads & _read) == 0){
+            address _pool = _getUniV3Pool(ctx, i);
+            if (_pool.isContract()){
+                _state.univ3Liquidities[i] = IUniswapV3Pool(_pool).liquidity();
+                if (_state.univ3Liquidities[i] > 0){
+                    (uint160 _sqrtPriceX96,,,,,,) = IUniswapV3Pool(_pool).slot0();
+                    _state.univ3SqrtPrices[i] = _sqrtPriceX96;
+                }
+            }
+            _state.reads |= _read;
+        }
+        return (_state.univ3Liquidities[i], _state.univ3SqrtPrices[i]);
+    }
+	
     /// @dev tell if there exists some Uniswap V3 pool for given token pair
     function checkUniV3PoolsExistence(address tokenIn, address tokenOut) public view returns (bool){
-        uint256 feeTypes = univ3_fees_length;	
-        (address token0, address token1, ) = _ifUniV3Token0Price(tokenIn, tokenOut);
-        bool _exist;
-        {    
-          for (uint256 i = 0; i < feeTypes;){
-             address _pool = _getUniV3PoolAddress(token0, token1, univ3_fees(i));
-             if (_pool.isContract()) {
-                 _exist = true;
-                 break;
-             }
-             unchecked { ++i; }	
-          }				 
-        }	
-        return _exist;		
+        return _checkUniV3PoolsExistence(_newPairContext(tokenIn, tokenOut));
+    }
+	
+    /// @dev same as checkUniV3PoolsExistence for the pair of given context, pools derived here are kept for the quote
+    function _checkUniV3PoolsExistence(PairContext memory ctx) internal view returns (bool){
+        for (uint256 i = 0; i < univ3_fees_length;){
+            if (_getUniV3Pool(ctx, i).isContract()) {
+                return true;
+            }
+            unchecked { ++i; }	
+        }
+        return false;
     }
 	
     /// @dev Uniswap V3 pool in-range liquidity check
@@ -381,25 +943,30 @@ contract OnChainPricingMainnet {
         }
     }
 	
-    /// @dev internal function to avoid stack too deep for 1) check in-range liquidity in Uniswap V3 pool 2) full cross-ticks simulation in Uniswap V3
-    function _checkSimulationInUniV3(address token0, address token1, uint256 amountIn, uint24 _fee, bool token0Price) internal view returns (bool, uint256) {
-        bool _crossTick;
-        uint256 _outAmt;
-        
-        address _pool = _getUniV3PoolAddress(token0, token1, _fee);		
-        {
-             // in-range swap check: find out whether the swap within current liquidity would move the price across next tick
-             (bool _outOfInRange, uint256 _outputAmount) = checkUniV3InRangeLiquidity(token0, token1, amountIn, _fee, token0Price, _pool);
-             _crossTick = _outOfInRange;
-             _outAmt = _outputAmount;
+    /// @dev 1) check in-range liquidity in the Uniswap V3 pool of the context for the fee univ3_fees(_feeIdx) 2) full cross-ticks simulation if required
+    /// @dev both are done in a single simulator call, see simulateUniV3SwapFused
+    function _checkSimulationInUniV3(PairContext memory ctx, uint256 amountIn, uint256 _feeIdx) internal view returns (bool, uint256) {
+        return simulateUniV3SwapFused(ctx.token0, ctx.token1, amountIn, univ3_fees(_feeIdx), ctx.token0Price, _getUniV3Pool(ctx, _feeIdx));
+    }
+	
+    /// @dev same quote as checkUniV3InRangeLiquidity followed by simulateUniV3Swap if it crosses ticks, 
+    /// @dev but the in-range attempt carries on into the cross-ticks simulation without reading the pool state twice
+    /// @return true if cross-ticks simulation was required for the swap, and the quote
+    function simulateUniV3SwapFused(address token0, address token1, uint256 amountIn, uint24 _fee, bool token0Price, address _pool) public view returns (bool, uint256){
+        if (!_pool.isContract()) {
+            return (false, 0);
         }
-        {
-             // unfortunately we need to do a full simulation to cross ticks
-             if (_crossTick){
-                 _outAmt = simulateUniV3Swap(token0, amountIn, token1, _fee, token0Price, _pool);
-             } 
+		
+        // pool liquidity is checked by the simulator
+        if (!_checkPoolLiquidityAndBalances(1, IERC20(token0Price? token0 : token1).balanceOf(_pool), amountIn)) {
+            return (false, 0);
+        }
+		
+        try IUniswapV3Simulator(uniV3Simulator).simulateUniV3SwapFused(_pool, token0Price, _fee, amountIn) returns (bool _crossTicks, uint256 _simOut) {
+            return (_crossTicks, _simOut);
+        } catch {
+            return (false, 0);
         }
-        return (_crossTick, _outAmt);
     }
 	
     /// @dev internal function for a basic sanity check pool existence and balances
@@ -446,16 +1013,27 @@ contract OnChainPricingMainnet {
     /// @dev Given the address of the input token & amount & the output token & connector token in between (input token ---> connector token ---> output token)
     /// @return the quote for it
     function getUniV3PriceWithConnector(address tokenIn, uint256 amountIn, address tokenOut, address connectorToken) public view returns (uint256) {
+        PairCache memory _cache;
+        (uint256 _quote, , ) = _getUniV3PriceAndFeesWithConnector(_cache, tokenIn, amountIn, tokenOut, connectorToken);
+        return _quote;
+    }
+	
+    /// @return same quote as getUniV3PriceWithConnector and the pool fee of each leg, legs are looked up in (or added to) given cache
+    function _getUniV3PriceAndFeesWithConnector(PairCache memory cache, address tokenIn, uint256 amountIn, address tokenOut, address connectorToken) internal view returns (uint256, uint24, uint24) {
+        PairContext memory _ctxIn = _getPairContext(cache, tokenIn, connectorToken);
+        PairContext memory _ctxOut = _getPairContext(cache, connectorToken, tokenOut);
+	
         // Skip if there is a mainstrem direct swap or connector pools not exist
-        if (!checkUniV3PoolsExistence(tokenIn, connectorToken) || !checkUniV3PoolsExistence(connectorToken, tokenOut)){
-            return 0;
+        if (!_checkUniV3PoolsExistence(_ctxIn) || !_checkUniV3PoolsExistence(_ctxOut)){
+            return (0, 0, 0);
         }
 		
-        uint256 connectorAmount = getUniV3Price(tokenIn, amountIn, connectorToken);	
+        (uint256 connectorAmount, uint24 _feeIn) = _sortUniV3Pools(_ctxIn, amountIn);	
         if (connectorAmount > 0){	
-            return getUniV3Price(connectorToken, connectorAmount, tokenOut);
+            (uint256 _quote, uint24 _feeOut) = _sortUniV3Pools(_ctxOut, connectorAmount);
+            return (_quote, _feeIn, _feeOut);
         } else{
-            return 0;
+            return (0, 0, 0);
         }
     }
 	
@@ -468,15 +1046,35 @@ contract OnChainPricingMainnet {
     /// @dev query with the address of the token0 & token1 & the fee tier
     /// @return the uniswap v3 pool address
     function _getUniV3PoolAddress(address token0, address token1, uint24 fee) internal pure returns (address) {
-        bytes32 addr = keccak256(abi.encodePacked(hex"ff", UNIV3_FACTORY, keccak256(abi.encode(token0, token1, fee)), UNIV3_POOL_INIT_CODE_HASH));
-        return address(uint160(uint256(addr)));
+        return PoolAddress.univ3Pool(token0, token1, fee);
+    }
+	
+    /// @return index i of given fee in univ3_fees(i)
+    function _univ3FeeIndex(uint24 _fee) internal pure returns (uint256) {
+        if (_fee == 100){
+            return 0;
+        } else if (_fee == 500) {
+            return 1;
+        } else if (_fee == 3000) {
+            return 2;
+        }
+        return 3;
+    }
+	
+    /// @return Uniswap V3 pool of the context for the fee univ3_fees(i), derived once
+    function _getUniV3Pool(PairContext memory ctx, uint256 i) internal pure returns (address _pool) {
+        _pool = ctx.univ3Pools[i];
+        if (_pool == address(0)){
+            _pool = _getUniV3PoolAddress(ctx.token0, ctx.token1, univ3_fees(i));
+            ctx.univ3Pools[i] = _pool;
+        }
     }
 	
     /// @dev selected token pair which will try a chosen Uniswap V3 pool ONLY among all possible fees
     /// @dev picked from most traded pool (Volume 7D) in https://info.uniswap.org/#/pools
     /// @dev mainly 5 most-popular tokens WETH-WBTC-USDC-USDT-DAI (Volume 24H) https://info.uniswap.org/#/tokens
     /// @return 0 if all possible fees should be checked otherwise the ONLY pool fee we should go for
-    function _useSinglePoolInUniV3(address tokenIn, address tokenOut) internal pure returns(uint24) {
+    function useSinglePoolInUniV3(address tokenIn, address tokenOut) public pure returns(uint24) {
         (address token0, address token1) = tokenIn < tokenOut ? (tokenIn, tokenOut) : (tokenOut, tokenIn);
         if (token1 == WETH && (token0 == USDC || token0 == WBTC || token0 == DAI)) {
             return 500;
@@ -496,21 +1094,42 @@ contract OnChainPricingMainnet {
     /// === BALANCER === ///
 	
     /// @dev Given the input/output token, returns the quote for input amount from Balancer V2 using its underlying math
+    /// @notice When several pools are registered for the pair, the best quote among them is returned
     function getBalancerPriceAnalytically(address tokenIn, uint256 amountIn, address tokenOut) public view returns (uint256) { 
-        bytes32 poolId = getBalancerV2Pool(tokenIn, tokenOut);
-        if (poolId == BALANCERV2_NONEXIST_POOLID){
-            return 0;
+        (uint256 _bestQuote, ) = _getBalancerPriceAndPool(tokenIn, amountIn, tokenOut);
+        return _bestQuote;
+    }
+
+    /// @return best quote among the registered pools for the pair and the pool id giving it
+    function _getBalancerPriceAndPool(address tokenIn, uint256 amountIn, address tokenOut) internal view returns (uint256 _bestQuote, bytes32 _bestPool) { 
+        bytes32[] memory poolIds = getBalancerV2Pools(tokenIn, tokenOut);
+        uint256 _len = poolIds.length;
+        for (uint256 i = 0; i < _len;){
+            uint256 _quote = getBalancerQuoteWithinPoolAnalytcially(poolIds[i], tokenIn, amountIn, tokenOut);
+            if (_quote > _bestQuote){
+                _bestQuote = _quote;
+                _bestPool = poolIds[i];
+            }
+            unchecked { ++i; }
         }
-        return getBalancerQuoteWithinPoolAnalytcially(poolId, tokenIn, amountIn, tokenOut);
     }
 	
     function getBalancerQuoteWithinPoolAnalytcially(bytes32 poolId, address tokenIn, uint256 amountIn, address tokenOut) public view returns (uint256) {			
+        (address[] memory tokens, uint256[] memory balances, ) = IBalancerV2Vault(BALANCERV2_VAULT).getPoolTokens(poolId);
+        return _getBalancerQuoteWithinPool(poolId, tokens, balances, tokenIn, amountIn, tokenOut);
+    }
+
+    /// @dev Same as getBalancerQuoteWithinPoolAnalytcially with the pool tokens & balances already read from the vault
+    function _getBalancerQuoteWithinPool(bytes32 poolId, address[] memory tokens, uint256[] memory balances, address tokenIn, uint256 amountIn, address tokenOut) internal view returns (uint256) {			
+        /// cached pool type, weights & scaling factors: no detection call nor decimals() reads
+        if (balancerV2PoolDescriptors[poolId].poolType != BALANCER_POOL_UNKNOWN) {
+            return _getBalancerQuoteWithDescriptor(poolId, tokens, balances, tokenIn, amountIn, tokenOut);
+        }
+
         uint256 _quote;		
         address _pool = getAddressFromBytes32Msb(poolId);
         
         {
-            (address[] memory tokens, uint256[] memory balances, ) = IBalancerV2Vault(BALANCERV2_VAULT).getPoolTokens(poolId);
-			
             uint256 _inTokenIdx = _findTokenInBalancePool(tokenIn, tokens);
             require(_inTokenIdx < tokens.length, "!inBAL");
             uint256 _outTokenIdx = _findTokenInBalancePool(tokenOut, tokens);
@@ -539,6 +1158,55 @@ contract OnChainPricingMainnet {
         return _quote;
     }
 	
+    /// @dev Same as getBalancerQuoteWithinPoolAnalytcially for a cached pool, the amplification of stable pools is still read as it may be ramping
+    function _getBalancerQuoteWithDescriptor(bytes32 poolId, address[] memory tokens, uint256[] memory balances, address tokenIn, uint256 amountIn, address tokenOut) internal view returns (uint256) {
+        BalancerPoolDescriptor storage _desc = balancerV2PoolDescriptors[poolId];
+
+        // pool tokens, balances & indices, it is the whole query for stable pools
+        ExactInStableQueryParam memory _poolQuery;
+        _poolQuery.tokens = tokens;
+        _poolQuery.balances = balances;
+        require(_desc.nTokens == _poolQuery.tokens.length, "!lenBAL");
+        _poolQuery.tokenIndexIn = _findTokenInBalancePool(tokenIn, _poolQuery.tokens);
+        require(_poolQuery.tokenIndexIn < _poolQuery.tokens.length, "!inBAL");
+        _poolQuery.tokenIndexOut = _findTokenInBalancePool(tokenOut, _poolQuery.tokens);
+        require(_poolQuery.tokenIndexOut < _poolQuery.tokens.length, "!outBAL");
+
+        if(_poolQuery.balances[_poolQuery.tokenIndexIn] <= amountIn) return 0;
+        _poolQuery.amountIn = amountIn;
+
+        address _pool = getAddressFromBytes32Msb(poolId);
+        uint256 _decimals = _desc.decimals;
+        if (_desc.poolType == BALANCER_POOL_STABLE) {
+            (_poolQuery.currentAmp, , ) = IBalancerV2StablePool(_pool).getAmplificationParameter();
+            _poolQuery.swapFeePercentage = IBalancerV2StablePool(_pool).getSwapFeePercentage();
+            uint256[] memory _scalingFactors = new uint256[](_poolQuery.tokens.length);
+            for (uint256 i = 0; i < _scalingFactors.length;){
+                _scalingFactors[i] = 1e18 * _balancerScalingFactor(_decimals, i);
+                unchecked { ++i; }
+            }
+            return IBalancerV2Simulator(balancerV2Simulator).calcOutGivenInForStableWithScaling(_poolQuery, _scalingFactors);
+        }
+
+        ExactInQueryParam memory _query;
+        _query.tokenIn = tokenIn;
+        _query.tokenOut = tokenOut;
+        _query.balanceIn = _poolQuery.balances[_poolQuery.tokenIndexIn];
+        _query.weightIn = _desc.weights[_poolQuery.tokenIndexIn];
+        _query.balanceOut = _poolQuery.balances[_poolQuery.tokenIndexOut];
+        _query.weightOut = _desc.weights[_poolQuery.tokenIndexOut];
+        _query.amountIn = amountIn;
+        _query.swapFeePercentage = IBalancerV2WeightedPool(_pool).getSwapFeePercentage();
+        uint256 _scalingFactorIn = _balancerScalingFactor(_decimals, _poolQuery.tokenIndexIn);
+        uint256 _scalingFactorOut = _balancerScalingFactor(_decimals, _poolQuery.tokenIndexOut);
+        return IBalancerV2Simulator(balancerV2Simulator).calcOutGivenInWithScaling(_query, _scalingFactorIn, _scalingFactorOut);
+    }
+
+    /// @return 10**(18 - decimals) of token k given the packed decimals of a BalancerPoolDescriptor
+    function _balancerScalingFactor(uint256 _decimals, uint256 k) internal pure returns (uint256) {
+        return 10**(18 - ((_decimals >> (8 * k)) & 0xff));
+    }
+	
     function _findTokenInBalancePool(address _token, address[] memory _tokens) internal pure returns (uint256){	    
         uint256 _len = _tokens.length;
         for (uint256 i = 0; i < _len; ){
@@ -551,63 +1219,222 @@ contract OnChainPricingMainnet {
     }
 	
     /// @dev Given the input/output/connector token, returns the quote for input amount from Balancer V2 using its underlying math
+    /// @notice the registry is read once per leg and each pool once from the vault, a pool holding the three tokens
+    ///     (e.g. auraBAL/graviAURA/WETH) serves both legs with a single read, both legs price against its current balances
     function getBalancerPriceWithConnectorAnalytically(address tokenIn, uint256 amountIn, address tokenOut, address connectorToken) public view returns (uint256) { 
-        if (getBalancerV2Pool(tokenIn, connectorToken) == BALANCERV2_NONEXIST_POOLID || getBalancerV2Pool(connectorToken, tokenOut) == BALANCERV2_NONEXIST_POOLID){
-            return 0;
+        PairCache memory _cache;
+        bytes32[] memory _poolsIn = getBalancerV2Pools(tokenIn, connectorToken);
+        bytes32[] memory _poolsOut = getBalancerV2Pools(connectorToken, tokenOut);
+        (uint256 _quote, , ) = _getBalancerConnectorQuoteWithReads(_poolsIn, _poolsOut, tokenIn, amountIn, tokenOut, connectorToken, _cache);
+        return _quote;
+    }
+
+    /// @dev getBalancerPriceAnalytically & getBalancerPriceWithConnectorAnalytically sharing the pool reads of all legs
+    /// @return direct quote and quote through the connector
+    function getBalancerPricesWithConnectorAnalytically(address tokenIn, uint256 amountIn, address tokenOut, address connectorToken) public view returns (uint256, uint256) { 
+        PairCache memory _cache;
+        VenueRoutes memory _routes;
+        return _getBalancerPricesAndPoolsWithConnector(_cache, tokenIn, amountIn, tokenOut, connectorToken, _routes);
+    }
+
+    /// @dev same as getBalancerPricesWithConnectorAnalytically, the pool ids giving both quotes are written to given venue routes
+    /// @notice registered pools of each pair & pool reads are looked up in (or added to) given cache
+    function _getBalancerPricesAndPoolsWithConnector(PairCache memory cache, address tokenIn, uint256 amountIn, address tokenOut, address connectorToken, VenueRoutes memory _routes) internal view returns (uint256, uint256) { 
+        uint256 _direct;
+        (_direct, _routes.balancerPool) = _getBalancerBestQuoteWithReads(_getBalancerPools(_getPairContext(cache, tokenIn, tokenOut)), tokenIn, amountIn, tokenOut, cache);
+        bytes32[] memory _poolsIn = _getBalancerPools(_getPairContext(cache, tokenIn, connectorToken));
+        bytes32[] memory _poolsOut = _getBalancerPools(_getPairContext(cache, connectorToken, tokenOut));
+        uint256 _withConnector;
+        (_withConnector, _routes.balancerWethPoolIn, _routes.balancerWethPoolOut) = _getBalancerConnectorQuoteWithReads(_poolsIn, _poolsOut, tokenIn, amountIn, tokenOut, connectorToken, cache);
+        return (_direct, _withConnector);
+    }
+
+    /// @return registered Balancer pools of the pair of the context, read once per pair state, see PairState
+    function _getBalancerPools(PairContext memory ctx) internal view returns (bytes32[] memory) {
+        PairState memory _state = ctx.state;
+        if ((_state.reads & PAIR_READ_BALANCER) == 0){
+            _state.balancerPools = balancerV2Pools[ctx.pairKey];
+            _state.reads |= PAIR_READ_BALANCER;
+        }
+        return _state.balancerPools;
+    }
+
+    /// @return quote through the connector and the pool id of each leg
+    function _getBalancerConnectorQuoteWithReads(bytes32[] memory _poolsIn, bytes32[] memory _poolsOut, address tokenIn, uint256 amountIn, address tokenOut, address connectorToken, PairCache memory cache) internal view returns (uint256, bytes32, bytes32) { 
+        if (_poolsIn.length == 0 || _poolsOut.length == 0){
+            return (0, bytes32(0), bytes32(0));
         }
 		
-        uint256 _in2ConnectorAmt = getBalancerPriceAnalytically(tokenIn, amountIn, connectorToken);
+        (uint256 _in2ConnectorAmt, bytes32 _poolIn) = _getBalancerBestQuoteWithReads(_poolsIn, tokenIn, amountIn, connectorToken, cache);
         if (_in2ConnectorAmt <= 0){
-            return 0;
+            return (0, bytes32(0), bytes32(0));
+        }
+        (uint256 _quote, bytes32 _poolOut) = _getBalancerBestQuoteWithReads(_poolsOut, connectorToken, _in2ConnectorAmt, tokenOut, cache);
+        return (_quote, _poolIn, _poolOut);
+    }
+
+    /// @return best quote among given pools and the pool id giving it, their tokens & balances are looked up in (or added to) the reads of given cache
+    function _getBalancerBestQuoteWithReads(bytes32[] memory poolIds, address tokenIn, uint256 amountIn, address tokenOut, PairCache memory cache) internal view returns (uint256 _bestQuote, bytes32 _bestPool) {
+        uint256 _len = poolIds.length;
+        for (uint256 i = 0; i < _len;){
+            BalancerPoolTokens memory _read = _readBalancerPoolTokens(poolIds[i], cache);
+            uint256 _quote = _getBalancerQuoteWithinPool(poolIds[i], _read.tokens, _read.balances, tokenIn, amountIn, tokenOut);
+            if (_quote > _bestQuote){
+                _bestQuote = _quote;
+                _bestPool = poolIds[i];
+            }
+            unchecked { ++i; }
+        }
+    }
+
+    /// @return tokens & balances of the pool from the reads of given cache, read from the vault and added to them if not there yet
+    function _readBalancerPoolTokens(bytes32 poolId, PairCache memory cache) internal view returns (BalancerPoolTokens memory) {
+        uint256 _size = cache.balancerSize;
+        for (uint256 i = 0; i < _size;){
+            if (cache.balancerReads[i].poolId == poolId){
+                return cache.balancerReads[i];
+            }
+            unchecked { ++i; }
         }
-        return getBalancerPriceAnalytically(connectorToken, _in2ConnectorAmt, tokenOut);    
+
+        if (_size == cache.balancerReads.length){
+            BalancerPoolTokens[] memory _grown = new BalancerPoolTokens[](_size < 2? 4 : _size * 2);
+            for (uint256 i = 0; i < _size;){
+                _grown[i] = cache.balancerReads[i];
+                unchecked { ++i; }
+            }
+            cache.balancerReads = _grown;
+        }
+        (address[] memory tokens, uint256[] memory balances, ) = IBalancerV2Vault(BALANCERV2_VAULT).getPoolTokens(poolId);
+        cache.balancerReads[_size] = BalancerPoolTokens(poolId, tokens, balances);
+        cache.balancerSize = _size + 1;
+        return cache.balancerReads[_size];
     }
 	
-    /// @return selected BalancerV2 pool given the tokenIn and tokenOut 
-    function getBalancerV2Pool(address tokenIn, address tokenOut) public pure returns(bytes32){
-        (address token0, address token1) = tokenIn < tokenOut ? (tokenIn, tokenOut) : (tokenOut, tokenIn);
-        if (token0 == CREAM && token1 == WETH){
-            return BALANCERV2_CREAM_WETH_POOLID;
-        } else if (token0 == GNO && token1 == WETH){
-            return BALANCERV2_GNO_WETH_POOLID;
-        } else if (token0 == WBTC && token1 == BADGER){
-            return BALANCERV2_BADGER_WBTC_POOLID;
-        } else if (token0 == FEI && token1 == WETH){
-            return BALANCERV2_FEI_WETH_POOLID;
-        } else if (token0 == BAL && token1 == WETH){
-            return BALANCERV2_BAL_WETH_POOLID;
-        } else if (token0 == USDC && token1 == WETH){
-            return BALANCERV2_USDC_WETH_POOLID;
-        } else if (token0 == WBTC && token1 == WETH){
-            return BALANCERV2_WBTC_WETH_POOLID;
-        } else if (token0 == WSTETH && token1 == WETH){
-            return BALANCERV2_WSTETH_WETH_POOLID;
-        } else if (token0 == LDO && token1 == WETH){
-            return BALANCERV2_LDO_WETH_POOLID;
-        } else if (token0 == SRM && token1 == WETH){
-            return BALANCERV2_SRM_WETH_POOLID;
-        } else if (token0 == rETH && token1 == WETH){
-            return BALANCERV2_rETH_WETH_POOLID;
-        } else if (token0 == AKITA && token1 == WETH){
-            return BALANCERV2_AKITA_WETH_POOLID;
-        } else if ((token0 == OHM && token1 == WETH) || (token0 == OHM && token1 == DAI)){
-            return BALANCERV2_OHM_DAI_WETH_POOLID;
-        } else if (token0 == GNO && token1 == COW){
-            return BALANCERV2_COW_GNO_POOLID;
-        } else if (token0 == WETH && token1 == COW){
-            return BALANCERV2_COW_WETH_POOLID;
-        } else if (token0 == WETH && token1 == AURA){
-            return BALANCERV2_AURA_WETH_POOLID;
-        } else if (token0 == BALWETHBPT && token1 == AURABAL){
-            return BALANCERV2_AURABAL_BALWETH_POOLID;
-            // TODO CHANGE
-        } else if (token0 == AURABAL && token1 == WETH){
-            return BALANCERV2_AURABAL_GRAVIAURA_WETH_POOLID;
-        } else if (token0 == GRAVIAURA && token1 == WETH){
-            return BALANCERV2_AURABAL_GRAVIAURA_WETH_POOLID;
-        } else{
-            return BALANCERV2_NONEXIST_POOLID;
-        }		
+    /// @return selected BalancerV2 pool given the tokenIn and tokenOut, the first registered candidate for the pair
+    function getBalancerV2Pool(address tokenIn, address tokenOut) public view returns(bytes32){
+        bytes32[] storage poolIds = balancerV2Pools[_sortedPairKey(tokenIn, tokenOut)];
+        return poolIds.length > 0 ? poolIds[0] : BALANCERV2_NONEXIST_POOLID;
+    }
+
+    /// @return all registered BalancerV2 pools given the tokenIn and tokenOut, empty if none
+    function getBalancerV2Pools(address tokenIn, address tokenOut) public view returns(bytes32[] memory){
+        return balancerV2Pools[_sortedPairKey(tokenIn, tokenOut)];
+    }
+
+    /// @dev Add a candidate pool for the pair, the pool must hold both tokens
+    function addBalancerV2Pool(address tokenA, address tokenB, bytes32 poolId) external {
+        require(msg.sender == TECH_OPS, "Only TechOps");
+        (address[] memory tokens, , ) = IBalancerV2Vault(BALANCERV2_VAULT).getPoolTokens(poolId);
+        require(_findTokenInBalancePool(tokenA, tokens) < tokens.length, "!inBAL");
+        require(_findTokenInBalancePool(tokenB, tokens) < tokens.length, "!outBAL");
+
+        bytes32[] storage poolIds = balancerV2Pools[_sortedPairKey(tokenA, tokenB)];
+        uint256 _len = poolIds.length;
+        for (uint256 i = 0; i < _len;){
+            require(poolIds[i] != poolId, "!dupBAL");
+            unchecked { ++i; }
+        }
+        _registerBalancerV2Pool(tokenA, tokenB, poolId);
+    }
+
+    /// @return cached metadata of given Balancer pool, poolType is BALANCER_POOL_UNKNOWN if not cached
+    function getBalancerV2PoolDescriptor(bytes32 poolId) external view returns (BalancerPoolDescriptor memory) {
+        return balancerV2PoolDescriptors[poolId];
+    }
+
+    /// @dev Cache (or refresh) the type, weights & token decimals of a pool registered for the pair
+    /// @notice only stable & fixed-weight pools can be cached as weights of pools like LBPs change over time
+    function cacheBalancerV2Pool(address tokenA, address tokenB, bytes32 poolId) external {
+        require(msg.sender == TECH_OPS, "Only TechOps");
+        bytes32[] storage poolIds = balancerV2Pools[_sortedPairKey(tokenA, tokenB)];
+        uint256 _len = poolIds.length;
+        uint256 i = 0;
+        while (i < _len && poolIds[i] != poolId){
+            unchecked { ++i; }
+        }
+        require(i < _len, "!BAL");
+        require(_cacheBalancerV2Pool(poolId), "!staticBAL");
+    }
+
+    /// @return false if the pool weights change over time, nothing is cached then
+    function _cacheBalancerV2Pool(bytes32 poolId) internal returns (bool) {
+        address _pool = getAddressFromBytes32Msb(poolId);
+        (address[] memory tokens, , ) = IBalancerV2Vault(BALANCERV2_VAULT).getPoolTokens(poolId);
+        uint256 _len = tokens.length;
+        require(_len <= BALANCER_MAX_TOKENS, "!lenBAL");
+
+        BalancerPoolDescriptor storage _desc = balancerV2PoolDescriptors[poolId];
+        try IBalancerV2StablePool(_pool).getAmplificationParameter() returns (uint256, bool, uint256) {
+            _desc.poolType = BALANCER_POOL_STABLE;
+        } catch (bytes memory) {
+            try IBalancerV2WeightedPool(_pool).getGradualWeightUpdateParams() returns (uint256, uint256) {
+                return false;
+            } catch (bytes memory) {
+                // fixed weights
+            }
+            uint256[] memory _weights = IBalancerV2WeightedPool(_pool).getNormalizedWeights();
+            require(_weights.length == _len, "!lenBAL");
+            for (uint256 i = 0; i < _len;){
+                _desc.weights[i] = uint64(_weights[i]);
+                unchecked { ++i; }
+            }
+            _desc.poolType = BALANCER_POOL_WEIGHTED;
+        }
+
+        uint256 _decimals;
+        for (uint256 i = 0; i < _len;){
+            uint256 _tokenDecimals = IERC20Metadata(tokens[i]).decimals();
+            require(_tokenDecimals <= 18, "!decimals");
+            _decimals |= _tokenDecimals << (8 * i);
+            unchecked { ++i; }
+        }
+        _desc.decimals = uint64(_decimals);
+        _desc.nTokens = uint8(_len);
+        return true;
+    }
+
+    /// @dev Remove a candidate pool for the pair, keeps the order of the remaining candidates
+    function removeBalancerV2Pool(address tokenA, address tokenB, bytes32 poolId) external {
+        require(msg.sender == TECH_OPS, "Only TechOps");
+        bytes32[] storage poolIds = balancerV2Pools[_sortedPairKey(tokenA, tokenB)];
+        uint256 _len = poolIds.length;
+        uint256 i = 0;
+        while (i < _len && poolIds[i] != poolId){
+            unchecked { ++i; }
+        }
+        require(i < _len, "!BAL");
+
+        for (; i + 1 < _len;){
+            poolIds[i] = poolIds[i + 1];
+            unchecked { ++i; }
+        }
+        poolIds.pop();
+
+        // a pool added back later gets cached again instead of reusing stale decimals & weights
+        if (--balancerV2PoolPairs[poolId] == 0){
+            delete balancerV2PoolDescriptors[poolId];
+        }
+    }
+
+    /// @dev the descriptor is shared by all pairs of the pool, so it is cached when the pool gets its first pair
+    /// @notice pools whose weights change over time are left uncached
+    function _registerBalancerV2Pool(address tokenA, address tokenB, bytes32 poolId) internal {
+        balancerV2Pools[_sortedPairKey(tokenA, tokenB)].push(poolId);
+        if (balancerV2PoolPairs[poolId]++ == 0){
+            _cacheBalancerV2Pool(poolId);
+        }
+    }
+
+    /// @return registry key of the pair, independent of the tokens order
+    function _sortedPairKey(address tokenA, address tokenB) internal pure returns (bytes32) {
+        (address token0, address token1) = tokenA < tokenB ? (tokenA, tokenB) : (tokenB, tokenA);
+        return _pairKey(token0, token1);
+    }
+
+    /// @return keccak256(abi.encodePacked(token0, token1)), see PoolAddress#pairKey
+    function _pairKey(address token0, address token1) internal pure returns (bytes32) {
+        return PoolAddress.pairKey(token0, token1);
     }
 
     /// === CURVE === ///
@@ -619,6 +1446,133 @@ contract OnChainPricingMainnet {
         return (pool, curveQuote);
     }
 	
+    /// @dev Cheap probe of Curve pools for the pair, the router only finds pools listed in these registries
+    /// @return true if any registry lists a pool for the pair
+    function checkCurvePoolsExistence(address tokenIn, address tokenOut) public view returns (bool) {
+        return ICurveRegistry(CURVE_REGISTRY).find_pool_for_coins(tokenIn, tokenOut) != address(0)
+            || ICurveRegistry(CURVE_FACTORY_REGISTRY).find_pool_for_coins(tokenIn, tokenOut) != address(0)
+            || ICurveRegistry(CURVE_CRYPTO_REGISTRY).find_pool_for_coins(tokenIn, tokenOut) != address(0)
+            || ICurveRegistry(CURVE_CRYPTO_FACTORY).find_pool_for_coins(tokenIn, tokenOut) != address(0);
+    }
+	
+    /// @dev same as checkCurvePoolsExistence for the pair of given context, looked up once per pair state
+    function _checkCurvePoolsExistence(PairContext memory ctx) internal view returns (bool) {
+        PairState memory _state = ctx.state;
+        if ((_state.reads & PAIR_READ_CURVE) == 0){
+            _state.curveListed = checkCurvePoolsExistence(ctx.tokenIn, ctx.tokenOut);
+            _state.reads |= PAIR_READ_CURVE;
+        }
+        return _state.curveListed;
+    }
+	
+    /// @dev Given the input/output token, returns the quote for input amount from the indexed Curve pool using its underlying math
+    /// @return the indexed pool and its quote, address(0) if the pair isn't indexed (use the router then)
+    function getCurvePriceAnalytically(address tokenIn, uint256 amountIn, address tokenOut) public view returns (address, uint256) {
+        CurvePoolIndex memory _index = curvePools[_sortedPairKey(tokenIn, tokenOut)];
+        if (_index.pool == address(0)){
+            return (address(0), 0);
+        }
+
+        CurveStableSwapQuery memory _query = _getCurveQuery(_index, tokenIn, tokenOut);
+        _query.dx = amountIn;
+        return (_index.pool, _getCurveDy(_query));
+    }
+
+    /// @dev Same as getCurvePriceAnalytically for several input amounts, reading the indexed pool once
+    /// @notice pairs without an indexed pool are quoted by the router, same source as findOptimalSwap for every pair
+    function getCurvePriceAmountsAnalytically(address tokenIn, uint256[] memory amountsIn, address tokenOut) public view returns (uint256[] memory) {
+        CurvePoolIndex memory _index = curvePools[_sortedPairKey(tokenIn, tokenOut)];
+        if (_index.pool == address(0)){
+            return getCurvePriceAmounts(CURVE_ROUTER, tokenIn, tokenOut, amountsIn);
+        }
+
+        uint256 _len = amountsIn.length;
+        uint256[] memory amountsOut = new uint256[](_len);
+        CurveStableSwapQuery memory _query = _getCurveQuery(_index, tokenIn, tokenOut);
+        for (uint256 i = 0; i < _len;){
+            _query.dx = amountsIn[i];
+            amountsOut[i] = _getCurveDy(_query);
+            unchecked { ++i; }
+        }
+        return amountsOut;
+    }
+
+    /// @return query of the indexed Curve pool for tokenIn to tokenOut with its current balances, A & fee, without input amount
+    function _getCurveQuery(CurvePoolIndex memory _index, address tokenIn, address tokenOut) internal view returns (CurveStableSwapQuery memory _query) {
+        uint256 _n = _index.nCoins;
+        _query.balances = new uint256[](_n);
+        _query.rates = new uint256[](_n);
+        for (uint256 k = 0; k < _n;){
+            _query.balances[k] = ICurvePool(_index.pool).balances(k);
+            _query.rates[k] = 10 ** (36 - ((_index.decimals >> (8 * k)) & 0xff));
+            unchecked { ++k; }
+        }
+        _query.amp = _index.aPrecise? ICurvePool(_index.pool).A_precise() : ICurvePool(_index.pool).A();
+        _query.aPrecision = _index.aPrecise? 100 : 1;
+        _query.fee = ICurvePool(_index.pool).fee();
+        (_query.i, _query.j) = tokenIn < tokenOut? (_index.index0, _index.index1) : (_index.index1, _index.index0);
+    }
+
+    /// @return get_dy of given query with CurveSwapSimulator, zero if the math reverts
+    function _getCurveDy(CurveStableSwapQuery memory _query) internal view returns (uint256) {
+        try ICurveSwapSimulator(curveSimulator).get_dy(_query) returns (uint256 _dy) {
+            return _dy;
+        } catch {
+            return 0;
+        }
+    }
+
+    /// @return indexed Curve pool for the pair, address(0) if none
+    function getCurvePool(address tokenA, address tokenB) external view returns (address) {
+        return curvePools[_sortedPairKey(tokenA, tokenB)].pool;
+    }
+
+    /// @dev Index all pairs of given Curve StableSwap plain pool, replacing the pool previously indexed for a pair if any
+    /// @notice only for pools with balances(uint256) & get_dy math of CurveSwapSimulator
+    function addCurvePool(address pool, uint256 nCoins, bool aPrecise) external {
+        require(msg.sender == TECH_OPS, "Only TechOps");
+        _registerCurvePool(pool, nCoins, aPrecise);
+    }
+
+    /// @dev Remove the indexed Curve pool of the pair, which falls back to the router
+    function removeCurvePool(address tokenA, address tokenB) external {
+        require(msg.sender == TECH_OPS, "Only TechOps");
+        bytes32 _key = _sortedPairKey(tokenA, tokenB);
+        require(curvePools[_key].pool != address(0), "!CRV");
+        delete curvePools[_key];
+    }
+
+    function _registerCurvePool(address pool, uint256 nCoins, bool aPrecise) internal {
+        require(nCoins > 1 && nCoins <= 4, "!nCRV");
+        address[] memory _coins = new address[](nCoins);
+        uint32 _decimals;
+        for (uint256 k = 0; k < nCoins;){
+            _coins[k] = ICurvePool(pool).coins(k);
+            _decimals |= uint32(IERC20Metadata(_coins[k]).decimals()) << uint32(8 * k);
+            unchecked { ++k; }
+        }
+
+        for (uint256 a = 0; a < nCoins;){
+            for (uint256 b = a + 1; b < nCoins;){
+                (uint8 _index0, uint8 _index1) = _coins[a] < _coins[b]? (uint8(a), uint8(b)) : (uint8(b), uint8(a));
+                curvePools[_sortedPairKey(_coins[a], _coins[b])] = CurvePoolIndex(pool, uint8(nCoins), _index0, _index1, aPrecise, _decimals);
+                unchecked { ++b; }
+            }
+            unchecked { ++a; }
+        }
+    }
+	
+    /// @dev Same as getCurvePrice for several input amounts, the router picks the best pool for each of them
+    function getCurvePriceAmounts(address router, address tokenIn, address tokenOut, uint256[] memory amountsIn) public view returns (uint256[] memory) {
+        uint256 _len = amountsIn.length;
+        uint256[] memory amountsOut = new uint256[](_len);
+        for (uint256 i = 0; i < _len;){
+            (, amountsOut[i]) = getCurvePrice(router, tokenIn, tokenOut, amountsIn[i]);
+            unchecked { ++i; }
+        }
+        return amountsOut;
+    }
+	
     /// @return assembled curve pools and fees in required Quote struct for given pool
     // TODO: Decide if we need fees, as it costs more gas to compute
     function _getCurveFees(address _pool) internal view returns (bytes32[] memory, uint256[] memory){	
@@ -631,6 +1585,98 @@ contract OnChainPricingMainnet {
 
     /// === UTILS === ///
 
+    /// @dev ceil(a * b / denominator) with full 512-bit precision, port of Uniswap V3 FullMath.mulDivRoundingUp for 0.8
+    /// @notice saturates at type(uint256).max instead of reverting on overflow, only used for upper bounds
+    function _mulDivRoundingUp(uint256 a, uint256 b, uint256 denominator) internal pure returns (uint256 result) {
+        unchecked {
+            bool _roundUp = mulmod(a, b, denominator) > 0;
+            uint256 prod0;
+            uint256 prod1;
+            assembly {
+                let mm := mulmod(a, b, not(0))
+                prod0 := mul(a, b)
+                prod1 := sub(sub(mm, prod0), lt(mm, prod0))
+            }
+
+            if (prod1 >= denominator) {
+                return type(uint256).max;
+            }
+
+            if (prod1 == 0) {
+                result = prod0 / denominator;
+            } else {
+                uint256 remainder;
+                assembly {
+                    remainder := mulmod(a, b, denominator)
+                    prod1 := sub(prod1, gt(remainder, prod0))
+                    prod0 := sub(prod0, remainder)
+                }
+                uint256 twos = denominator & (~denominator + 1);
+                assembly {
+                    denominator := div(denominator, twos)
+                    prod0 := div(prod0, twos)
+                    twos := add(div(sub(0, twos), twos), 1)
+                }
+                prod0 |= prod1 * twos;
+                // inverse of denominator mod 2^256, correct to 4 bits then doubled by each Newton-Raphson iteration
+                uint256 inv = (3 * denominator) ^ 2;
+                inv *= 2 - denominator * inv;
+                inv *= 2 - denominator * inv;
+                inv *= 2 - denominator * inv;
+                inv *= 2 - denominator * inv;
+                inv *= 2 - denominator * inv;
+                inv *= 2 - denominator * inv;
+                result = prod0 * inv;
+            }
+
+            if (_roundUp && result < type(uint256).max) {
+                ++result;
+            }
+        }
+    }
+
+    /// @return context of given pair from given cache, added to it if not there yet with the pool state of the reverse direction if cached
+    function _getPairContext(PairCache memory cache, address tokenIn, address tokenOut) internal pure returns (PairContext memory ctx) {
+        uint256 _size = cache.size;
+        uint256 _reverse = _size;
+        for (uint256 i = 0; i < _size;){
+            PairContext memory _cached = cache.pairs[i];
+            if (_cached.tokenIn == tokenIn && _cached.tokenOut == tokenOut){
+                return _cached;
+            }
+            if (_cached.tokenIn == tokenOut && _cached.tokenOut == tokenIn){
+                _reverse = i;
+            }
+            unchecked { ++i; }
+        }
+
+        ctx = _newPairContext(tokenIn, tokenOut);
+        if (_reverse < _size){
+            ctx.state = cache.pairs[_reverse].state;
+        }
+        if (_size == cache.pairs.length){
+            PairContext[] memory _grown = new PairContext[](_size < 2? 4 : _size * 2);
+            for (uint256 i = 0; i < _size;){
+                _grown[i] = cache.pairs[i];
+                unchecked { ++i; }
+            }
+            cache.pairs = _grown;
+        }
+        cache.pairs[_size] = ctx;
+        cache.size = _size + 1;
+    }
+
+    /// @return context of given pair for quotes within one call, see PairContext
+    function _newPairContext(address tokenIn, address tokenOut) internal pure returns (PairContext memory ctx) {
+        (address token0, address token1, bool token0Price) = _ifUniV3Token0Price(tokenIn, tokenOut);
+        ctx.tokenIn = tokenIn;
+        ctx.tokenOut = tokenOut;
+        ctx.token0 = token0;
+        ctx.token1 = token1;
+        ctx.token0Price = token0Price;
+        ctx.pairKey = _pairKey(token0, token1);
+    }
+
     /// @dev Given a address input, return the bytes32 representation
     // TODO: Figure out if abi.encode is better -> Benchmark on GasLab
     function convertToBytes32(address _input) public pure returns (bytes32){
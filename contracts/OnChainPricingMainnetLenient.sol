@@ -23,8 +23,7 @@ import {OnChainPricingMainnet} from "./OnChainPricingMainnet.sol";
 contract OnChainPricingMainnetLenient is OnChainPricingMainnet {
 
     // === SLIPPAGE === //
-    // Can change slippage within rational limits
-    address public constant TECH_OPS = 0x86cbD0ce0c087b482782c181dA8d191De18C8275;
+    // Can change slippage within rational limits, see TECH_OPS
     
     uint256 private constant MAX_BPS = 10_000;
 
@@ -34,8 +33,9 @@ contract OnChainPricingMainnetLenient is OnChainPricingMainnet {
 
     constructor(
         address _uniV3Simulator, 
-        address _balancerV2Simulator
-    ) OnChainPricingMainnet(_uniV3Simulator, _balancerV2Simulator){
+        address _balancerV2Simulator,
+        address _curveSimulator
+    ) OnChainPricingMainnet(_uniV3Simulator, _balancerV2Simulator, _curveSimulator){
         // Silence is golden
     }
 
@@ -52,4 +52,28 @@ contract OnChainPricingMainnetLenient is OnChainPricingMainnet {
         q = _findOptimalSwap(tokenIn, tokenOut, amountIn);
         q.amountOut = q.amountOut * (MAX_BPS - slippage) / MAX_BPS;
     }
+
+    /// @dev View function for testing the routing of the strategy, probing venues first
+    function findOptimalSwapWithProbes(address tokenIn, address tokenOut, uint256 amountIn) external view override returns (Quote memory q) {
+        q = _findOptimalSwap(tokenIn, tokenOut, amountIn, true);
+        q.amountOut = q.amountOut * (MAX_BPS - slippage) / MAX_BPS;
+    }
+
+    /// @dev View function for testing the routing of the strategy, memoized version
+    /// @notice the context keeps the exact quote, only the returned copy is lowered by the slippage
+    function findOptimalSwapWithContext(address tokenIn, address tokenOut, uint256 amountIn, QuoteContext memory ctx) external view override returns (Quote memory q, QuoteContext memory) {
+        (q, ctx) = _findOptimalSwapWithContext(tokenIn, tokenOut, amountIn, ctx);
+        q.amountOut = q.amountOut * (MAX_BPS - slippage) / MAX_BPS;
+        return (q, ctx);
+    }
+
+    /// @dev View function for testing the routing of the strategy, batched version
+    function findOptimalSwapBatch(address[] calldata tokensIn, address[] calldata tokensOut, uint256[] calldata amountsIn) external view override returns (Quote[] memory qs) {
+        qs = _findOptimalSwapBatch(tokensIn, tokensOut, amountsIn);
+        uint256 length = qs.length;
+        for (uint256 i = 0; i < length;){
+            qs[i].amountOut = qs[i].amountOut * (MAX_BPS - slippage) / MAX_BPS;
+            unchecked { ++i; }
+        }
+    }
 }
\ No newline at end of file
@@ -0,0 +1,620 @@
+// SPDX-License-Identifier: GPL-2.0
+pragma solidity 0.8.10;
+
+
+import {IERC20} from "@oz/token/ERC20/IERC20.sol";
+import {Address} from "@oz/utils/Address.sol";
+
+import "../interfaces/uniswap/IV3Pool.sol";
+import "../interfaces/uniswap/IV2Pool.sol";
+import "../interfaces/balancer/IBalancerV2Vault.sol";
+import "../interfaces/balancer/IBalancerV2WeightedPool.sol";
+import "../interfaces/balancer/IBalancerV2StablePool.sol";
+import "../interfaces/uniswap/IV3Simulator.sol";
+import "../interfaces/balancer/IBalancerV2Simulator.sol";
+import "./libraries/uniswap/PoolAddress.sol";
+
+import {OnChainPricingMainnet, SwapType} from "./OnChainPricingMainnet.sol";
+
+/// @title OnChainQuoter
+/// @author Alex the Entreprenerd for BadgerDAO
+/// @dev Mainnet Version of the router quoter: two-hop routes, split swaps & swap curves on top of OnChainPricingMainnet
+/// @notice Kept out of the pricer so that it stays deployable below the contract size limit (EIP-170),
+///     single pair quotes come from the pricer and the pools of several amounts are read here
+/// @notice TOC
+/// ROUTE
+/// SPLIT
+/// SWAP CURVES
+/// UTILS
+///
+contract OnChainQuoterMainnet {
+    using Address for address;
+
+    address public constant WETH = 0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2;
+    address public constant USDC = 0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48;
+    address public constant DAI = 0x6B175474E89094C44Da98b954EedeAC495271d0F;
+    address public constant WBTC = 0x2260FAC5E5542a773Aa44fBCfeDf7C193bc2C599;
+    address public constant WSTETH = 0x7f39C581F595B53c5cb19bD0b3f8dA6c935E2Ca0;
+
+    address public constant UNIV2_ROUTER = 0x7a250d5630B4cF539739dF2C5dAcb4c659F2488D;
+    address public constant SUSHI_ROUTER = 0xd9e1cE17f2641f24aE83637ab66a2cca9C378B9F;
+    address public constant BALANCERV2_VAULT = 0xBA12222222228d8Ba445958a75a0704d566BF2C8;
+
+    // Can add / remove connectors
+    address public constant TECH_OPS = 0x86cbD0ce0c087b482782c181dA8d191De18C8275;
+
+    // Split quotes: amountIn is allocated in SPLIT_STEPS equal chunks across at most SPLIT_MAX_LEGS pools
+    uint256 public constant SPLIT_STEPS = 10;
+    uint256 public constant SPLIT_MAX_LEGS = 3;
+
+    /// @dev pricer quoting each pair, see OnChainPricingMainnet
+    address public immutable pricer;
+    /// @dev simulators of the pricer, used for the amounts read here
+    address public immutable uniV3Simulator;
+    address public immutable balancerV2Simulator;
+
+    /// @dev intermediate tokens tried by findOptimalRoute for two-hop routes
+    address[] public connectors;
+
+    /// @dev same fee tiers as OnChainPricingMainnet
+    uint256 constant univ3_fees_length = 4;
+    function univ3_fees(uint256 i) internal pure returns (uint24) {
+        if(i == 0){
+            return uint24(100);
+        } else if (i == 1) {
+            return uint24(500);
+        } else if (i == 2) {
+            return uint24(3000);
+        }
+        // else if (i == 3) {
+        return uint24(10000);
+    }
+
+    constructor(address _pricer){
+        require(_pricer != address(0));
+        pricer = _pricer;
+        uniV3Simulator = OnChainPricingMainnet(_pricer).uniV3Simulator();
+        balancerV2Simulator = OnChainPricingMainnet(_pricer).balancerV2Simulator();
+
+        // default connectors, most liquid tokens on Ethereum, wstETH as stETH rebases
+        connectors.push(WETH);
+        connectors.push(USDC);
+        connectors.push(DAI);
+        connectors.push(WBTC);
+        connectors.push(WSTETH);
+    }
+
+    struct SwapCurve {
+        SwapType name;
+        uint256[] amountsOut; // output for each of the requested input amounts
+    }
+
+    struct SplitLeg {
+        SwapType name;
+        uint256 amountIn;
+        uint256 amountOut;
+        bytes32[] pools; // specific pool of the leg
+        uint256[] poolFees; // specific pool fee of the leg, typically in Uniswap V3
+    }
+
+    struct SplitQuote {
+        uint256 amountOut; // total output of all legs
+        SplitLeg[] legs;
+    }
+
+    /// @dev single pool a split leg could go through, with its output for each SPLIT_STEPS-th of the input
+    struct SplitVenue {
+        SwapType name;
+        bytes32 pool;
+        uint24 fee;
+        uint256[] amountsOut;
+    }
+
+    /// === ROUTE === ///
+
+    /// @dev External function, virtual so you can override
+    /// @notice Best of the direct swap & two-hop routes via each connector, each leg can be on any venue,
+    ///     pools & fees of both legs are included so OnChainSwapMainnet#doRouteSwapWithQuote can execute the route
+    /// @param tokenIn - The token you want to sell
+    /// @param tokenOut - The token you want to buy
+    /// @param amountIn - The amount of token you want to sell
+    function findOptimalRoute(address tokenIn, address tokenOut, uint256 amountIn) external view virtual returns (OnChainPricingMainnet.RouteQuote memory) {
+        return _findOptimalRoute(tokenIn, tokenOut, amountIn);
+    }
+
+    /// @dev one pricer call per connector, see OnChainPricingMainnet#findOptimalRouteViaConnector for the cost of each
+    /// See {findOptimalRoute}
+    function _findOptimalRoute(address tokenIn, address tokenOut, uint256 amountIn) internal view returns (OnChainPricingMainnet.RouteQuote memory _best) {
+        _best = OnChainPricingMainnet(pricer).findOptimalRouteViaConnector(tokenIn, tokenOut, amountIn, address(0));
+
+        address[] memory _connectors = connectors;
+        uint256 _len = _connectors.length;
+        for (uint256 i = 0; i < _len;){
+            address _connector = _connectors[i];
+            if (_connector != tokenIn && _connector != tokenOut){
+                OnChainPricingMainnet.RouteQuote memory _route = OnChainPricingMainnet(pricer).findOptimalRouteViaConnector(tokenIn, tokenOut, amountIn, _connector);
+                if (_route.amountOut > _best.amountOut){
+                    _best = _route;
+                }
+            }
+            unchecked { ++i; }
+        }
+    }
+
+    /// @return all connectors tried by findOptimalRoute
+    function getConnectors() external view returns (address[] memory) {
+        return connectors;
+    }
+
+    /// @dev Add a connector for two-hop routes
+    function addConnector(address connector) external {
+        require(msg.sender == TECH_OPS, "Only TechOps");
+        require(connector != address(0), "!connector");
+        uint256 _len = connectors.length;
+        for (uint256 i = 0; i < _len;){
+            require(connectors[i] != connector, "!dupConnector");
+            unchecked { ++i; }
+        }
+        connectors.push(connector);
+    }
+
+    /// @dev Remove a connector, keeps the order of the remaining ones
+    function removeConnector(address connector) external {
+        require(msg.sender == TECH_OPS, "Only TechOps");
+        uint256 _len = connectors.length;
+        uint256 i = 0;
+        while (i < _len && connectors[i] != connector){
+            unchecked { ++i; }
+        }
+        require(i < _len, "!connector");
+
+        for (; i + 1 < _len;){
+            connectors[i] = connectors[i + 1];
+            unchecked { ++i; }
+        }
+        connectors.pop();
+    }
+
+    /// === SPLIT === ///
+
+    /// @dev External function, virtual so you can override
+    /// @notice Split amountIn across up to SPLIT_MAX_LEGS direct pools among UniV2, Sushi, UniV3 fee tiers & Balancer,
+    ///     see OnChainSwapMainnet#doSplitSwapWithQuote to execute all legs at once
+    /// @param tokenIn - The token you want to sell
+    /// @param tokenOut - The token you want to buy
+    /// @param amountIn - The amount of token you want to sell
+    function findOptimalSplitSwap(address tokenIn, address tokenOut, uint256 amountIn) external view virtual returns (SplitQuote memory) {
+        return _findOptimalSplitSwap(tokenIn, tokenOut, amountIn);
+    }
+
+    /// @dev Each chunk of the input goes to the pool with the highest marginal output, which is optimal for concave
+    ///     output curves (i.e. all supported AMMs), the best single pool is used if it somehow does better
+    /// See {findOptimalSplitSwap}
+    function _findOptimalSplitSwap(address tokenIn, address tokenOut, uint256 amountIn) internal view returns (SplitQuote memory) {
+        SplitVenue[] memory _venues = _getSplitVenues(tokenIn, tokenOut, amountIn);
+        uint256[] memory _chunks = _allocateSplitChunks(_venues);
+        return _buildSplitQuote(tokenIn, tokenOut, amountIn, _venues, _chunks);
+    }
+
+    /// @return all direct pools for the pair with their output for each SPLIT_STEPS-th of amountIn
+    function _getSplitVenues(address tokenIn, address tokenOut, uint256 amountIn) internal view returns (SplitVenue[] memory _venues) {
+        uint256[] memory _amounts = new uint256[](SPLIT_STEPS);
+        for (uint256 i = 0; i < SPLIT_STEPS;){
+            _amounts[i] = amountIn * (i + 1) / SPLIT_STEPS;
+            unchecked { ++i; }
+        }
+
+        bytes32[] memory _balancerPools = OnChainPricingMainnet(pricer).getBalancerV2Pools(tokenIn, tokenOut);
+        uint256 _len = 2 + univ3_fees_length + _balancerPools.length;
+        _venues = new SplitVenue[](_len);
+
+        (address token0, address token1) = PoolAddress.sortTokens(tokenIn, tokenOut);
+        _venues[0].name = SwapType.UNIV2;
+        _venues[0].pool = _convertToBytes32(PoolAddress.univ2Pair(true, token0, token1));
+        _venues[1].name = SwapType.SUSHI;
+        _venues[1].pool = _convertToBytes32(PoolAddress.univ2Pair(false, token0, token1));
+
+        for (uint256 i = 0; i < univ3_fees_length;){
+            SplitVenue memory _venue = _venues[2 + i];
+            _venue.name = SwapType.UNIV3;
+            _venue.fee = univ3_fees(i);
+            _venue.pool = _convertToBytes32(PoolAddress.univ3Pool(token0, token1, _venue.fee));
+            unchecked { ++i; }
+        }
+
+        for (uint256 i = 0; i < _balancerPools.length;){
+            _venues[2 + univ3_fees_length + i].name = SwapType.BALANCER;
+            _venues[2 + univ3_fees_length + i].pool = _balancerPools[i];
+            unchecked { ++i; }
+        }
+
+        for (uint256 i = 0; i < _len;){
+            _venues[i].amountsOut = _getSplitVenueAmounts(_venues[i], tokenIn, tokenOut, _amounts);
+            unchecked { ++i; }
+        }
+    }
+
+    /// @return output of given split venue for ascending input amounts
+    function _getSplitVenueAmounts(SplitVenue memory _venue, address tokenIn, address tokenOut, uint256[] memory amountsIn) internal view returns (uint256[] memory amountsOut) {
+        if (_venue.name == SwapType.UNIV2){
+            return getUniPriceAmounts(UNIV2_ROUTER, tokenIn, tokenOut, amountsIn);
+        } else if (_venue.name == SwapType.SUSHI){
+            return getUniPriceAmounts(SUSHI_ROUTER, tokenIn, tokenOut, amountsIn);
+        } else if (_venue.name == SwapType.UNIV3){
+            amountsOut = new uint256[](amountsIn.length);
+            (address token0, address token1) = PoolAddress.sortTokens(tokenIn, tokenOut);
+            _simulateUniV3SwapAmounts(token0, token1, amountsIn, _venue.fee, token0 == tokenIn, amountsOut);
+        } else {
+            return getBalancerQuoteAmountsWithinPoolAnalytically(_venue.pool, tokenIn, amountsIn, tokenOut);
+        }
+    }
+
+    /// @return number of SPLIT_STEPS-th of the input allocated to each venue, either all of them or none
+    function _allocateSplitChunks(SplitVenue[] memory _venues) internal pure returns (uint256[] memory _chunks) {
+        uint256 _len = _venues.length;
+        _chunks = new uint256[](_len);
+        uint256 _legs;
+        uint256 _total;
+        uint256 _allocated;
+
+        for (; _allocated < SPLIT_STEPS;){
+            uint256 _best = _len;
+            uint256 _bestGain;
+            for (uint256 i = 0; i < _len;){
+                if (_chunks[i] > 0 || _legs < SPLIT_MAX_LEGS){
+                    uint256 _gain = _splitMarginalOutput(_venues[i].amountsOut, _chunks[i]);
+                    if (_gain > _bestGain){
+                        _best = i;
+                        _bestGain = _gain;
+                    }
+                }
+                unchecked { ++i; }
+            }
+            if (_best == _len){
+                // no pool could take the remaining input
+                _total = 0;
+                break;
+            }
+
+            if (_chunks[_best] == 0){
+                ++_legs;
+            }
+            ++_chunks[_best];
+            _total += _bestGain;
+            unchecked { ++_allocated; }
+        }
+
+        // all in the best single pool if greedy does worse (non-concave output) or couldn't allocate everything
+        uint256 _single = _len;
+        for (uint256 i = 0; i < _len;){
+            uint256 _out = _venues[i].amountsOut[SPLIT_STEPS - 1];
+            if (_out > _total){
+                _single = i;
+                _total = _out;
+            }
+            unchecked { ++i; }
+        }
+        if (_single < _len){
+            _chunks = new uint256[](_len);
+            _chunks[_single] = SPLIT_STEPS;
+        } else if (_allocated < SPLIT_STEPS){
+            _chunks = new uint256[](_len);
+        }
+    }
+
+    /// @return extra output of the next SPLIT_STEPS-th of the input in the venue with given allocated chunks
+    function _splitMarginalOutput(uint256[] memory _amountsOut, uint256 _chunk) internal pure returns (uint256) {
+        if (_chunk >= SPLIT_STEPS){
+            return 0;
+        }
+        uint256 _prev = _chunk > 0 ? _amountsOut[_chunk - 1] : 0;
+        return _amountsOut[_chunk] > _prev ? _amountsOut[_chunk] - _prev : 0;
+    }
+
+    /// @dev the last leg takes the rounding remainder of the input so that legs sum up to amountIn
+    function _buildSplitQuote(address tokenIn, address tokenOut, uint256 amountIn, SplitVenue[] memory _venues, uint256[] memory _chunks) internal view returns (SplitQuote memory q) {
+        uint256 _legCount;
+        for (uint256 i = 0; i < _venues.length;){
+            if (_chunks[i] > 0){
+                ++_legCount;
+            }
+            unchecked { ++i; }
+        }
+
+        q.legs = new SplitLeg[](_legCount);
+        uint256 _remaining = amountIn;
+        uint256 _leg;
+        for (uint256 i = 0; i < _venues.length;){
+            if (_chunks[i] > 0){
+                uint256 _gridIn = amountIn * _chunks[i] / SPLIT_STEPS;
+                q.legs[_leg] = _buildSplitLeg(_venues[i], tokenIn, tokenOut, _chunks[i], _gridIn, (_leg == _legCount - 1 ? _remaining : _gridIn));
+                q.amountOut += q.legs[_leg].amountOut;
+                _remaining -= q.legs[_leg].amountIn;
+                ++_leg;
+            }
+            unchecked { ++i; }
+        }
+    }
+
+    /// @return leg with given input through given venue, only quoted again if the input is off the SPLIT_STEPS grid
+    function _buildSplitLeg(SplitVenue memory _venue, address tokenIn, address tokenOut, uint256 _chunk, uint256 _gridIn, uint256 _legIn) internal view returns (SplitLeg memory _splitLeg) {
+        _splitLeg.name = _venue.name;
+        _splitLeg.amountIn = _legIn;
+        if (_legIn == _gridIn){
+            _splitLeg.amountOut = _venue.amountsOut[_chunk - 1];
+        } else {
+            uint256[] memory _legAmounts = new uint256[](1);
+            _legAmounts[0] = _legIn;
+            _splitLeg.amountOut = _getSplitVenueAmounts(_venue, tokenIn, tokenOut, _legAmounts)[0];
+        }
+
+        _splitLeg.pools = new bytes32[](1);
+        _splitLeg.pools[0] = _venue.pool;
+        if (_venue.name == SwapType.UNIV3){
+            _splitLeg.poolFees = new uint256[](1);
+            _splitLeg.poolFees[0] = _venue.fee;
+        }
+    }
+
+    /// === SWAP CURVES === ///
+
+    /// @dev Output curve of each venue of OnChainPricingMainnet#findOptimalSwap for given input amounts, e.g. to build price-impact curves
+    /// @notice Each pool is read once and its state reused across all amounts, the UniV3 tick walk is shared too
+    /// @param tokenIn - The token you want to sell
+    /// @param tokenOut - The token you want to buy
+    /// @param amountsIn - The amounts you want to sell, sorted ascending
+    function findSwapCurves(address tokenIn, address tokenOut, uint256[] memory amountsIn) external view returns (SwapCurve[] memory) {
+        require(_isAscending(amountsIn), "!asc");
+
+        bool wethInvolved = (tokenIn == WETH || tokenOut == WETH);
+        SwapCurve[] memory curves = new SwapCurve[](wethInvolved? 5 : 7);
+
+        curves[0] = SwapCurve(SwapType.CURVE, OnChainPricingMainnet(pricer).getCurvePriceAmountsAnalytically(tokenIn, amountsIn, tokenOut));
+        curves[1] = SwapCurve(SwapType.UNIV2, getUniPriceAmounts(UNIV2_ROUTER, tokenIn, tokenOut, amountsIn));
+        curves[2] = SwapCurve(SwapType.SUSHI, getUniPriceAmounts(SUSHI_ROUTER, tokenIn, tokenOut, amountsIn));
+        curves[3] = SwapCurve(SwapType.UNIV3, getUniV3PriceAmounts(tokenIn, amountsIn, tokenOut));
+        curves[4] = SwapCurve(SwapType.BALANCER, getBalancerPriceAmountsAnalytically(tokenIn, amountsIn, tokenOut));
+
+        if(!wethInvolved){
+            curves[5] = SwapCurve(SwapType.UNIV3WITHWETH, (OnChainPricingMainnet(pricer).useSinglePoolInUniV3(tokenIn, tokenOut) > 0 ? new uint256[](amountsIn.length) : getUniV3PriceWithConnectorAmounts(tokenIn, amountsIn, tokenOut, WETH)));
+            curves[6] = SwapCurve(SwapType.BALANCERWITHWETH, getBalancerPriceWithConnectorAmountsAnalytically(tokenIn, amountsIn, tokenOut, WETH));
+        }
+
+        return curves;
+    }
+
+    /// @dev Same as OnChainPricingMainnet#getUniPrice for several input amounts, reading the pair reserves once
+    function getUniPriceAmounts(address router, address tokenIn, address tokenOut, uint256[] memory amountsIn) public view returns (uint256[] memory) {
+        uint256 _len = amountsIn.length;
+        uint256[] memory amountsOut = new uint256[](_len);
+
+        (address _token0, address _token1) = PoolAddress.sortTokens(tokenIn, tokenOut);
+        address _pool = PoolAddress.univ2Pair((router == UNIV2_ROUTER), _token0, _token1);
+        if (!_pool.isContract()){
+            return amountsOut;
+        }
+
+        (uint256 _t0Balance, uint256 _t1Balance, ) = IUniswapV2Pool(_pool).getReserves();
+        (uint256 _reserveIn, uint256 _reserveOut) = _token0 == tokenIn? (_t0Balance, _t1Balance) : (_t1Balance, _t0Balance);
+        for (uint256 i = 0; i < _len;){
+            // same basic check as the pricer, the pool must be liquid compared to the swap amount
+            if (_reserveIn > amountsIn[i]){
+                amountsOut[i] = _getUniV2AmountOut(amountsIn[i], _reserveIn, _reserveOut);
+            }
+            unchecked { ++i; }
+        }
+        return amountsOut;
+    }
+
+    /// @dev Same as OnChainPricingMainnet#getUniV3Price for several input amounts
+    /// @notice Ascending amounts share a single tick walk per pool, otherwise each amount is quoted by the pricer on its own
+    function getUniV3PriceAmounts(address tokenIn, uint256[] memory amountsIn, address tokenOut) public view returns (uint256[] memory) {
+        uint256 _len = amountsIn.length;
+        uint256[] memory amountsOut = new uint256[](_len);
+
+        if (!_isAscending(amountsIn)){
+            for (uint256 i = 0; i < _len;){
+                amountsOut[i] = OnChainPricingMainnet(pricer).getUniV3Price(tokenIn, amountsIn[i], tokenOut);
+                unchecked { ++i; }
+            }
+            return amountsOut;
+        }
+
+        (address token0, address token1) = PoolAddress.sortTokens(tokenIn, tokenOut);
+        uint24 _bestFee = OnChainPricingMainnet(pricer).useSinglePoolInUniV3(tokenIn, tokenOut);
+        if (_bestFee > 0) {
+            _simulateUniV3SwapAmounts(token0, token1, amountsIn, _bestFee, token0 == tokenIn, amountsOut);
+            return amountsOut;
+        }
+
+        for (uint256 i = 0; i < univ3_fees_length;){
+            _simulateUniV3SwapAmounts(token0, token1, amountsIn, univ3_fees(i), token0 == tokenIn, amountsOut);
+            unchecked { ++i; }
+        }
+        return amountsOut;
+    }
+
+    /// @dev Same as OnChainPricingMainnet#getUniV3PriceWithConnector for several input amounts
+    function getUniV3PriceWithConnectorAmounts(address tokenIn, uint256[] memory amountsIn, address tokenOut, address connectorToken) public view returns (uint256[] memory) {
+        // Skip if there is a mainstrem direct swap or connector pools not exist
+        if (!OnChainPricingMainnet(pricer).checkUniV3PoolsExistence(tokenIn, connectorToken) || !OnChainPricingMainnet(pricer).checkUniV3PoolsExistence(connectorToken, tokenOut)){
+            return new uint256[](amountsIn.length);
+        }
+
+        // zero connector amounts quote zero, same as getUniV3PriceWithConnector
+        uint256[] memory connectorAmounts = getUniV3PriceAmounts(tokenIn, amountsIn, connectorToken);
+        return getUniV3PriceAmounts(connectorToken, connectorAmounts, tokenOut);
+    }
+
+    /// @dev simulate ascending amounts in the Uniswap V3 pool of given fee in a single tick walk
+    /// @dev amountsOut keeps for each amount the best of its current value and the simulated output
+    function _simulateUniV3SwapAmounts(address token0, address token1, uint256[] memory amountsIn, uint24 _fee, bool token0Price, uint256[] memory amountsOut) internal view {
+        address _pool = PoolAddress.univ3Pool(token0, token1, _fee);
+        if (!_pool.isContract()) {
+            return;
+        }
+
+        // same basic check as OnChainPricingMainnet#checkUniV3InRangeLiquidity, with ascending amounts only a prefix could pass
+        uint256 _count = amountsIn.length;
+        if (IUniswapV3Pool(_pool).liquidity() == 0) {
+            return;
+        }
+        {
+            uint256 _reserveIn = IERC20(token0Price? token0 : token1).balanceOf(_pool);
+            while (_count > 0 && _reserveIn <= amountsIn[_count - 1]) {
+                unchecked { --_count; }
+            }
+        }
+        if (_count == 0) {
+            return;
+        }
+
+        uint256[] memory _simAmountsIn = new uint256[](_count);
+        for (uint256 i = 0; i < _count;){
+            _simAmountsIn[i] = amountsIn[i];
+            unchecked { ++i; }
+        }
+
+        try IUniswapV3Simulator(uniV3Simulator).simulateUniV3SwapAmounts(_pool, token0Price, _fee, _simAmountsIn) returns (uint256[] memory _simOut) {
+            for (uint256 i = 0; i < _count;){
+                if (_simOut[i] > amountsOut[i]) {
+                    amountsOut[i] = _simOut[i];
+                }
+                unchecked { ++i; }
+            }
+        } catch {
+            // the walk of the largest amount reverted, fallback to quote each amount on its own
+            for (uint256 i = 0; i < _count;){
+                (, uint256 _outAmt) = OnChainPricingMainnet(pricer).simulateUniV3SwapFused(token0, token1, amountsIn[i], _fee, token0Price, _pool);
+                if (_outAmt > amountsOut[i]) {
+                    amountsOut[i] = _outAmt;
+                }
+                unchecked { ++i; }
+            }
+        }
+    }
+
+    /// @dev Same as OnChainPricingMainnet#getBalancerPriceAnalytically for several input amounts
+    function getBalancerPriceAmountsAnalytically(address tokenIn, uint256[] memory amountsIn, address tokenOut) public view returns (uint256[] memory) {
+        bytes32[] memory poolIds = OnChainPricingMainnet(pricer).getBalancerV2Pools(tokenIn, tokenOut);
+        uint256 _len = poolIds.length;
+        if (_len == 0){
+            return new uint256[](amountsIn.length);
+        }
+
+        uint256[] memory _bestQuotes = getBalancerQuoteAmountsWithinPoolAnalytically(poolIds[0], tokenIn, amountsIn, tokenOut);
+        for (uint256 i = 1; i < _len;){
+            uint256[] memory _quotes = getBalancerQuoteAmountsWithinPoolAnalytically(poolIds[i], tokenIn, amountsIn, tokenOut);
+            for (uint256 j = 0; j < _quotes.length;){
+                if (_quotes[j] > _bestQuotes[j]){
+                    _bestQuotes[j] = _quotes[j];
+                }
+                unchecked { ++j; }
+            }
+            unchecked { ++i; }
+        }
+        return _bestQuotes;
+    }
+
+    /// @dev Same as OnChainPricingMainnet#getBalancerQuoteWithinPoolAnalytcially for several input amounts, reading the pool once
+    /// @notice amounts the simulator reverts on (e.g. above the max in ratio) quote zero instead of reverting the whole call
+    function getBalancerQuoteAmountsWithinPoolAnalytically(bytes32 poolId, address tokenIn, uint256[] memory amountsIn, address tokenOut) public view returns (uint256[] memory) {
+        address _pool = address(uint160(bytes20(poolId)));
+        (address[] memory tokens, uint256[] memory balances, ) = IBalancerV2Vault(BALANCERV2_VAULT).getPoolTokens(poolId);
+
+        uint256 _inTokenIdx = _findTokenInBalancePool(tokenIn, tokens);
+        require(_inTokenIdx < tokens.length, "!inBAL");
+        uint256 _outTokenIdx = _findTokenInBalancePool(tokenOut, tokens);
+        require(_outTokenIdx < tokens.length, "!outBAL");
+
+        try IBalancerV2StablePool(_pool).getAmplificationParameter() returns (uint256 currentAmp, bool, uint256) {
+            // stable pool math
+            ExactInStableQueryParam memory _stableQuery = ExactInStableQueryParam(tokens, balances, currentAmp, _inTokenIdx, _outTokenIdx, 0, IBalancerV2StablePool(_pool).getSwapFeePercentage());
+            return _getBalancerStableAmounts(_stableQuery, amountsIn);
+        } catch (bytes memory) {
+            // weighted pool math
+            uint256[] memory _weights = IBalancerV2WeightedPool(_pool).getNormalizedWeights();
+            require(_weights.length == tokens.length, "!lenBAL");
+            ExactInQueryParam memory _query = ExactInQueryParam(tokenIn, tokenOut, balances[_inTokenIdx], _weights[_inTokenIdx], balances[_outTokenIdx], _weights[_outTokenIdx], 0, IBalancerV2WeightedPool(_pool).getSwapFeePercentage());
+            return _getBalancerWeightedAmounts(_query, amountsIn);
+        }
+    }
+
+    function _getBalancerStableAmounts(ExactInStableQueryParam memory _stableQuery, uint256[] memory amountsIn) internal view returns (uint256[] memory) {
+        uint256 _len = amountsIn.length;
+        uint256[] memory amountsOut = new uint256[](_len);
+        uint256 _balanceIn = _stableQuery.balances[_stableQuery.tokenIndexIn];
+        for (uint256 i = 0; i < _len;){
+            if (amountsIn[i] > 0 && _balanceIn > amountsIn[i]) {
+                _stableQuery.amountIn = amountsIn[i];
+                try IBalancerV2Simulator(balancerV2Simulator).calcOutGivenInForStable(_stableQuery) returns (uint256 _quote) {
+                    amountsOut[i] = _quote;
+                } catch {}
+            }
+            unchecked { ++i; }
+        }
+        return amountsOut;
+    }
+
+    function _getBalancerWeightedAmounts(ExactInQueryParam memory _query, uint256[] memory amountsIn) internal view returns (uint256[] memory) {
+        uint256 _len = amountsIn.length;
+        uint256[] memory amountsOut = new uint256[](_len);
+        for (uint256 i = 0; i < _len;){
+            if (amountsIn[i] > 0 && _query.balanceIn > amountsIn[i]) {
+                _query.amountIn = amountsIn[i];
+                try IBalancerV2Simulator(balancerV2Simulator).calcOutGivenIn(_query) returns (uint256 _quote) {
+                    amountsOut[i] = _quote;
+                } catch {}
+            }
+            unchecked { ++i; }
+        }
+        return amountsOut;
+    }
+
+    /// @dev Same as OnChainPricingMainnet#getBalancerPriceWithConnectorAnalytically for several input amounts
+    function getBalancerPriceWithConnectorAmountsAnalytically(address tokenIn, uint256[] memory amountsIn, address tokenOut, address connectorToken) public view returns (uint256[] memory) {
+        if (OnChainPricingMainnet(pricer).getBalancerV2Pools(tokenIn, connectorToken).length == 0 || OnChainPricingMainnet(pricer).getBalancerV2Pools(connectorToken, tokenOut).length == 0){
+            return new uint256[](amountsIn.length);
+        }
+
+        // zero connector amounts quote zero, same as getBalancerPriceWithConnectorAnalytically
+        uint256[] memory _in2ConnectorAmts = getBalancerPriceAmountsAnalytically(tokenIn, amountsIn, connectorToken);
+        return getBalancerPriceAmountsAnalytically(connectorToken, _in2ConnectorAmts, tokenOut);
+    }
+
+    /// === UTILS === ///
+
+    /// @dev same math as OnChainPricingMainnet#getUniV2AmountOutAnalytically, without a call per amount
+    function _getUniV2AmountOut(uint256 amountIn, uint256 reserveIn, uint256 reserveOut) internal pure returns (uint256) {
+        uint256 amountInWithFee = amountIn * 997;
+        return amountInWithFee * reserveOut / (reserveIn * 1000 + amountInWithFee);
+    }
+
+    function _findTokenInBalancePool(address _token, address[] memory _tokens) internal pure returns (uint256){
+        uint256 _len = _tokens.length;
+        for (uint256 i = 0; i < _len; ){
+            if (_tokens[i] == _token){
+                return i;
+            }
+            unchecked{ ++i; }
+        }
+        return type(uint256).max;
+    }
+
+    /// @return true if given amounts are sorted ascending
+    function _isAscending(uint256[] memory amounts) internal pure returns (bool) {
+        uint256 _len = amounts.length;
+        for (uint256 i = 1; i < _len;){
+            if (amounts[i] < amounts[i - 1]) {
+                return false;
+            }
+            unchecked { ++i; }
+        }
+        return true;
+    }
+
+    /// @dev same as OnChainPricingMainnet#convertToBytes32
+    function _convertToBytes32(address _input) internal pure returns (bytes32){
+        return bytes32(uint256(uint160(_input)) << 96);
+    }
+}
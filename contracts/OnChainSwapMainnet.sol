@@ -6,8 +6,11 @@ import {SafeERC20} from "@oz/token/ERC20/utils/SafeERC20.sol";
 
 import "../interfaces/uniswap/IUniswapRouterV3.sol";
 import "../interfaces/uniswap/IUniswapRouterV2.sol";
+import "../interfaces/uniswap/IV2Pool.sol";
+import "../interfaces/uniswap/IV3Pool.sol";
 import "../interfaces/curve/ICurveRouter.sol";
 import "../interfaces/balancer/IBalancerV2Vault.sol";
+import "./libraries/uniswap/PoolAddress.sol";
 
 /**
     NOTE: UNSAFE, UNTESTED, WIP, Use, read, look at and copy at your own risk
@@ -30,8 +33,47 @@ struct Quote {
     uint256[] poolFees; // specific pool fees involved in the optimal swap path, typically in Uniswap V3
 }
 
+struct SplitLeg {
+    SwapType name;
+    uint256 amountIn;
+    uint256 amountOut;
+    bytes32[] pools; // specific pool of the leg
+    uint256[] poolFees; // specific pool fee of the leg, typically in Uniswap V3
+}
+
+struct SplitQuote {
+    uint256 amountOut; // total output of all legs
+    SplitLeg[] legs;
+}
+
+struct RouteQuote {
+    uint256 amountOut;
+    address connector; // address(0) for a direct swap
+    Quote firstLeg; // tokenIn to connector, or to tokenOut for a direct swap
+    Quote secondLeg; // connector to tokenOut, empty for a direct swap
+}
+
+struct QuoteContext {
+    bytes32[] keys;
+    Quote[] quotes;
+    uint256 size; // number of used entries
+}
+
+struct BatchSell {
+    address tokenIn;
+    uint256 amountIn;
+    uint256 minOut; // minimum output in tokenOut of this sell, its share of the shared leg included, see OnChainSwapMainnet#doOptimalSwapBatch
+}
+
 interface OnChainPricing {
     function findOptimalSwap(address tokenIn, address tokenOut, uint256 amountIn) external view returns (Quote memory);
+    function findOptimalSwapWithContext(address tokenIn, address tokenOut, uint256 amountIn, QuoteContext memory ctx) external view returns (Quote memory, QuoteContext memory);
+    function findOptimalSwapBatch(address[] calldata tokensIn, address[] calldata tokensOut, uint256[] calldata amountsIn) external view returns (Quote[] memory);
+}
+
+interface OnChainQuoter {
+    function findOptimalSplitSwap(address tokenIn, address tokenOut, uint256 amountIn) external view returns (SplitQuote memory);
+    function findOptimalRoute(address tokenIn, address tokenOut, uint256 amountIn) external view returns (RouteQuote memory);
 }
 
 /// @dev Mainnet Version of swap for various on-chain dex
@@ -44,13 +86,20 @@ contract OnChainSwapMainnet {
     address public constant UNIV2_ROUTER = 0x7a250d5630B4cF539739dF2C5dAcb4c659F2488D; 
     address public constant SUSHI_ROUTER = 0xd9e1cE17f2641f24aE83637ab66a2cca9C378B9F;
     address public constant WETH = 0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2; 
+
+    // price limits of a Uniswap V3 swap without limit, see TickMath
+    uint160 internal constant MIN_SQRT_RATIO = 4295128739;
+    uint160 internal constant MAX_SQRT_RATIO = 1461446703485210103287273052203988822378723970342;
 		
     address public constant TECH_OPS = 0x86cbD0ce0c087b482782c181dA8d191De18C8275;
     address public immutable pricer;
+    address public immutable quoter; // routes & split swaps, see OnChainQuoterMainnet
 
-    constructor (address _pricer) {
+    constructor (address _pricer, address _quoter) {
         require(_pricer != address(0));
+        require(_quoter != address(0));
         pricer = _pricer;
+        quoter = _quoter;
     }
 
 		
@@ -62,42 +111,285 @@ contract OnChainSwapMainnet {
         return doOptimalSwapWithQuote(tokenIn, tokenOut, amountIn, _optimalQuote);
     }
 		
+    /// @dev execute on-chain swap based on optimal quote, served from the context if the caller already quoted
+    ///     the same swap in this block (see OnChainPricingMainnet#findOptimalSwapWithContext)
+    /// @return output amount after swap execution and the updated context, to be passed along to following calls
+    function doOptimalSwapWithContext(address tokenIn, address tokenOut, uint256 amountIn, QuoteContext memory ctx) external returns(uint256, QuoteContext memory){
+        require(pricer != address(0), "!pricer");
+        Quote memory _optimalQuote;
+        (_optimalQuote, ctx) = OnChainPricing(pricer).findOptimalSwapWithContext(tokenIn, tokenOut, amountIn, ctx);
+        return (doOptimalSwapWithQuote(tokenIn, tokenOut, amountIn, _optimalQuote), ctx);
+    }
+		
     /// @dev execute on-chain swap based on optimal quote from OnChainPricingMainnet#findOptimalSwap
     /// @notice The swap uses the quote as minOut,
     ///         if you wish to add further slippage tollerance, change the Quote.amountOut before calling
     /// @return output amount after swap execution
     function doOptimalSwapWithQuote(address tokenIn, address tokenOut, uint256 amountIn, Quote memory optimalQuote) public returns(uint256){		
+        return _doOptimalSwapWithQuote(tokenIn, tokenOut, amountIn, optimalQuote, msg.sender);
+    }
+
+    /// @dev See {doOptimalSwapWithQuote}, output is sent to given receiver
+    function _doOptimalSwapWithQuote(address tokenIn, address tokenOut, uint256 amountIn, Quote memory optimalQuote, address receiver) internal returns(uint256){		
         SwapType dex = optimalQuote.name;
 
         uint256 _minOut = optimalQuote.amountOut;
 		
         if (dex == SwapType.CURVE){
-            return execSwapCurve(convertToAddress(optimalQuote.pools[0]), amountIn, tokenIn, tokenOut, _minOut, msg.sender);
+            return execSwapCurve(convertToAddress(optimalQuote.pools[0]), amountIn, tokenIn, tokenOut, _minOut, receiver);
         }else if (dex == SwapType.UNIV2){
             address[] memory path = new address[](2);
             path[0] = tokenIn;
             path[1] = tokenOut;
-            return execSwapUniV2(UNIV2_ROUTER, amountIn, path, _minOut, msg.sender);			
+            return execSwapUniV2(UNIV2_ROUTER, amountIn, path, _minOut, receiver);			
         }else if (dex == SwapType.SUSHI){
             address[] memory path = new address[](2);
             path[0] = tokenIn;
             path[1] = tokenOut;
-            return execSwapUniV2(SUSHI_ROUTER, amountIn, path, _minOut, msg.sender);		
+            return execSwapUniV2(SUSHI_ROUTER, amountIn, path, _minOut, receiver);		
         }else if (dex == SwapType.UNIV3){
             bytes memory encodedPath = encodeUniV3SingleHop(tokenIn, uint24(optimalQuote.poolFees[0]), tokenOut);
-            return execSwapUniV3(amountIn, tokenIn, encodedPath, _minOut, msg.sender);
+            return execSwapUniV3(amountIn, tokenIn, encodedPath, _minOut, receiver);
         }else if (dex == SwapType.UNIV3WITHWETH){
             bytes memory encodedPath = encodeUniV3TwoHop(tokenIn, uint24(optimalQuote.poolFees[0]), WETH, uint24(optimalQuote.poolFees[1]), tokenOut);
-            return execSwapUniV3(amountIn, tokenIn, encodedPath, _minOut, msg.sender);		
+            return execSwapUniV3(amountIn, tokenIn, encodedPath, _minOut, receiver);		
         }else if (dex == SwapType.BALANCER){
-            return execSwapBalancerV2Single(optimalQuote.pools[0], amountIn, tokenIn, tokenOut, _minOut, msg.sender);
+            return execSwapBalancerV2Single(optimalQuote.pools[0], amountIn, tokenIn, tokenOut, _minOut, receiver);
         }else if (dex == SwapType.BALANCERWITHWETH){
-            return execSwapBalancerV2Batch(optimalQuote.pools[0], optimalQuote.pools[1], amountIn, tokenIn, tokenOut, WETH, _minOut, msg.sender);
+            return execSwapBalancerV2Batch(optimalQuote.pools[0], optimalQuote.pools[1], amountIn, tokenIn, tokenOut, WETH, _minOut, receiver);
         }else{
             return 0;
         }
     }
 
+    /// @dev execute on-chain swap based on optimal route, directly or via a connector
+    /// @return output amount after swap execution
+    function doOptimalRouteSwap(address tokenIn, address tokenOut, uint256 amountIn) external returns(uint256){
+        require(quoter != address(0), "!quoter");
+        RouteQuote memory _routeQuote = OnChainQuoter(quoter).findOptimalRoute(tokenIn, tokenOut, amountIn);
+        return doRouteSwapWithQuote(tokenIn, tokenOut, amountIn, _routeQuote);
+    }
+
+    /// @dev execute on-chain swap based on route quote from OnChainQuoterMainnet#findOptimalRoute
+    /// @notice The first leg of a two-hop route is swapped to this contract without minOut, the second leg uses RouteQuote.amountOut as minOut,
+    ///         if you wish to add further slippage tollerance, change the RouteQuote.amountOut before calling
+    /// @return output amount after swap execution
+    function doRouteSwapWithQuote(address tokenIn, address tokenOut, uint256 amountIn, RouteQuote memory routeQuote) public returns(uint256){
+        Quote memory _lastLeg;
+        if (routeQuote.connector == address(0)){
+            _lastLeg = routeQuote.firstLeg;
+        } else {
+            Quote memory _firstLeg = routeQuote.firstLeg;
+            amountIn = _doOptimalSwapWithQuote(tokenIn, routeQuote.connector, amountIn, Quote(_firstLeg.name, 0, _firstLeg.pools, _firstLeg.poolFees), address(this));
+            tokenIn = routeQuote.connector;
+            _lastLeg = routeQuote.secondLeg;
+        }
+        return _doOptimalSwapWithQuote(tokenIn, tokenOut, amountIn, Quote(_lastLeg.name, routeQuote.amountOut, _lastLeg.pools, _lastLeg.poolFees), msg.sender);
+    }
+
+    /// @dev execute on-chain split swap based on optimal split quote
+    /// @return total output amount of all legs after swap execution
+    function doOptimalSplitSwap(address tokenIn, address tokenOut, uint256 amountIn) external returns(uint256){
+        require(quoter != address(0), "!quoter");
+        SplitQuote memory _splitQuote = OnChainQuoter(quoter).findOptimalSplitSwap(tokenIn, tokenOut, amountIn);
+        return doSplitSwapWithQuote(tokenIn, tokenOut, amountIn, _splitQuote);
+    }
+
+    /// @dev execute all legs of a split quote from OnChainQuoterMainnet#findOptimalSplitSwap in this transaction
+    /// @notice Legs are swapped without their own minOut, the total uses SplitQuote.amountOut as combined minOut,
+    ///         if you wish to add further slippage tollerance, change the SplitQuote.amountOut before calling
+    /// @return total output amount of all legs after swap execution
+    function doSplitSwapWithQuote(address tokenIn, address tokenOut, uint256 amountIn, SplitQuote memory splitQuote) public returns(uint256){
+        uint256 _legCount = splitQuote.legs.length;
+        uint256 _totalIn;
+        uint256 _totalOut;
+        for (uint256 i = 0; i < _legCount;){
+            SplitLeg memory _leg = splitQuote.legs[i];
+            _totalIn += _leg.amountIn;
+            _totalOut += doOptimalSwapWithQuote(tokenIn, tokenOut, _leg.amountIn, Quote(_leg.name, 0, _leg.pools, _leg.poolFees));
+            unchecked { ++i; }
+        }
+        require(_totalIn == amountIn, "!split");
+        require(_totalOut >= splitQuote.amountOut, "!minOut");
+        return _totalOut;
+    }
+
+    /// @dev execute on-chain swap based on optimal quote, directly in the pool for UniV2, Sushi & UniV3 (see doOptimalDirectSwapWithQuote)
+    /// @return output amount after swap execution
+    function doOptimalDirectSwap(address tokenIn, address tokenOut, uint256 amountIn) external returns(uint256){
+        require(pricer != address(0), "!pricer");
+        Quote memory _optimalQuote = OnChainPricing(pricer).findOptimalSwap(tokenIn, tokenOut, amountIn);
+        return doOptimalDirectSwapWithQuote(tokenIn, tokenOut, amountIn, _optimalQuote);
+    }
+
+    /// @dev same as doOptimalSwapWithQuote, but UniV2, Sushi & UniV3 quotes are swapped in the pools themselves without router nor approval:
+    ///     UniV2 & Sushi pairs are paid upfront, UniV3 pools in uniswapV3SwapCallback. Other venues still go through their router
+    /// @return output amount after swap execution
+    function doOptimalDirectSwapWithQuote(address tokenIn, address tokenOut, uint256 amountIn, Quote memory optimalQuote) public returns(uint256){
+        return _doOptimalDirectSwapWithQuote(tokenIn, tokenOut, amountIn, optimalQuote, msg.sender);
+    }
+
+    /// @dev See {doOptimalDirectSwapWithQuote}, output is sent to given receiver
+    function _doOptimalDirectSwapWithQuote(address tokenIn, address tokenOut, uint256 amountIn, Quote memory optimalQuote, address receiver) internal returns(uint256){
+        SwapType dex = optimalQuote.name;
+
+        uint256 _minOut = optimalQuote.amountOut;
+
+        if (dex == SwapType.UNIV2 || dex == SwapType.SUSHI){
+            return execSwapUniV2Direct(dex == SwapType.UNIV2, amountIn, tokenIn, tokenOut, _minOut, receiver);
+        }else if (dex == SwapType.UNIV3){
+            return execSwapUniV3Direct(uint24(optimalQuote.poolFees[0]), amountIn, tokenIn, tokenOut, _minOut, receiver);
+        }else if (dex == SwapType.UNIV3WITHWETH){
+            uint256 _wethAmount = execSwapUniV3Direct(uint24(optimalQuote.poolFees[0]), amountIn, tokenIn, WETH, 0, address(this));
+            return execSwapUniV3Direct(uint24(optimalQuote.poolFees[1]), _wethAmount, WETH, tokenOut, _minOut, receiver);
+        }else{
+            return _doOptimalSwapWithQuote(tokenIn, tokenOut, amountIn, optimalQuote, receiver);
+        }
+    }
+
+    /// @dev sell many tokens for tokenOut in one transaction, each tokenIn is 'pushed' to this contract beforehand as for a single swap
+    /// @dev all sells are quoted in one OnChainPricingMainnet#findOptimalSwapBatch call and swapped (see doOptimalDirectSwapWithQuote)
+    ///     to the connector if any, whose total is then swapped to tokenOut in a single leg, e.g. many reward tokens to WETH then one WETH to USDC
+    /// @notice minOut of each sell is in tokenOut, checked on its pro-rata share of the shared leg (a sell of the connector itself included)
+    ///         and minOut is the minimum total output in tokenOut. A sell quoted or swapped below its minOut reverts the batch,
+    ///         or if skipOnFailure is skipped and its tokenIn sent back to the caller. A share below its minOut after the shared leg always reverts
+    /// @return total output in tokenOut sent to the caller and the share of each sell in it, 0 if skipped
+    function doOptimalSwapBatch(BatchSell[] calldata sells, address connector, address tokenOut, uint256 minOut, bool skipOnFailure) external returns (uint256 _totalOut, uint256[] memory _amountsOut){
+        require(pricer != address(0), "!pricer");
+        address _hopToken = (connector == address(0) || connector == tokenOut)? tokenOut : connector;
+
+        (Quote[] memory _quotes, Quote memory _hopQuote, uint256 _hopIn) = _quoteBatchSells(sells, _hopToken, tokenOut);
+        // without a route for the shared leg, none of the sells can reach tokenOut
+        require(_hopIn == 0 || _hopToken == tokenOut || _hopQuote.amountOut > 0, "!hop");
+        uint256 _hopTotal;
+        (_hopTotal, _amountsOut) = _execBatchSells(sells, _hopToken, _quotes, _hopIn, _hopQuote.amountOut, skipOnFailure);
+
+        if (_hopToken != tokenOut){
+            // shared leg straight to the caller, in the route quoted along the sells
+            if (_hopTotal > 0){
+                _hopQuote.amountOut = minOut;
+                _totalOut = _doOptimalDirectSwapWithQuote(_hopToken, tokenOut, _hopTotal, _hopQuote, msg.sender);
+            }
+            _checkBatchShares(sells, _amountsOut, _hopTotal, _totalOut);
+        } else if (_hopTotal > 0){
+            _totalOut = _hopTotal;
+            IERC20(tokenOut).safeTransfer(msg.sender, _totalOut);
+        }
+        require(_totalOut >= minOut, "!minOut");
+    }
+
+    /// @return quote of each sell for given hop token from a single batched quote (left empty for a sell of the hop token itself),
+    ///     quote of the shared leg from the hop token to tokenOut for the total quoted in the hop token and that total.
+    ///     Without shared leg (hop token is tokenOut), the returned leg only carries the total as its output
+    function _quoteBatchSells(BatchSell[] calldata sells, address _hopToken, address _tokenOut) internal view returns (Quote[] memory _quotes, Quote memory _hopQuote, uint256 _hopIn){
+        uint256 _len = sells.length;
+        uint256 _count;
+        for (uint256 i = 0; i < _len;){
+            if (sells[i].tokenIn != _hopToken){
+                ++_count;
+            }
+            unchecked { ++i; }
+        }
+
+        address[] memory _tokensIn = new address[](_count);
+        address[] memory _tokensOut = new address[](_count);
+        uint256[] memory _amountsIn = new uint256[](_count);
+        uint256 j;
+        for (uint256 i = 0; i < _len;){
+            if (sells[i].tokenIn != _hopToken){
+                _tokensIn[j] = sells[i].tokenIn;
+                _tokensOut[j] = _hopToken;
+                _amountsIn[j] = sells[i].amountIn;
+                ++j;
+            }
+            unchecked { ++i; }
+        }
+        Quote[] memory _batch = OnChainPricing(pricer).findOptimalSwapBatch(_tokensIn, _tokensOut, _amountsIn);
+
+        _quotes = new Quote[](_len);
+        j = 0;
+        for (uint256 i = 0; i < _len;){
+            if (sells[i].tokenIn != _hopToken){
+                _quotes[i] = _batch[j];
+                _hopIn += _batch[j].amountOut;
+                ++j;
+            } else {
+                _hopIn += sells[i].amountIn;
+            }
+            unchecked { ++i; }
+        }
+
+        if (_hopToken != _tokenOut){
+            if (_hopIn > 0){
+                _hopQuote = OnChainPricing(pricer).findOptimalSwap(_hopToken, _tokenOut, _hopIn);
+            }
+        } else {
+            _hopQuote.amountOut = _hopIn;
+        }
+    }
+
+    /// @return total output in the hop token kept in this contract and the output of each sell, 0 if skipped
+    /// @dev minOut of each sell is converted to the hop token at the quoted rate of the shared leg (_hopOut for _hopIn)
+    function _execBatchSells(BatchSell[] calldata sells, address _hopToken, Quote[] memory _quotes, uint256 _hopIn, uint256 _hopOut, bool skipOnFailure) internal returns (uint256 _total, uint256[] memory _amountsOut){
+        uint256 _len = sells.length;
+        _amountsOut = new uint256[](_len);
+        for (uint256 i = 0; i < _len;){
+            uint256 _out = _execBatchSell(sells[i], _hopToken, _quotes[i], _hopMinOut(sells[i].minOut, _hopIn, _hopOut), skipOnFailure);
+            _amountsOut[i] = _out;
+            _total += _out;
+            unchecked { ++i; }
+        }
+    }
+
+    /// @return minimum output in the hop token giving at least minOut in tokenOut at the rate _hopOut for _hopIn, rounded up
+    function _hopMinOut(uint256 _minOut, uint256 _hopIn, uint256 _hopOut) internal pure returns (uint256){
+        if (_minOut == 0){
+            return 0;
+        }
+        if (_hopOut == 0 || (_hopIn > 0 && _minOut > type(uint256).max / _hopIn)){
+            return type(uint256).max;
+        }
+        return (_minOut * _hopIn + _hopOut - 1) / _hopOut;
+    }
+
+    /// @dev replace the output in the hop token of each sell by its pro-rata share of the shared leg output and check its minOut on it
+    function _checkBatchShares(BatchSell[] calldata sells, uint256[] memory _amountsOut, uint256 _hopTotal, uint256 _totalOut) internal pure {
+        uint256 _len = sells.length;
+        for (uint256 i = 0; i < _len;){
+            if (_amountsOut[i] > 0){
+                _amountsOut[i] = _totalOut * _amountsOut[i] / _hopTotal;
+                require(_amountsOut[i] >= sells[i].minOut, "!minOut");
+            }
+            unchecked { ++i; }
+        }
+    }
+
+    /// @return output in given hop token of one sell of doOptimalSwapBatch kept in this contract, 0 if skipped
+    function _execBatchSell(BatchSell calldata _sell, address _hopToken, Quote memory _quote, uint256 _minOut, bool skipOnFailure) internal returns (uint256){
+        require(_checkTokenTransfer(_sell.tokenIn, _sell.amountIn), "!AMT");
+        bool _isHop = (_sell.tokenIn == _hopToken);
+        bool _quoted = _isHop? (_sell.amountIn >= _minOut) : (_quote.amountOut > 0 && _quote.amountOut >= _minOut);
+        if (!skipOnFailure){
+            require(_quoted, "!minOut");
+        }
+
+        if (_quoted){
+            if (_isHop){
+                return _sell.amountIn;
+            }
+            Quote memory _minQuote = Quote(_quote.name, _minOut, _quote.pools, _quote.poolFees);
+            if (!skipOnFailure){
+                return _doOptimalDirectSwapWithQuote(_sell.tokenIn, _hopToken, _sell.amountIn, _minQuote, address(this));
+            }
+            // external self call so a failed swap only reverts itself, its output is sent to this contract
+            try this.doOptimalDirectSwapWithQuote(_sell.tokenIn, _hopToken, _sell.amountIn, _minQuote) returns (uint256 _out){
+                return _out;
+            } catch {}
+        }
+        IERC20(_sell.tokenIn).safeTransfer(msg.sender, _sell.amountIn);
+        return 0;
+    }
+
     /// @dev function for swap in Uniswap V3
     /// @dev path: (abi.encodePacked) for (tokenIn, fee, connectorToken, fee, tokenOut)
     /// @dev fee is in hundredths of basis points (e.g. the fee for a pool at the 0.3% tier is 3000; the fee for a pool at the 0.01% tier is 100).
@@ -130,6 +422,25 @@ contract OnChainSwapMainnet {
         return address(uint160(bytes20(_input)));
     }
 
+    /// @dev function for swap directly in the Uniswap V3 pool of given fee, paid in uniswapV3SwapCallback
+    function execSwapUniV3Direct(uint24 fee, uint256 amountIn, address tokenIn, address tokenOut, uint256 expectedOut, address receiver) public returns (uint256) {
+        require(_checkTokenTransfer(tokenIn, amountIn), "!AMT");
+
+        bool _zeroForOne = tokenIn < tokenOut;
+        (int256 _amount0, int256 _amount1) = IUniswapV3Pool(getUniV3Pool(tokenIn, tokenOut, fee)).swap(receiver, _zeroForOne, int256(amountIn), (_zeroForOne? MIN_SQRT_RATIO + 1 : MAX_SQRT_RATIO - 1), abi.encode(tokenIn, tokenOut, fee));
+        uint256 _amountOut = uint256(-(_zeroForOne? _amount1 : _amount0));
+        require(_amountOut >= expectedOut, "!minOut");
+        return _amountOut;
+    }
+
+    /// @dev pays the input of a direct swap in Uniswap V3 (see execSwapUniV3Direct)
+    /// @dev the caller must be the pool derived from the callback data, so no one else could pull tokens from this contract
+    function uniswapV3SwapCallback(int256 amount0Delta, int256 amount1Delta, bytes calldata data) external {
+        (address tokenIn, address tokenOut, uint24 fee) = abi.decode(data, (address, address, uint24));
+        require(msg.sender == getUniV3Pool(tokenIn, tokenOut, fee), "!pool");
+        IERC20(tokenIn).safeTransfer(msg.sender, uint256(amount0Delta > 0? amount0Delta : amount1Delta));
+    }
+
     /// @dev function for swap in Uniswap V2 alike dex
     function execSwapUniV2(address router, uint256 amountIn, address[] memory path, uint256 expectedOut, address receiver) public returns (uint256) {
         IERC20(path[0]).safeApprove(router, 0);
@@ -141,6 +452,39 @@ contract OnChainSwapMainnet {
         return _amountsOut[_amountsOut.length - 1];
     }
 
+    /// @dev function for swap directly in the UniV2 (if _univ2) or Sushi pair: output computed from the reserves like the router, then input paid upfront
+    function execSwapUniV2Direct(bool _univ2, uint256 amountIn, address tokenIn, address tokenOut, uint256 expectedOut, address receiver) public returns (uint256) {
+        require(_checkTokenTransfer(tokenIn, amountIn), "!AMT");
+
+        (address _pair, address _token0) = getUniV2Pair(_univ2, tokenIn, tokenOut);
+        (uint256 _reserve0, uint256 _reserve1, ) = IUniswapV2Pool(_pair).getReserves();
+        bool _zeroForOne = tokenIn == _token0;
+        uint256 _amountOut = _getUniV2AmountOut(amountIn, (_zeroForOne? _reserve0 : _reserve1), (_zeroForOne? _reserve1 : _reserve0));
+        require(_amountOut >= expectedOut, "!minOut");
+
+        IERC20(tokenIn).safeTransfer(_pair, amountIn);
+        IUniswapV2Pool(_pair).swap((_zeroForOne? 0 : _amountOut), (_zeroForOne? _amountOut : 0), receiver, "");
+        return _amountOut;
+    }
+
+    /// @dev same as UniswapV2Library#getAmountOut
+    function _getUniV2AmountOut(uint256 amountIn, uint256 reserveIn, uint256 reserveOut) internal pure returns (uint256) {
+        uint256 amountInWithFee = amountIn * 997;
+        return (amountInWithFee * reserveOut) / (reserveIn * 1000 + amountInWithFee);
+    }
+
+    /// @return UniV2 (if _univ2) or Sushi pair of given tokens and its token0, derived with PoolAddress as in OnChainPricingMainnet
+    function getUniV2Pair(bool _univ2, address tokenA, address tokenB) public pure returns (address, address) {
+        (address token0, address token1) = PoolAddress.sortTokens(tokenA, tokenB);
+        return (PoolAddress.univ2Pair(_univ2, token0, token1), token0);
+    }
+
+    /// @return Uniswap V3 pool of given tokens & fee, derived with PoolAddress as in OnChainPricingMainnet
+    function getUniV3Pool(address tokenA, address tokenB, uint24 fee) public pure returns (address) {
+        (address token0, address token1) = PoolAddress.sortTokens(tokenA, tokenB);
+        return PoolAddress.univ3Pool(token0, token1, fee);
+    }
+
     /// @dev function for swap in Curve
     function execSwapCurve(address pool, uint256 amountIn, address tokenIn, address tokenOut, uint256 expectedOut, address receiver) public returns (uint256) {
         IERC20(tokenIn).safeApprove(CURVE_ROUTER, 0);
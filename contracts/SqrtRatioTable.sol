@@ -0,0 +1,86 @@
+// SPDX-License-Identifier: MIT
+pragma solidity 0.7.6;
+
+import "./libraries/uniswap/TickMath.sol";
+
+/// @dev Data contract (SSTORE2-style) of the partial products of TickMath#getSqrtRatioAtTick for the lowest TABLE_BITS bits of |tick|
+/// @dev getSqrtRatioAtTick multiplies the ratio by one constant per set bit of |tick| from the lowest bit up, truncating each time,
+/// @dev so the ratio after the low bits is a pure function of them and the chain can resume from it for the high bits bit by bit exact
+/// @dev its code is a STOP byte followed by one 16-byte entry per value of the low bits, computed in the constructor
+contract SqrtRatioTable {
+    uint256 internal constant TABLE_BITS = 10;
+    uint256 internal constant ENTRIES = 1 << TABLE_BITS;
+    uint256 internal constant ENTRY_SIZE = 16;
+
+    constructor() {
+        // factors of the low bits, same as in TickMath
+        uint256[TABLE_BITS] memory _factors = [
+            uint256(0xfffcb933bd6fad37aa2d162d1a594001),
+            0xfff97272373d413259a46990580e213a,
+            0xfff2e50f5f656932ef12357cf3c7fdcc,
+            0xffe5caca7e10e4e61c3624eaa0941cd0,
+            0xffcb9843d60f6159c9db58835c926644,
+            0xff973b41fa98c081472e6896dfb254c0,
+            0xff2ea16466c96a3843ec78b326b52861,
+            0xfe5dee046a99a2a811c461f1969c3053,
+            0xfcbe86c7900a88aedcffc83b479aa3a4,
+            0xf987a7253ac413176f2b074cf7815e54
+        ];
+        uint256[] memory _ratios = new uint256[](ENTRIES);
+        _ratios[0] = 0x100000000000000000000000000000000;
+        // the highest set bit is the last one multiplied in, so each entry extends the entry without it
+        uint256 _top;
+        for (uint256 i = 1; i < ENTRIES; ++i) {
+            if (i == (2 << _top)) ++_top;
+            _ratios[i] = (_ratios[i ^ (1 << _top)] * _factors[_top]) >> 128;
+        }
+
+        // every entry but the first (2^128, which TickMathTable handles itself) fits in 16 bytes
+        bytes memory _code = new bytes(1 + ENTRIES * ENTRY_SIZE);
+        for (uint256 i = 1; i < ENTRIES; ++i) {
+            uint256 _ratio = _ratios[i];
+            assembly {
+                mstore(add(add(_code, 33), mul(i, ENTRY_SIZE)), shl(128, _ratio))
+            }
+        }
+        assembly {
+            return(add(_code, 32), mload(_code))
+        }
+    }
+}
+
+/// @dev TickMath#getSqrtRatioAtTick resuming from the partial product of the low bits read from a SqrtRatioTable
+/// @dev saves the conditional multiplications of those bits for one EXTCODECOPY, results are identical to TickMath
+library TickMathTable {
+    uint256 internal constant TABLE_MASK = 0x3ff;
+
+    function getSqrtRatioAtTick(address _table, int24 tick) internal view returns (uint160 sqrtPriceX96) {
+        uint256 absTick = tick < 0 ? uint256(-int256(tick)) : uint256(int256(tick));
+        require(absTick <= uint256(TickMath.MAX_TICK), 'T');
+
+        uint256 ratio = 0x100000000000000000000000000000000;
+        uint256 _low = absTick & TABLE_MASK;
+        if (_low != 0) {
+            assembly {
+                let _ptr := mload(0x40)
+                mstore(_ptr, 0)
+                extcodecopy(_table, add(_ptr, 16), add(1, mul(_low, 16)), 16)
+                ratio := mload(_ptr)
+            }
+        }
+        if (absTick & 0x400 != 0) ratio = (ratio * 0xf3392b0822b70005940c7a398e4b70f3) >> 128;
+        if (absTick & 0x800 != 0) ratio = (ratio * 0xe7159475a2c29b7443b29c7fa6e889d9) >> 128;
+        if (absTick & 0x1000 != 0) ratio = (ratio * 0xd097f3bdfd2022b8845ad8f792aa5825) >> 128;
+        if (absTick & 0x2000 != 0) ratio = (ratio * 0xa9f746462d870fdf8a65dc1f90e061e5) >> 128;
+        if (absTick & 0x4000 != 0) ratio = (ratio * 0x70d869a156d2a1b890bb3df62baf32f7) >> 128;
+        if (absTick & 0x8000 != 0) ratio = (ratio * 0x31be135f97d08fd981231505542fcfa6) >> 128;
+        if (absTick & 0x10000 != 0) ratio = (ratio * 0x9aa508b5b7a84e1c677de54f3e99bc9) >> 128;
+        if (absTick & 0x20000 != 0) ratio = (ratio * 0x5d6af8dedb81196699c329225ee604) >> 128;
+        if (absTick & 0x40000 != 0) ratio = (ratio * 0x2216e584f5fa1ea926041bedfe98) >> 128;
+        if (absTick & 0x80000 != 0) ratio = (ratio * 0x48a170391f7dc42444e8fa2) >> 128;
+
+        if (tick > 0) ratio = type(uint256).max / ratio;
+
+        sqrtPriceX96 = uint160((ratio >> 32) + (ratio % (1 << 32) == 0 ? 0 : 1));
+    }
+}
@@ -8,6 +8,8 @@ import "./libraries/uniswap/TickMath.sol";
 import "./libraries/uniswap/FullMath.sol";
 import "./libraries/uniswap/LiquidityMath.sol";
 import "./libraries/uniswap/SqrtPriceMath.sol";
+import "./libraries/uniswap/FixedPoint96.sol";
+import "./SqrtRatioTable.sol";
 	
 struct UniV3SortPoolQuery{
     address _pool;
@@ -38,6 +40,16 @@ struct SwapStatus{
     int256 _amountCalculated;
 }
 
+// result of a simulation which may stop before the whole input is swapped
+struct UniV3BoundedSwapResult{
+    uint256 amountOut; // output of the steps done, exact if not truncated otherwise a lower bound of the full simulation
+    uint256 amountInRemaining; // input left when the walk stopped
+    uint160 sqrtPriceX96; // price where the walk stopped
+    uint256 ticksCrossed; // tick boundaries reached, i.e. initialized ticks & ends of tick bitmap words
+    bool truncated; // true if the walk stopped because of the tick or gas limit
+    uint256 upperBound; // upper bound of the full simulation output, equal to amountOut if not truncated
+}
+
 /// @dev Swap Simulator for Uniswap V3
 contract UniV3SwapSimulator {
     using LowGasSafeMath for uint256;
@@ -50,8 +62,32 @@ contract UniV3SwapSimulator {
     /// @dev simplified version of https://github.com/Uniswap/v3-core/blob/main/contracts/UniswapV3Pool.sol#L596
     /// @return simulated output token amount using Uniswap V3 tick-based math
     function simulateUniV3Swap(address _pool, address _token0, address _token1, bool _zeroForOne, uint24 _fee, uint256 _amountIn) external view returns (uint256){        
-        // Get current state of the pool
-        int24 _tickSpacing = IUniswapV3PoolSwapTick(_pool).tickSpacing();
+        (uint256 _amountOut, , ) = _simulateUniV3Swap(_pool, _zeroForOne, _fee, _amountIn, address(0));
+        return _amountOut;
+    }
+	
+    /// @dev Opt-in fast path of simulateUniV3Swap with the same output: tick prices resume from the partial products
+    /// @dev of a deployed SqrtRatioTable instead of the full TickMath chain, and the current tick is not recomputed
+    /// @dev with TickMath#getTickAtSqrtRatio after the last step since the walk ends there anyway
+    /// @return simulated output token amount using Uniswap V3 tick-based math
+    function simulateUniV3SwapWithTable(address _pool, bool _zeroForOne, uint24 _fee, uint256 _amountIn, address _sqrtRatioTable) external view returns (uint256){
+        require(_sqrtRatioTable != address(0), "!table");
+        (uint256 _amountOut, , ) = _simulateUniV3Swap(_pool, _zeroForOne, _fee, _amountIn, _sqrtRatioTable);
+        return _amountOut;
+    }
+	
+    /// @dev Same as simulateUniV3Swap, also returns the number of swap steps and of tickBitmap() calls for benchmarks
+    /// @dev without the bitmap word cache every step would read the bitmap from the pool
+    function simulateUniV3SwapStats(address _pool, bool _zeroForOne, uint24 _fee, uint256 _amountIn) external view returns (uint256, uint256, uint256){
+        return _simulateUniV3Swap(_pool, _zeroForOne, _fee, _amountIn, address(0));
+    }
+	
+    /// @return simulated output, swap steps & tickBitmap() calls
+    function _simulateUniV3Swap(address _pool, bool _zeroForOne, uint24 _fee, uint256 _amountIn, address _sqrtRatioTable) internal view returns (uint256, uint256, uint256){        
+        // Get current state of the pool, the query is reused across steps with the updated tick
+        TickNextWithWordQuery memory _nextTickQuery = TickNextWithWordQuery(_pool, 0, IUniswapV3PoolSwapTick(_pool).tickSpacing(), _zeroForOne);
+        TickBitmapCache memory _bitmapCache;
+        uint256 _steps;
         // lower limit if zeroForOne in terms of slippage, or upper limit for the other direction
         uint160 _sqrtPriceLimitX96;
         // Temporary state holding key data across swap steps
@@ -66,13 +102,185 @@ contract UniV3SwapSimulator {
         // Loop over ticks until we exhaust all _amountIn or hit the slippage-allowed price limit
         while (state._amountSpecifiedRemaining != 0 && state._sqrtPriceX96 != _sqrtPriceLimitX96) {
            {
-               _stepInTick(state, TickNextWithWordQuery(_pool, state._tick, _tickSpacing, _zeroForOne), _fee, _zeroForOne, _sqrtPriceLimitX96);	
+               _nextTickQuery.tick = state._tick;
+               _stepInTick(state, _nextTickQuery, _bitmapCache, _fee, _sqrtPriceLimitX96, _sqrtRatioTable);
+               ++_steps;
            }			
         }
 		
-        return uint256(state._amountCalculated);
+        return (uint256(state._amountCalculated), _steps, _bitmapCache.wordReads);
     }	
 	
+    /// @dev Fused checkInRangeLiquidity & simulateUniV3Swap: the first swap step is the in-range attempt and if it reaches
+    /// @dev the next initialized tick, the walk carries on from its state & bitmap words instead of reading the pool again
+    /// @return true if the swap crosses ticks, and the simulated output (same as simulateUniV3Swap, zero without in-range liquidity)
+    function simulateUniV3SwapFused(address _pool, bool _zeroForOne, uint24 _fee, uint256 _amountIn) external view returns (bool, uint256){
+        uint128 _liq = IUniswapV3PoolSwapTick(_pool).liquidity();
+		
+        // same as checkInRangeLiquidity: not a liquid-enough pool to quote
+        if (_liq == 0) {
+           return (false, 0);
+        }
+		
+        TickNextWithWordQuery memory _nextTickQuery = TickNextWithWordQuery(_pool, 0, IUniswapV3PoolSwapTick(_pool).tickSpacing(), _zeroForOne);
+        TickBitmapCache memory _bitmapCache;
+        uint160 _sqrtPriceLimitX96 = _getLimitPrice(_zeroForOne);
+        SwapStatus memory state;
+		
+        {
+           (uint160 _currentPX96, int24 _currentTick,,,,,) = IUniswapV3PoolSwapTick(_pool).slot0();
+           state = SwapStatus(_amountIn.toInt256(), _currentPX96, _currentTick, _liq, 0);
+        }
+		
+        if (state._amountSpecifiedRemaining == 0 || state._sqrtPriceX96 == _sqrtPriceLimitX96) {
+           return (false, 0);
+        }
+		
+        _nextTickQuery.tick = state._tick;
+        if (!_stepInRange(state, _nextTickQuery, _bitmapCache, _fee, _sqrtPriceLimitX96)) {
+           return (false, uint256(state._amountCalculated));
+        }
+		
+        while (state._amountSpecifiedRemaining != 0 && state._sqrtPriceX96 != _sqrtPriceLimitX96) {
+           _nextTickQuery.tick = state._tick;
+           _stepInTick(state, _nextTickQuery, _bitmapCache, _fee, _sqrtPriceLimitX96, address(0));
+        }
+		
+        return (true, uint256(state._amountCalculated));
+    }
+	
+    /// @dev first swap step of simulateUniV3SwapFused, its output is the in-range quote of checkInRangeLiquidity if the price stops short of the next tick
+    /// @return true if the step reached the next initialized tick (i.e. crossing ticks required), then the tick is already crossed
+    function _stepInRange(SwapStatus memory state, TickNextWithWordQuery memory _nextTickQuery, TickBitmapCache memory _bitmapCache, uint24 _fee, uint160 _sqrtPriceLimitX96) view internal returns (bool){
+        (int24 tickNext, bool initialized, uint160 sqrtPriceNextX96) = _getNextInitializedTick(_nextTickQuery, _bitmapCache);
+        uint160 sqrtPriceStartX96 = state._sqrtPriceX96;
+        _swapCalculation(state, _getTargetPriceForSwapStep(_nextTickQuery.lte, sqrtPriceNextX96, _sqrtPriceLimitX96), _fee);
+		
+        // stopping short of the next tick means the input is used up (or the price limit hit), the walk ends here
+        if (state._sqrtPriceX96 != sqrtPriceNextX96) {
+           return false;
+        }
+        _updateTickAfterStep(state, _nextTickQuery.pool, tickNext, initialized, sqrtPriceNextX96, sqrtPriceStartX96, _nextTickQuery.lte);
+        return true;
+    }
+	
+    /// @dev Same as simulateUniV3Swap but stops once _maxTicks tick boundaries are crossed or _gasBudget gas is spent (zero for no limit),
+    /// @dev for callers which can't afford a full walk through a thin pool (the pricer ranks fee tiers by spot price instead)
+    /// @dev price only gets worse along the walk, so a truncated walk bounds the full simulation output by 
+    /// @dev pricing the remaining input (less fee) at the price where it stopped
+    /// @return result of the (maybe truncated) simulation, see UniV3BoundedSwapResult
+    function simulateUniV3SwapBounded(address _pool, bool _zeroForOne, uint24 _fee, uint256 _amountIn, uint256 _maxTicks, uint256 _gasBudget) external view returns (UniV3BoundedSwapResult memory result){
+        TickNextWithWordQuery memory _nextTickQuery = TickNextWithWordQuery(_pool, 0, IUniswapV3PoolSwapTick(_pool).tickSpacing(), _zeroForOne);
+        TickBitmapCache memory _bitmapCache;
+        uint160 _sqrtPriceLimitX96 = _getLimitPrice(_zeroForOne);
+        SwapStatus memory state;
+		
+        {
+           (uint160 _currentPX96, int24 _currentTick,,,,,) = IUniswapV3PoolSwapTick(_pool).slot0();
+           state = SwapStatus(_amountIn.toInt256(), _currentPX96, _currentTick, IUniswapV3PoolSwapTick(_pool).liquidity(), 0);
+        }
+		
+        // reuse the budget slot for the gas floor to keep the stack shallow
+        _gasBudget = (_gasBudget == 0 || _gasBudget >= gasleft())? 0 : gasleft() - _gasBudget;
+		
+        while (state._amountSpecifiedRemaining != 0 && state._sqrtPriceX96 != _sqrtPriceLimitX96) {
+           if ((_maxTicks > 0 && result.ticksCrossed >= _maxTicks) || gasleft() < _gasBudget) {
+               result.truncated = true;
+               break;
+           }
+           _nextTickQuery.tick = state._tick;
+           _stepInTick(state, _nextTickQuery, _bitmapCache, _fee, _sqrtPriceLimitX96, address(0));
+           // a step which does not exhaust the input always ends on the next tick boundary
+           if (state._amountSpecifiedRemaining != 0) {
+               ++result.ticksCrossed;
+           }
+        }
+		
+        result.amountOut = uint256(state._amountCalculated);
+        result.amountInRemaining = uint256(state._amountSpecifiedRemaining);
+        result.sqrtPriceX96 = state._sqrtPriceX96;
+        // round up and add one so that a truncated walk never ties with an exact quote
+        result.upperBound = result.truncated? result.amountOut.add(_getOutputUpperBound(result.amountInRemaining, state._sqrtPriceX96, _fee, _zeroForOne)).add(1) : result.amountOut;
+    }
+	
+    /// @dev output of given input (less fee) at given price without any price impact, rounded up
+    function _getOutputUpperBound(uint256 _amountIn, uint160 _sqrtPriceX96, uint24 _fee, bool _zeroForOne) internal pure returns (uint256) {
+        uint256 _amountInLessFee = FullMath.mulDiv(_amountIn, 1e6 - _fee, 1e6);
+        if (_zeroForOne) {
+           return FullMath.mulDivRoundingUp(FullMath.mulDivRoundingUp(_amountInLessFee, _sqrtPriceX96, FixedPoint96.Q96), _sqrtPriceX96, FixedPoint96.Q96);
+        } else {
+           return FullMath.mulDivRoundingUp(FullMath.mulDivRoundingUp(_amountInLessFee, FixedPoint96.Q96, _sqrtPriceX96), FixedPoint96.Q96, _sqrtPriceX96);
+        }
+    }
+	
+    /// @dev Same as simulateUniV3Swap but for several input amounts sorted ascending, in a single tick walk
+    /// @dev full swap steps only depend on the price target, so all amounts share the walk of the largest one
+    /// @dev and only differ in the (partial) step where their own remaining input runs out
+    /// @return simulated output token amount for each of given amounts
+    function simulateUniV3SwapAmounts(address _pool, bool _zeroForOne, uint24 _fee, uint256[] memory _amountsIn) external view returns (uint256[] memory){
+        uint256 _len = _amountsIn.length;
+        uint256[] memory _amountsOut = new uint256[](_len);
+        if (_len == 0) {
+           return _amountsOut;
+        }
+        for (uint256 i = 1; i < _len; ++i) {
+           require(_amountsIn[i] >= _amountsIn[i - 1], "!asc");
+        }
+		
+        TickNextWithWordQuery memory _nextTickQuery = TickNextWithWordQuery(_pool, 0, IUniswapV3PoolSwapTick(_pool).tickSpacing(), _zeroForOne);
+        TickBitmapCache memory _bitmapCache;
+        uint160 _sqrtPriceLimitX96 = _getLimitPrice(_zeroForOne);
+        SwapStatus memory state;
+		
+        {
+           (uint160 _currentPX96, int24 _currentTick,,,,,) = IUniswapV3PoolSwapTick(_pool).slot0();
+           state = SwapStatus(_amountsIn[_len - 1].toInt256(), _currentPX96, _currentTick, IUniswapV3PoolSwapTick(_pool).liquidity(), 0);
+        }
+		
+        // index of the smallest amount not settled yet
+        uint256 _next;
+        while (state._amountSpecifiedRemaining != 0 && state._sqrtPriceX96 != _sqrtPriceLimitX96) {
+           _nextTickQuery.tick = state._tick;
+           _next = _stepInTickForAmounts(state, _nextTickQuery, _bitmapCache, _amountsIn, _amountsOut, _next, _fee, _sqrtPriceLimitX96);
+        }
+		
+        // amounts still pending went through exactly the same steps as the largest one
+        for (; _next < _len; ++_next) {
+           _amountsOut[_next] = uint256(state._amountCalculated);
+        }
+        return _amountsOut;
+    }
+	
+    /// @dev swap step in the tick for the largest amount, settling smaller amounts which run out of input within this step
+    /// @return index of the smallest amount still pending after this step
+    function _stepInTickForAmounts(SwapStatus memory state, TickNextWithWordQuery memory _nextTickQuery, TickBitmapCache memory _bitmapCache, uint256[] memory _amountsIn, uint256[] memory _amountsOut, uint256 _next, uint24 _fee, uint160 _sqrtPriceLimitX96) view internal returns (uint256){
+        (int24 tickNext, bool initialized, uint160 sqrtPriceNextX96) = _getNextInitializedTick(_nextTickQuery, _bitmapCache);
+        uint160 sqrtPriceStartX96 = state._sqrtPriceX96;
+        uint160 _targetPX96 = _getTargetPriceForSwapStep(_nextTickQuery.lte, sqrtPriceNextX96, _sqrtPriceLimitX96);
+		
+        _next = _settleAmountsInStep(state, _amountsIn, _amountsOut, _next, _targetPX96, _fee);
+        _swapCalculation(state, _targetPX96, _fee);
+        _updateTickAfterStep(state, _nextTickQuery.pool, tickNext, initialized, sqrtPriceNextX96, sqrtPriceStartX96, _nextTickQuery.lte);
+        return _next;
+    }
+	
+    /// @dev settle the amounts (excluding the largest one) whose remaining input would not reach the target price of current step
+    /// @return index of the smallest amount still pending after this step
+    function _settleAmountsInStep(SwapStatus memory state, uint256[] memory _amountsIn, uint256[] memory _amountsOut, uint256 _next, uint160 _targetPX96, uint24 _fee) internal pure returns (uint256) {
+        uint256 _last = _amountsIn.length - 1;
+        uint256 _consumed = _amountsIn[_last] - uint256(state._amountSpecifiedRemaining);
+        while (_next < _last) {
+           (uint160 _nextPrice, , uint256 _amountOut, ) = SwapMath.computeSwapStep(state._sqrtPriceX96, _targetPX96, state._liquidity, _amountsIn[_next].sub(_consumed).toInt256(), _fee);
+           // reaching the target means a full step, identical to the one of the largest amount
+           if (_nextPrice == _targetPX96) {
+               break;
+           }
+           _amountsOut[_next] = uint256(state._amountCalculated) + _amountOut;
+           ++_next;
+        }
+        return _next;
+    }
+	
     /// @dev allow caller to check if given amountIn would be satisfied with in-range liquidity
     /// @return true if in-range liquidity is good for the quote otherwise false which means a full cross-ticks simulation required
     function checkInRangeLiquidity(UniV3SortPoolQuery memory _sortQuery) public view returns (bool, uint256) {	
@@ -95,14 +303,19 @@ contract UniV3SwapSimulator {
 	}
 	
     /// @dev retrieve next initialized tick for given Uniswap V3 pool
-    function _getNextInitializedTick(TickNextWithWordQuery memory _nextTickQuery) internal view returns (int24, bool, uint160) {	
-        (int24 tickNext, bool initialized) = TickBitmap.nextInitializedTickWithinOneWord(_nextTickQuery);
+    function _getNextInitializedTick(TickNextWithWordQuery memory _nextTickQuery, TickBitmapCache memory _bitmapCache) internal view returns (int24, bool, uint160) {	
+        return _getNextInitializedTick(_nextTickQuery, _bitmapCache, address(0));
+    }
+	
+    /// @dev Same as above, the price of the tick is read through given SqrtRatioTable unless it is zero
+    function _getNextInitializedTick(TickNextWithWordQuery memory _nextTickQuery, TickBitmapCache memory _bitmapCache, address _sqrtRatioTable) internal view returns (int24, bool, uint160) {	
+        (int24 tickNext, bool initialized) = TickBitmap.nextInitializedTickWithinOneWord(_nextTickQuery, _bitmapCache);
         if (tickNext < TickMath.MIN_TICK) {
            tickNext = TickMath.MIN_TICK;
         } else if (tickNext > TickMath.MAX_TICK) {
            tickNext = TickMath.MAX_TICK;
         }
-        uint160 sqrtPriceNextX96 = TickMath.getSqrtRatioAtTick(tickNext);
+        uint160 sqrtPriceNextX96 = _sqrtRatioTable == address(0)? TickMath.getSqrtRatioAtTick(tickNext) : TickMathTable.getSqrtRatioAtTick(_sqrtRatioTable, tickNext);
         return (tickNext, initialized, sqrtPriceNextX96);
     }
 	
@@ -114,23 +327,32 @@ contract UniV3SwapSimulator {
     }
 	
     /// @dev swap step in the tick
-    function _stepInTick(SwapStatus memory state, TickNextWithWordQuery memory _nextTickQuery, uint24 _fee, bool _zeroForOne, uint160 _sqrtPriceLimitX96) view internal{
+    function _stepInTick(SwapStatus memory state, TickNextWithWordQuery memory _nextTickQuery, TickBitmapCache memory _bitmapCache, uint24 _fee, uint160 _sqrtPriceLimitX96, address _sqrtRatioTable) view internal{
 		
         /// Fetch NEXT-STEP tick to prepare for crossing
-        (int24 tickNext, bool initialized, uint160 sqrtPriceNextX96) = _getNextInitializedTick(_nextTickQuery);
+        (int24 tickNext, bool initialized, uint160 sqrtPriceNextX96) = _getNextInitializedTick(_nextTickQuery, _bitmapCache, _sqrtRatioTable);
         uint160 sqrtPriceStartX96 = state._sqrtPriceX96;
-        uint160 _targetPX96 = _getTargetPriceForSwapStep(_zeroForOne, sqrtPriceNextX96, _sqrtPriceLimitX96);
 		
         /// Trying to perform in-tick swap
         {		    
-           _swapCalculation(state, _targetPX96, _fee);
+           _swapCalculation(state, _getTargetPriceForSwapStep(_nextTickQuery.lte, sqrtPriceNextX96, _sqrtPriceLimitX96), _fee);
+        }
+		
+        /// a step stopping short of the next tick used up the input or hit the price limit: the walk ends & its tick is never read
+        if (_sqrtRatioTable != address(0) && state._sqrtPriceX96 != sqrtPriceNextX96) {
+           return;
         }
 						
         /// Check if we have to cross ticks for NEXT-STEP
+        _updateTickAfterStep(state, _nextTickQuery.pool, tickNext, initialized, sqrtPriceNextX96, sqrtPriceStartX96, _nextTickQuery.lte);
+    } 
+	
+    /// @dev cross the tick (if reached) or recompute current tick after a swap step
+    function _updateTickAfterStep(SwapStatus memory state, address _pool, int24 tickNext, bool initialized, uint160 sqrtPriceNextX96, uint160 sqrtPriceStartX96, bool _zeroForOne) view internal{
         if (state._sqrtPriceX96 == sqrtPriceNextX96) {
            // if the tick is initialized, run the tick transition
            if (initialized) {
-               (,int128 liquidityNet,,,,,,) = IUniswapV3PoolSwapTick(_nextTickQuery.pool).ticks(tickNext);
+               (,int128 liquidityNet,,,,,,) = IUniswapV3PoolSwapTick(_pool).ticks(tickNext);
                // if we're moving leftward, we interpret liquidityNet as the opposite sign safe because liquidityNet cannot be type(int128).min
                if (_zeroForOne) liquidityNet = -liquidityNet;
                state._liquidity = LiquidityMath.addDelta(state._liquidity, liquidityNet);
@@ -140,7 +362,7 @@ contract UniV3SwapSimulator {
            // recompute unless we're on a lower tick boundary (i.e. already transitioned ticks), and haven't moved
            state._tick = TickMath.getTickAtSqrtRatio(state._sqrtPriceX96);
         }
-    } 
+    }
 	
     function _findSwapPriceExactIn(UniV3SortPoolQuery memory _sortQuery, uint128 _liq) internal view returns (uint160, uint160, uint160) {
         uint160 _tickNextPrice;
@@ -149,7 +371,8 @@ contract UniV3SwapSimulator {
 		
         {
            TickNextWithWordQuery memory _nextTickQ = TickNextWithWordQuery(_sortQuery._pool, _tick, IUniswapV3PoolSwapTick(_sortQuery._pool).tickSpacing(), _sortQuery.zeroForOne);
-           (,,uint160 _nxtTkP) = _getNextInitializedTick(_nextTickQ);
+           TickBitmapCache memory _bitmapCache;
+           (,,uint160 _nxtTkP) = _getNextInitializedTick(_nextTickQ, _bitmapCache);
            _tickNextPrice = _nxtTkP;
         }
 		
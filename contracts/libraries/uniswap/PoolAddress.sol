@@ -0,0 +1,60 @@
+// SPDX-License-Identifier: GPL-2.0
+pragma solidity 0.8.10;
+
+// https://github.com/Uniswap/v3-periphery/blob/main/contracts/libraries/PoolAddress.sol
+// extended to UniV2 like pairs, shared by OnChainPricingMainnet, OnChainQuoterMainnet & OnChainSwapMainnet so all derive the same pools
+
+/// @title Provides functions for deriving UniV2 like pair & Uniswap V3 pool addresses from the factory, tokens & fee
+library PoolAddress {
+    bytes32 internal constant UNIV2_POOL_INITCODE = 0x96e8ac4277198ff8b6f785478aa9a39f403cb768dd02cbee326c3e7da348845f;
+    address internal constant UNIV2_FACTORY = 0x5C69bEe701ef814a2B6a3EDD4B1652CB9cc5aA6f;
+    bytes32 internal constant SUSHI_POOL_INITCODE = 0xe18a34eb0e04b04f7a0ac29a6e80748dca96319b42c54d679cb821dca90c6303;
+    address internal constant SUSHI_FACTORY = 0xC0AEe478e3658e2610c5F7A4A2E1777cE9e4f2Ac;
+    bytes32 internal constant UNIV3_POOL_INIT_CODE_HASH = 0xe34f199b19b2b4f47f68442619d555527d244f78a3297ea89325f843f87b8b54;
+    address internal constant UNIV3_FACTORY = 0x1F98431c8aD98523631AE4a59f267346ea31F984;
+
+    /// @return token0 & token1 of given tokens, sorted by address
+    function sortTokens(address tokenA, address tokenB) internal pure returns (address, address) {
+        return tokenA < tokenB ? (tokenA, tokenB) : (tokenB, tokenA);
+    }
+
+    /// @return keccak256(abi.encodePacked(token0, token1)) hashed in the scratch space without allocating, the CREATE2 salt of UniV2 like pairs
+    function pairKey(address token0, address token1) internal pure returns (bytes32 _key) {
+        assembly {
+            mstore(0x14, token1)
+            mstore(0x00, token0)
+            _key := keccak256(0x0c, 0x28)
+        }
+    }
+
+    /// @return UniV2 (if _univ2) or Sushi pair of given sorted tokens
+    function univ2Pair(bool _univ2, address token0, address token1) internal pure returns (address) {
+        return computeCreate2Address((_univ2? UNIV2_FACTORY : SUSHI_FACTORY), pairKey(token0, token1), (_univ2? UNIV2_POOL_INITCODE : SUSHI_POOL_INITCODE));
+    }
+
+    /// @return Uniswap V3 pool of given sorted tokens & fee
+    function univ3Pool(address token0, address token1, uint24 fee) internal pure returns (address) {
+        // keccak256(abi.encode(token0, token1, fee)) hashed past the free memory pointer without allocating
+        bytes32 _salt;
+        assembly {
+            let _ptr := mload(0x40)
+            mstore(_ptr, token0)
+            mstore(add(_ptr, 0x20), token1)
+            mstore(add(_ptr, 0x40), fee)
+            _salt := keccak256(_ptr, 0x60)
+        }
+        return computeCreate2Address(UNIV3_FACTORY, _salt, UNIV3_POOL_INIT_CODE_HASH);
+    }
+
+    /// @dev CREATE2 address of given deployer, salt & init code hash, hashed past the free memory pointer without allocating
+    function computeCreate2Address(address _deployer, bytes32 _salt, bytes32 _initCodeHash) internal pure returns (address _addr) {
+        assembly {
+            let _ptr := mload(0x40)
+            mstore(add(_ptr, 0x40), _initCodeHash)
+            mstore(add(_ptr, 0x20), _salt)
+            mstore(_ptr, _deployer)
+            mstore8(add(_ptr, 0x0b), 0xff)
+            _addr := and(keccak256(add(_ptr, 0x0b), 0x55), 0xffffffffffffffffffffffffffffffffffffffff)
+        }
+    }
+}
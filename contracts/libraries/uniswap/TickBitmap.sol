@@ -15,6 +15,14 @@ struct TickNextWithWordQuery{
     bool lte;
 }
 
+// last tick bitmap word read from the pool, a tick walk is monotonic so consecutive steps mostly stay within the same word
+struct TickBitmapCache{
+    int16 wordPos;
+    uint256 word;
+    bool loaded;
+    uint256 wordReads; // external tickBitmap() calls made through this cache
+}
+
 // https://github.com/Uniswap/v3-core/blob/main/contracts/libraries/TickBitmap.sol
 library TickBitmap {
     /// @notice Computes the position in the mapping where the initialized bit for a tick lives
@@ -35,6 +43,12 @@ library TickBitmap {
     /// @return next The next initialized or uninitialized tick up to 256 ticks away from the current tick
     /// @return initialized Whether the next tick is initialized, as the function only searches within up to 256 ticks
     function nextInitializedTickWithinOneWord(TickNextWithWordQuery memory _query) internal view returns (int24 next, bool initialized) {
+        TickBitmapCache memory _cache;
+        return nextInitializedTickWithinOneWord(_query, _cache);
+    }
+
+    /// @notice Same as above but reads the bitmap word through given cache, which is only valid for a single pool
+    function nextInitializedTickWithinOneWord(TickNextWithWordQuery memory _query, TickBitmapCache memory _cache) internal view returns (int24 next, bool initialized) {
         int24 compressed = _query.tick / _query.tickSpacing;
         if (_query.tick < 0 && _query.tick % _query.tickSpacing != 0) compressed--; // round towards negative infinity
 
@@ -42,7 +56,7 @@ library TickBitmap {
             (int16 wordPos, uint8 bitPos) = position(compressed);
             // all the 1s at or to the right of the current bitPos
             uint256 mask = (1 << bitPos) - 1 + (1 << bitPos);
-            uint256 masked = IUniswapV3PoolBitmap(_query.pool).tickBitmap(wordPos) & mask;
+            uint256 masked = _readWord(_query.pool, wordPos, _cache) & mask;
 
             // if there are no initialized ticks to the right of or at the current tick, return rightmost in the word
             initialized = masked != 0;
@@ -55,7 +69,7 @@ library TickBitmap {
             (int16 wordPos, uint8 bitPos) = position(compressed + 1);
             // all the 1s at or to the left of the bitPos
             uint256 mask = ~((1 << bitPos) - 1);
-            uint256 masked =  IUniswapV3PoolBitmap(_query.pool).tickBitmap(wordPos) & mask;
+            uint256 masked = _readWord(_query.pool, wordPos, _cache) & mask;
 
             // if there are no initialized ticks to the left of the current tick, return leftmost in the word
             initialized = masked != 0;
@@ -65,4 +79,15 @@ library TickBitmap {
                 : (compressed + 1 + int24(type(uint8).max - bitPos)) * _query.tickSpacing;
         }
     }
+
+    /// @return the bitmap word at given position, only calls the pool if the cache holds another word
+    function _readWord(address _pool, int16 _wordPos, TickBitmapCache memory _cache) private view returns (uint256) {
+        if (!_cache.loaded || _cache.wordPos != _wordPos) {
+            _cache.word = IUniswapV3PoolBitmap(_pool).tickBitmap(_wordPos);
+            _cache.wordPos = _wordPos;
+            _cache.loaded = true;
+            ++_cache.wordReads;
+        }
+        return _cache.word;
+    }
 }
\ No newline at end of file
@@ -0,0 +1,13 @@
+pragma solidity 0.8.10;
+
+import {ERC20} from "@oz/token/ERC20/ERC20.sol";
+
+/// @dev Freely mintable token for local pools in tests
+contract MockERC20 is ERC20 {
+   constructor(string memory name, string memory symbol) ERC20(name, symbol) {
+   }
+
+   function mint(address to, uint256 amount) external {
+      _mint(to, amount);
+   }
+}
@@ -18,15 +18,66 @@ struct Quote {
    bytes32[] pools; // specific pools involved in the optimal swap path
    uint256[] poolFees; // specific pool fees involved in the optimal swap path, typically in Uniswap V3
 }
+struct SwapCurve {
+   SwapType name;
+   uint256[] amountsOut; // output for each of the requested input amounts
+}
+struct SplitLeg {
+   SwapType name;
+   uint256 amountIn;
+   uint256 amountOut;
+   bytes32[] pools; // specific pool of the leg
+   uint256[] poolFees; // specific pool fee of the leg, typically in Uniswap V3
+}
+struct SplitQuote {
+   uint256 amountOut; // total output of all legs
+   SplitLeg[] legs;
+}
+struct VenueCost {
+   SwapType name;
+   uint256 amountOut;
+   uint256 gasUsed;
+}
+struct RouteQuote {
+   uint256 amountOut;
+   address connector; // address(0) for a direct swap
+   Quote firstLeg; // tokenIn to connector, or to tokenOut for a direct swap
+   Quote secondLeg; // connector to tokenOut, empty for a direct swap
+}
 interface OnChainPricing {
    function isPairSupported(address tokenIn, address tokenOut, uint256 amountIn) external view returns (bool);
    function findOptimalSwap(address tokenIn, address tokenOut, uint256 amountIn) external view returns (Quote memory);
+   function findOptimalSwapWithProbes(address tokenIn, address tokenOut, uint256 amountIn) external view returns (Quote memory);
+   function findOptimalSwapBatch(address[] calldata tokensIn, address[] calldata tokensOut, uint256[] calldata amountsIn) external view returns (Quote[] memory);
    function checkUniV3InRangeLiquidity(address token0, address token1, uint256 amountIn, uint24 _fee, bool token0Price, address _pool) external view returns (bool, uint256);
    function simulateUniV3Swap(address token0, uint256 amountIn, address token1, uint24 _fee, bool token0Price, address _pool) external view returns (uint256);
+   function simulateUniV3SwapFused(address token0, address token1, uint256 amountIn, uint24 _fee, bool token0Price, address _pool) external view returns (bool, uint256);
+   function getBalancerV2Pool(address tokenIn, address tokenOut) external view returns (bytes32);
+   function sortUniV3Pools(address tokenIn, uint256 amountIn, address tokenOut) external view returns (uint256, uint24);
+   function getCurvePrice(address router, address tokenIn, address tokenOut, uint256 amountIn) external view returns (address, uint256);
+   function getCurvePriceAnalytically(address tokenIn, uint256 amountIn, address tokenOut) external view returns (address, uint256);
+   function getUniPrice(address router, address tokenIn, address tokenOut, uint256 amountIn) external view returns (uint256);
+   function getUniV3Price(address tokenIn, uint256 amountIn, address tokenOut) external view returns (uint256);
+   function getUniV3PriceWithConnector(address tokenIn, uint256 amountIn, address tokenOut, address connectorToken) external view returns (uint256);
+   function getBalancerPriceAnalytically(address tokenIn, uint256 amountIn, address tokenOut) external view returns (uint256);
+   function getBalancerQuoteWithinPoolAnalytcially(bytes32 poolId, address tokenIn, uint256 amountIn, address tokenOut) external view returns (uint256);
+   function getBalancerPriceWithConnectorAnalytically(address tokenIn, uint256 amountIn, address tokenOut, address connectorToken) external view returns (uint256);
+   function getBalancerPricesWithConnectorAnalytically(address tokenIn, uint256 amountIn, address tokenOut, address connectorToken) external view returns (uint256, uint256);
+   function getBalancerV2Pools(address tokenIn, address tokenOut) external view returns (bytes32[] memory);
+}
+interface OnChainQuoter {
+   function findOptimalSplitSwap(address tokenIn, address tokenOut, uint256 amountIn) external view returns (SplitQuote memory);
+   function findOptimalRoute(address tokenIn, address tokenOut, uint256 amountIn) external view returns (RouteQuote memory);
+   function findSwapCurves(address tokenIn, address tokenOut, uint256[] memory amountsIn) external view returns (SwapCurve[] memory);
 }
 // END OnchainPricing
 
 contract PricerWrapper {
+   address public constant CURVE_ROUTER = 0x8e764bE4288B842791989DB5b8ec067279829809;
+   address public constant UNIV2_ROUTER = 0x7a250d5630B4cF539739dF2C5dAcb4c659F2488D;
+   address public constant SUSHI_ROUTER = 0xd9e1cE17f2641f24aE83637ab66a2cca9C378B9F;
+   address public constant WETH = 0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2;
+
    address public pricer;
    constructor(address _pricer) {
       pricer = _pricer;
@@ -36,11 +87,29 @@ contract PricerWrapper {
       return OnChainPricing(pricer).isPairSupported(tokenIn, tokenOut, amountIn);
    }
 
+   function isPairSupportedWithGas(address tokenIn, address tokenOut, uint256 amountIn) external view returns (uint256, bool) {
+      uint256 _gasBefore = gasleft();
+      bool _supported = OnChainPricing(pricer).isPairSupported(tokenIn, tokenOut, amountIn);
+      return (_gasBefore - gasleft(), _supported);
+   }
+
    function findOptimalSwap(address tokenIn, address tokenOut, uint256 amountIn) external view returns (uint256, Quote memory) {
       uint256 _gasBefore = gasleft();
       Quote memory q = OnChainPricing(pricer).findOptimalSwap(tokenIn, tokenOut, amountIn);
       return (_gasBefore - gasleft(), q);
    }
+
+   function findOptimalSwapWithProbes(address tokenIn, address tokenOut, uint256 amountIn) external view returns (uint256, Quote memory) {
+      uint256 _gasBefore = gasleft();
+      Quote memory q = OnChainPricing(pricer).findOptimalSwapWithProbes(tokenIn, tokenOut, amountIn);
+      return (_gasBefore - gasleft(), q);
+   }
+
+   function findOptimalSwapBatch(address[] calldata tokensIn, address[] calldata tokensOut, uint256[] calldata amountsIn) external view returns (uint256, Quote[] memory) {
+      uint256 _gasBefore = gasleft();
+      Quote[] memory qs = OnChainPricing(pricer).findOptimalSwapBatch(tokensIn, tokensOut, amountsIn);
+      return (_gasBefore - gasleft(), qs);
+   }
    
    function checkUniV3InRangeLiquidity(address token0, address token1, uint256 amountIn, uint24 _fee, bool token0Price, address _pool) public view returns (uint256, bool, uint256){
       uint256 _gasBefore = gasleft();
@@ -53,4 +122,158 @@ contract PricerWrapper {
       uint256 _simOut = OnChainPricing(pricer).simulateUniV3Swap(token0, amountIn, token1, _fee, token0Price, _pool);
       return (_gasBefore - gasleft(), _simOut);
    }
-}
\ No newline at end of file
+   
+   function simulateUniV3SwapFused(address token0, address token1, uint256 amountIn, uint24 _fee, bool token0Price, address _pool) public view returns (uint256, bool, uint256){
+      uint256 _gasBefore = gasleft();
+      (bool _crossTicks, uint256 _simOut) = OnChainPricing(pricer).simulateUniV3SwapFused(token0, token1, amountIn, _fee, token0Price, _pool);
+      return (_gasBefore - gasleft(), _crossTicks, _simOut);
+   }
+   
+   /// @dev baseline of simulateUniV3SwapFused: in-range liquidity check then full simulation if it crosses ticks
+   function checkThenSimulateUniV3Swap(address token0, address token1, uint256 amountIn, uint24 _fee, bool token0Price, address _pool) public view returns (uint256, bool, uint256){
+      uint256 _gasBefore = gasleft();
+      (bool _crossTicks, uint256 _simOut) = OnChainPricing(pricer).checkUniV3InRangeLiquidity(token0, token1, amountIn, _fee, token0Price, _pool);
+      if (_crossTicks) {
+         _simOut = OnChainPricing(pricer).simulateUniV3Swap(token0, amountIn, token1, _fee, token0Price, _pool);
+      }
+      return (_gasBefore - gasleft(), _crossTicks, _simOut);
+   }
+   
+   function getBalancerV2Pool(address tokenIn, address tokenOut) public view returns (uint256, bytes32){
+      uint256 _gasBefore = gasleft();
+      bytes32 _poolId = OnChainPricing(pricer).getBalancerV2Pool(tokenIn, tokenOut);
+      return (_gasBefore - gasleft(), _poolId);
+   }
+   
+   function sortUniV3Pools(address tokenIn, uint256 amountIn, address tokenOut) public view returns (uint256, uint256, uint24){
+      uint256 _gasBefore = gasleft();
+      (uint256 _maxQuote, uint24 _maxQuoteFee) = OnChainPricing(pricer).sortUniV3Pools(tokenIn, amountIn, tokenOut);
+      return (_gasBefore - gasleft(), _maxQuote, _maxQuoteFee);
+   }
+   
+   function getCurvePrice(address router, address tokenIn, address tokenOut, uint256 amountIn) public view returns (uint256, address, uint256){
+      uint256 _gasBefore = gasleft();
+      (address _pool, uint256 _quote) = OnChainPricing(pricer).getCurvePrice(router, tokenIn, tokenOut, amountIn);
+      return (_gasBefore - gasleft(), _pool, _quote);
+   }
+   
+   function getBalancerPriceAnalytically(address tokenIn, uint256 amountIn, address tokenOut) public view returns (uint256, uint256){
+      uint256 _gasBefore = gasleft();
+      uint256 _quote = OnChainPricing(pricer).getBalancerPriceAnalytically(tokenIn, amountIn, tokenOut);
+      return (_gasBefore - gasleft(), _quote);
+   }
+   
+   function getBalancerQuoteWithinPoolAnalytcially(bytes32 poolId, address tokenIn, uint256 amountIn, address tokenOut) public view returns (uint256, uint256){
+      uint256 _gasBefore = gasleft();
+      uint256 _quote = OnChainPricing(pricer).getBalancerQuoteWithinPoolAnalytcially(poolId, tokenIn, amountIn, tokenOut);
+      return (_gasBefore - gasleft(), _quote);
+   }
+   
+   function getBalancerPriceWithConnectorAnalytically(address tokenIn, uint256 amountIn, address tokenOut, address connectorToken) public view returns (uint256, uint256){
+      uint256 _gasBefore = gasleft();
+      uint256 _quote = OnChainPricing(pricer).getBalancerPriceWithConnectorAnalytically(tokenIn, amountIn, tokenOut, connectorToken);
+      return (_gasBefore - gasleft(), _quote);
+   }
+   
+   function getBalancerPricesWithConnectorAnalytically(address tokenIn, uint256 amountIn, address tokenOut, address connectorToken) public view returns (uint256, uint256, uint256){
+      uint256 _gasBefore = gasleft();
+      (uint256 _direct, uint256 _withConnector) = OnChainPricing(pricer).getBalancerPricesWithConnectorAnalytically(tokenIn, amountIn, tokenOut, connectorToken);
+      return (_gasBefore - gasleft(), _direct, _withConnector);
+   }
+   
+   /// @dev Same quotes as getBalancerPricesWithConnectorAnalytically with one pricer call per leg, each reading its pools again
+   function getBalancerPricesPerLeg(address tokenIn, uint256 amountIn, address tokenOut, address connectorToken) public view returns (uint256, uint256, uint256){
+      uint256 _gasBefore = gasleft();
+      uint256 _direct = OnChainPricing(pricer).getBalancerPriceAnalytically(tokenIn, amountIn, tokenOut);
+      uint256 _withConnector;
+      if (OnChainPricing(pricer).getBalancerV2Pools(tokenIn, connectorToken).length > 0 && OnChainPricing(pricer).getBalancerV2Pools(connectorToken, tokenOut).length > 0){
+         uint256 _in2ConnectorAmt = OnChainPricing(pricer).getBalancerPriceAnalytically(tokenIn, amountIn, connectorToken);
+         if (_in2ConnectorAmt > 0){
+            _withConnector = OnChainPricing(pricer).getBalancerPriceAnalytically(connectorToken, _in2ConnectorAmt, tokenOut);
+         }
+      }
+      return (_gasBefore - gasleft(), _direct, _withConnector);
+   }
+   
+   function getCurvePriceAnalytically(address tokenIn, uint256 amountIn, address tokenOut) public view returns (uint256, address, uint256){
+      uint256 _gasBefore = gasleft();
+      (address _pool, uint256 _quote) = OnChainPricing(pricer).getCurvePriceAnalytically(tokenIn, amountIn, tokenOut);
+      return (_gasBefore - gasleft(), _pool, _quote);
+   }
+   
+   /// @dev findOptimalSwap next to the cost of each of its venues, in the order of findOptimalSwap
+   /// @notice each venue is quoted with its own call so the pricer's heuristics across venues are not replayed,
+   ///     e.g. UniV3 with WETH is quoted even for the hardcoded single pool pairs
+   function findOptimalSwapBreakdown(address tokenIn, address tokenOut, uint256 amountIn) external view returns (uint256, Quote memory, VenueCost[] memory){
+      uint256 _gasBefore = gasleft();
+      Quote memory _quote = OnChainPricing(pricer).findOptimalSwap(tokenIn, tokenOut, amountIn);
+      uint256 _gasUsed = _gasBefore - gasleft();
+
+      bool _wethInvolved = (tokenIn == WETH || tokenOut == WETH);
+      VenueCost[] memory _costs = new VenueCost[](_wethInvolved? 5 : 7);
+      _costs[0] = _curveCost(tokenIn, tokenOut, amountIn);
+      _costs[1] = _uniCost(SwapType.UNIV2, UNIV2_ROUTER, tokenIn, tokenOut, amountIn);
+      _costs[2] = _uniCost(SwapType.SUSHI, SUSHI_ROUTER, tokenIn, tokenOut, amountIn);
+
+      _gasBefore = gasleft();
+      uint256 _out = OnChainPricing(pricer).getUniV3Price(tokenIn, amountIn, tokenOut);
+      _costs[3] = VenueCost(SwapType.UNIV3, _out, _gasBefore - gasleft());
+
+      _gasBefore = gasleft();
+      _out = OnChainPricing(pricer).getBalancerPriceAnalytically(tokenIn, amountIn, tokenOut);
+      _costs[4] = VenueCost(SwapType.BALANCER, _out, _gasBefore - gasleft());
+
+      if (!_wethInvolved){
+         _gasBefore = gasleft();
+         _out = OnChainPricing(pricer).getUniV3PriceWithConnector(tokenIn, amountIn, tokenOut, WETH);
+         _costs[5] = VenueCost(SwapType.UNIV3WITHWETH, _out, _gasBefore - gasleft());
+
+         _gasBefore = gasleft();
+         _out = OnChainPricing(pricer).getBalancerPriceWithConnectorAnalytically(tokenIn, amountIn, tokenOut, WETH);
+         _costs[6] = VenueCost(SwapType.BALANCERWITHWETH, _out, _gasBefore - gasleft());
+      }
+      return (_gasUsed, _quote, _costs);
+   }
+
+   /// @dev indexed pool with native math, otherwise the router
+   function _curveCost(address tokenIn, address tokenOut, uint256 amountIn) internal view returns (VenueCost memory){
+      uint256 _gasBefore = gasleft();
+      (address _pool, uint256 _out) = OnChainPricing(pricer).getCurvePriceAnalytically(tokenIn, amountIn, tokenOut);
+      if (_pool == address(0)){
+         (, _out) = OnChainPricing(pricer).getCurvePrice(CURVE_ROUTER, tokenIn, tokenOut, amountIn);
+      }
+      return VenueCost(SwapType.CURVE, _out, _gasBefore - gasleft());
+   }
+
+   function _uniCost(SwapType name, address router, address tokenIn, address tokenOut, uint256 amountIn) internal view returns (VenueCost memory){
+      uint256 _gasBefore = gasleft();
+      uint256 _out = OnChainPricing(pricer).getUniPrice(router, tokenIn, tokenOut, amountIn);
+      return VenueCost(name, _out, _gasBefore - gasleft());
+   }
+}
+
+/// @dev gas of OnChainQuoterMainnet calls, see PricerWrapper
+contract QuoterWrapper {
+   address public quoter;
+   constructor(address _quoter) {
+      quoter = _quoter;
+   }
+
+   function findOptimalSplitSwap(address tokenIn, address tokenOut, uint256 amountIn) external view returns (uint256, SplitQuote memory) {
+      uint256 _gasBefore = gasleft();
+      SplitQuote memory q = OnChainQuoter(quoter).findOptimalSplitSwap(tokenIn, tokenOut, amountIn);
+      return (_gasBefore - gasleft(), q);
+   }
+
+   function findOptimalRoute(address tokenIn, address tokenOut, uint256 amountIn) external view returns (uint256, RouteQuote memory) {
+      uint256 _gasBefore = gasleft();
+      RouteQuote memory q = OnChainQuoter(quoter).findOptimalRoute(tokenIn, tokenOut, amountIn);
+      return (_gasBefore - gasleft(), q);
+   }
+
+   function findSwapCurves(address tokenIn, address tokenOut, uint256[] memory amountsIn) external view returns (uint256, SwapCurve[] memory) {
+      uint256 _gasBefore = gasleft();
+      SwapCurve[] memory curves = OnChainQuoter(quoter).findSwapCurves(tokenIn, tokenOut, amountsIn);
+      return (_gasBefore - gasleft(), curves);
+   }
+}
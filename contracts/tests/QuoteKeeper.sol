@@ -0,0 +1,50 @@
+pragma solidity 0.8.10;
+pragma experimental ABIEncoderV2;
+
+import {IERC20} from "@oz/token/ERC20/IERC20.sol";
+import {SafeERC20} from "@oz/token/ERC20/utils/SafeERC20.sol";
+
+import {Quote, QuoteContext, OnChainSwapMainnet} from "../OnChainSwapMainnet.sol";
+
+interface KeeperPricing {
+   function isPairSupported(address tokenIn, address tokenOut, uint256 amountIn) external view returns (bool);
+   function findOptimalSwap(address tokenIn, address tokenOut, uint256 amountIn) external view returns (Quote memory);
+   function isPairSupportedWithContext(address tokenIn, address tokenOut, uint256 amountIn, QuoteContext memory ctx) external view returns (bool, QuoteContext memory);
+   function findOptimalSwapWithContext(address tokenIn, address tokenOut, uint256 amountIn, QuoteContext memory ctx) external view returns (Quote memory, QuoteContext memory);
+}
+
+/// @dev Mock keeper doing the usual check support, quote then swap in one transaction, with and without a QuoteContext
+contract QuoteKeeper {
+   using SafeERC20 for IERC20;
+
+   address public immutable pricer;
+   address public immutable swapExecutor;
+
+   constructor(address _pricer, address _swapExecutor){
+      pricer = _pricer;
+      swapExecutor = _swapExecutor;
+   }
+
+   function checkQuoteAndSwap(address tokenIn, address tokenOut, uint256 amountIn) external returns (uint256, uint256) {
+      require(KeeperPricing(pricer).isPairSupported(tokenIn, tokenOut, amountIn), "!supported");
+      Quote memory q = KeeperPricing(pricer).findOptimalSwap(tokenIn, tokenOut, amountIn);
+
+      IERC20(tokenIn).safeTransfer(swapExecutor, amountIn);
+      uint256 _out = OnChainSwapMainnet(swapExecutor).doOptimalSwap(tokenIn, tokenOut, amountIn);
+      return (q.amountOut, _out);
+   }
+
+   function checkQuoteAndSwapWithContext(address tokenIn, address tokenOut, uint256 amountIn) external returns (uint256, uint256) {
+      QuoteContext memory ctx;
+      bool _supported;
+      (_supported, ctx) = KeeperPricing(pricer).isPairSupportedWithContext(tokenIn, tokenOut, amountIn, ctx);
+      require(_supported, "!supported");
+      Quote memory q;
+      (q, ctx) = KeeperPricing(pricer).findOptimalSwapWithContext(tokenIn, tokenOut, amountIn, ctx);
+
+      IERC20(tokenIn).safeTransfer(swapExecutor, amountIn);
+      uint256 _out;
+      (_out, ctx) = OnChainSwapMainnet(swapExecutor).doOptimalSwapWithContext(tokenIn, tokenOut, amountIn, ctx);
+      return (q.amountOut, _out);
+   }
+}
@@ -0,0 +1,49 @@
+// SPDX-License-Identifier: MIT
+pragma solidity 0.7.6;
+
+import "../libraries/uniswap/TickMath.sol";
+import "../SqrtRatioTable.sol";
+
+/// @dev Exposes TickMath#getSqrtRatioAtTick and its SqrtRatioTable counterpart to check they agree & compare their gas
+contract TickMathTableTester {
+
+   function getSqrtRatioAtTick(int24 tick) external pure returns (uint160) {
+      return TickMath.getSqrtRatioAtTick(tick);
+   }
+
+   function getSqrtRatioAtTickWithTable(address _table, int24 tick) external view returns (uint160) {
+      return TickMathTable.getSqrtRatioAtTick(_table, tick);
+   }
+
+   /// @dev compare both on the ticks start, start + step, ... (count ticks)
+   /// @return true and the first tick where they differ, or false
+   function firstMismatch(address _table, int24 _start, int24 _step, uint256 _count) external view returns (bool, int24) {
+      int24 _tick = _start;
+      for (uint256 i = 0; i < _count; ++i) {
+         if (TickMath.getSqrtRatioAtTick(_tick) != TickMathTable.getSqrtRatioAtTick(_table, _tick)) {
+            return (true, _tick);
+         }
+         _tick += _step;
+      }
+      return (false, 0);
+   }
+
+   /// @return gas of TickMath & of the table on the same ticks start, start + step, ... (count ticks)
+   function gasOf(address _table, int24 _start, int24 _step, uint256 _count) external view returns (uint256 _tickMathGas, uint256 _tableGas) {
+      uint256 _gas = gasleft();
+      int24 _tick = _start;
+      for (uint256 i = 0; i < _count; ++i) {
+         TickMath.getSqrtRatioAtTick(_tick);
+         _tick += _step;
+      }
+      _tickMathGas = _gas - gasleft();
+
+      _gas = gasleft();
+      _tick = _start;
+      for (uint256 i = 0; i < _count; ++i) {
+         TickMathTable.getSqrtRatioAtTick(_table, _tick);
+         _tick += _step;
+      }
+      _tableGas = _gas - gasleft();
+   }
+}
@@ -0,0 +1,56 @@
+pragma solidity 0.8.10;
+
+import "../../interfaces/uniswap/IV3Factory.sol";
+import {MockERC20} from "./MockERC20.sol";
+
+interface IUniswapV3PoolActions {
+   function token0() external view returns (address);
+   function token1() external view returns (address);
+   function initialize(uint160 sqrtPriceX96) external;
+   function mint(address recipient, int24 tickLower, int24 tickUpper, uint128 amount, bytes calldata data) external returns (uint256 amount0, uint256 amount1);
+   function swap(address recipient, bool zeroForOne, int256 amountSpecified, uint160 sqrtPriceLimitX96, bytes calldata data) external returns (int256 amount0, int256 amount1);
+}
+
+/// @dev Creates Uniswap V3 pools of mock tokens, provides liquidity and swaps in them, paying the pool in its callbacks
+/// @notice the real counterpart of UniV3SwapSimulator in differential tests
+contract UniV3PoolActor {
+   uint160 internal constant MIN_SQRT_RATIO = 4295128739;
+   uint160 internal constant MAX_SQRT_RATIO = 1461446703485210103287273052203988822378723970342;
+
+   /// @dev new pool of two new mock tokens, initialized at given price
+   function createPool(address factory, uint24 fee, uint160 sqrtPriceX96) external returns (address pool) {
+      address _tokenA = address(new MockERC20("Token A", "TKA"));
+      address _tokenB = address(new MockERC20("Token B", "TKB"));
+      pool = IUniswapV3Factory(factory).createPool(_tokenA, _tokenB, fee);
+      IUniswapV3PoolActions(pool).initialize(sqrtPriceX96);
+   }
+
+   function mint(address pool, int24 tickLower, int24 tickUpper, uint128 liquidity) external {
+      IUniswapV3PoolActions(pool).mint(address(this), tickLower, tickUpper, liquidity, "");
+   }
+
+   /// @dev exact input swap with the same price limit as the simulator, meant to be run with eth_call
+   /// @return output amount
+   function swapExactIn(address pool, bool zeroForOne, uint256 amountIn) external returns (uint256) {
+      uint160 _limit = zeroForOne? MIN_SQRT_RATIO + 1 : MAX_SQRT_RATIO - 1;
+      (int256 _amount0, int256 _amount1) = IUniswapV3PoolActions(pool).swap(address(this), zeroForOne, int256(amountIn), _limit, "");
+      return uint256(-(zeroForOne? _amount1 : _amount0));
+   }
+
+   function uniswapV3MintCallback(uint256 amount0Owed, uint256 amount1Owed, bytes calldata) external {
+      _pay(msg.sender, amount0Owed, amount1Owed);
+   }
+
+   function uniswapV3SwapCallback(int256 amount0Delta, int256 amount1Delta, bytes calldata) external {
+      _pay(msg.sender, amount0Delta > 0? uint256(amount0Delta) : 0, amount1Delta > 0? uint256(amount1Delta) : 0);
+   }
+
+   function _pay(address pool, uint256 amount0, uint256 amount1) internal {
+      if (amount0 > 0){
+         MockERC20(IUniswapV3PoolActions(pool).token0()).mint(pool, amount0);
+      }
+      if (amount1 > 0){
+         MockERC20(IUniswapV3PoolActions(pool).token1()).mint(pool, amount1);
+      }
+   }
+}
@@ -0,0 +1,360 @@
+"""
+    Exact integer port of the Balancer V2 libraries used by BalancerSwapSimulator
+    https://github.com/balancer-labs/balancer-v2-monorepo/tree/master/pkg/solidity-utils/contracts/math
+    Every function mirrors its Solidity counterpart bit by bit, reverts are raised as SolidityRevert
+"""
+
+from helpers.univ3_math import SolidityRevert, require, sdiv, smod, MAX_UINT256
+
+ONE = 10**18
+TWO = 2 * ONE
+FOUR = 4 * ONE
+MAX_POW_RELATIVE_ERROR = 10000
+
+_MAX_IN_RATIO = 3 * 10**17
+_AMP_PRECISION = 10**3
+
+
+### BalancerMath ###
+
+def bmul(a, b):
+    c = a * b
+    require(c <= MAX_UINT256, "!OVEF")
+    return c
+
+
+def bdiv_down(a, b):
+    require(b != 0, "!b0")
+    return a // b
+
+
+def bdiv_up(a, b):
+    require(b != 0, "!b0")
+    if a == 0:
+        return 0
+    return 1 + (a - 1) // b
+
+
+def bdiv(a, b, round_up):
+    return bdiv_up(a, b) if round_up else bdiv_down(a, b)
+
+
+### BalancerFixedPoint ###
+
+def add(a, b):
+    c = a + b
+    require(c <= MAX_UINT256, "!add")
+    return c
+
+
+def sub(a, b):
+    require(b <= a, "!sub")
+    return a - b
+
+
+def div_up(a, b):
+    require(b != 0, "!b0")
+    if a == 0:
+        return 0
+    a_inflated = a * ONE
+    require(a_inflated <= MAX_UINT256, "!divU")
+    return ((a_inflated - 1) // b) + 1
+
+
+def div_down(a, b):
+    require(b != 0, "!b0")
+    if a == 0:
+        return 0
+    a_inflated = a * ONE
+    require(a_inflated <= MAX_UINT256, "divD")
+    return a_inflated // b
+
+
+def mul_up(a, b):
+    product = a * b
+    require(product <= MAX_UINT256, "!mul")
+    if product == 0:
+        return 0
+    return ((product - 1) // ONE) + 1
+
+
+def mul_down(a, b):
+    product = a * b
+    require(product <= MAX_UINT256, "mulD")
+    return product // ONE
+
+
+def complement(x):
+    return (ONE - x) if x < ONE else 0
+
+
+def pow_up(x, y):
+    if y == ONE:
+        return x
+    elif y == TWO:
+        return mul_up(x, x)
+    elif y == FOUR:
+        square = mul_up(x, x)
+        return mul_up(square, square)
+    raw = pow(x, y)
+    max_error = add(mul_up(raw, MAX_POW_RELATIVE_ERROR), 1)
+    return add(raw, max_error)
+
+
+### BalancerLogExpMath ###
+
+ONE_18 = 10**18
+ONE_20 = 10**20
+ONE_36 = 10**36
+MAX_NATURAL_EXPONENT = 130 * 10**18
+MIN_NATURAL_EXPONENT = -41 * 10**18
+LN_36_LOWER_BOUND = ONE_18 - 10**17
+LN_36_UPPER_BOUND = ONE_18 + 10**17
+MILD_EXPONENT_BOUND = 2**254 // ONE_20
+
+x0 = 128000000000000000000
+a0 = 38877084059945950922200000000000000000000000000000000000
+x1 = 64000000000000000000
+a1 = 6235149080811616882910000000
+x2 = 3200000000000000000000
+a2 = 7896296018268069516100000000000000
+x3 = 1600000000000000000000
+a3 = 888611052050787263676000000
+x4 = 800000000000000000000
+a4 = 298095798704172827474000
+x5 = 400000000000000000000
+a5 = 5459815003314423907810
+x6 = 200000000000000000000
+a6 = 738905609893065022723
+x7 = 100000000000000000000
+a7 = 271828182845904523536
+x8 = 50000000000000000000
+a8 = 164872127070012814685
+x9 = 25000000000000000000
+a9 = 128402541668774148407
+x10 = 12500000000000000000
+a10 = 113314845306682631683
+x11 = 6250000000000000000
+a11 = 106449445891785942956
+
+_EXP_STEPS = ((x2, a2), (x3, a3), (x4, a4), (x5, a5), (x6, a6), (x7, a7), (x8, a8), (x9, a9))
+_LN_STEPS = ((x2, a2), (x3, a3), (x4, a4), (x5, a5), (x6, a6), (x7, a7), (x8, a8), (x9, a9), (x10, a10), (x11, a11))
+
+
+def pow(x, y):
+    if y == 0:
+        return ONE_18
+    if x == 0:
+        return 0
+
+    require(x >> 255 == 0, "!OUTB")
+    require(y < MILD_EXPONENT_BOUND, "!OUTB")
+
+    if LN_36_LOWER_BOUND < x and x < LN_36_UPPER_BOUND:
+        ln_36_x = _ln_36(x)
+        logx_times_y = sdiv(ln_36_x, ONE_18) * y + sdiv(smod(ln_36_x, ONE_18) * y, ONE_18)
+    else:
+        logx_times_y = _ln(x) * y
+    logx_times_y = sdiv(logx_times_y, ONE_18)
+
+    require(MIN_NATURAL_EXPONENT <= logx_times_y and logx_times_y <= MAX_NATURAL_EXPONENT, "!OUTB")
+    return exp(logx_times_y)
+
+
+def exp(x):
+    require(x >= MIN_NATURAL_EXPONENT and x <= MAX_NATURAL_EXPONENT, "!EXP")
+
+    if x < 0:
+        return sdiv(ONE_18 * ONE_18, exp(-x))
+
+    if x >= x0:
+        x -= x0
+        first_an = a0
+    elif x >= x1:
+        x -= x1
+        first_an = a1
+    else:
+        first_an = 1
+
+    x *= 100
+
+    product = ONE_20
+    for (xn, an) in _EXP_STEPS:
+        if x >= xn:
+            x -= xn
+            product = sdiv(product * an, ONE_20)
+
+    series_sum = ONE_20
+    term = x
+    series_sum += term
+    for n in range(2, 13):
+        term = sdiv(sdiv(term * x, ONE_20), n)
+        series_sum += term
+
+    return sdiv(sdiv(product * series_sum, ONE_20) * first_an, 100)
+
+
+def _ln(a):
+    if a < ONE_18:
+        return -_ln(sdiv(ONE_18 * ONE_18, a))
+
+    total = 0
+    if a >= a0 * ONE_18:
+        a = sdiv(a, a0)
+        total += x0
+
+    if a >= a1 * ONE_18:
+        a = sdiv(a, a1)
+        total += x1
+
+    total *= 100
+    a *= 100
+
+    for (xn, an) in _LN_STEPS:
+        if a >= an:
+            a = sdiv(a * ONE_20, an)
+            total += xn
+
+    z = sdiv((a - ONE_20) * ONE_20, a + ONE_20)
+    z_squared = sdiv(z * z, ONE_20)
+
+    num = z
+    series_sum = num
+    for d in (3, 5, 7, 9, 11):
+        num = sdiv(num * z_squared, ONE_20)
+        series_sum += sdiv(num, d)
+
+    series_sum *= 2
+    return sdiv(total + series_sum, 100)
+
+
+def _ln_36(x):
+    x *= ONE_18
+
+    z = sdiv((x - ONE_36) * ONE_36, x + ONE_36)
+    z_squared = sdiv(z * z, ONE_36)
+
+    num = z
+    series_sum = num
+    for d in (3, 5, 7, 9, 11, 13, 15):
+        num = sdiv(num * z_squared, ONE_36)
+        series_sum += sdiv(num, d)
+
+    return series_sum * 2
+
+
+### BalancerStableMath ###
+
+def calculate_invariant(amplification_parameter, balances, round_up):
+    total = 0
+    num_tokens = len(balances)
+    for b in balances:
+        total = add(total, b)
+    if total == 0:
+        return 0
+
+    prev_invariant = 0
+    invariant = total
+    amp_times_total = amplification_parameter * num_tokens
+
+    for _ in range(255):
+        p_d = balances[0] * num_tokens
+        for j in range(1, num_tokens):
+            p_d = bdiv(bmul(bmul(p_d, balances[j]), num_tokens), invariant, round_up)
+        prev_invariant = invariant
+        invariant = bdiv(
+            add(bmul(bmul(num_tokens, invariant), invariant), bdiv(bmul(bmul(amp_times_total, total), p_d), _AMP_PRECISION, round_up)),
+            add(bmul(num_tokens + 1, invariant), bdiv(bmul(amp_times_total - _AMP_PRECISION, p_d), _AMP_PRECISION, not round_up)),
+            round_up
+        )
+
+        if invariant > prev_invariant:
+            if invariant - prev_invariant <= 1:
+                return invariant
+        elif prev_invariant - invariant <= 1:
+            return invariant
+
+    raise SolidityRevert("!INVT")
+
+
+def get_token_balance_given_invariant_and_all_other_balances(amplification_parameter, balances, invariant, token_index):
+    amp_times_total = amplification_parameter * len(balances)
+    total = balances[0]
+    p_d = balances[0] * len(balances)
+    for j in range(1, len(balances)):
+        p_d = bdiv_down(bmul(bmul(p_d, balances[j]), len(balances)), invariant)
+        total = add(total, balances[j])
+    total = total - balances[token_index]
+
+    inv2 = bmul(invariant, invariant)
+    c = bmul(bmul(bdiv_up(inv2, bmul(amp_times_total, p_d)), _AMP_PRECISION), balances[token_index])
+    b = add(total, bmul(bdiv_down(invariant, amp_times_total), _AMP_PRECISION))
+
+    token_balance = bdiv_up(add(inv2, c), add(invariant, b))
+
+    for _ in range(255):
+        prev_token_balance = token_balance
+        token_balance = bdiv_up(add(bmul(token_balance, token_balance), c), sub(add(bmul(token_balance, 2), b), invariant))
+
+        if token_balance > prev_token_balance:
+            if token_balance - prev_token_balance <= 1:
+                return token_balance
+        elif prev_token_balance - token_balance <= 1:
+            return token_balance
+
+    raise SolidityRevert("!COVG")
+
+
+### BalancerSwapSimulator ###
+
+def subtract_swap_fee_amount(amount, swap_fee_percentage):
+    fee_amount = mul_up(amount, swap_fee_percentage)
+    return sub(amount, fee_amount)
+
+
+def compute_scaling_factor_weighted_pool(decimals):
+    return 10**sub(18, decimals)
+
+
+def compute_scaling_factor(decimals):
+    return ONE * 10**sub(18, decimals)
+
+
+def calc_out_given_in(balance_in, weight_in, decimals_in, balance_out, weight_out, decimals_out, amount_in, swap_fee_percentage):
+    """ BalancerSwapSimulator.calcOutGivenIn for weighted pools """
+    amount_in = subtract_swap_fee_amount(amount_in, swap_fee_percentage)
+
+    scaling_factor_in = compute_scaling_factor_weighted_pool(decimals_in)
+    amount_in = bmul(amount_in, scaling_factor_in)
+    balance_in = bmul(balance_in, scaling_factor_in)
+    require(balance_in > amount_in, "!amtIn")
+
+    scaling_factor_out = compute_scaling_factor_weighted_pool(decimals_out)
+    balance_out = bmul(balance_out, scaling_factor_out)
+
+    require(amount_in <= mul_down(balance_in, _MAX_IN_RATIO), "!maxIn")
+
+    denominator = add(balance_in, amount_in)
+    base = div_up(balance_in, denominator)
+    exponent = div_down(weight_in, weight_out)
+    power = pow_up(base, exponent)
+
+    scaled_out = mul_down(balance_out, complement(power))
+    return bdiv_down(scaled_out, scaling_factor_out)
+
+
+def calc_out_given_in_for_stable(decimals, balances, current_amp, token_index_in, token_index_out, amount_in, swap_fee_percentage):
+    """ BalancerSwapSimulator.calcOutGivenInForStable """
+    scaling_factors = [compute_scaling_factor(d) for d in decimals]
+
+    amount_in = subtract_swap_fee_amount(amount_in, swap_fee_percentage)
+    balances = [mul_down(b, s) for (b, s) in zip(balances, scaling_factors)]
+    amount_in = mul_down(amount_in, scaling_factors[token_index_in])
+
+    invariant = calculate_invariant(current_amp, balances, True)
+
+    balances[token_index_in] = add(balances[token_index_in], amount_in)
+    final_balance_out = get_token_balance_given_invariant_and_all_other_balances(current_amp, balances, invariant, token_index_out)
+
+    scaled_out = sub(balances[token_index_out], add(final_balance_out, 1))
+    return div_down(scaled_out, scaling_factors[token_index_out])
@@ -0,0 +1,132 @@
+"""
+    Fill a MarketState from the connected brownie network, the node is only used for plain state reads
+    Quotes themselves are computed by helpers/offchain_pricer.py
+"""
+
+from brownie import interface, web3
+from brownie.exceptions import VirtualMachineError
+
+from helpers.offchain_pricer import (
+    MarketState,
+    MissingPoolState,
+    UniV2PairState,
+    UniV3PoolState,
+    BalancerPoolState,
+    CurvePoolState,
+)
+from helpers.pool_addresses import univ2_pair, sushi_pair, univ3_pool
+
+CURVE_ROUTER = "0x8e764bE4288B842791989DB5b8ec067279829809"
+BALANCERV2_VAULT = "0xBA12222222228d8Ba445958a75a0704d566BF2C8"
+
+## each quote touches at most a couple dozen pools, so this is just a guard against a runaway loop
+MAX_FETCH_ROUNDS = 1000
+
+
+def _is_contract(address):
+    return len(web3.eth.get_code(address)) > 0
+
+
+class ChainStateFetcher:
+    """ lazily reads from chain whatever the OffChainPricer reported as missing """
+
+    def __init__(self, state=None, block_identifier="latest"):
+        self.state = state if state is not None else MarketState()
+        self.block_identifier = block_identifier
+        self.calls = 0
+
+    def _call(self, fn, *args):
+        self.calls += 1
+        return fn.call(*args, block_identifier=self.block_identifier)
+
+    def fetch(self, missing):
+        handler = getattr(self, "_fetch_" + missing.kind)
+        handler(missing.key)
+
+    def _fetch_univ2(self, key):
+        self.state.univ2[key] = self._fetch_univ2_like(univ2_pair(*key))
+
+    def _fetch_sushi(self, key):
+        self.state.sushi[key] = self._fetch_univ2_like(sushi_pair(*key))
+
+    def _fetch_univ2_like(self, pair):
+        if not _is_contract(pair):
+            return None
+        (reserve0, reserve1, _) = self._call(interface.IUniswapV2Pool(pair).getReserves)
+        return UniV2PairState(reserve0, reserve1)
+
+    def _fetch_univ3(self, key):
+        (token0, token1, fee) = key
+        pool = univ3_pool(token0, token1, fee)
+        if not _is_contract(pool):
+            self.state.univ3[key] = None
+            return
+
+        v3 = interface.IUniswapV3Pool(pool)
+        slot0 = self._call(v3.slot0)
+        self.state.univ3[key] = UniV3PoolState(
+            fee=fee,
+            tick_spacing=self._call(v3.tickSpacing),
+            sqrt_price_x96=slot0[0],
+            tick=slot0[1],
+            liquidity=self._call(v3.liquidity),
+            balance0=self._call(interface.ERC20(token0).balanceOf, pool),
+            balance1=self._call(interface.ERC20(token1).balanceOf, pool),
+        )
+
+    def _fetch_univ3_bitmap(self, key):
+        (pool_key, word_pos) = key
+        v3 = interface.IUniswapV3Pool(univ3_pool(*pool_key))
+        self.state.univ3[pool_key].tick_bitmap[word_pos] = self._call(v3.tickBitmap, word_pos)
+
+    def _fetch_univ3_tick(self, key):
+        (pool_key, tick) = key
+        v3 = interface.IUniswapV3Pool(univ3_pool(*pool_key))
+        self.state.univ3[pool_key].liquidity_net[tick] = self._call(v3.ticks, tick)[1]
+
+    def _fetch_balancer(self, pool_id):
+        pool = interface.IBalancerV2StablePool(pool_id[:42])
+        (tokens, balances, _) = self._call(interface.IBalancerV2Vault(BALANCERV2_VAULT).getPoolTokens, pool_id)
+        fee = self._call(pool.getSwapFeePercentage)
+
+        ## same dispatch as OnChainPricingMainnet: stable if getAmplificationParameter() succeeds otherwise weighted
+        try:
+            (amp, _, _) = self._call(pool.getAmplificationParameter)
+            state = BalancerPoolState(list(tokens), list(balances), fee, amp=amp)
+        except VirtualMachineError:
+            weights = self._call(interface.IBalancerV2WeightedPool(pool_id[:42]).getNormalizedWeights)
+            state = BalancerPoolState(list(tokens), list(balances), fee, weights=list(weights))
+        self.state.balancer[pool_id.lower()] = state
+
+    def _fetch_decimals(self, token):
+        self.state.decimals[token] = self._call(interface.ERC20(token).decimals)
+
+    def _fetch_curve(self, key):
+        (tokenIn, tokenOut, amountIn) = key
+        (pool, quote) = self._call(interface.ICurveRouter(CURVE_ROUTER).get_best_rate, tokenIn, tokenOut, amountIn)
+        fee = self._call(interface.ICurvePool(pool).fee) if quote > 0 else 0
+        self.state.curve[key] = (pool, quote, fee)
+
+    def _fetch_curve_pools(self, key):
+        (pool, n, precise) = key
+        curve = interface.ICurvePool(pool)
+        self.state.curve_pools[key] = CurvePoolState(
+            coins=[str(self._call(curve.coins, k)).lower() for k in range(n)],
+            balances=[self._call(curve.balances, k) for k in range(n)],
+            amp=self._call(curve.A_precise if precise else curve.A),
+            fee=self._call(curve.fee),
+        )
+
+
+def quote_with_fetcher(pricer, fetcher, fn_name, *args):
+    """
+        Run given OffChainPricer function, fetching missing state until it completes
+        e.g. quote_with_fetcher(pricer, fetcher, "find_optimal_swap", tokenIn, tokenOut, amountIn)
+    """
+    fn = getattr(pricer, fn_name)
+    for _ in range(MAX_FETCH_ROUNDS):
+        try:
+            return fn(*args)
+        except MissingPoolState as missing:
+            fetcher.fetch(missing)
+    raise RuntimeError("too many fetch rounds for " + fn_name)
@@ -0,0 +1,79 @@
+"""
+    Exact integer port of CurveSwapSimulator, i.e. the StableSwap math of Curve plain pools
+    https://etherscan.io/address/0xbEbc44782C7dB0a1A60Cb6fe97d0b483032FF1C7#code (3pool)
+    Every function mirrors its Solidity counterpart bit by bit, reverts are raised as SolidityRevert
+"""
+
+from helpers.univ3_math import require
+
+PRECISION = 10**18
+FEE_DENOMINATOR = 10**10
+
+
+def _sub(a, b):
+    require(a >= b, "")
+    return a - b
+
+
+def _div(a, b):
+    require(b != 0, "")
+    return a // b
+
+
+def get_d(xp, amp, a_precision):
+    """ StableSwap invariant D for given normalized balances """
+    n = len(xp)
+    s = sum(xp)
+    if s == 0:
+        return 0
+
+    d = s
+    ann = amp * n
+    for _ in range(255):
+        d_p = d
+        for x in xp:
+            d_p = _div(d_p * d, x * n)
+        d_prev = d
+        d = _div((ann * s // a_precision + d_p * n) * d, _sub(ann, a_precision) * d // a_precision + (n + 1) * d_p)
+        if abs(d - d_prev) <= 1:
+            return d
+    require(False, "!D")
+
+
+def get_y(i, j, x, xp, amp, a_precision):
+    """ new balance of coin j given new balance x of coin i, keeping D constant """
+    require(i != j, "!ij")
+    n = len(xp)
+    d = get_d(xp, amp, a_precision)
+    ann = amp * n
+    c = d
+    s_ = 0
+    for k in range(n):
+        if k != j:
+            _x = x if k == i else xp[k]
+            s_ += _x
+            c = _div(c * d, _x * n)
+    c = _div(c * d * a_precision, ann * n)
+    b = s_ + _div(d * a_precision, ann)
+
+    y = d
+    for _ in range(255):
+        y_prev = y
+        y = _div(y * y + c, _sub(2 * y + b, d))
+        if abs(y - y_prev) <= 1:
+            return y
+    require(False, "!y")
+
+
+def get_dy(balances, rates, amp, a_precision, fee, i, j, dx):
+    """ CurveSwapSimulator#get_dy, rates are 10 ** (36 - decimals) for each coin """
+    xp = [rate * balance // PRECISION for (rate, balance) in zip(rates, balances)]
+    x = xp[i] + dx * rates[i] // PRECISION
+    y = get_y(i, j, x, xp, amp, a_precision)
+    dy = _sub(_sub(xp[j], y), 1)
+    if a_precision == 1:
+        # legacy pools without A_precise (e.g. 3pool) take the fee on the denormalized output
+        dy = _div(dy * PRECISION, rates[j])
+        return dy - fee * dy // FEE_DENOMINATOR
+    _fee = fee * dy // FEE_DENOMINATOR
+    return _div(_sub(dy, _fee) * PRECISION, rates[j])
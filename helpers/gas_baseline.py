@@ -0,0 +1,73 @@
+"""
+    Versioned gas baseline of benchmark scenarios, to track gas regressions between releases
+
+    A baseline records the gas of each scenario along with the chain state it was measured on ("source"),
+    either a pinned-block fork (block number & hash) or a seeded snapshot (block & content hash),
+    measurements are only compared to a baseline taken on the same source so that numbers are reproducible
+"""
+
+import hashlib
+import json
+
+from tabulate import tabulate
+
+BASELINE_VERSION = 1
+DEFAULT_THRESHOLD_PCT = 5.0
+
+
+class BaselineVersionError(Exception):
+    pass
+
+
+def fork_source(block, block_hash):
+    return {"kind": "fork", "block": int(block), "hash": str(block_hash).lower()}
+
+
+def snapshot_source(snapshot):
+    content = json.dumps(snapshot["accounts"], sort_keys=True).encode()
+    return {"kind": "snapshot", "block": int(snapshot["block"]), "hash": "0x" + hashlib.sha256(content).hexdigest()}
+
+
+def new_baseline(source, gas):
+    """ gas: scenario name -> gas used """
+    return {"version": BASELINE_VERSION, "source": source, "gas": dict(gas)}
+
+
+def compare(baseline, gas, threshold_pct=DEFAULT_THRESHOLD_PCT):
+    """
+        one row per scenario: (name, baseline gas, measured gas, delta, delta %, status)
+        status is "REGRESSION" above threshold_pct, "new" / "removed" for scenarios only on one side
+    """
+    rows = []
+    for name in sorted(set(baseline["gas"]) | set(gas)):
+        (before, after) = (baseline["gas"].get(name), gas.get(name))
+        if before is None or after is None:
+            rows.append((name, before, after, None, None, "new" if before is None else "removed"))
+            continue
+        delta = after - before
+        pct = 100.0 * delta / before if before > 0 else 0.0
+        rows.append((name, before, after, delta, round(pct, 2), "REGRESSION" if pct > threshold_pct else "ok"))
+    return rows
+
+
+def regressions(rows):
+    return [r for r in rows if r[5] == "REGRESSION"]
+
+
+def format_deltas(rows):
+    return tabulate(rows, headers=["scenario", "baseline", "gas", "delta", "delta %", "status"])
+
+
+### FILES ###
+
+def save_baseline(path, baseline):
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=1, sort_keys=True)
+
+
+def load_baseline(path):
+    with open(path) as f:
+        baseline = json.load(f)
+    if baseline.get("version") != BASELINE_VERSION:
+        raise BaselineVersionError("unsupported baseline version {}, expected {}".format(baseline.get("version"), BASELINE_VERSION))
+    return baseline
@@ -0,0 +1,286 @@
+"""
+    Async quoting client: gathers the pool state of many swaps with a few aggregated Multicall2 requests
+    sent concurrently over a pooled HTTP session, then quotes locally with helpers/offchain_pricer.py
+
+    Round 1 prefetches what every quote needs (UniV2/Sushi reserves, UniV3 slot0 & liquidity for all fee tiers,
+    Balancer pool tokens, indexed Curve pools & Curve router rates), later rounds only fetch what the pricer still reports as missing
+    (tick bitmap words & ticks crossed, decimals, ...)
+
+    import asyncio
+    client = MulticallQuoteClient("http://127.0.0.1:8545")
+    quotes = asyncio.run(client.quote_many([(tokenIn, tokenOut, amountIn), ...]))
+    print(client.stats)
+"""
+
+import asyncio
+import itertools
+import time
+
+import aiohttp
+import eth_abi
+from eth_utils import function_signature_to_4byte_selector
+
+from helpers.offchain_pricer import (
+    OffChainPricer,
+    MarketState,
+    MissingPoolState,
+    UniV2PairState,
+    UniV3PoolState,
+    BalancerPoolState,
+    CurvePoolState,
+    UNIV3_FEES,
+    WETH,
+    sort_tokens,
+)
+from helpers.pool_addresses import univ2_pair, sushi_pair, univ3_pool
+
+MULTICALL2 = "0x5BA1e12693Dc8F9c48aAD8770482f4739bEeD696"
+CURVE_ROUTER = "0x8e764bE4288B842791989DB5b8ec067279829809"
+BALANCERV2_VAULT = "0xBA12222222228d8Ba445958a75a0704d566BF2C8"
+
+## calls per tryAggregate request, keeps each eth_call well below node gas & payload limits
+CALLS_PER_REQUEST = 300
+## concurrent HTTP requests in flight
+MAX_CONCURRENT_REQUESTS = 8
+MAX_ROUNDS = 100
+
+_encode = getattr(eth_abi, "encode", None) or eth_abi.encode_abi
+_decode = getattr(eth_abi, "decode", None) or eth_abi.decode_abi
+
+
+def _calldata(signature, types=(), args=()):
+    return function_signature_to_4byte_selector(signature) + _encode(list(types), list(args))
+
+
+def _decode_or_none(types, success, data):
+    """ calls to an address without code succeed with empty return data, so they decode to None like failed calls """
+    if not success or len(data) == 0:
+        return None
+    return _decode(list(types), data)
+
+
+class MulticallQuoteClient:
+
+    def __init__(self, rpc_url, block="latest", state=None, calls_per_request=CALLS_PER_REQUEST, max_concurrent_requests=MAX_CONCURRENT_REQUESTS):
+        self.rpc_url = rpc_url
+        self.block = block if isinstance(block, str) else hex(block)
+        self.state = state if state is not None else MarketState()
+        self.pricer = OffChainPricer(self.state)
+        self.calls_per_request = calls_per_request
+        self.max_concurrent_requests = max_concurrent_requests
+        self._curve_rates = {}
+        self._request_ids = itertools.count(1)
+        self.stats = {"requests": 0, "calls": 0, "rounds": 0, "quotes": 0, "requestsPerQuote": 0, "seconds": 0}
+
+    ### QUOTING ###
+
+    async def quote_many(self, swaps):
+        """ (tokenIn, tokenOut, amountIn) -> Quote, in the same order as given swaps """
+        start = time.time()
+        connector = aiohttp.TCPConnector(limit=self.max_concurrent_requests)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            await self._fetch(session, self._prefetch_keys(swaps))
+
+            quotes = [None] * len(swaps)
+            pending = list(range(len(swaps)))
+            for _ in range(MAX_ROUNDS):
+                missing = {}
+                for i in pending:
+                    try:
+                        quotes[i] = self.pricer.find_optimal_swap(*swaps[i])
+                    except MissingPoolState as e:
+                        missing[(e.kind, e.key)] = True
+                pending = [i for i in pending if quotes[i] is None]
+                if not pending:
+                    break
+                await self._fetch(session, list(missing))
+            else:
+                raise RuntimeError("too many fetch rounds")
+
+        self.stats["quotes"] += len(swaps)
+        self.stats["seconds"] += time.time() - start
+        self.stats["requestsPerQuote"] = self.stats["requests"] / max(self.stats["quotes"], 1)
+        return quotes
+
+    def _prefetch_keys(self, swaps):
+        keys = {}
+        for (tokenIn, tokenOut, amountIn) in swaps:
+            (tokenIn, tokenOut) = (tokenIn.lower(), tokenOut.lower())
+            legs = [(tokenIn, tokenOut)]
+            if tokenIn != WETH and tokenOut != WETH:
+                legs += [(tokenIn, WETH), (WETH, tokenOut)]
+            for (a, b) in legs:
+                pair = sort_tokens(a, b)
+                keys[("univ2", pair)] = True
+                keys[("sushi", pair)] = True
+                for fee in UNIV3_FEES:
+                    keys[("univ3", pair + (fee,))] = True
+                for pool_id in self.pricer.get_balancer_v2_pools(a, b):
+                    keys[("balancer", pool_id.lower())] = True
+            keys[("curve", (tokenIn, tokenOut, int(amountIn)))] = True
+        for pool_key in self.pricer.curve_pools:
+            keys[("curve_pools", pool_key)] = True
+        return [k for k in keys if not self._has(*k)]
+
+    def _has(self, kind, key):
+        try:
+            self.state._get(kind, key)
+            return True
+        except MissingPoolState:
+            return False
+
+    ### FETCHING ###
+
+    async def _fetch(self, session, keys):
+        """ one round: build the calls of every key, send them in concurrent tryAggregate chunks, decode into the state """
+        groups = [self._calls_for(kind, key) for (kind, key) in keys]
+        calls = [c for (group_calls, _) in groups for c in group_calls]
+        if not calls:
+            return
+
+        chunks = [calls[i:i + self.calls_per_request] for i in range(0, len(calls), self.calls_per_request)]
+        results = await asyncio.gather(*[self._try_aggregate(session, chunk) for chunk in chunks])
+        results = [r for chunk_results in results for r in chunk_results]
+
+        offset = 0
+        for (group_calls, decoder) in groups:
+            decoder(results[offset:offset + len(group_calls)])
+            offset += len(group_calls)
+
+        self.stats["rounds"] += 1
+        self.stats["calls"] += len(calls)
+
+    async def _try_aggregate(self, session, calls):
+        data = _calldata("tryAggregate(bool,(address,bytes)[])", ["bool", "(address,bytes)[]"], [False, calls])
+        payload = {
+            "jsonrpc": "2.0",
+            "id": next(self._request_ids),
+            "method": "eth_call",
+            "params": [{"to": MULTICALL2, "data": "0x" + data.hex()}, self.block],
+        }
+        self.stats["requests"] += 1
+        async with session.post(self.rpc_url, json=payload) as response:
+            body = await response.json(content_type=None)
+        if "error" in body:
+            raise RuntimeError(body["error"])
+        (results, ) = _decode(["(bool,bytes)[]"], bytes.fromhex(body["result"][2:]))
+        return results
+
+    ### CALLS & DECODERS PER STATE KIND ###
+
+    def _calls_for(self, kind, key):
+        return getattr(self, "_calls_" + kind)(key)
+
+    def _calls_univ2(self, key):
+        return self._univ2_like(self.state.univ2, key, univ2_pair(*key))
+
+    def _calls_sushi(self, key):
+        return self._univ2_like(self.state.sushi, key, sushi_pair(*key))
+
+    def _univ2_like(self, pairs, key, pair):
+        def decode(results):
+            reserves = _decode_or_none(["uint112", "uint112", "uint32"], *results[0])
+            pairs[key] = None if reserves is None else UniV2PairState(reserves[0], reserves[1])
+        return ([(pair, _calldata("getReserves()"))], decode)
+
+    def _calls_univ3(self, key):
+        (token0, token1, fee) = key
+        pool = univ3_pool(token0, token1, fee)
+        calls = [
+            (pool, _calldata("slot0()")),
+            (pool, _calldata("tickSpacing()")),
+            (pool, _calldata("liquidity()")),
+            (token0, _calldata("balanceOf(address)", ["address"], [pool])),
+            (token1, _calldata("balanceOf(address)", ["address"], [pool])),
+        ]
+
+        def decode(results):
+            slot0 = _decode_or_none(["uint160", "int24", "uint16", "uint16", "uint16", "uint8", "bool"], *results[0])
+            if slot0 is None:
+                self.state.univ3[key] = None
+                return
+            self.state.univ3[key] = UniV3PoolState(
+                fee=fee,
+                tick_spacing=_decode(["int24"], results[1][1])[0],
+                sqrt_price_x96=slot0[0],
+                tick=slot0[1],
+                liquidity=_decode(["uint128"], results[2][1])[0],
+                balance0=_decode(["uint256"], results[3][1])[0],
+                balance1=_decode(["uint256"], results[4][1])[0],
+            )
+        return (calls, decode)
+
+    def _calls_univ3_bitmap(self, key):
+        (pool_key, word_pos) = key
+
+        def decode(results):
+            self.state.univ3[pool_key].tick_bitmap[word_pos] = _decode(["uint256"], results[0][1])[0]
+        return ([(univ3_pool(*pool_key), _calldata("tickBitmap(int16)", ["int16"], [word_pos]))], decode)
+
+    def _calls_univ3_tick(self, key):
+        (pool_key, tick) = key
+
+        def decode(results):
+            info = _decode(["uint128", "int128", "uint256", "uint256", "int56", "uint160", "uint32", "bool"], results[0][1])
+            self.state.univ3[pool_key].liquidity_net[tick] = info[1]
+        return ([(univ3_pool(*pool_key), _calldata("ticks(int24)", ["int24"], [tick]))], decode)
+
+    def _calls_balancer(self, pool_id):
+        pool = pool_id[:42]
+        calls = [
+            (BALANCERV2_VAULT, _calldata("getPoolTokens(bytes32)", ["bytes32"], [bytes.fromhex(pool_id[2:])])),
+            (pool, _calldata("getSwapFeePercentage()")),
+            (pool, _calldata("getAmplificationParameter()")),
+            (pool, _calldata("getNormalizedWeights()")),
+        ]
+
+        def decode(results):
+            (tokens, balances, _) = _decode(["address[]", "uint256[]", "uint256"], results[0][1])
+            fee = _decode(["uint256"], results[1][1])[0]
+            ## same dispatch as OnChainPricingMainnet: stable if getAmplificationParameter() succeeds otherwise weighted
+            amp = _decode_or_none(["uint256", "bool", "uint256"], *results[2])
+            if amp is not None:
+                state = BalancerPoolState(list(tokens), list(balances), fee, amp=amp[0])
+            else:
+                state = BalancerPoolState(list(tokens), list(balances), fee, weights=list(_decode(["uint256[]"], results[3][1])[0]))
+            self.state.balancer[pool_id] = state
+        return (calls, decode)
+
+    def _calls_decimals(self, token):
+        def decode(results):
+            self.state.decimals[token] = _decode(["uint8"], results[0][1])[0]
+        return ([(token, _calldata("decimals()"))], decode)
+
+    def _calls_curve_pools(self, key):
+        (pool, n, precise) = key
+        calls = [(pool, _calldata("coins(uint256)", ["uint256"], [k])) for k in range(n)]
+        calls += [(pool, _calldata("balances(uint256)", ["uint256"], [k])) for k in range(n)]
+        calls += [(pool, _calldata("A_precise()" if precise else "A()")), (pool, _calldata("fee()"))]
+
+        def decode(results):
+            self.state.curve_pools[key] = CurvePoolState(
+                coins=[_decode(["address"], r[1])[0].lower() for r in results[:n]],
+                balances=[_decode(["uint256"], r[1])[0] for r in results[n:2 * n]],
+                amp=_decode(["uint256"], results[2 * n][1])[0],
+                fee=_decode(["uint256"], results[2 * n + 1][1])[0],
+            )
+        return (calls, decode)
+
+    def _calls_curve(self, key):
+        ## the pool fee can only be read once the router picked the pool, so a quoting Curve pool takes two rounds
+        if key in self._curve_rates:
+            (pool, quote) = self._curve_rates[key]
+
+            def decode_fee(results):
+                self.state.curve[key] = (pool, quote, _decode(["uint256"], results[0][1])[0])
+            return ([(pool, _calldata("fee()"))], decode_fee)
+
+        (tokenIn, tokenOut, amountIn) = key
+
+        def decode(results):
+            (pool, quote) = _decode(["address", "uint256"], results[0][1])
+            if quote > 0:
+                self._curve_rates[key] = (pool, quote)
+            else:
+                self.state.curve[key] = (pool, quote, 0)
+        return ([(CURVE_ROUTER, _calldata("get_best_rate(address,address,uint256)", ["address", "address", "uint256"], [tokenIn, tokenOut, amountIn]))], decode)
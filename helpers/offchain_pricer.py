@@ -0,0 +1,712 @@
+"""
+    Off-chain reference pricer, mirrors OnChainPricingMainnet#findOptimalSwap with exact integer math
+    Quotes are computed from a MarketState (pool-state snapshot) instead of a fork node,
+    so the node is only needed for state reads
+
+    Whenever the pricer needs some state that is not in the MarketState it raises MissingPoolState,
+    callers can then fetch it (see helpers/chain_state.py) and quote again
+"""
+
+from collections import namedtuple
+from dataclasses import dataclass, field
+from enum import IntEnum
+
+from helpers.univ3_math import (
+    SolidityRevert,
+    require,
+    MIN_TICK,
+    MAX_TICK,
+    MIN_SQRT_RATIO,
+    MAX_SQRT_RATIO,
+    add_delta,
+    compute_swap_step,
+    get_amount0_delta,
+    get_amount1_delta,
+    get_exact_in_next_price,
+    get_sqrt_ratio_at_tick,
+    get_tick_at_sqrt_ratio,
+    next_initialized_tick_within_one_word,
+    to_int256,
+)
+from helpers.balancer_math import calc_out_given_in, calc_out_given_in_for_stable
+from helpers.curve_math import get_dy
+from helpers.pool_addresses import univ2_pair, sushi_pair, univ3_pool
+
+WETH = "0xc02aaa39b223fe8d0a0e5c4f27ead9083c756cc2"
+WSTETH = "0x7f39c581f595b53c5cb19bd0b3f8da6c935e2ca0"
+WBTC = "0x2260fac5e5542a773aa44fbcfedf7c193bc2c599"
+USDC = "0xa0b86991c6218b36c1d19d4a2e9eb0ce3606eb48"
+USDT = "0xdac17f958d2ee523a2206206994597c13d831ec7"
+DAI = "0x6b175474e89094c44da98b954eedeac495271d0f"
+BAL = "0xba100000625a3754423978a60c9317c58a424e3d"
+FEI = "0x956f47f50a910163d8bf957cf5846d573e7f87ca"
+BADGER = "0x3472a5a71965499acd81997a54bba8d852c6e53d"
+GNO = "0x6810e776880c02933d47db1b9fc05908e5386b96"
+CREAM = "0x2ba592f78db6436527729929aaf6c908497cb200"
+LDO = "0x5a98fcbea516cf06857215779fd812ca3bef1b32"
+SRM = "0x476c5e26a75bd202a9683ffd34359c0cc15be0ff"
+RETH = "0xae78736cd615f374d3085123a210448e74fc6393"
+AKITA = "0x3301ee63fb29f863f2333bd4466acb46cd8323e6"
+OHM = "0x64aa3364f17a4d01c6f1751fd97c2bd3d7e7f1d5"
+COW = "0xdef1ca1fb7fbcdc777520aa7f396b4e015f497ab"
+AURA = "0xc0c293ce456ff0ed870add98a0828dd4d2903dbf"
+AURABAL = "0x616e8bfa43f920657b3497dbf40d6b1a02d4608d"
+BALWETHBPT = "0x5c6ee304399dbdb9c8ef030ab642b10820db8f56"
+GRAVIAURA = "0xba485b556399123261a5f9c95d413b4f93107407"
+
+CURVE_3POOL = "0xbebc44782c7db0a1a60cb6fe97d0b483032ff1c7"
+CURVE_FRAXBP = "0xdcef968d416a41cdac0ed8702fac8128a64241a2"
+CURVE_CVX_BVECVX = "0x04c90c198b2eff55716079bc06d7ccc4aa4d7512"
+
+BALANCERV2_NONEXIST_POOLID = "0x" + b"BALANCER-V2-NON-EXIST-POOLID".ljust(32, b"\x00").hex()
+ZERO_POOLID = "0x" + "00" * 32
+
+UNIV3_FEES = (100, 500, 3000, 10000)
+CURVE_FEE_SCALE = 100000
+
+
+class SwapType(IntEnum):
+    CURVE = 0
+    UNIV2 = 1
+    SUSHI = 2
+    UNIV3 = 3
+    UNIV3WITHWETH = 4
+    BALANCER = 5
+    BALANCERWITHWETH = 6
+
+
+Quote = namedtuple("Quote", ["name", "amountOut", "pools", "poolFees"])
+SwapCurve = namedtuple("SwapCurve", ["name", "amountsOut"])
+
+
+class MissingPoolState(Exception):
+    """ raised when the MarketState does not (yet) hold a piece of state the pricer needs """
+    def __init__(self, kind, key):
+        super().__init__(kind, key)
+        self.kind = kind
+        self.key = key
+
+
+@dataclass
+class UniV2PairState:
+    reserve0: int
+    reserve1: int
+
+
+@dataclass
+class UniV3PoolState:
+    fee: int
+    tick_spacing: int
+    sqrt_price_x96: int
+    tick: int
+    liquidity: int
+    balance0: int
+    balance1: int
+    tick_bitmap: dict = field(default_factory=dict)     # word position -> bitmap word
+    liquidity_net: dict = field(default_factory=dict)   # initialized tick -> liquidityNet
+
+
+@dataclass
+class BalancerPoolState:
+    tokens: list
+    balances: list
+    swap_fee_percentage: int
+    weights: list = None    # normalized weights, only for weighted pools
+    amp: int = None         # getAmplificationParameter() value, only for stable pools
+
+
+@dataclass
+class CurvePoolState:
+    coins: list
+    balances: list
+    amp: int    # A_precise() if the pool has it, otherwise A()
+    fee: int
+
+
+def _addr(token):
+    return str(token).lower()
+
+
+def sort_tokens(tokenA, tokenB):
+    (tokenA, tokenB) = (_addr(tokenA), _addr(tokenB))
+    return (tokenA, tokenB) if int(tokenA, 16) < int(tokenB, 16) else (tokenB, tokenA)
+
+
+def _is_ascending(amounts):
+    return all(amounts[i] >= amounts[i - 1] for i in range(1, len(amounts)))
+
+
+def convert_to_bytes32(address):
+    """ OnChainPricingMainnet#convertToBytes32 as hex string """
+    return "0x" + _addr(address)[2:] + "00" * 12
+
+
+class MarketState:
+    """
+        Pool-state snapshot consumed by OffChainPricer, all keys use lowercase addresses
+        - univ2 / sushi: (token0, token1) -> UniV2PairState or None if the pair does not exist
+        - univ3: (token0, token1, fee) -> UniV3PoolState or None if the pool does not exist
+        - balancer: poolId -> BalancerPoolState
+        - decimals: token -> decimals
+        - curve: (tokenIn, tokenOut, amountIn) -> (pool, amountOut, poolFee) as returned by the Curve router
+        - curve_pools: (pool, nCoins, aPrecise) -> CurvePoolState of an indexed Curve StableSwap pool
+    """
+    def __init__(self, univ2=None, sushi=None, univ3=None, balancer=None, decimals=None, curve=None, curve_pools=None, block=None):
+        self.univ2 = univ2 if univ2 is not None else {}
+        self.sushi = sushi if sushi is not None else {}
+        self.univ3 = univ3 if univ3 is not None else {}
+        self.balancer = balancer if balancer is not None else {}
+        self.decimals = decimals if decimals is not None else {}
+        self.curve = curve if curve is not None else {}
+        self.curve_pools = curve_pools if curve_pools is not None else {}
+        self.block = block
+
+    def _get(self, kind, key):
+        states = getattr(self, kind)
+        if key not in states:
+            raise MissingPoolState(kind, key)
+        return states[key]
+
+    def univ2_pair(self, venue, token0, token1):
+        return self._get(venue, (token0, token1))
+
+    def univ3_pool(self, token0, token1, fee):
+        return self._get("univ3", (token0, token1, fee))
+
+    def balancer_pool(self, pool_id):
+        return self._get("balancer", pool_id.lower())
+
+    def token_decimals(self, token):
+        return self._get("decimals", _addr(token))
+
+    def curve_rate(self, tokenIn, tokenOut, amountIn):
+        return self._get("curve", (_addr(tokenIn), _addr(tokenOut), amountIn))
+
+    def curve_pool(self, pool_key):
+        return self._get("curve_pools", pool_key)
+
+    def univ3_bitmap_word(self, pool_key, word_pos):
+        pool = self.univ3_pool(*pool_key)
+        if word_pos not in pool.tick_bitmap:
+            raise MissingPoolState("univ3_bitmap", (pool_key, word_pos))
+        return pool.tick_bitmap[word_pos]
+
+    def univ3_liquidity_net(self, pool_key, tick):
+        pool = self.univ3_pool(*pool_key)
+        if tick not in pool.liquidity_net:
+            raise MissingPoolState("univ3_tick", (pool_key, tick))
+        return pool.liquidity_net[tick]
+
+
+def _pair(a, b):
+    return tuple(sorted((a, b), key=lambda t: int(t, 16)))
+
+
+# default Balancer V2 pool registry, sorted pair => candidate pool ids, see OnChainPricingMainnet constructor
+DEFAULT_BALANCER_POOLS = {
+    _pair(CREAM, WETH): ["0x85370d9e3bb111391cc89f6de344e801760461830002000000000000000001ef"],
+    _pair(GNO, WETH): ["0xf4c0dd9b82da36c07605df83c8a416f11724d88b000200000000000000000026"],
+    _pair(WBTC, BADGER): ["0xb460daa847c45f1c4a41cb05bfb3b51c92e41b36000200000000000000000194"],
+    _pair(FEI, WETH): ["0x90291319f1d4ea3ad4db0dd8fe9e12baf749e84500020000000000000000013c"],
+    _pair(BAL, WETH): ["0x5c6ee304399dbdb9c8ef030ab642b10820db8f56000200000000000000000014"],
+    _pair(USDC, WETH): ["0x96646936b91d6b9d7d0c47c496afbf3d6ec7b6f8000200000000000000000019"],
+    _pair(WBTC, WETH): ["0xa6f548df93de924d73be7d25dc02554c6bd66db500020000000000000000000e"],
+    _pair(WSTETH, WETH): ["0x32296969ef14eb0c6d29669c550d4a0449130230000200000000000000000080"],
+    _pair(LDO, WETH): ["0xbf96189eee9357a95c7719f4f5047f76bde804e5000200000000000000000087"],
+    _pair(SRM, WETH): ["0x231e687c9961d3a27e6e266ac5c433ce4f8253e4000200000000000000000023"],
+    _pair(RETH, WETH): ["0x1e19cf2d73a72ef1332c882f20534b6519be0276000200000000000000000112"],
+    _pair(AKITA, WETH): ["0xc065798f227b49c150bcdc6cdc43149a12c4d75700020000000000000000010b"],
+    _pair(OHM, WETH): ["0xc45d42f801105e861e86658648e3678ad7aa70f900010000000000000000011e"],
+    _pair(OHM, DAI): ["0xc45d42f801105e861e86658648e3678ad7aa70f900010000000000000000011e"],
+    _pair(GNO, COW): ["0x92762b42a06dcdddc5b7362cfb01e631c4d44b40000200000000000000000182"],
+    _pair(WETH, COW): ["0xde8c195aa41c11a0c4787372defbbddaa31306d2000200000000000000000181"],
+    _pair(WETH, AURA): ["0xc29562b045d80fd77c69bec09541f5c16fe20d9d000200000000000000000251"],
+    _pair(BALWETHBPT, AURABAL): ["0x3dd0843a028c86e0b760b1a76929d1c5ef93a2dd000200000000000000000249"],
+    _pair(AURABAL, WETH): ["0x0578292cb20a443ba1cde459c985ce14ca2bdee5000100000000000000000269"],
+    _pair(GRAVIAURA, WETH): ["0x0578292cb20a443ba1cde459c985ce14ca2bdee5000100000000000000000269"],
+}
+
+
+# default Curve index, (pool, nCoins, aPrecise) in registration order, see OnChainPricingMainnet constructor
+# all pairs of a pool's coins are indexed, a later pool replaces an earlier one for a shared pair
+DEFAULT_CURVE_POOLS = [
+    (CURVE_3POOL, 3, False),
+    (CURVE_FRAXBP, 2, True),
+    (CURVE_CVX_BVECVX, 2, True),
+]
+
+
+class OffChainPricer:
+    """ Python twin of OnChainPricingMainnet, function names mirror the Solidity ones """
+
+    def __init__(self, state, balancer_pools=None, curve_pools=None):
+        self.state = state
+        self.balancer_pools = balancer_pools if balancer_pools is not None else DEFAULT_BALANCER_POOLS
+        self.curve_pools = curve_pools if curve_pools is not None else DEFAULT_CURVE_POOLS
+
+    ### PRICING ###
+
+    def find_optimal_swap(self, tokenIn, tokenOut, amountIn):
+        """ best quote with its route, same shape as OnChainPricingMainnet#_buildQuote """
+        (tokenIn, tokenOut) = (_addr(tokenIn), _addr(tokenOut))
+        weth_involved = (tokenIn == WETH or tokenOut == WETH)
+
+        (curve_pool, curve_quote, curve_fee) = self.get_curve_price_indexed_or_router(tokenIn, tokenOut, amountIn)
+        if curve_quote > 0:
+            quotes = [Quote(SwapType.CURVE, curve_quote, [convert_to_bytes32(curve_pool)], [curve_fee * CURVE_FEE_SCALE // 10**10])]
+        else:
+            quotes = [Quote(SwapType.CURVE, curve_quote, [], [])]
+
+        quotes.append(Quote(SwapType.UNIV2, self.get_uni_price("univ2", tokenIn, tokenOut, amountIn), [convert_to_bytes32(univ2_pair(tokenIn, tokenOut))], []))
+        quotes.append(Quote(SwapType.SUSHI, self.get_uni_price("sushi", tokenIn, tokenOut, amountIn), [convert_to_bytes32(sushi_pair(tokenIn, tokenOut))], []))
+        (univ3_quote, univ3_fee) = self.sort_univ3_pools(tokenIn, amountIn, tokenOut)
+        quotes.append(Quote(SwapType.UNIV3, univ3_quote, [convert_to_bytes32(univ3_pool(tokenIn, tokenOut, univ3_fee))], [univ3_fee]))
+        (balancer_quote, balancer_pool) = self.get_balancer_price_and_pool(tokenIn, amountIn, tokenOut)
+        quotes.append(Quote(SwapType.BALANCER, balancer_quote, [balancer_pool], []))
+
+        if not weth_involved:
+            (univ3_with_weth, fee_in, fee_out) = (0, 0, 0) if self._use_single_pool_in_univ3(tokenIn, tokenOut) > 0 else self.get_univ3_price_and_fees_with_connector(tokenIn, amountIn, tokenOut, WETH)
+            pools = [convert_to_bytes32(univ3_pool(tokenIn, WETH, fee_in)), convert_to_bytes32(univ3_pool(WETH, tokenOut, fee_out))]
+            quotes.append(Quote(SwapType.UNIV3WITHWETH, univ3_with_weth, pools, [fee_in, fee_out]))
+            (balancer_with_weth, pool_in, pool_out) = self.get_balancer_price_and_pools_with_connector(tokenIn, amountIn, tokenOut, WETH)
+            quotes.append(Quote(SwapType.BALANCERWITHWETH, balancer_with_weth, [pool_in, pool_out], []))
+
+        best_quote = quotes[0]
+        for q in quotes[1:]:
+            if q.amountOut > best_quote.amountOut:
+                best_quote = q
+        return best_quote
+
+    def find_swap_curves(self, tokenIn, tokenOut, amountsIn):
+        require(_is_ascending(amountsIn), "!asc")
+        (tokenIn, tokenOut) = (_addr(tokenIn), _addr(tokenOut))
+        weth_involved = (tokenIn == WETH or tokenOut == WETH)
+
+        curves = [
+            SwapCurve(SwapType.CURVE, self.get_curve_price_amounts_analytically(tokenIn, amountsIn, tokenOut)),
+            SwapCurve(SwapType.UNIV2, self.get_uni_price_amounts("univ2", tokenIn, tokenOut, amountsIn)),
+            SwapCurve(SwapType.SUSHI, self.get_uni_price_amounts("sushi", tokenIn, tokenOut, amountsIn)),
+            SwapCurve(SwapType.UNIV3, self.get_univ3_price_amounts(tokenIn, amountsIn, tokenOut)),
+            SwapCurve(SwapType.BALANCER, self.get_balancer_price_amounts_analytically(tokenIn, amountsIn, tokenOut)),
+        ]
+        if not weth_involved:
+            univ3_with_weth = [0] * len(amountsIn) if self._use_single_pool_in_univ3(tokenIn, tokenOut) > 0 else self.get_univ3_price_with_connector_amounts(tokenIn, amountsIn, tokenOut, WETH)
+            curves.append(SwapCurve(SwapType.UNIV3WITHWETH, univ3_with_weth))
+            curves.append(SwapCurve(SwapType.BALANCERWITHWETH, self.get_balancer_price_with_connector_amounts_analytically(tokenIn, amountsIn, tokenOut, WETH)))
+        return curves
+
+    ### UNIV2 ###
+
+    def get_uni_price(self, venue, tokenIn, tokenOut, amountIn):
+        (token0, token1) = sort_tokens(tokenIn, tokenOut)
+        pair = self.state.univ2_pair(venue, token0, token1)
+        if pair is None:
+            return 0
+
+        zero_for_one = (token0 == _addr(tokenIn))
+        reserve_in = pair.reserve0 if zero_for_one else pair.reserve1
+        reserve_out = pair.reserve1 if zero_for_one else pair.reserve0
+        if not self._check_pool_liquidity_and_balances(1, reserve_in, amountIn):
+            return 0
+        return self.get_univ2_amount_out_analytically(amountIn, reserve_in, reserve_out)
+
+    def get_uni_price_amounts(self, venue, tokenIn, tokenOut, amountsIn):
+        (token0, token1) = sort_tokens(tokenIn, tokenOut)
+        pair = self.state.univ2_pair(venue, token0, token1)
+        if pair is None:
+            return [0] * len(amountsIn)
+
+        zero_for_one = (token0 == _addr(tokenIn))
+        reserve_in = pair.reserve0 if zero_for_one else pair.reserve1
+        reserve_out = pair.reserve1 if zero_for_one else pair.reserve0
+        return [self.get_univ2_amount_out_analytically(a, reserve_in, reserve_out) if self._check_pool_liquidity_and_balances(1, reserve_in, a) else 0 for a in amountsIn]
+
+    @staticmethod
+    def get_univ2_amount_out_analytically(amountIn, reserveIn, reserveOut):
+        amount_in_with_fee = amountIn * 997
+        numerator = amount_in_with_fee * reserveOut
+        denominator = reserveIn * 1000 + amount_in_with_fee
+        return numerator // denominator
+
+    ### UNIV3 ###
+
+    def sort_univ3_pools(self, tokenIn, amountIn, tokenOut):
+        best_fee = self._use_single_pool_in_univ3(tokenIn, tokenOut)
+        (token0, token1) = sort_tokens(tokenIn, tokenOut)
+        token0_price = (token0 == _addr(tokenIn))
+
+        if best_fee > 0:
+            (_, best_out) = self._check_simulation_in_univ3(token0, token1, amountIn, best_fee, token0_price)
+            return (best_out, best_fee)
+
+        max_quote = 0
+        max_quote_fee = 0
+        for fee in UNIV3_FEES:
+            (_, out) = self._check_simulation_in_univ3(token0, token1, amountIn, fee, token0_price)
+            if out > max_quote:
+                max_quote = out
+                max_quote_fee = fee
+        return (max_quote, max_quote_fee)
+
+    def check_univ3_pools_existence(self, tokenIn, tokenOut):
+        (token0, token1) = sort_tokens(tokenIn, tokenOut)
+        for fee in UNIV3_FEES:
+            if self.state.univ3_pool(token0, token1, fee) is not None:
+                return True
+        return False
+
+    def check_univ3_in_range_liquidity(self, token0, token1, amountIn, fee, token0_price):
+        pool = self.state.univ3_pool(token0, token1, fee)
+        if pool is None:
+            return (False, 0)
+        if not self._check_pool_liquidity_and_balances(pool.liquidity, pool.balance0 if token0_price else pool.balance1, amountIn):
+            return (False, 0)
+        try:
+            return self._simulator_check_in_range_liquidity((token0, token1, fee), pool, amountIn, token0_price)
+        except SolidityRevert:
+            return (False, 0)
+
+    def simulate_univ3_swap(self, token0, amountIn, token1, fee, token0_price):
+        pool = self.state.univ3_pool(token0, token1, fee)
+        try:
+            return self._simulator_simulate_univ3_swap((token0, token1, fee), pool, token0_price, fee, amountIn)
+        except SolidityRevert:
+            return 0
+
+    def get_univ3_price(self, tokenIn, amountIn, tokenOut):
+        (max_quote, _) = self.sort_univ3_pools(tokenIn, amountIn, tokenOut)
+        return max_quote
+
+    def get_univ3_price_with_connector(self, tokenIn, amountIn, tokenOut, connectorToken):
+        return self.get_univ3_price_and_fees_with_connector(tokenIn, amountIn, tokenOut, connectorToken)[0]
+
+    def get_univ3_price_and_fees_with_connector(self, tokenIn, amountIn, tokenOut, connectorToken):
+        """ (amountOut, feeIn, feeOut), see OnChainPricingMainnet#_getUniV3PriceAndFeesWithConnector """
+        if not self.check_univ3_pools_existence(tokenIn, connectorToken) or not self.check_univ3_pools_existence(connectorToken, tokenOut):
+            return (0, 0, 0)
+        (connector_amount, fee_in) = self.sort_univ3_pools(tokenIn, amountIn, connectorToken)
+        if connector_amount > 0:
+            (quote, fee_out) = self.sort_univ3_pools(connectorToken, connector_amount, tokenOut)
+            return (quote, fee_in, fee_out)
+        return (0, 0, 0)
+
+    def get_univ3_price_amounts(self, tokenIn, amountsIn, tokenOut):
+        if not _is_ascending(amountsIn):
+            return [self.get_univ3_price(tokenIn, a, tokenOut) for a in amountsIn]
+
+        amounts_out = [0] * len(amountsIn)
+        (token0, token1) = sort_tokens(tokenIn, tokenOut)
+        token0_price = (token0 == _addr(tokenIn))
+        best_fee = self._use_single_pool_in_univ3(tokenIn, tokenOut)
+        for fee in ((best_fee,) if best_fee > 0 else UNIV3_FEES):
+            self._simulate_univ3_swap_amounts(token0, token1, amountsIn, fee, token0_price, amounts_out)
+        return amounts_out
+
+    def get_univ3_price_with_connector_amounts(self, tokenIn, amountsIn, tokenOut, connectorToken):
+        if not self.check_univ3_pools_existence(tokenIn, connectorToken) or not self.check_univ3_pools_existence(connectorToken, tokenOut):
+            return [0] * len(amountsIn)
+        connector_amounts = self.get_univ3_price_amounts(tokenIn, amountsIn, connectorToken)
+        return self.get_univ3_price_amounts(connectorToken, connector_amounts, tokenOut)
+
+    def _simulate_univ3_swap_amounts(self, token0, token1, amountsIn, fee, token0_price, amounts_out):
+        pool = self.state.univ3_pool(token0, token1, fee)
+        if pool is None:
+            return
+
+        reserve_in = pool.balance0 if token0_price else pool.balance1
+        count = len(amountsIn)
+        while count > 0 and not self._check_pool_liquidity_and_balances(pool.liquidity, reserve_in, amountsIn[count - 1]):
+            count -= 1
+        if count == 0:
+            return
+
+        try:
+            sim_out = self._simulator_simulate_univ3_swap_amounts((token0, token1, fee), pool, token0_price, fee, amountsIn[:count])
+        except SolidityRevert:
+            sim_out = [self._check_simulation_in_univ3(token0, token1, a, fee, token0_price)[1] for a in amountsIn[:count]]
+        for i in range(count):
+            amounts_out[i] = max(amounts_out[i], sim_out[i])
+
+    def _check_simulation_in_univ3(self, token0, token1, amountIn, fee, token0_price):
+        (cross_tick, out) = self.check_univ3_in_range_liquidity(token0, token1, amountIn, fee, token0_price)
+        if cross_tick:
+            out = self.simulate_univ3_swap(token0, amountIn, token1, fee, token0_price)
+        return (cross_tick, out)
+
+    @staticmethod
+    def _check_pool_liquidity_and_balances(liq, reserve_in, amountIn):
+        if liq == 0:
+            return False
+        return reserve_in > amountIn
+
+    @staticmethod
+    def _use_single_pool_in_univ3(tokenIn, tokenOut):
+        (token0, token1) = sort_tokens(tokenIn, tokenOut)
+        if token1 == WETH and (token0 == USDC or token0 == WBTC or token0 == DAI):
+            return 500
+        elif token0 == WETH and token1 == USDT:
+            return 500
+        elif token1 == USDC and token0 == DAI:
+            return 100
+        elif token0 == USDC and token1 == USDT:
+            return 100
+        elif token1 == USDC and token0 == WBTC:
+            return 3000
+        return 0
+
+    ### UNIV3 SIMULATOR (UniV3SwapSimulator) ###
+
+    def _get_next_initialized_tick(self, pool_key, tick, tick_spacing, lte):
+        (tick_next, initialized) = next_initialized_tick_within_one_word(lambda w: self.state.univ3_bitmap_word(pool_key, w), tick, tick_spacing, lte)
+        tick_next = min(max(tick_next, MIN_TICK), MAX_TICK)
+        return (tick_next, initialized, get_sqrt_ratio_at_tick(tick_next))
+
+    @staticmethod
+    def _get_limit_price(zero_for_one):
+        return MIN_SQRT_RATIO + 1 if zero_for_one else MAX_SQRT_RATIO - 1
+
+    @staticmethod
+    def _get_target_price_for_swap_step(zero_for_one, sqrt_price_next_x96, sqrt_price_limit_x96):
+        if (sqrt_price_next_x96 < sqrt_price_limit_x96) if zero_for_one else (sqrt_price_next_x96 > sqrt_price_limit_x96):
+            return sqrt_price_limit_x96
+        return sqrt_price_next_x96
+
+    def _simulator_check_in_range_liquidity(self, pool_key, pool, amountIn, zero_for_one):
+        liq = pool.liquidity
+        if liq <= 0:
+            return (False, 0)
+
+        (_, _, tick_next_price) = self._get_next_initialized_tick(pool_key, pool.tick, pool.tick_spacing, zero_for_one)
+        target = self._get_target_price_for_swap_step(zero_for_one, tick_next_price, self._get_limit_price(zero_for_one))
+        (_, swap_after_price) = get_exact_in_next_price(amountIn, pool.fee, pool.sqrt_price_x96, target, liq, zero_for_one)
+
+        cross_tick = (swap_after_price <= tick_next_price) if zero_for_one else (swap_after_price >= tick_next_price)
+        if cross_tick:
+            return (True, 0)
+        if zero_for_one:
+            return (False, get_amount1_delta(swap_after_price, pool.sqrt_price_x96, liq, False))
+        return (False, get_amount0_delta(pool.sqrt_price_x96, swap_after_price, liq, False))
+
+    def _simulator_simulate_univ3_swap(self, pool_key, pool, zero_for_one, fee, amountIn):
+        sqrt_price_limit_x96 = self._get_limit_price(zero_for_one)
+        remaining = to_int256(amountIn)
+        sqrt_price_x96 = pool.sqrt_price_x96
+        tick = pool.tick
+        liquidity = pool.liquidity
+        calculated = 0
+
+        while remaining != 0 and sqrt_price_x96 != sqrt_price_limit_x96:
+            (tick_next, initialized, sqrt_price_next_x96) = self._get_next_initialized_tick(pool_key, tick, pool.tick_spacing, zero_for_one)
+            sqrt_price_start_x96 = sqrt_price_x96
+            target = self._get_target_price_for_swap_step(zero_for_one, sqrt_price_next_x96, sqrt_price_limit_x96)
+
+            (sqrt_price_x96, step_in, step_out, step_fee) = compute_swap_step(sqrt_price_x96, target, liquidity, remaining, fee)
+            remaining -= to_int256(step_in + step_fee)
+            calculated += to_int256(step_out)
+
+            if sqrt_price_x96 == sqrt_price_next_x96:
+                if initialized:
+                    liquidity_net = self.state.univ3_liquidity_net(pool_key, tick_next)
+                    if zero_for_one:
+                        liquidity_net = -liquidity_net
+                    liquidity = add_delta(liquidity, liquidity_net)
+                tick = tick_next - 1 if zero_for_one else tick_next
+            elif sqrt_price_x96 != sqrt_price_start_x96:
+                tick = get_tick_at_sqrt_ratio(sqrt_price_x96)
+
+        return calculated
+
+    def _simulator_simulate_univ3_swap_amounts(self, pool_key, pool, zero_for_one, fee, amounts_in):
+        """ UniV3SwapSimulator.simulateUniV3SwapAmounts: one tick walk for ascending amounts """
+        amounts_out = [0] * len(amounts_in)
+        if len(amounts_in) == 0:
+            return amounts_out
+        require(_is_ascending(amounts_in), "!asc")
+
+        sqrt_price_limit_x96 = self._get_limit_price(zero_for_one)
+        largest = amounts_in[-1]
+        remaining = to_int256(largest)
+        sqrt_price_x96 = pool.sqrt_price_x96
+        tick = pool.tick
+        liquidity = pool.liquidity
+        calculated = 0
+        pending = 0
+
+        while remaining != 0 and sqrt_price_x96 != sqrt_price_limit_x96:
+            (tick_next, initialized, sqrt_price_next_x96) = self._get_next_initialized_tick(pool_key, tick, pool.tick_spacing, zero_for_one)
+            sqrt_price_start_x96 = sqrt_price_x96
+            target = self._get_target_price_for_swap_step(zero_for_one, sqrt_price_next_x96, sqrt_price_limit_x96)
+
+            ## settle smaller amounts running out of input before reaching the target of this step
+            consumed = largest - remaining
+            while pending < len(amounts_in) - 1:
+                require(amounts_in[pending] >= consumed)
+                (next_price, _, step_out, _) = compute_swap_step(sqrt_price_x96, target, liquidity, to_int256(amounts_in[pending] - consumed), fee)
+                if next_price == target:
+                    break
+                amounts_out[pending] = calculated + step_out
+                pending += 1
+
+            (sqrt_price_x96, step_in, step_out, step_fee) = compute_swap_step(sqrt_price_x96, target, liquidity, remaining, fee)
+            remaining -= to_int256(step_in + step_fee)
+            calculated += to_int256(step_out)
+
+            if sqrt_price_x96 == sqrt_price_next_x96:
+                if initialized:
+                    liquidity_net = self.state.univ3_liquidity_net(pool_key, tick_next)
+                    if zero_for_one:
+                        liquidity_net = -liquidity_net
+                    liquidity = add_delta(liquidity, liquidity_net)
+                tick = tick_next - 1 if zero_for_one else tick_next
+            elif sqrt_price_x96 != sqrt_price_start_x96:
+                tick = get_tick_at_sqrt_ratio(sqrt_price_x96)
+
+        for i in range(pending, len(amounts_in)):
+            amounts_out[i] = calculated
+        return amounts_out
+
+    ### BALANCER ###
+
+    def get_balancer_v2_pools(self, tokenIn, tokenOut):
+        return list(self.balancer_pools.get(sort_tokens(tokenIn, tokenOut), []))
+
+    def get_balancer_v2_pool(self, tokenIn, tokenOut):
+        pool_ids = self.get_balancer_v2_pools(tokenIn, tokenOut)
+        return pool_ids[0] if pool_ids else BALANCERV2_NONEXIST_POOLID
+
+    def get_balancer_price_analytically(self, tokenIn, amountIn, tokenOut):
+        return self.get_balancer_price_and_pool(tokenIn, amountIn, tokenOut)[0]
+
+    def get_balancer_price_and_pool(self, tokenIn, amountIn, tokenOut):
+        """ best quote among the registered pools and the first pool giving it, zero pool id if none quotes """
+        (best, best_pool) = (0, ZERO_POOLID)
+        for pool_id in self.get_balancer_v2_pools(tokenIn, tokenOut):
+            quote = self.get_balancer_quote_within_pool_analytically(pool_id, tokenIn, amountIn, tokenOut)
+            if quote > best:
+                (best, best_pool) = (quote, pool_id)
+        return (best, best_pool)
+
+    def get_balancer_quote_within_pool_analytically(self, pool_id, tokenIn, amountIn, tokenOut):
+        pool = self.state.balancer_pool(pool_id)
+        tokens = [_addr(t) for t in pool.tokens]
+
+        require(_addr(tokenIn) in tokens, "!inBAL")
+        in_idx = tokens.index(_addr(tokenIn))
+        require(_addr(tokenOut) in tokens, "!outBAL")
+        out_idx = tokens.index(_addr(tokenOut))
+
+        if pool.balances[in_idx] <= amountIn:
+            return 0
+
+        if pool.amp is not None:
+            decimals = [self.state.token_decimals(t) for t in tokens]
+            return calc_out_given_in_for_stable(decimals, list(pool.balances), pool.amp, in_idx, out_idx, amountIn, pool.swap_fee_percentage)
+
+        require(len(pool.weights) == len(tokens), "!lenBAL")
+        return calc_out_given_in(
+            pool.balances[in_idx], pool.weights[in_idx], self.state.token_decimals(tokenIn),
+            pool.balances[out_idx], pool.weights[out_idx], self.state.token_decimals(tokenOut),
+            amountIn, pool.swap_fee_percentage
+        )
+
+    def get_balancer_price_amounts_analytically(self, tokenIn, amountsIn, tokenOut):
+        best = [0] * len(amountsIn)
+        for pool_id in self.get_balancer_v2_pools(tokenIn, tokenOut):
+            quotes = self.get_balancer_quote_amounts_within_pool_analytically(pool_id, tokenIn, amountsIn, tokenOut)
+            best = [max(b, q) for (b, q) in zip(best, quotes)]
+        return best
+
+    def get_balancer_quote_amounts_within_pool_analytically(self, pool_id, tokenIn, amountsIn, tokenOut):
+        """ amounts the simulator reverts on quote zero, see OnChainQuoterMainnet#getBalancerQuoteAmountsWithinPoolAnalytically """
+        pool = self.state.balancer_pool(pool_id)
+        tokens = [_addr(t) for t in pool.tokens]
+
+        require(_addr(tokenIn) in tokens, "!inBAL")
+        in_idx = tokens.index(_addr(tokenIn))
+        require(_addr(tokenOut) in tokens, "!outBAL")
+        out_idx = tokens.index(_addr(tokenOut))
+
+        if pool.amp is not None:
+            decimals = [self.state.token_decimals(t) for t in tokens]
+            calc = lambda a: calc_out_given_in_for_stable(decimals, list(pool.balances), pool.amp, in_idx, out_idx, a, pool.swap_fee_percentage)
+        else:
+            require(len(pool.weights) == len(tokens), "!lenBAL")
+            (decimals_in, decimals_out) = (self.state.token_decimals(tokenIn), self.state.token_decimals(tokenOut))
+            calc = lambda a: calc_out_given_in(
+                pool.balances[in_idx], pool.weights[in_idx], decimals_in,
+                pool.balances[out_idx], pool.weights[out_idx], decimals_out,
+                a, pool.swap_fee_percentage
+            )
+
+        amounts_out = []
+        for a in amountsIn:
+            out = 0
+            if a > 0 and pool.balances[in_idx] > a:
+                try:
+                    out = calc(a)
+                except SolidityRevert:
+                    pass
+            amounts_out.append(out)
+        return amounts_out
+
+    def get_balancer_price_with_connector_amounts_analytically(self, tokenIn, amountsIn, tokenOut, connectorToken):
+        if self.get_balancer_v2_pool(tokenIn, connectorToken) == BALANCERV2_NONEXIST_POOLID or self.get_balancer_v2_pool(connectorToken, tokenOut) == BALANCERV2_NONEXIST_POOLID:
+            return [0] * len(amountsIn)
+        in_to_connector = self.get_balancer_price_amounts_analytically(tokenIn, amountsIn, connectorToken)
+        return self.get_balancer_price_amounts_analytically(connectorToken, in_to_connector, tokenOut)
+
+    def get_balancer_price_with_connector_analytically(self, tokenIn, amountIn, tokenOut, connectorToken):
+        return self.get_balancer_price_and_pools_with_connector(tokenIn, amountIn, tokenOut, connectorToken)[0]
+
+    def get_balancer_price_and_pools_with_connector(self, tokenIn, amountIn, tokenOut, connectorToken):
+        """ (amountOut, poolIn, poolOut), see OnChainPricingMainnet#_getBalancerConnectorQuoteWithReads """
+        if self.get_balancer_v2_pool(tokenIn, connectorToken) == BALANCERV2_NONEXIST_POOLID or self.get_balancer_v2_pool(connectorToken, tokenOut) == BALANCERV2_NONEXIST_POOLID:
+            return (0, ZERO_POOLID, ZERO_POOLID)
+        (in_to_connector, pool_in) = self.get_balancer_price_and_pool(tokenIn, amountIn, connectorToken)
+        if in_to_connector <= 0:
+            return (0, ZERO_POOLID, ZERO_POOLID)
+        (quote, pool_out) = self.get_balancer_price_and_pool(connectorToken, in_to_connector, tokenOut)
+        return (quote, pool_in, pool_out)
+
+    ### CURVE ###
+
+    def get_curve_price(self, tokenIn, tokenOut, amountIn):
+        """ the Curve router scans its registries on-chain, so its result is taken from the MarketState as is """
+        return self.state.curve_rate(tokenIn, tokenOut, amountIn)
+
+    def get_curve_pool_key(self, tokenA, tokenB):
+        """ indexed (pool, nCoins, aPrecise) for the pair or None, all indexed pools are read to find it """
+        (tokenA, tokenB) = (_addr(tokenA), _addr(tokenB))
+        found = None
+        for pool_key in self.curve_pools:
+            coins = self.state.curve_pool(pool_key).coins
+            if tokenA != tokenB and tokenA in coins and tokenB in coins:
+                found = pool_key
+        return found
+
+    def get_curve_price_analytically(self, tokenIn, amountIn, tokenOut):
+        """ (pool, amountOut, poolFee) of the indexed pool with StableSwap math, pool is None if the pair isn't indexed """
+        pool_key = self.get_curve_pool_key(tokenIn, tokenOut)
+        if pool_key is None:
+            return (None, 0, 0)
+
+        (pool, _, a_precise) = pool_key
+        state = self.state.curve_pool(pool_key)
+        coins = state.coins
+        rates = [10 ** (36 - self.state.token_decimals(c)) for c in coins]
+        try:
+            out = get_dy(state.balances, rates, state.amp, 100 if a_precise else 1, state.fee, coins.index(_addr(tokenIn)), coins.index(_addr(tokenOut)), amountIn)
+        except SolidityRevert:
+            out = 0
+        return (pool, out, state.fee)
+
+    def get_curve_price_amounts_analytically(self, tokenIn, amountsIn, tokenOut):
+        """ same as get_curve_price_indexed_or_router for several input amounts """
+        return [self.get_curve_price_indexed_or_router(tokenIn, tokenOut, a)[1] for a in amountsIn]
+
+    def get_curve_price_indexed_or_router(self, tokenIn, tokenOut, amountIn):
+        """ same fallback as findOptimalSwap: the router only quotes pairs without an indexed pool """
+        (pool, quote, fee) = self.get_curve_price_analytically(tokenIn, amountIn, tokenOut)
+        if pool is None:
+            return self.get_curve_price(tokenIn, tokenOut, amountIn)
+        return (pool, quote, fee)
@@ -0,0 +1,44 @@
+"""
+    Off-chain mirror of the CREATE2 pool address derivation in OnChainPricingMainnet
+    pairForUniV2 & _getUniV3PoolAddress
+"""
+
+from eth_utils import keccak, to_checksum_address
+
+UNIV2_FACTORY = "0x5C69bEe701ef814a2B6a3EDD4B1652CB9cc5aA6f"
+UNIV2_POOL_INITCODE = "0x96e8ac4277198ff8b6f785478aa9a39f403cb768dd02cbee326c3e7da348845f"
+SUSHI_FACTORY = "0xC0AEe478e3658e2610c5F7A4A2E1777cE9e4f2Ac"
+SUSHI_POOL_INITCODE = "0xe18a34eb0e04b04f7a0ac29a6e80748dca96319b42c54d679cb821dca90c6303"
+UNIV3_FACTORY = "0x1F98431c8aD98523631AE4a59f267346ea31F984"
+UNIV3_POOL_INIT_CODE_HASH = "0xe34f199b19b2b4f47f68442619d555527d244f78a3297ea89325f843f87b8b54"
+
+
+def _bytes(hexstr):
+    return bytes.fromhex(hexstr[2:] if hexstr.startswith("0x") else hexstr)
+
+
+def sort_tokens(tokenA, tokenB):
+    return (tokenA, tokenB) if int(tokenA, 16) < int(tokenB, 16) else (tokenB, tokenA)
+
+
+def create2_address(factory, salt, init_code_hash):
+    return to_checksum_address(keccak(b"\xff" + _bytes(factory) + salt + _bytes(init_code_hash))[12:])
+
+
+def pair_for_univ2(factory, tokenA, tokenB, init_code_hash):
+    (token0, token1) = sort_tokens(tokenA, tokenB)
+    return create2_address(factory, keccak(_bytes(token0) + _bytes(token1)), init_code_hash)
+
+
+def univ2_pair(tokenA, tokenB):
+    return pair_for_univ2(UNIV2_FACTORY, tokenA, tokenB, UNIV2_POOL_INITCODE)
+
+
+def sushi_pair(tokenA, tokenB):
+    return pair_for_univ2(SUSHI_FACTORY, tokenA, tokenB, SUSHI_POOL_INITCODE)
+
+
+def univ3_pool(tokenA, tokenB, fee):
+    (token0, token1) = sort_tokens(tokenA, tokenB)
+    salt = keccak(_bytes(token0).rjust(32, b"\x00") + _bytes(token1).rjust(32, b"\x00") + fee.to_bytes(32, "big"))
+    return create2_address(UNIV3_FACTORY, salt, UNIV3_POOL_INIT_CODE_HASH)
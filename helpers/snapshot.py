@@ -0,0 +1,182 @@
+"""
+    Versioned on-disk snapshot of the pool state the pricer touches for a list of swaps at a given block
+
+    A snapshot holds two views of the same block:
+    - "state": the decoded MarketState consumed by helpers/offchain_pricer.py
+    - "accounts": optional raw prestate (code + touched storage slots) of every account read by
+      findOptimalSwap, used to seed a local dev chain so the Solidity pricer runs without a fork
+"""
+
+import json
+
+from helpers.offchain_pricer import MarketState, UniV2PairState, UniV3PoolState, BalancerPoolState, CurvePoolState
+
+SNAPSHOT_VERSION = 2
+
+## RPC methods to override account code & storage, tried in order (anvil/hardhat, ganache)
+SET_CODE_METHODS = ("anvil_setCode", "hardhat_setCode", "evm_setAccountCode")
+SET_STORAGE_METHODS = ("anvil_setStorageAt", "hardhat_setStorageAt", "evm_setAccountStorageAt")
+
+
+class SnapshotVersionError(Exception):
+    pass
+
+
+### ENCODING ###
+
+def _encode_univ2(pairs):
+    return [[t0, t1, None if s is None else [s.reserve0, s.reserve1]] for ((t0, t1), s) in pairs.items()]
+
+
+def _encode_univ3(pools):
+    encoded = []
+    for ((t0, t1, fee), s) in pools.items():
+        if s is None:
+            encoded.append([t0, t1, fee, None])
+            continue
+        encoded.append([t0, t1, fee, {
+            "tickSpacing": s.tick_spacing,
+            "sqrtPriceX96": s.sqrt_price_x96,
+            "tick": s.tick,
+            "liquidity": s.liquidity,
+            "balance0": s.balance0,
+            "balance1": s.balance1,
+            "tickBitmap": sorted([w, v] for (w, v) in s.tick_bitmap.items()),
+            "liquidityNet": sorted([t, n] for (t, n) in s.liquidity_net.items()),
+        }])
+    return encoded
+
+
+def _encode_balancer(pools):
+    return {pool_id: {
+        "tokens": s.tokens,
+        "balances": s.balances,
+        "swapFeePercentage": s.swap_fee_percentage,
+        "weights": s.weights,
+        "amp": s.amp,
+    } for (pool_id, s) in pools.items()}
+
+
+def encode_snapshot(state, swaps=(), accounts=None, block=None, timestamp=None, chain_id=1):
+    """ swaps are the (tokenIn, tokenOut, amountIn) the snapshot was captured for """
+    return {
+        "version": SNAPSHOT_VERSION,
+        "chainId": chain_id,
+        "block": block if block is not None else state.block,
+        "timestamp": timestamp,
+        "swaps": [[str(i).lower(), str(o).lower(), int(a)] for (i, o, a) in swaps],
+        "state": {
+            "univ2": _encode_univ2(state.univ2),
+            "sushi": _encode_univ2(state.sushi),
+            "univ3": _encode_univ3(state.univ3),
+            "balancer": _encode_balancer(state.balancer),
+            "decimals": dict(state.decimals),
+            "curve": [[i, o, a, [str(pool), out, fee]] for ((i, o, a), (pool, out, fee)) in state.curve.items()],
+            "curvePools": [[pool, n, precise, {"coins": s.coins, "balances": s.balances, "amp": s.amp, "fee": s.fee}] for ((pool, n, precise), s) in state.curve_pools.items()],
+        },
+        "accounts": accounts if accounts is not None else {},
+    }
+
+
+### DECODING ###
+
+def _decode_univ2(entries):
+    return {(t0, t1): (None if s is None else UniV2PairState(*s)) for (t0, t1, s) in entries}
+
+
+def _decode_univ3(entries):
+    pools = {}
+    for (t0, t1, fee, s) in entries:
+        pools[(t0, t1, fee)] = None if s is None else UniV3PoolState(
+            fee=fee,
+            tick_spacing=s["tickSpacing"],
+            sqrt_price_x96=s["sqrtPriceX96"],
+            tick=s["tick"],
+            liquidity=s["liquidity"],
+            balance0=s["balance0"],
+            balance1=s["balance1"],
+            tick_bitmap={w: v for (w, v) in s["tickBitmap"]},
+            liquidity_net={t: n for (t, n) in s["liquidityNet"]},
+        )
+    return pools
+
+
+def _decode_balancer(entries):
+    return {pool_id: BalancerPoolState(s["tokens"], s["balances"], s["swapFeePercentage"], weights=s["weights"], amp=s["amp"]) for (pool_id, s) in entries.items()}
+
+
+def decode_snapshot(snapshot):
+    """ returns the MarketState held by given snapshot dict """
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        raise SnapshotVersionError("unsupported snapshot version {}, expected {}".format(snapshot.get("version"), SNAPSHOT_VERSION))
+
+    state = snapshot["state"]
+    return MarketState(
+        univ2=_decode_univ2(state["univ2"]),
+        sushi=_decode_univ2(state["sushi"]),
+        univ3=_decode_univ3(state["univ3"]),
+        balancer=_decode_balancer(state["balancer"]),
+        decimals=dict(state["decimals"]),
+        curve={(i, o, a): tuple(r) for (i, o, a, r) in state["curve"]},
+        curve_pools={(pool, n, precise): CurvePoolState(s["coins"], s["balances"], s["amp"], s["fee"]) for (pool, n, precise, s) in state["curvePools"]},
+        block=snapshot["block"],
+    )
+
+
+### FILES ###
+
+def save_snapshot(path, snapshot):
+    with open(path, "w") as f:
+        json.dump(snapshot, f, indent=1, sort_keys=True)
+
+
+def load_snapshot(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def load_market_state(path):
+    return decode_snapshot(load_snapshot(path))
+
+
+### RAW PRESTATE ###
+
+def merge_prestate(accounts, prestate):
+    """ merge a prestateTracer result into accounts, first read of a slot wins as all traces run on the same block """
+    for (address, account) in prestate.items():
+        merged = accounts.setdefault(address.lower(), {"code": "0x", "storage": {}})
+        if account.get("code"):
+            merged["code"] = account["code"]
+        for (slot, value) in account.get("storage", {}).items():
+            merged["storage"].setdefault(slot, value)
+    return accounts
+
+
+def _first_supported(provider, methods, params):
+    """ returns the first of given RPC methods the dev chain accepts, after calling it with params """
+    for method in methods:
+        response = provider.make_request(method, params)
+        if "error" not in response:
+            return method
+    raise RuntimeError("dev chain supports none of " + ", ".join(methods))
+
+
+def _as_word(value):
+    return "0x" + hex(int(value, 16))[2:].rjust(64, "0")
+
+
+def seed_dev_chain(provider, snapshot, skip=()):
+    """
+        Write code & storage of every captured account into a local dev chain through given web3 provider
+        skip: addresses not to overwrite, e.g. the pricer & simulators deployed by the test itself
+    """
+    skip = {a.lower() for a in skip}
+    set_code = SET_CODE_METHODS
+    set_storage = SET_STORAGE_METHODS
+    for (address, account) in snapshot["accounts"].items():
+        if address in skip:
+            continue
+        if account["code"] != "0x":
+            set_code = (_first_supported(provider, set_code, [address, account["code"]]),)
+        for (slot, value) in account["storage"].items():
+            set_storage = (_first_supported(provider, set_storage, [address, _as_word(slot), _as_word(value)]),)
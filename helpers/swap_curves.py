@@ -0,0 +1,53 @@
+"""
+    NumPy helpers around findSwapCurves, works with both the deployed quoter (brownie contract, see OnChainQuoterMainnet)
+    and the off-chain reference pricer (helpers/offchain_pricer.py)
+
+    Amounts are uint256 so arrays use dtype=object to stay exact, cast with .astype(float) for plotting
+"""
+
+import numpy as np
+
+from helpers.offchain_pricer import OffChainPricer, SwapType
+
+VENUES = len(SwapType)
+
+
+def find_swap_curves(pricer, tokenIn, tokenOut, amountsIn):
+    """ returns a (len(SwapType), len(amountsIn)) array, row i is the output curve of SwapType(i), zero for venues not quoted """
+    amountsIn = [int(a) for a in amountsIn]
+    if isinstance(pricer, OffChainPricer):
+        curves = pricer.find_swap_curves(tokenIn, tokenOut, amountsIn)
+    else:
+        curves = pricer.findSwapCurves(tokenIn, tokenOut, amountsIn)
+
+    result = np.zeros((VENUES, len(amountsIn)), dtype=object)
+    for (name, amountsOut) in curves:
+        result[int(name)] = [int(a) for a in amountsOut]
+    return result
+
+
+def find_swap_curves_bulk(pricer, swaps, amountsIn):
+    """ same as find_swap_curves for many (tokenIn, tokenOut) pairs, returns a (len(swaps), len(SwapType), len(amountsIn)) array """
+    result = np.zeros((len(swaps), VENUES, len(amountsIn)), dtype=object)
+    for (i, (tokenIn, tokenOut)) in enumerate(swaps):
+        result[i] = find_swap_curves(pricer, tokenIn, tokenOut, amountsIn)
+    return result
+
+
+def best_curve(curves):
+    """ best output over venues for each amount, i.e. what findOptimalSwap would quote, works on single & bulk curves """
+    return curves.max(axis=-2)
+
+
+def price_impact(amountsIn, amountsOut):
+    """
+        relative loss of the average execution price of each amount against the one of the smallest amount
+        e.g. 0.01 means 1% worse than quoting amountsIn[0], nan where the output is zero
+    """
+    amountsIn = np.asarray(amountsIn, dtype=object).astype(float)
+    amountsOut = np.asarray(amountsOut, dtype=object).astype(float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        prices = amountsOut / amountsIn
+        impact = 1.0 - prices / prices[..., :1]
+    impact[amountsOut == 0] = np.nan
+    return impact
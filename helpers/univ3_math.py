@@ -0,0 +1,287 @@
+"""
+    Exact integer port of the Uniswap V3 libraries used by UniV3SwapSimulator
+    https://github.com/Uniswap/v3-core/tree/main/contracts/libraries
+    Every function mirrors its Solidity counterpart bit by bit, reverts are raised as SolidityRevert
+"""
+
+MAX_UINT256 = 2**256 - 1
+MAX_UINT160 = 2**160 - 1
+MAX_UINT128 = 2**128 - 1
+MAX_INT256 = 2**255 - 1
+
+Q96 = 2**96
+RESOLUTION = 96
+
+MIN_TICK = -887272
+MAX_TICK = -MIN_TICK
+MIN_SQRT_RATIO = 4295128739
+MAX_SQRT_RATIO = 1461446703485210103287273052203988822378723970342
+
+
+class SolidityRevert(Exception):
+    pass
+
+
+def require(condition, reason=""):
+    if not condition:
+        raise SolidityRevert(reason)
+
+
+def sdiv(a, b):
+    """ signed division truncating towards zero like the EVM """
+    require(b != 0, "div0")
+    q = abs(a) // abs(b)
+    return q if (a >= 0) == (b >= 0) else -q
+
+
+def smod(a, b):
+    """ signed modulo taking the sign of the dividend like the EVM """
+    require(b != 0, "mod0")
+    r = abs(a) % abs(b)
+    return r if a >= 0 else -r
+
+
+### FullMath ###
+
+def mul_div(a, b, denominator):
+    require(denominator > 0)
+    result = (a * b) // denominator
+    require(result <= MAX_UINT256)
+    return result
+
+
+def mul_div_rounding_up(a, b, denominator):
+    result = mul_div(a, b, denominator)
+    if (a * b) % denominator > 0:
+        require(result < MAX_UINT256)
+        result += 1
+    return result
+
+
+def div_rounding_up(x, y):
+    return x // y + (1 if x % y > 0 else 0)
+
+
+### SafeCast ###
+
+def to_uint160(y):
+    require(y <= MAX_UINT160)
+    return y
+
+
+def to_int256(y):
+    require(y <= MAX_INT256)
+    return y
+
+
+### BitMath ###
+
+def most_significant_bit(x):
+    require(x > 0)
+    return x.bit_length() - 1
+
+
+def least_significant_bit(x):
+    require(x > 0)
+    return (x & -x).bit_length() - 1
+
+
+### LiquidityMath ###
+
+def add_delta(x, y):
+    if y < 0:
+        z = (x - (-y)) % 2**128
+        require(z < x, "LS")
+    else:
+        z = (x + y) % 2**128
+        require(z >= x, "LA")
+    return z
+
+
+### TickMath ###
+
+_TICK_MULTIPLIERS = (
+    (0x2, 0xfff97272373d413259a46990580e213a),
+    (0x4, 0xfff2e50f5f656932ef12357cf3c7fdcc),
+    (0x8, 0xffe5caca7e10e4e61c3624eaa0941cd0),
+    (0x10, 0xffcb9843d60f6159c9db58835c926644),
+    (0x20, 0xff973b41fa98c081472e6896dfb254c0),
+    (0x40, 0xff2ea16466c96a3843ec78b326b52861),
+    (0x80, 0xfe5dee046a99a2a811c461f1969c3053),
+    (0x100, 0xfcbe86c7900a88aedcffc83b479aa3a4),
+    (0x200, 0xf987a7253ac413176f2b074cf7815e54),
+    (0x400, 0xf3392b0822b70005940c7a398e4b70f3),
+    (0x800, 0xe7159475a2c29b7443b29c7fa6e889d9),
+    (0x1000, 0xd097f3bdfd2022b8845ad8f792aa5825),
+    (0x2000, 0xa9f746462d870fdf8a65dc1f90e061e5),
+    (0x4000, 0x70d869a156d2a1b890bb3df62baf32f7),
+    (0x8000, 0x31be135f97d08fd981231505542fcfa6),
+    (0x10000, 0x9aa508b5b7a84e1c677de54f3e99bc9),
+    (0x20000, 0x5d6af8dedb81196699c329225ee604),
+    (0x40000, 0x2216e584f5fa1ea926041bedfe98),
+    (0x80000, 0x48a170391f7dc42444e8fa2),
+)
+
+
+def get_sqrt_ratio_at_tick(tick):
+    abs_tick = abs(tick)
+    require(abs_tick <= MAX_TICK, "T")
+
+    ratio = 0xfffcb933bd6fad37aa2d162d1a594001 if abs_tick & 0x1 != 0 else 0x100000000000000000000000000000000
+    for (bit, multiplier) in _TICK_MULTIPLIERS:
+        if abs_tick & bit != 0:
+            ratio = (ratio * multiplier) >> 128
+
+    if tick > 0:
+        ratio = MAX_UINT256 // ratio
+
+    return (ratio >> 32) + (0 if ratio % (1 << 32) == 0 else 1)
+
+
+def get_tick_at_sqrt_ratio(sqrt_price_x96):
+    """ the greatest tick for which get_sqrt_ratio_at_tick(tick) <= sqrt_price_x96, which is what the log2 approximation in TickMath computes """
+    require(sqrt_price_x96 >= MIN_SQRT_RATIO and sqrt_price_x96 < MAX_SQRT_RATIO, "R")
+    lo = MIN_TICK
+    hi = MAX_TICK
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if get_sqrt_ratio_at_tick(mid) <= sqrt_price_x96:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+### SqrtPriceMath ###
+
+def get_next_sqrt_price_from_amount0_rounding_up(sqrt_px96, liquidity, amount, add):
+    if amount == 0:
+        return sqrt_px96
+    numerator1 = liquidity << RESOLUTION
+
+    if add:
+        product = (amount * sqrt_px96) & MAX_UINT256
+        if product // amount == sqrt_px96:
+            denominator = (numerator1 + product) & MAX_UINT256
+            if denominator >= numerator1:
+                return mul_div_rounding_up(numerator1, sqrt_px96, denominator)
+        denominator = numerator1 // sqrt_px96 + amount
+        require(denominator <= MAX_UINT256)
+        return div_rounding_up(numerator1, denominator)
+    else:
+        product = (amount * sqrt_px96) & MAX_UINT256
+        require(product // amount == sqrt_px96 and numerator1 > product)
+        denominator = numerator1 - product
+        return to_uint160(mul_div_rounding_up(numerator1, sqrt_px96, denominator))
+
+
+def get_next_sqrt_price_from_amount1_rounding_down(sqrt_px96, liquidity, amount, add):
+    if add:
+        quotient = (amount << RESOLUTION) // liquidity if amount <= MAX_UINT160 else mul_div(amount, Q96, liquidity)
+        result = sqrt_px96 + quotient
+        require(result <= MAX_UINT256)
+        return to_uint160(result)
+    else:
+        quotient = div_rounding_up(amount << RESOLUTION, liquidity) if amount <= MAX_UINT160 else mul_div_rounding_up(amount, Q96, liquidity)
+        require(sqrt_px96 > quotient)
+        return sqrt_px96 - quotient
+
+
+def get_next_sqrt_price_from_input(sqrt_px96, liquidity, amount_in, zero_for_one):
+    require(sqrt_px96 > 0)
+    require(liquidity > 0)
+    if zero_for_one:
+        return get_next_sqrt_price_from_amount0_rounding_up(sqrt_px96, liquidity, amount_in, True)
+    return get_next_sqrt_price_from_amount1_rounding_down(sqrt_px96, liquidity, amount_in, True)
+
+
+def get_amount0_delta(sqrt_ratio_a_x96, sqrt_ratio_b_x96, liquidity, round_up):
+    if sqrt_ratio_a_x96 > sqrt_ratio_b_x96:
+        (sqrt_ratio_a_x96, sqrt_ratio_b_x96) = (sqrt_ratio_b_x96, sqrt_ratio_a_x96)
+
+    numerator1 = liquidity << RESOLUTION
+    numerator2 = sqrt_ratio_b_x96 - sqrt_ratio_a_x96
+
+    require(sqrt_ratio_a_x96 > 0)
+
+    if round_up:
+        return div_rounding_up(mul_div_rounding_up(numerator1, numerator2, sqrt_ratio_b_x96), sqrt_ratio_a_x96)
+    return mul_div(numerator1, numerator2, sqrt_ratio_b_x96) // sqrt_ratio_a_x96
+
+
+def get_amount1_delta(sqrt_ratio_a_x96, sqrt_ratio_b_x96, liquidity, round_up):
+    if sqrt_ratio_a_x96 > sqrt_ratio_b_x96:
+        (sqrt_ratio_a_x96, sqrt_ratio_b_x96) = (sqrt_ratio_b_x96, sqrt_ratio_a_x96)
+
+    if round_up:
+        return mul_div_rounding_up(liquidity, sqrt_ratio_b_x96 - sqrt_ratio_a_x96, Q96)
+    return mul_div(liquidity, sqrt_ratio_b_x96 - sqrt_ratio_a_x96, Q96)
+
+
+### SwapMath ###
+
+def get_exact_in_next_price(amount_in, fee, current_price_x96, target_price_x96, liquidity, zero_for_one):
+    """ SwapMath._getExactInNextPrice, returns (amountIn to reach target, next sqrt price) """
+    amount_remaining_less_fee = mul_div(amount_in, 1000000 - fee, 1000000)
+    if zero_for_one:
+        amount_in_to_target = get_amount0_delta(target_price_x96, current_price_x96, liquidity, True)
+    else:
+        amount_in_to_target = get_amount1_delta(current_price_x96, target_price_x96, liquidity, True)
+    if amount_remaining_less_fee >= amount_in_to_target:
+        next_price = target_price_x96
+    else:
+        next_price = get_next_sqrt_price_from_input(current_price_x96, liquidity, amount_remaining_less_fee, zero_for_one)
+    return (amount_in_to_target, next_price)
+
+
+def compute_swap_step(sqrt_ratio_current_x96, sqrt_ratio_target_x96, liquidity, amount_remaining, fee_pips):
+    """ exact-input only version of SwapMath.computeSwapStep, returns (sqrtRatioNextX96, amountIn, amountOut, feeAmount) """
+    require(amount_remaining >= 0, "!exactIn")
+    zero_for_one = sqrt_ratio_current_x96 >= sqrt_ratio_target_x96
+
+    (amount_in, sqrt_ratio_next_x96) = get_exact_in_next_price(amount_remaining, fee_pips, sqrt_ratio_current_x96, sqrt_ratio_target_x96, liquidity, zero_for_one)
+    reached_target = sqrt_ratio_target_x96 == sqrt_ratio_next_x96
+
+    if zero_for_one:
+        if not reached_target:
+            amount_in = get_amount0_delta(sqrt_ratio_next_x96, sqrt_ratio_current_x96, liquidity, True)
+        amount_out = get_amount1_delta(sqrt_ratio_next_x96, sqrt_ratio_current_x96, liquidity, False)
+    else:
+        if not reached_target:
+            amount_in = get_amount1_delta(sqrt_ratio_current_x96, sqrt_ratio_next_x96, liquidity, True)
+        amount_out = get_amount0_delta(sqrt_ratio_current_x96, sqrt_ratio_next_x96, liquidity, False)
+
+    if not reached_target:
+        fee_amount = amount_remaining - amount_in
+    else:
+        fee_amount = mul_div_rounding_up(amount_in, fee_pips, 1000000 - fee_pips)
+
+    return (sqrt_ratio_next_x96, amount_in, amount_out, fee_amount)
+
+
+### TickBitmap ###
+
+def next_initialized_tick_within_one_word(tick_bitmap, tick, tick_spacing, lte):
+    """ tick_bitmap is a callable returning the bitmap word for given word position """
+    compressed = sdiv(tick, tick_spacing)
+    if tick < 0 and smod(tick, tick_spacing) != 0:
+        compressed -= 1
+
+    if lte:
+        word_pos = compressed >> 8
+        bit_pos = compressed % 256
+        mask = (1 << bit_pos) - 1 + (1 << bit_pos)
+        masked = tick_bitmap(word_pos) & mask
+        initialized = masked != 0
+        if initialized:
+            return ((compressed - (bit_pos - most_significant_bit(masked))) * tick_spacing, True)
+        return ((compressed - bit_pos) * tick_spacing, False)
+    else:
+        word_pos = (compressed + 1) >> 8
+        bit_pos = (compressed + 1) % 256
+        mask = MAX_UINT256 ^ ((1 << bit_pos) - 1)
+        masked = tick_bitmap(word_pos) & mask
+        initialized = masked != 0
+        if initialized:
+            return ((compressed + 1 + (least_significant_bit(masked) - bit_pos)) * tick_spacing, True)
+        return ((compressed + 1 + (255 - bit_pos)) * tick_spacing, False)
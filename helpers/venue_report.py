@@ -0,0 +1,153 @@
+"""
+    Per-venue cost report of findOptimalSwap, built from PricerWrapper#findOptimalSwapBreakdown
+
+    For each swap the breakdown gives the quote & gas of every venue, the transaction trace of the same call
+    gives the external calls made by each venue and the UniV3 ticks crossed (one ticks() read per crossed tick).
+    Reports are aggregated per venue into a table and saved as JSON to be diffed between releases
+
+    report = venue_report(pricerwrapper, [(tokenIn, tokenOut, amountIn), ...], accounts[0])
+    print(format_report(report))
+    save_report("venue_report.json", report)
+"""
+
+import json
+import time
+
+from eth_utils import function_signature_to_4byte_selector
+from tabulate import tabulate
+
+from helpers.offchain_pricer import SwapType
+
+REPORT_VERSION = 1
+
+## PricerWrapper calls to the pricer made for each venue, in findOptimalSwapBreakdown order
+_VENUE_CALLS = {
+    "getCurvePriceAnalytically(address,uint256,address)": [SwapType.CURVE],
+    "getCurvePrice(address,address,address,uint256)": [SwapType.CURVE],
+    "getUniPrice(address,address,address,uint256)": [SwapType.UNIV2, SwapType.SUSHI],
+    "getUniV3Price(address,uint256,address)": [SwapType.UNIV3],
+    "getBalancerPriceAnalytically(address,uint256,address)": [SwapType.BALANCER],
+    "getUniV3PriceWithConnector(address,uint256,address,address)": [SwapType.UNIV3WITHWETH],
+    "getBalancerPriceWithConnectorAnalytically(address,uint256,address,address)": [SwapType.BALANCERWITHWETH],
+}
+
+
+def _selector(signature):
+    return "0x" + function_signature_to_4byte_selector(signature).hex()
+
+
+def _call_keys(signature):
+    """ selector & bare name, whichever brownie reports for the call """
+    return [_selector(signature), signature.split("(")[0]]
+
+
+_VENUE_KEYS = {k: venues for (sig, venues) in _VENUE_CALLS.items() for k in _call_keys(sig)}
+_TICKS_KEYS = _call_keys("ticks(int24)")
+
+
+def _subcall_key(subcall):
+    """ brownie decodes the calls of known contracts ("function"), others only keep the raw "calldata" """
+    if "calldata" in subcall:
+        return str(subcall["calldata"])[:10].lower()
+    function = subcall.get("function", "").split(".")[-1]
+    return _selector(function) if "(" in function else function
+
+
+def attribute_subcalls(wrapper, subcalls):
+    """
+        venue name -> {"calls": external calls, "ticksCrossed": ticks() reads}
+        a call from the wrapper starts a venue, every nested call until the next one from the wrapper belongs to it
+    """
+    wrapper = str(wrapper).lower()
+    seen = {}
+    stats = {}
+    current = None
+    for subcall in subcalls:
+        key = _subcall_key(subcall)
+        if str(subcall["from"]).lower() == wrapper:
+            venues = _VENUE_KEYS.get(key)
+            if venues is None:
+                ## the findOptimalSwap call of the total, not a venue
+                current = None
+                continue
+            ## the same pricer function serves several venues in turn (UniV2 then Sushi)
+            idx = seen.get(key, 0)
+            seen[key] = idx + 1
+            current = venues[min(idx, len(venues) - 1)].name
+            stats.setdefault(current, {"calls": 0, "ticksCrossed": 0})
+        elif current is not None:
+            stats[current]["calls"] += 1
+            if key in _TICKS_KEYS:
+                stats[current]["ticksCrossed"] += 1
+    return stats
+
+
+def swap_breakdown(pricerwrapper, tokenIn, tokenOut, amountIn, sender):
+    """ breakdown of one swap, the call is sent as a transaction to get its trace """
+    start = time.time()
+    pricerwrapper.findOptimalSwapBreakdown.call(tokenIn, tokenOut, amountIn)
+    seconds = time.time() - start
+
+    tx = pricerwrapper.findOptimalSwapBreakdown.transact(tokenIn, tokenOut, amountIn, {"from": sender})
+    (gas, quote, costs) = tx.return_value
+    stats = attribute_subcalls(pricerwrapper.address, tx.subcalls)
+    venues = []
+    for (name, amountOut, gasUsed) in costs:
+        venue = SwapType(name).name
+        venues.append({
+            "venue": venue,
+            "amountOut": amountOut,
+            "gas": gasUsed,
+            "calls": stats.get(venue, {}).get("calls", 0),
+            "ticksCrossed": stats.get(venue, {}).get("ticksCrossed", 0),
+        })
+    return {
+        "tokenIn": str(tokenIn).lower(),
+        "tokenOut": str(tokenOut).lower(),
+        "amountIn": amountIn,
+        "quote": {"venue": SwapType(quote[0]).name, "amountOut": quote[1]},
+        "gas": gas,
+        "seconds": round(seconds, 3),
+        "venues": venues,
+    }
+
+
+def aggregate(swaps):
+    """ venue name -> totals over all swaps, along with the number of swaps the venue won """
+    totals = {}
+    for swap in swaps:
+        for v in swap["venues"]:
+            t = totals.setdefault(v["venue"], {"swaps": 0, "wins": 0, "gas": 0, "calls": 0, "ticksCrossed": 0, "maxGas": 0})
+            t["swaps"] += 1
+            t["gas"] += v["gas"]
+            t["calls"] += v["calls"]
+            t["ticksCrossed"] += v["ticksCrossed"]
+            t["maxGas"] = max(t["maxGas"], v["gas"])
+        totals.setdefault(swap["quote"]["venue"], {"swaps": 0, "wins": 0, "gas": 0, "calls": 0, "ticksCrossed": 0, "maxGas": 0})["wins"] += 1
+    return totals
+
+
+def venue_report(pricerwrapper, swaps, sender, block=None):
+    breakdowns = [swap_breakdown(pricerwrapper, tokenIn, tokenOut, amountIn, sender) for (tokenIn, tokenOut, amountIn) in swaps]
+    return {
+        "version": REPORT_VERSION,
+        "block": block,
+        "swaps": breakdowns,
+        "venues": aggregate(breakdowns),
+    }
+
+
+def format_report(report):
+    rows = []
+    for (venue, t) in sorted(report["venues"].items(), key=lambda item: SwapType[item[0]]):
+        n = max(t["swaps"], 1)
+        rows.append([venue, t["swaps"], t["wins"], t["gas"] // n, t["maxGas"], round(t["calls"] / n, 1), round(t["ticksCrossed"] / n, 1)])
+    headers = ["venue", "swaps", "wins", "avg gas", "max gas", "avg calls", "avg ticks crossed"]
+    total_gas = sum(s["gas"] for s in report["swaps"])
+    footer = "{} swaps, findOptimalSwap avg gas {}".format(len(report["swaps"]), total_gas // max(len(report["swaps"]), 1))
+    return tabulate(rows, headers=headers) + "\n" + footer
+
+
+def save_report(path, report):
+    with open(path, "w") as f:
+        json.dump(report, f, indent=1, sort_keys=True)
@@ -26,4 +26,6 @@ struct ExactInStableQueryParam{
 interface IBalancerV2Simulator {
     function calcOutGivenIn(ExactInQueryParam memory _query) external view returns (uint256);
     function calcOutGivenInForStable(ExactInStableQueryParam memory _query) external view returns (uint256);
+    function calcOutGivenInWithScaling(ExactInQueryParam memory _query, uint256 _scalingFactorIn, uint256 _scalingFactorOut) external view returns (uint256);
+    function calcOutGivenInForStableWithScaling(ExactInStableQueryParam memory _query, uint256[] memory _scalingFactors) external view returns (uint256);
 }
\ No newline at end of file
@@ -5,4 +5,6 @@ pragma abicoder v2;
 interface IBalancerV2WeightedPool {
     function getNormalizedWeights() external view returns (uint256[] memory);
     function getSwapFeePercentage() external view returns (uint256);
+    // only in pools whose weights change over time (LBPs, managed & investment pools), endWeights omitted
+    function getGradualWeightUpdateParams() external view returns (uint256 startTime, uint256 endTime);
 }
@@ -10,4 +10,7 @@ interface ICurvePool {
   function get_virtual_price() external view returns (uint256);
   function get_balances() external view returns (uint256[] memory);
   function fee() external view returns (uint256);
+  function balances(uint256 n) external view returns (uint256);
+  function A() external view returns (uint256);
+  function A_precise() external view returns (uint256);
 }
\ No newline at end of file
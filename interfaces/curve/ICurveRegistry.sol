@@ -0,0 +1,8 @@
+// SPDX-License-Identifier: MIT
+pragma solidity >=0.5.0;
+pragma experimental ABIEncoderV2;
+
+
+interface ICurveRegistry {
+  function find_pool_for_coins(address _from, address _to) external view returns (address);
+}
@@ -0,0 +1,18 @@
+// SPDX-License-Identifier: GPL-2.0-or-later
+pragma solidity 0.8.10;
+pragma abicoder v2;
+
+struct CurveStableSwapQuery{
+    uint256[] balances;
+    uint256[] rates; // 10 ** (36 - decimals) for each coin
+    uint256 amp; // A() or A_precise() of the pool
+    uint256 aPrecision; // 1 if amp is A(), 100 if amp is A_precise()
+    uint256 fee;
+    uint256 i;
+    uint256 j;
+    uint256 dx;
+}
+
+interface ICurveSwapSimulator {
+    function get_dy(CurveStableSwapQuery memory _query) external view returns (uint256);
+}
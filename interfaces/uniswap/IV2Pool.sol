@@ -4,4 +4,5 @@ pragma abicoder v2;
 
 interface IUniswapV2Pool {
     function getReserves() external view returns (uint256 reserve0, uint256 reserve1, uint32 blockTimestampLast);
+    function swap(uint256 amount0Out, uint256 amount1Out, address to, bytes calldata data) external;
 }
\ No newline at end of file
@@ -19,7 +19,19 @@ struct UniV3SortPoolQuery{
     bool zeroForOne;
 }
 
+struct UniV3BoundedSwapResult{
+    uint256 amountOut;
+    uint256 amountInRemaining;
+    uint160 sqrtPriceX96;
+    uint256 ticksCrossed;
+    bool truncated;
+    uint256 upperBound;
+}
+
 interface IUniswapV3Simulator {
     function simulateUniV3Swap(address _pool, address _token0, address _token1, bool _zeroForOne, uint24 _fee, uint256 _amountIn) external view returns (uint256);
     function checkInRangeLiquidity(UniV3SortPoolQuery memory _sortQuery) external view returns (bool, uint256);
+    function simulateUniV3SwapFused(address _pool, bool _zeroForOne, uint24 _fee, uint256 _amountIn) external view returns (bool, uint256);
+    function simulateUniV3SwapBounded(address _pool, bool _zeroForOne, uint24 _fee, uint256 _amountIn, uint256 _maxTicks, uint256 _gasBudget) external view returns (UniV3BoundedSwapResult memory);
+    function simulateUniV3SwapAmounts(address _pool, bool _zeroForOne, uint24 _fee, uint256[] memory _amountsIn) external view returns (uint256[] memory);
 }
\ No newline at end of file
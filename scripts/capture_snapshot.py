@@ -0,0 +1,60 @@
+from brownie import *
+
+from helpers.offchain_pricer import OffChainPricer
+from helpers.chain_state import ChainStateFetcher, quote_with_fetcher
+from helpers.snapshot import encode_snapshot, merge_prestate, save_snapshot
+
+"""
+    Capture the pool state touched by findOptimalSwap for a list of swaps into a snapshot file (see helpers/snapshot.py)
+    brownie run scripts/capture_snapshot.py main snapshot.json --network mainnet-fork
+"""
+
+DEFAULT_SWAPS = [
+    ("0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2", "0x2260FAC5E5542a773Aa44fBCfeDf7C193bc2C599", 10 * 10**18), ## WETH -> WBTC
+    ("0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2", "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48", 1 * 10**18), ## WETH -> USDC
+    ("0x6b175474e89094c44da98b954eedeac495271d0f", "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48", 50000 * 10**18), ## DAI -> USDC
+    ("0xf4d2888d29D722226FafA5d9B24F9164c092421E", "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2", 600000 * 10**18), ## LOOKS -> WETH
+    ("0xf4d2888d29D722226FafA5d9B24F9164c092421E", "0x2260FAC5E5542a773Aa44fBCfeDf7C193bc2C599", 600000 * 10**18), ## LOOKS -> WBTC
+    ("0xC0c293ce456fF0ED870ADd98a0828Dd4d2903DBF", "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2", 8000 * 10**18), ## AURA -> WETH
+    ("0xC0c293ce456fF0ED870ADd98a0828Dd4d2903DBF", "0x2260FAC5E5542a773Aa44fBCfeDf7C193bc2C599", 8000 * 10**18), ## AURA -> WBTC
+    ("0x3472A5A71965499acd81997a54BBA8D852C6E53d", "0x2260FAC5E5542a773Aa44fBCfeDf7C193bc2C599", 1000 * 10**18), ## BADGER -> WBTC
+    ("0x4e3fbd56cd56c3e72c1403e103b45db9da5b9d2b", "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2", 10000 * 10**18), ## CVX -> WETH
+    ("0xD533a949740bb3306d119CC777fa900bA034cd52", "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2", 10000 * 10**18), ## CRV -> WETH
+]
+
+def trace_prestate(pricer, tokenIn, tokenOut, amountIn):
+    """ raw code & storage read by findOptimalSwap, needs a node with debug_traceCall (anvil, hardhat, geth) """
+    tx = {"to": pricer.address, "data": pricer.findOptimalSwap.encode_input(tokenIn, tokenOut, amountIn)}
+    response = web3.provider.make_request("debug_traceCall", [tx, "latest", {"tracer": "prestateTracer"}])
+    if "error" in response:
+        return None
+    return response["result"]
+
+def capture(swaps, trace=True):
+    univ3simulator = UniV3SwapSimulator.deploy({"from": accounts[0]})
+    balancerV2Simulator = BalancerSwapSimulator.deploy({"from": accounts[0]})
+    curveSimulator = CurveSwapSimulator.deploy({"from": accounts[0]})
+    pricer = OnChainPricingMainnet.deploy(univ3simulator.address, balancerV2Simulator.address, curveSimulator.address, {"from": accounts[0]})
+    deployed = {c.address.lower() for c in (univ3simulator, balancerV2Simulator, curveSimulator, pricer)}
+
+    ## deployments above do not touch any pool, so the latest block holds the same pool state as the fork block
+    block = chain.height
+    fetcher = ChainStateFetcher(block_identifier=block)
+    offchain = OffChainPricer(fetcher.state)
+    raw = {}
+
+    for (tokenIn, tokenOut, amountIn) in swaps:
+        quote_with_fetcher(offchain, fetcher, "find_optimal_swap", tokenIn, tokenOut, amountIn)
+        if trace:
+            prestate = trace_prestate(pricer, tokenIn, tokenOut, amountIn)
+            if prestate is None:
+                print("debug_traceCall not supported by the node, capturing decoded state only")
+                trace = False
+                continue
+            merge_prestate(raw, {a: s for (a, s) in prestate.items() if a.lower() not in deployed})
+
+    print("captured block", block, "with", fetcher.calls, "state reads and", len(raw), "raw accounts")
+    return encode_snapshot(fetcher.state, swaps, raw, block, chain[block].timestamp, chain.id)
+
+def main(path="snapshot.json", trace="true"):
+    save_snapshot(path, capture(DEFAULT_SWAPS, trace.lower() == "true"))
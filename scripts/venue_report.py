@@ -0,0 +1,24 @@
+from brownie import *
+
+from helpers.venue_report import venue_report, format_report, save_report
+from tests.gas_benchmark.benchmark_token_coverage import TOP_DECIMAL18_TOKENS
+
+"""
+    Per-venue gas, external calls & UniV3 ticks crossed of findOptimalSwap selling each of TOP_DECIMAL18_TOKENS for WETH
+    (see helpers/venue_report.py), printed as a table & saved as JSON to diff between releases
+    brownie run scripts/venue_report.py main venue_report.json --network mainnet-fork
+"""
+
+WETH = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+
+def main(path="venue_report.json"):
+    univ3simulator = UniV3SwapSimulator.deploy({"from": accounts[0]})
+    balancerV2Simulator = BalancerSwapSimulator.deploy({"from": accounts[0]})
+    curveSimulator = CurveSwapSimulator.deploy({"from": accounts[0]})
+    pricer = OnChainPricingMainnet.deploy(univ3simulator.address, balancerV2Simulator.address, curveSimulator.address, {"from": accounts[0]})
+    pricerwrapper = PricerWrapper.deploy(pricer.address, {"from": accounts[0]})
+
+    swaps = [(token, WETH, count * 10**18) for (token, count) in TOP_DECIMAL18_TOKENS]
+    report = venue_report(pricerwrapper, swaps, accounts[0], chain.height)
+    print(format_report(report))
+    save_report(path, report)
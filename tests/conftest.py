@@ -5,9 +5,11 @@ from brownie import (
   interface,
   UniV3SwapSimulator,
   BalancerSwapSimulator,
+  CurveSwapSimulator,
   OnChainPricingMainnet,
   OnChainPricingMainnetLenient,
   FullOnChainPricingMainnet,
+  OnChainQuoterMainnet,
   OnChainSwapMainnet
 )
 import eth_abi
@@ -49,21 +51,31 @@ WBTC_WHALE = "0xbf72da2bd84c5170618fbe5914b0eca9638d5eb5"
 ## Contracts ##
   
 @pytest.fixture
-def swapexecutor():
-  return OnChainSwapMainnet.deploy({"from": accounts[0]})
+def swapexecutor(pricer, quoter):
+  return OnChainSwapMainnet.deploy(pricer.address, quoter.address, {"from": accounts[0]})
   
 @pytest.fixture
 def pricerwrapper():
   univ3simulator = UniV3SwapSimulator.deploy({"from": accounts[0]})
   balancerV2Simulator = BalancerSwapSimulator.deploy({"from": accounts[0]})
-  pricer = OnChainPricingMainnet.deploy(univ3simulator.address, balancerV2Simulator.address, {"from": accounts[0]})  
+  curveSimulator = CurveSwapSimulator.deploy({"from": accounts[0]})
+  pricer = OnChainPricingMainnet.deploy(univ3simulator.address, balancerV2Simulator.address, curveSimulator.address, {"from": accounts[0]})  
   return PricerWrapper.deploy(pricer.address, {"from": accounts[0]})
 
 @pytest.fixture
 def pricer():
   univ3simulator = UniV3SwapSimulator.deploy({"from": accounts[0]})
   balancerV2Simulator = BalancerSwapSimulator.deploy({"from": accounts[0]})
-  return OnChainPricingMainnet.deploy(univ3simulator.address, balancerV2Simulator.address, {"from": accounts[0]})
+  curveSimulator = CurveSwapSimulator.deploy({"from": accounts[0]})
+  return OnChainPricingMainnet.deploy(univ3simulator.address, balancerV2Simulator.address, curveSimulator.address, {"from": accounts[0]})
+
+@pytest.fixture
+def quoter(pricer):
+  return OnChainQuoterMainnet.deploy(pricer.address, {"from": accounts[0]})
+
+@pytest.fixture
+def quoterwrapper(quoter):
+  return QuoterWrapper.deploy(quoter.address, {"from": accounts[0]})
 
 @pytest.fixture
 def pricer_legacy():
@@ -74,7 +86,8 @@ def lenient_contract():
   ## NOTE: We have 5% slippage on this one
   univ3simulator = UniV3SwapSimulator.deploy({"from": accounts[0]})
   balancerV2Simulator = BalancerSwapSimulator.deploy({"from": accounts[0]})
-  c = OnChainPricingMainnetLenient.deploy(univ3simulator.address, balancerV2Simulator.address, {"from": accounts[0]})
+  curveSimulator = CurveSwapSimulator.deploy({"from": accounts[0]})
+  c = OnChainPricingMainnetLenient.deploy(univ3simulator.address, balancerV2Simulator.address, curveSimulator.address, {"from": accounts[0]})
   c.setSlippage(499, {"from": accounts.at(c.TECH_OPS(), force=True)})
 
   return c
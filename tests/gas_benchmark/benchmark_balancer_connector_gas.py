@@ -0,0 +1,35 @@
+import brownie
+from brownie import *
+import pytest
+
+"""
+    Benchmark test for gas of Balancer direct & WETH connector quotes sharing their pool reads (one getPoolTokens per pool)
+    against pricing each leg with its own pricer call, as findOptimalSwap did before
+    This file is ok to be exclcuded in test suite due to its underluying functionality should be covered by other tests
+    Rename the file to test_benchmark_balancer_connector_gas.py to make this part of the testing suite if required
+"""
+
+WETH = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+USDC = "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48"
+DAI = "0x6B175474E89094C44Da98b954EedeAC495271d0F"
+AURA = "0xC0c293ce456fF0ED870ADd98a0828Dd4d2903DBF"
+AURABAL = "0x616e8BfA43F920657B3497DBf40D6b1A02D4608d"
+GRAVIAURA = "0xBA485b556399123261a5F9c95d413B4f93107407"
+OHM = "0x64aa3364F17a4D01c6f1751Fd97C2BD3D7e7f1D5"
+WSTETH = "0x7f39C581F595B53c5cb19bD0b3f8dA6c935E2Ca0"
+
+QUOTES = [
+  ("auraBAL -> graviAURA, same pool for both legs", AURABAL, GRAVIAURA, 1000 * 10**18),
+  ("OHM -> DAI, same pool for direct & first leg", OHM, DAI, 100 * 10**9),
+  ("AURA -> USDC, distinct pools", AURA, USDC, 8000 * 10**18),
+  ("WSTETH -> AURA, distinct pools", WSTETH, AURA, 100 * 10**18),
+]
+
+@pytest.mark.parametrize("name,tokenIn,tokenOut,amountIn", QUOTES)
+def test_gas_balancer_connector_shared_reads(name, tokenIn, tokenOut, amountIn, pricerwrapper):
+  (perLegGas, direct, withWeth) = pricerwrapper.getBalancerPricesPerLeg(tokenIn, amountIn, tokenOut, WETH)
+  (sharedGas, sharedDirect, sharedWithWeth) = pricerwrapper.getBalancerPricesWithConnectorAnalytically(tokenIn, amountIn, tokenOut, WETH)
+
+  print(name, ": per leg", perLegGas, "shared reads", sharedGas, "saved", perLegGas - sharedGas)
+  assert (sharedDirect, sharedWithWeth) == (direct, withWeth)
+  assert sharedGas < perLegGas
@@ -0,0 +1,44 @@
+import brownie
+from brownie import *
+import pytest
+
+"""
+    Benchmark test for gas saved by cached Balancer pool descriptors (pool type, weights & token decimals)
+    Uncached quotes try getAmplificationParameter() on every pool (a failed call for weighted pools), read the weights
+    and the decimals() of the tokens, cached quotes only read balances, swap fee & the amplification of stable pools
+    This file is ok to be exclcuded in test suite due to its underluying functionality should be covered by other tests
+    Rename the file to test_benchmark_balancer_descriptor_gas.py to make this part of the testing suite if required
+"""
+
+WETH = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+WBTC = "0x2260FAC5E5542a773Aa44fBCfeDf7C193bc2C599"
+USDC = "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48"
+AURA = "0xC0c293ce456fF0ED870ADd98a0828Dd4d2903DBF"
+WSTETH = "0x7f39C581F595B53c5cb19bD0b3f8dA6c935E2Ca0"
+BAL = "0xba100000625a3754423978a60c9317c58a424e3D"
+
+## (name, pool id getter of the pricer, tokenIn, tokenOut, amountIn), default pools registered for a single pair
+QUOTES = [
+  ("weighted AURA-WETH", "BALANCERV2_AURA_WETH_POOLID", AURA, WETH, 8000 * 10**18),
+  ("weighted WETH-USDC", "BALANCERV2_USDC_WETH_POOLID", WETH, USDC, 10 * 10**18),
+  ("weighted BAL-WETH", "BALANCERV2_BAL_WETH_POOLID", BAL, WETH, 1000 * 10**18),
+  ("weighted WBTC-WETH", "BALANCERV2_WBTC_WETH_POOLID", WBTC, WETH, 1 * 10**8),
+  ("stable WSTETH-WETH", "BALANCERV2_WSTETH_WETH_POOLID", WSTETH, WETH, 1000 * 10**18),
+]
+
+@pytest.mark.parametrize("name,poolIdGetter,tokenIn,tokenOut,amountIn", QUOTES)
+def test_gas_balancer_descriptor(name, poolIdGetter, tokenIn, tokenOut, amountIn, pricerwrapper):
+  pricer = OnChainPricingMainnet.at(pricerwrapper.pricer())
+  poolId = getattr(pricer, poolIdGetter)()
+  ## default pools are cached at deployment
+  (cachedGas, cachedQuote) = pricerwrapper.getBalancerQuoteWithinPoolAnalytcially(poolId, tokenIn, amountIn, tokenOut)
+
+  ## removing the pool from its only pair drops its descriptor
+  techOps = accounts.at(pricer.TECH_OPS(), force=True)
+  pricer.removeBalancerV2Pool(tokenIn, tokenOut, poolId, {"from": techOps})
+  assert pricer.getBalancerV2PoolDescriptor(poolId)[0] == 0
+  (uncachedGas, uncachedQuote) = pricerwrapper.getBalancerQuoteWithinPoolAnalytcially(poolId, tokenIn, amountIn, tokenOut)
+
+  print(name, ": uncached", uncachedGas, "cached", cachedGas, "saved", uncachedGas - cachedGas)
+  assert cachedQuote == uncachedQuote and cachedQuote > 0
+  assert cachedGas < uncachedGas
@@ -0,0 +1,37 @@
+import brownie
+from brownie import *
+import pytest
+
+"""
+    Benchmark test for gas cost of getBalancerV2Pool: storage registry against the hardcoded if/else chain (legacy pricer)
+    Cold lookups pay one SLOAD on a miss and two on a hit, repeated lookups of the same pair within a quote are warm
+    This file is ok to be exclcuded in test suite due to its underluying functionality should be covered by other tests
+    Rename the file to test_benchmark_balancer_registry_gas.py to make this part of the testing suite if required
+"""
+
+WETH = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+USDC = "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48"
+GRAVIAURA = "0xBA485b556399123261a5F9c95d413B4f93107407"
+CREAM = "0x2ba592F78dB6436527729929AAf6c908497cB200"
+CVX = "0x4e3fbd56cd56c3e72c1403e103b45db9da5b9d2b"
+
+LOOKUPS = [
+  ("hit first branch", CREAM, WETH),
+  ("hit last branch", GRAVIAURA, WETH),
+  ("miss", CVX, USDC),
+]
+
+@pytest.fixture
+def legacywrapper(pricer_legacy):
+  return PricerWrapper.deploy(pricer_legacy.address, {"from": accounts[0]})
+
+@pytest.mark.parametrize("name,tokenIn,tokenOut", LOOKUPS)
+def test_gas_balancer_pool_lookup(name, tokenIn, tokenOut, pricerwrapper, legacywrapper):
+  (registryGas, registryPool) = pricerwrapper.getBalancerV2Pool(tokenIn, tokenOut)
+  (chainGas, chainPool) = legacywrapper.getBalancerV2Pool(tokenIn, tokenOut)
+
+  print(name, "registry", registryGas, "if/else chain", chainGas)
+  nonExistPool = "0x" + b"BALANCER-V2-NON-EXIST-POOLID".ljust(32, b"\x00").hex()
+  assert (registryPool == nonExistPool) == (chainPool == nonExistPool)
+  ## O(1): same cost wherever the pair sits in the registry, one cold SLOAD for the length + one for the pool on hits
+  assert registryGas <= 7000
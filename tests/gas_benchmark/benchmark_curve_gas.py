@@ -0,0 +1,38 @@
+import brownie
+from brownie import *
+import pytest
+
+"""
+    Benchmark test for gas cost of Curve quotes: the router (scanning its registries) against the native StableSwap math
+    of getCurvePriceAnalytically over the indexed pool, both quotes should be the same
+    This file is ok to be exclcuded in test suite due to its underluying functionality should be covered by other tests
+    Rename the file to test_benchmark_curve_gas.py to make this part of the testing suite if required
+"""
+
+DAI = "0x6B175474E89094C44Da98b954EedeAC495271d0F"
+USDC = "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48"
+USDT = "0xdAC17F958D2ee523a2206206994597C13D831ec7"
+FRAX = "0x853d955aCEf822Db058eb8505911ED77F175b99e"
+CVX = "0x4e3FBD56CD56c3e72c1403e103b45Db9da5B9D2B"
+BVE_CVX = "0xfd05D3C7fe2924020620A8bE4961bBaA747e6305"
+CURVE_ROUTER = "0x8e764bE4288B842791989DB5b8ec067279829809"
+
+SWAPS = [
+  (DAI, USDC, 100000 * 10**18),
+  (USDT, DAI, 100000 * 10**6),
+  (FRAX, USDC, 100000 * 10**18),
+  (CVX, BVE_CVX, 10000 * 10**18),
+]
+
+@pytest.mark.parametrize("tokenIn,tokenOut,amountIn", SWAPS)
+def test_gas_curve_router_vs_analytic(tokenIn, tokenOut, amountIn, pricerwrapper):
+  (routerGas, routerPool, routerQuote) = pricerwrapper.getCurvePrice(CURVE_ROUTER, tokenIn, tokenOut, amountIn)
+  (analyticGas, pool, quote) = pricerwrapper.getCurvePriceAnalytically(tokenIn, amountIn, tokenOut)
+
+  print(tokenIn, "->", tokenOut, amountIn, ": router", routerGas, "analytic", analyticGas)
+  if routerPool == pool:
+    assert quote == routerQuote
+  else:
+    ## the router found a better pool than the indexed one
+    assert routerQuote >= quote
+  assert analyticGas < routerGas
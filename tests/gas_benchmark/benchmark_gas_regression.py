@@ -0,0 +1,133 @@
+import os
+
+import brownie
+from brownie import *
+import pytest
+
+from helpers.gas_baseline import (
+  new_baseline,
+  fork_source,
+  snapshot_source,
+  compare,
+  regressions,
+  format_deltas,
+  load_baseline,
+  save_baseline,
+  DEFAULT_THRESHOLD_PCT,
+)
+from helpers.offchain_pricer import MarketState
+from helpers.pool_addresses import univ3_pool
+from helpers.snapshot import encode_snapshot, merge_prestate, save_snapshot, load_snapshot, seed_dev_chain
+
+"""
+    Gas regression harness: gas of every scenario below is compared to a stored baseline (see helpers/gas_baseline.py)
+    and the test fails if any scenario uses more than GAS_BASELINE_THRESHOLD percent (default 5) above its baseline.
+    Numbers are only reproducible on a fixed chain state, so it runs either:
+    - on a fork pinned at block GAS_BENCHMARK_BLOCK (e.g. ganache fork=<rpc>@<block>), or
+    - on a dev chain seeded with the snapshot GAS_BENCHMARK_SNAPSHOT, captured beforehand on the pinned fork
+      with GAS_BENCHMARK_CAPTURE=<path> (needs a node with debug_traceCall)
+    GAS_BASELINE (default gas_baseline.json) is (re)recorded when missing or with GAS_BASELINE_UPDATE=1
+    This file is ok to be exclcuded in test suite due to its underluying functionality should be covered by other tests
+    Rename the file to test_benchmark_gas_regression.py to make this part of the testing suite if required
+"""
+
+CULT = "0xf0f9d895aca5c8678f706fb8216fa22957685a13"
+TOKE = "0x2e9d63788249371f1DFC918a52f8d799F4a38C94"
+AURA = "0xC0c293ce456fF0ED870ADd98a0828Dd4d2903DBF"
+LOOKS = "0xf4d2888d29D722226FafA5d9B24F9164c092421E"
+CRV = "0xD533a949740bb3306d119CC777fa900bA034cd52"
+CVX = "0x4e3FBD56CD56c3e72c1403e103b45Db9da5B9D2B"
+BVE_CVX = "0xfd05D3C7fe2924020620A8bE4961bBaA747e6305"
+WSTETH = "0x7f39C581F595B53c5cb19bD0b3f8dA6c935E2Ca0"
+WETH = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+WBTC = "0x2260FAC5E5542a773Aa44fBCfeDf7C193bc2C599"
+DAI = "0x6B175474E89094C44Da98b954EedeAC495271d0F"
+USDC = "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48"
+
+SWAPS = [
+  ("only uniswap v2", CULT, WETH, 100000000 * 10**9),
+  ("uniswap v2 & sushi", TOKE, WETH, 5000 * 10**18),
+  ("only balancer v2", AURA, WETH, 8000 * 10**18),
+  ("only balancer v2 with weth", AURA, WBTC, 8000 * 10**18),
+  ("only uniswap v3", LOOKS, WETH, 600000 * 10**18),
+  ("only uniswap v3 with weth", LOOKS, WBTC, 600000 * 10**18),
+  ("almost everything", WETH, WBTC, 10 * 10**18),
+  ("curve", DAI, USDC, 50000 * 10**18),
+]
+
+def _univ3_simulation(tokenIn, tokenOut, fee, amountIn):
+  (token0, token1) = sorted([tokenIn, tokenOut], key=lambda t: int(t, 16))
+  return (token0, amountIn, token1, fee, token0 == tokenIn, univ3_pool(token0, token1, fee))
+
+## scenario name -> (PricerWrapper function returning the gas first, arguments)
+SCENARIOS = {}
+for (name, tokenIn, tokenOut, amountIn) in SWAPS:
+  SCENARIOS["findOptimalSwap " + name] = ("findOptimalSwap", (tokenIn, tokenOut, amountIn))
+  SCENARIOS["isPairSupported " + name] = ("isPairSupportedWithGas", (tokenIn, tokenOut, amountIn))
+SCENARIOS.update({
+  "sortUniV3Pools LOOKS-WETH": ("sortUniV3Pools", (LOOKS, 600000 * 10**18, WETH)),
+  "sortUniV3Pools WETH-LOOKS": ("sortUniV3Pools", (WETH, 500 * 10**18, LOOKS)),
+  "sortUniV3Pools CRV-WETH": ("sortUniV3Pools", (CRV, 100000 * 10**18, WETH)),
+  "UniV3 simulator LOOKS-WETH 3000": ("simulateUniV3Swap", _univ3_simulation(LOOKS, WETH, 3000, 6000000 * 10**18)),
+  "UniV3 simulator WETH-WBTC 500": ("simulateUniV3Swap", _univ3_simulation(WETH, WBTC, 500, 5000 * 10**18)),
+  "Balancer simulator weighted AURA-WETH": ("getBalancerPriceAnalytically", (AURA, 8000 * 10**18, WETH)),
+  "Balancer simulator stable WSTETH-WETH": ("getBalancerPriceAnalytically", (WSTETH, 1000 * 10**18, WETH)),
+  "Curve simulator DAI-USDC": ("getCurvePriceAnalytically", (DAI, 50000 * 10**18, USDC)),
+  "Curve simulator CVX-BVECVX": ("getCurvePriceAnalytically", (CVX, 10000 * 10**18, BVE_CVX)),
+})
+
+def _deploy_args():
+  univ3simulator = UniV3SwapSimulator.deploy({"from": accounts[0]})
+  balancerV2Simulator = BalancerSwapSimulator.deploy({"from": accounts[0]})
+  curveSimulator = CurveSwapSimulator.deploy({"from": accounts[0]})
+  return (univ3simulator.address, balancerV2Simulator.address, curveSimulator.address)
+
+def _trace_prestate(tx):
+  response = web3.provider.make_request("debug_traceCall", [tx, "latest", {"tracer": "prestateTracer"}])
+  if "error" in response:
+    raise RuntimeError("capturing a snapshot needs a node with debug_traceCall: " + str(response["error"]))
+  return response["result"]
+
+def capture(path, pricerwrapper, simulators, block):
+  """ raw state read by the pricer deployment & every scenario, to replay them on a seeded dev chain """
+  deployed = {a.lower() for a in simulators + (pricerwrapper.address, pricerwrapper.pricer())}
+  raw = {}
+  txs = [{"data": OnChainPricingMainnet.deploy.encode_input(*simulators)}]
+  txs += [{"to": pricerwrapper.address, "data": getattr(pricerwrapper, fn).encode_input(*args)} for (fn, args) in SCENARIOS.values()]
+  for tx in txs:
+    merge_prestate(raw, {a: s for (a, s) in _trace_prestate(tx).items() if a.lower() not in deployed})
+  save_snapshot(path, encode_snapshot(MarketState(block=block), [], raw, block, chain[block].timestamp, chain.id))
+
+def test_gas_regression():
+  snapshot_path = os.environ.get("GAS_BENCHMARK_SNAPSHOT")
+  if snapshot_path:
+    snapshot = load_snapshot(snapshot_path)
+    seed_dev_chain(web3.provider, snapshot)
+    source = snapshot_source(snapshot)
+  elif os.environ.get("GAS_BENCHMARK_BLOCK"):
+    block = int(os.environ["GAS_BENCHMARK_BLOCK"])
+    source = fork_source(block, chain[block].hash.hex())
+  else:
+    pytest.skip("needs a fork pinned with GAS_BENCHMARK_BLOCK or a snapshot in GAS_BENCHMARK_SNAPSHOT")
+
+  simulators = _deploy_args()
+  pricer = OnChainPricingMainnet.deploy(*simulators, {"from": accounts[0]})
+  pricerwrapper = PricerWrapper.deploy(pricer.address, {"from": accounts[0]})
+  gas = {name: getattr(pricerwrapper, fn)(*args)[0] for (name, (fn, args)) in SCENARIOS.items()}
+
+  if os.environ.get("GAS_BENCHMARK_CAPTURE") and source["kind"] == "fork":
+    capture(os.environ["GAS_BENCHMARK_CAPTURE"], pricerwrapper, simulators, source["block"])
+
+  path = os.environ.get("GAS_BASELINE", "gas_baseline.json")
+  if os.environ.get("GAS_BASELINE_UPDATE") == "1" or not os.path.exists(path):
+    save_baseline(path, new_baseline(source, gas))
+    print("recorded gas baseline of", len(gas), "scenarios into", path)
+    return
+
+  baseline = load_baseline(path)
+  if baseline["source"] != source:
+    pytest.skip("baseline measured on {} but running on {}".format(baseline["source"], source))
+
+  rows = compare(baseline, gas, float(os.environ.get("GAS_BASELINE_THRESHOLD", DEFAULT_THRESHOLD_PCT)))
+  print(format_deltas(rows))
+  assert not regressions(rows)
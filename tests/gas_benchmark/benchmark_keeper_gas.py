@@ -0,0 +1,30 @@
+import brownie
+from brownie import *
+import pytest
+
+"""
+    Benchmark test for gas cost of the keeper pattern: check support, quote then swap in one transaction,
+    without and with a QuoteContext passed along so the swap quote is memoized instead of quoted three times
+    This file is ok to be exclcuded in test suite due to its underluying functionality should be covered by other tests
+    Rename the file to test_benchmark_keeper_gas.py to make this part of the testing suite if required
+"""
+
+CVX = "0x4e3FBD56CD56c3e72c1403e103b45Db9da5B9D2B"
+BVE_CVX = "0xfd05D3C7fe2924020620A8bE4961bBaA747e6305"
+
+def test_gas_keeper_check_quote_swap(oneE18, cvx_whale, pricer, swapexecutor):
+  keeper = QuoteKeeper.deploy(pricer.address, swapexecutor.address, {"from": accounts[0]})
+  sell_amount = 1000 * oneE18
+  interface.ERC20(CVX).transfer(keeper.address, sell_amount * 2, {"from": cvx_whale})
+
+  chain.snapshot()
+  tx = keeper.checkQuoteAndSwap(CVX, BVE_CVX, sell_amount, {"from": accounts[0]})
+  (quote, out) = tx.return_value
+  chain.revert()
+  tx_ctx = keeper.checkQuoteAndSwapWithContext(CVX, BVE_CVX, sell_amount, {"from": accounts[0]})
+  (quote_ctx, out_ctx) = tx_ctx.return_value
+
+  print("keeper gas: plain", tx.gas_used, "with context", tx_ctx.gas_used, "saved", tx.gas_used - tx_ctx.gas_used)
+  assert (quote_ctx, out_ctx) == (quote, out)
+  assert out >= quote
+  assert tx_ctx.gas_used < tx.gas_used
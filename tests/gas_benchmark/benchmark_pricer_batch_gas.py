@@ -0,0 +1,73 @@
+import brownie
+from brownie import *
+import pytest
+from time import time
+
+"""
+    Benchmark test for gas cost & latency in findOptimalSwapBatch against N single findOptimalSwap calls
+    This file is ok to be exclcuded in test suite due to its underluying functionality should be covered by other tests
+    Rename the file to test_benchmark_pricer_batch_gas.py to make this part of the testing suite if required
+"""
+
+WETH = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+WBTC = "0x2260FAC5E5542a773Aa44fBCfeDf7C193bc2C599"
+AURA = "0xC0c293ce456fF0ED870ADd98a0828Dd4d2903DBF"
+
+BATCH_REQUESTS = [
+  ("0xf0f9d895aca5c8678f706fb8216fa22957685a13", WETH, 100000000 * 1000000000), # CULTDAO-WETH only in Uniswap V2
+  ("0x2e9d63788249371f1DFC918a52f8d799F4a38C94", WETH, 5000 * 10**18),          # TOKE-WETH in Uniswap V2 & SushiSwap
+  (AURA, WETH, 8000 * 10**18),                                                  # AURA-WETH only in Balancer V2
+  (AURA, WBTC, 8000 * 10**18),                                                  # AURA-WETH-WBTC in Balancer V2
+  ("0xf4d2888d29D722226FafA5d9B24F9164c092421E", WETH, 600000 * 10**18),        # LOOKS-WETH only in Uniswap V3
+  ("0xf4d2888d29D722226FafA5d9B24F9164c092421E", WBTC, 600000 * 10**18),        # LOOKS-WETH-WBTC in Uniswap V3
+  ("0x5a98fcbea516cf06857215779fd812ca3bef1b32", WETH, 10000 * 10**18),         # LDO
+  ("0xd533a949740bb3306d119cc777fa900ba034cd52", WETH, 10000 * 10**18),         # CRV
+  ("0x4e3fbd56cd56c3e72c1403e103b45db9da5b9d2b", WETH, 10000 * 10**18),         # CVX
+  ("0x5a98fcbea516cf06857215779fd812ca3bef1b32", WETH, 10000 * 10**18),         # LDO again, served from the batch
+  (WETH, "0xf4d2888d29D722226FafA5d9B24F9164c092421E", 100 * 10**18),           # WETH-LOOKS, pool state read by LOOKS-WETH above
+  (WBTC, AURA, 1 * 10**8),                                                      # WBTC-WETH-AURA, WETH legs read by AURA-WBTC above
+]
+
+def _unzip(requests):
+  return ([r[0] for r in requests], [r[1] for r in requests], [r[2] for r in requests])
+
+def test_gas_batch_vs_single(pricerwrapper):
+  pricer = pricerwrapper
+  tokensIn, tokensOut, amountsIn = _unzip(BATCH_REQUESTS)
+
+  start = time()
+  singleGas = 0
+  singleQuotes = []
+  for (tokenIn, tokenOut, amountIn) in BATCH_REQUESTS:
+    tx = pricer.findOptimalSwap(tokenIn, tokenOut, amountIn)
+    singleGas += tx[0]
+    singleQuotes.append(tx[1])
+  singleElapsed = time() - start
+
+  start = time()
+  txBatch = pricer.findOptimalSwapBatch(tokensIn, tokensOut, amountsIn)
+  batchElapsed = time() - start
+
+  print("findOptimalSwap x", len(BATCH_REQUESTS), ": gas", singleGas, "elapsed", singleElapsed)
+  print("findOptimalSwapBatch: gas", txBatch[0], "elapsed", batchElapsed)
+
+  ## same quotes as N single calls
+  assert len(txBatch[1]) == len(BATCH_REQUESTS)
+  for i in range(len(BATCH_REQUESTS)):
+    assert txBatch[1][i][0] == singleQuotes[i][0]
+    assert txBatch[1][i][1] == singleQuotes[i][1]
+
+  ## duplicated request is served without quoting again, pools shared by several requests are read once
+  assert txBatch[0] < singleGas
+
+def test_batch_length_mismatch(pricer):
+  tokensIn, tokensOut, amountsIn = _unzip(BATCH_REQUESTS)
+  with brownie.reverts("!len"):
+    pricer.findOptimalSwapBatch(tokensIn, tokensOut[1:], amountsIn)
+
+def test_batch_lenient_slippage(lenient_contract, pricer):
+  tokensIn, tokensOut, amountsIn = _unzip(BATCH_REQUESTS[-4:])
+  quotes = pricer.findOptimalSwapBatch(tokensIn, tokensOut, amountsIn)
+  lenientQuotes = lenient_contract.findOptimalSwapBatch(tokensIn, tokensOut, amountsIn)
+  for i in range(len(quotes)):
+    assert lenientQuotes[i][1] == quotes[i][1] * (10000 - 499) // 10000
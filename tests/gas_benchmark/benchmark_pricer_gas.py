@@ -91,4 +91,30 @@ def test_gas_almost_everything(oneE18, wbtc, weth, pricerwrapper):
   assert (tx[1][0] <= 3 or tx[1][0] == 5) ## CURVE or UNIV2 or SUSHI or UNIV3 or BALANCER  
   assert tx[1][1] > 0  
   assert tx[0] <= 210000 ## 200229 in test simulation
-  
\ No newline at end of file
+  
+"""
+    Same scenarios as above quoted with findOptimalSwapWithProbes, which probes the Curve registries before the router
+    best rate search (other venues skip missing pools in both modes). The best quote must be the same as findOptimalSwap,
+    the saving is the router search for pairs no registry lists, otherwise the probe only adds its registry lookups
+"""
+PROBED_SCENARIOS = [
+  ("only uniswap v2", "0xf0f9d895aca5c8678f706fb8216fa22957685a13", "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2", 100000000 * 10**9),
+  ("uniswap v2 & sushi", "0x2e9d63788249371f1DFC918a52f8d799F4a38C94", "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2", 5000 * 10**18),
+  ("only balancer v2", "0xC0c293ce456fF0ED870ADd98a0828Dd4d2903DBF", "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2", 8000 * 10**18),
+  ("only balancer v2 with weth", "0xC0c293ce456fF0ED870ADd98a0828Dd4d2903DBF", "0x2260FAC5E5542a773Aa44fBCfeDf7C193bc2C599", 8000 * 10**18),
+  ("only uniswap v3", "0xf4d2888d29D722226FafA5d9B24F9164c092421E", "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2", 600000 * 10**18),
+  ("only uniswap v3 with weth", "0xf4d2888d29D722226FafA5d9B24F9164c092421E", "0x2260FAC5E5542a773Aa44fBCfeDf7C193bc2C599", 600000 * 10**18),
+  ("almost everything", "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2", "0x2260FAC5E5542a773Aa44fBCfeDf7C193bc2C599", 10 * 10**18),
+]
+
+@pytest.mark.parametrize("name,tokenIn,tokenOut,amountIn", PROBED_SCENARIOS)
+def test_gas_with_probes(name, tokenIn, tokenOut, amountIn, pricerwrapper, pricer):
+  (gas, quote) = pricerwrapper.findOptimalSwap(tokenIn, tokenOut, amountIn)
+  (probedGas, probedQuote) = pricerwrapper.findOptimalSwapWithProbes(tokenIn, tokenOut, amountIn)
+
+  print(name, ": probed", probedGas, "full", gas, "saved", gas - probedGas)
+  assert probedQuote[0] == quote[0]
+  assert probedQuote[1] == quote[1]
+  ## the Curve probe is the only difference between both modes
+  if not pricer.checkCurvePoolsExistence(tokenIn, tokenOut):
+    assert probedGas < gas
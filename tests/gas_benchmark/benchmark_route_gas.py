@@ -0,0 +1,35 @@
+import brownie
+from brownie import *
+import pytest
+
+"""
+    Benchmark test for gas cost of findOptimalRoute as connectors are added
+    The cost is linear in the number of connectors, but a connector without pools for one of its legs only costs the existence
+    checks of that leg (storage reads first, then pool code checks, external Curve registries last), a fraction of a quoted connector
+    This file is ok to be exclcuded in test suite due to its underluying functionality should be covered by other tests
+    Rename the file to test_benchmark_route_gas.py to make this part of the testing suite if required
+"""
+
+LOOKS = "0xf4d2888d29D722226FafA5d9B24F9164c092421E"
+WBTC = "0x2260FAC5E5542a773Aa44fBCfeDf7C193bc2C599"
+## tokens without pools against LOOKS
+EXTRA_CONNECTORS = [
+  "0x3472A5A71965499acd81997a54BBA8D852C6E53d", # BADGER
+  "0xC0c293ce456fF0ED870ADd98a0828Dd4d2903DBF", # AURA
+  "0x616e8BfA43F920657B3497DBf40D6b1A02D4608d", # AURABAL
+  "0xBA485b556399123261a5F9c95d413B4f93107407", # GRAVIAURA
+]
+
+def test_gas_route_connectors(quoterwrapper):
+  quoter = OnChainQuoterMainnet.at(quoterwrapper.quoter())
+  techOps = accounts.at(quoter.TECH_OPS(), force=True)
+  sell_amount = 600000 * 10**18
+
+  (baseGas, baseRoute) = quoterwrapper.findOptimalRoute(LOOKS, WBTC, sell_amount)
+  print("connectors", len(quoter.getConnectors()), "gas", baseGas)
+
+  for connector in EXTRA_CONNECTORS:
+    quoter.addConnector(connector, {"from": techOps})
+    (gas, route) = quoterwrapper.findOptimalRoute(LOOKS, WBTC, sell_amount)
+    print("connectors", len(quoter.getConnectors()), "gas", gas, "extra", gas - baseGas)
+    assert route[0] == baseRoute[0]
@@ -0,0 +1,66 @@
+import brownie
+from brownie import *
+import pytest
+
+"""
+    Benchmark test for gas cost of selling a basket of 20 tokens for USDC: one doOptimalSwap transaction per token
+    against a single doOptimalSwapBatch transaction quoting all of them at once and sharing the WETH to USDC leg
+    This file is ok to be exclcuded in test suite due to its underluying functionality should be covered by other tests
+    Rename the file to test_benchmark_swap_batch_gas.py to make this part of the testing suite if required
+"""
+
+WETH = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+USDC = "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48"
+
+BASKET = [
+  "0x2260FAC5E5542a773Aa44fBCfeDf7C193bc2C599", ## WBTC
+  "0x6B175474E89094C44Da98b954EedeAC495271d0F", ## DAI
+  "0xdAC17F958D2ee523a2206206994597C13D831ec7", ## USDT
+  "0xD533a949740bb3306d119CC777fa900bA034cd52", ## CRV
+  "0x4e3FBD56CD56c3e72c1403e103b45Db9da5B9D2B", ## CVX
+  "0x3472A5A71965499acd81997a54BBA8D852C6E53d", ## BADGER
+  "0xC0c293ce456fF0ED870ADd98a0828Dd4d2903DBF", ## AURA
+  "0x5A98FcBEA516Cf06857215779Fd812CA3beF1B32", ## LDO
+  "0x1f9840a85d5aF5bf1D1762F925BDADdC4201F984", ## UNI
+  "0x514910771AF9Ca656af840dff83E8264EcF986CA", ## LINK
+  "0x7Fc66500c84A76Ad7e9c93437bFc5Ac33E2DDaE9", ## AAVE
+  "0x9f8F72aA9304c8B593d555F12eF6589cC3A579A2", ## MKR
+  "0xC011a73ee8576Fb46F5E1c5751cA3B9Fe0af2a6F", ## SNX
+  "0xc00e94Cb662C3520282E6f5717214004A7f26888", ## COMP
+  "0x6B3595068778DD592e39A122f4f5a5cF09C90fE2", ## SUSHI
+  "0xba100000625a3754423978a60c9317c58a424e3D", ## BAL
+  "0x3432B6A60D23Ca0dFCa7761B7ab56459D9C964D0", ## FXS
+  "0xf4d2888d29D722226FafA5d9B24F9164c092421E", ## LOOKS
+  "0x090185f2135308BaD17527004364eBcC2D37e5F6", ## SPELL
+  "0x111111111117dC0c70AB08a59bC2cfF7d9bD6d7F", ## 1INCH
+]
+
+def test_gas_swap_batch_basket(oneE18, weth, weth_whale, swapexecutor):
+  ## buy the basket with WETH first
+  for token in BASKET:
+    weth.transfer(swapexecutor.address, 1 * oneE18, {"from": weth_whale})
+    swapexecutor.doOptimalSwap(WETH, token, 1 * oneE18, {"from": weth_whale})
+  amounts = [interface.ERC20(token).balanceOf(weth_whale) for token in BASKET]
+  usdc = interface.ERC20(USDC)
+
+  chain.snapshot()
+  sequential_gas = 0
+  sequential_out = 0
+  for (token, amount) in zip(BASKET, amounts):
+    interface.ERC20(token).transfer(swapexecutor.address, amount, {"from": weth_whale})
+    balBefore = usdc.balanceOf(weth_whale)
+    tx = swapexecutor.doOptimalSwap(token, USDC, amount, {"from": weth_whale})
+    sequential_gas += tx.gas_used
+    sequential_out += usdc.balanceOf(weth_whale) - balBefore
+  chain.revert()
+
+  for (token, amount) in zip(BASKET, amounts):
+    interface.ERC20(token).transfer(swapexecutor.address, amount, {"from": weth_whale})
+  sells = [(token, amount, 0) for (token, amount) in zip(BASKET, amounts)]
+  balBefore = usdc.balanceOf(weth_whale)
+  tx_batch = swapexecutor.doOptimalSwapBatch(sells, WETH, USDC, 0, True, {"from": weth_whale})
+  (batch_out, amountsOut) = tx_batch.return_value
+
+  print("basket of", len(BASKET), "tokens: sequential gas", sequential_gas, "out", sequential_out, "| batch gas", tx_batch.gas_used, "out", batch_out, "skipped", amountsOut.count(0))
+  assert usdc.balanceOf(weth_whale) - balBefore == batch_out > 0
+  assert tx_batch.gas_used < sequential_gas
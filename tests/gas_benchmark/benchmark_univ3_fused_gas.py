@@ -0,0 +1,46 @@
+import brownie
+from brownie import *
+import pytest
+
+from helpers.pool_addresses import univ3_pool
+
+"""
+    Benchmark test for gas of the fused Uniswap V3 quote (simulateUniV3SwapFused) against the in-range liquidity check
+    followed by the full simulation, on the pairs of test_univ3_pricer_simu.py
+    Cross-ticks swaps save the second read of the pool state & the repeated first swap step
+    This file is ok to be exclcuded in test suite due to its underluying functionality should be covered by other tests
+    Rename the file to test_benchmark_univ3_fused_gas.py to make this part of the testing suite if required
+"""
+
+DAI = "0x6B175474E89094C44Da98b954EedeAC495271d0F"
+USDC = "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48"
+USDT = "0xdAC17F958D2ee523a2206206994597C13D831ec7"
+TUSD = "0x0000000000085d4780B73119b644AE5ecd22b376"
+WETH = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+LOOKS = "0xf4d2888d29D722226FafA5d9B24F9164c092421E"
+SETH2 = "0xFe2e637202056d30016725477c5da089Ab0A043A"
+USDM = "0xbbAec992fc2d637151dAF40451f160bF85f3C8C1"
+
+SWAPS = [
+  (DAI, USDC, 10000 * 10**18),
+  (WETH, USDT, 10 * 10**18),
+  (WETH, SETH2, 10 * 10**18),
+  (USDC, USDT, 10000 * 10**6),
+  (USDC, TUSD, 10000 * 10**6),
+  (USDC, USDM, 10000 * 10**6),
+  (LOOKS, WETH, 600000 * 10**18),
+  (WETH, LOOKS, 500 * 10**18),
+]
+
+@pytest.mark.parametrize("tokenIn,tokenOut,amountIn", SWAPS)
+def test_gas_univ3_fused_simulation(tokenIn, tokenOut, amountIn, pricerwrapper):
+  (token0, token1) = sorted([tokenIn, tokenOut], key=lambda t: int(t, 16))
+  token0Price = (token0 == tokenIn)
+
+  for fee in [100, 500, 3000, 10000]:
+    pool = univ3_pool(token0, token1, fee)
+    (gas, crossTicks, quote) = pricerwrapper.checkThenSimulateUniV3Swap(token0, token1, amountIn, fee, token0Price, pool)
+    (fusedGas, fusedCrossTicks, fusedQuote) = pricerwrapper.simulateUniV3SwapFused(token0, token1, amountIn, fee, token0Price, pool)
+
+    print(tokenIn, "->", tokenOut, fee, ": cross ticks", crossTicks, "gas check then simulate", gas, "fused", fusedGas, "saved", gas - fusedGas)
+    assert (fusedCrossTicks, fusedQuote) == (crossTicks, quote)
@@ -0,0 +1,65 @@
+import brownie
+from brownie import *
+import pytest
+
+from helpers.pool_addresses import univ3_pool
+
+"""
+    Benchmark test for external calls & gas of multi-tick Uniswap V3 simulations
+    Without the bitmap word cache each swap step calls tickBitmap() on the pool, with it only steps moving to another word do
+    The SqrtRatioTable fast path (simulateUniV3SwapWithTable) is compared to the default TickMath path on the same swaps
+    This file is ok to be exclcuded in test suite due to its underluying functionality should be covered by other tests
+    Rename the file to test_benchmark_univ3_simulator_gas.py to make this part of the testing suite if required
+"""
+
+LOOKS = "0xf4d2888d29D722226FafA5d9B24F9164c092421E"
+WETH = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+WBTC = "0x2260FAC5E5542a773Aa44fBCfeDf7C193bc2C599"
+
+SWAPS = [
+  (LOOKS, WETH, 3000, 6000000 * 10**18),
+  (WETH, LOOKS, 3000, 1000 * 10**18),
+  (WETH, WBTC, 3000, 5000 * 10**18),
+  (WETH, WBTC, 500, 5000 * 10**18),
+  (WBTC, WETH, 3000, 300 * 10**8),
+]
+
+@pytest.mark.parametrize("tokenIn,tokenOut,fee,amountIn", SWAPS)
+def test_gas_univ3_multi_tick_simulation(tokenIn, tokenOut, fee, amountIn, pricerwrapper):
+  simulator = UniV3SwapSimulator.at(OnChainPricingMainnet.at(pricerwrapper.pricer()).uniV3Simulator())
+  (token0, token1) = sorted([tokenIn, tokenOut], key=lambda t: int(t, 16))
+  zeroForOne = (token0 == tokenIn)
+  pool = univ3_pool(token0, token1, fee)
+
+  (amountOut, steps, bitmapReads) = simulator.simulateUniV3SwapStats(pool, zeroForOne, fee, amountIn)
+  (gas, simOut) = pricerwrapper.simulateUniV3Swap(token0, amountIn, token1, fee, zeroForOne, pool)
+
+  print(tokenIn, "->", tokenOut, fee, ": steps", steps, "tickBitmap() calls", bitmapReads, "(uncached", steps, ") gas", gas)
+  assert simOut == amountOut
+  assert bitmapReads <= steps
+
+@pytest.fixture(scope="module")
+def sqrt_ratio_table():
+  return SqrtRatioTable.deploy({"from": accounts[0]})
+
+@pytest.mark.parametrize("tokenIn,tokenOut,fee,amountIn", SWAPS)
+def test_gas_univ3_simulation_with_table(tokenIn, tokenOut, fee, amountIn, pricerwrapper, sqrt_ratio_table):
+  simulator = UniV3SwapSimulator.at(OnChainPricingMainnet.at(pricerwrapper.pricer()).uniV3Simulator())
+  (token0, token1) = sorted([tokenIn, tokenOut], key=lambda t: int(t, 16))
+  zeroForOne = (token0 == tokenIn)
+  pool = univ3_pool(token0, token1, fee)
+
+  (amountOut, steps, bitmapReads) = simulator.simulateUniV3SwapStats(pool, zeroForOne, fee, amountIn)
+  tableOut = simulator.simulateUniV3SwapWithTable(pool, zeroForOne, fee, amountIn, sqrt_ratio_table)
+  gas = simulator.simulateUniV3Swap.estimate_gas(pool, token0, token1, zeroForOne, fee, amountIn)
+  tableGas = simulator.simulateUniV3SwapWithTable.estimate_gas(pool, zeroForOne, fee, amountIn, sqrt_ratio_table)
+
+  print(tokenIn, "->", tokenOut, fee, ": steps", steps, "gas TickMath", gas, "with table", tableGas, "saved", gas - tableGas)
+  assert tableOut == amountOut
+
+@pytest.mark.parametrize("tickSpacing", [1, 10, 60, 200])
+def test_gas_sqrt_ratio_at_tick(tickSpacing, sqrt_ratio_table):
+  tester = TickMathTableTester.deploy({"from": accounts[0]})
+  count = 500
+  (tickMathGas, tableGas) = tester.gasOf(sqrt_ratio_table, -250 * tickSpacing, tickSpacing, count)
+  print("tick spacing", tickSpacing, ": getSqrtRatioAtTick avg gas TickMath", tickMathGas // count, "with table", tableGas // count)
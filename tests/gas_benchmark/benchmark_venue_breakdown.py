@@ -0,0 +1,37 @@
+import brownie
+from brownie import *
+import pytest
+
+from helpers.venue_report import venue_report, format_report
+
+"""
+    Benchmark test for the per-venue cost breakdown of findOptimalSwap (gas, external calls & UniV3 ticks crossed)
+    The full report over TOP_DECIMAL18_TOKENS is produced by scripts/venue_report.py
+    This file is ok to be exclcuded in test suite due to its underluying functionality should be covered by other tests
+    Rename the file to test_benchmark_venue_breakdown.py to make this part of the testing suite if required
+"""
+
+LOOKS = "0xf4d2888d29D722226FafA5d9B24F9164c092421E"
+AURA = "0xC0c293ce456fF0ED870ADd98a0828Dd4d2903DBF"
+DAI = "0x6B175474E89094C44Da98b954EedeAC495271d0F"
+CRV = "0xD533a949740bb3306d119CC777fa900bA034cd52"
+WETH = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+WBTC = "0x2260FAC5E5542a773Aa44fBCfeDf7C193bc2C599"
+USDC = "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48"
+
+SWAPS = [
+  (LOOKS, WETH, 600000 * 10**18), ## UNIV3 cross-ticks
+  (AURA, WBTC, 8000 * 10**18), ## BALANCERWITHWETH
+  (DAI, USDC, 50000 * 10**18), ## CURVE
+  (CRV, WETH, 10000 * 10**18),
+]
+
+def test_gas_venue_breakdown(pricerwrapper):
+  report = venue_report(pricerwrapper, SWAPS, accounts[0], chain.height)
+  print(format_report(report))
+
+  for swap in report["swaps"]:
+    outs = {v["venue"]: v["amountOut"] for v in swap["venues"]}
+    assert outs[swap["quote"]["venue"]] == swap["quote"]["amountOut"]
+    assert sum(v["gas"] for v in swap["venues"]) > 0
+  assert report["venues"]["UNIV3"]["ticksCrossed"] > 0
@@ -159,4 +159,129 @@ def test_get_balancer_pools(weth, usdc, wbtc, pricer):
   assert pricer.getBalancerV2Pool(pricer.CREAM(), weth.address) != nonExistPool and pricer.getBalancerV2Pool(pricer.CREAM(), usdc.address) == nonExistPool
   assert pricer.getBalancerV2Pool(pricer.WBTC(), pricer.BADGER()) != nonExistPool and pricer.getBalancerV2Pool(pricer.WBTC(), usdc.address) == nonExistPool
   assert pricer.getBalancerV2Pool(pricer.LDO(), weth.address) != nonExistPool and pricer.getBalancerV2Pool(pricer.LDO(), usdc.address) == nonExistPool and pricer.getBalancerV2Pool(pricer.LDO(), wbtc.address) == nonExistPool
-  
\ No newline at end of file
+  
+"""
+    Balancer pool registry: TechOps can add candidate pools for a pair, all candidates are quoted and the best is used
+"""
+def test_balancer_pool_registry(oneE18, weth, usdc, dai, aura, pricer):
+  techOps = accounts.at(pricer.TECH_OPS(), force=True)
+  nonExistPool = pricer.BALANCERV2_NONEXIST_POOLID()
+  stablePool = pricer.BALANCERV2_DAI_USDC_USDT_POOLID()
+  sell_amount = 50000 * oneE18
+
+  ## not seeded by default
+  assert pricer.getBalancerV2Pool(dai.address, usdc.address) == nonExistPool
+  assert pricer.getBalancerPriceAnalytically(dai.address, sell_amount, usdc.address) == 0
+
+  with brownie.reverts("Only TechOps"):
+    pricer.addBalancerV2Pool(dai.address, usdc.address, stablePool, {"from": accounts[0]})
+  with brownie.reverts("!inBAL"):
+    pricer.addBalancerV2Pool(weth.address, usdc.address, stablePool, {"from": techOps})
+
+  pricer.addBalancerV2Pool(usdc.address, dai.address, stablePool, {"from": techOps})
+  assert pricer.getBalancerV2Pool(dai.address, usdc.address) == stablePool
+  assert pricer.getBalancerPriceAnalytically(dai.address, sell_amount, usdc.address) == pricer.getBalancerQuoteWithinPoolAnalytcially(stablePool, dai.address, sell_amount, usdc.address)
+
+  with brownie.reverts("!dupBAL"):
+    pricer.addBalancerV2Pool(dai.address, usdc.address, stablePool, {"from": techOps})
+
+  pricer.removeBalancerV2Pool(dai.address, usdc.address, stablePool, {"from": techOps})
+  assert len(pricer.getBalancerV2Pools(dai.address, usdc.address)) == 0
+  with brownie.reverts("!BAL"):
+    pricer.removeBalancerV2Pool(dai.address, usdc.address, stablePool, {"from": techOps})
+
+def test_balancer_pool_registry_best_candidate(oneE18, weth, aura, pricer):
+  techOps = accounts.at(pricer.TECH_OPS(), force=True)
+  defaultPool = pricer.BALANCERV2_AURA_WETH_POOLID()
+  ## bveAURA-WETH-AURA
+  secondPool = "0xa3283e3470d3cd1f18c074e3f2d3965f6d62fff2000100000000000000000267"
+  sell_amount = 8000 * oneE18
+
+  pricer.addBalancerV2Pool(aura.address, weth.address, secondPool, {"from": techOps})
+  assert pricer.getBalancerV2Pool(aura.address, weth.address) == defaultPool
+  assert list(pricer.getBalancerV2Pools(weth.address, aura.address)) == [defaultPool, secondPool]
+
+  quoteDefault = pricer.getBalancerQuoteWithinPoolAnalytcially(defaultPool, aura.address, sell_amount, weth.address)
+  quoteSecond = pricer.getBalancerQuoteWithinPoolAnalytcially(secondPool, aura.address, sell_amount, weth.address)
+  assert pricer.getBalancerPriceAnalytically(aura.address, sell_amount, weth.address) == max(quoteDefault, quoteSecond)
+
+  ## removing keeps the order of the remaining candidates
+  pricer.removeBalancerV2Pool(aura.address, weth.address, defaultPool, {"from": techOps})
+  assert pricer.getBalancerV2Pool(aura.address, weth.address) == secondPool
+
+"""
+    cached pool descriptors (type, weights & decimals) quote exactly like detecting the pool type on every quote
+"""
+def test_balancer_pool_descriptor_cache(oneE18, weth, usdc, dai, aura, pricer):
+  techOps = accounts.at(pricer.TECH_OPS(), force=True)
+  wsteth = pricer.WSTETH()
+  weightedPool = pricer.BALANCERV2_AURA_WETH_POOLID()
+  metaStablePool = pricer.BALANCERV2_WSTETH_WETH_POOLID()
+  vault = interface.IBalancerV2Vault(pricer.BALANCERV2_VAULT())
+
+  for (poolId, tokenIn, tokenOut, amounts, poolType) in [(weightedPool, aura.address, weth.address, [100 * oneE18, 8000 * oneE18], 1), (metaStablePool, wsteth, weth.address, [1 * oneE18, 1000 * oneE18], 2)]:
+    ## default pools are cached at deployment
+    descriptor = pricer.getBalancerV2PoolDescriptor(poolId)
+    (cachedType, nTokens, decimals, weights) = descriptor
+    tokens = vault.getPoolTokens(poolId)[0]
+    assert cachedType == poolType and nTokens == len(tokens)
+    assert [(decimals >> (8 * k)) & 0xff for k in range(nTokens)] == [interface.ERC20(t).decimals() for t in tokens]
+    if poolType == 1:
+      assert list(weights[:nTokens]) == list(interface.IBalancerV2WeightedPool(getAddressFromPoolId(poolId)).getNormalizedWeights())
+
+    quotes = [pricer.getBalancerQuoteWithinPoolAnalytcially(poolId, tokenIn, a, tokenOut) for a in amounts]
+    reverseQuotes = [pricer.getBalancerQuoteWithinPoolAnalytcially(poolId, tokenOut, q, tokenIn) for q in quotes]
+
+    ## removing the pool from its only pair drops its descriptor, the pool type is then detected on every quote
+    pricer.removeBalancerV2Pool(tokenIn, tokenOut, poolId, {"from": techOps})
+    assert pricer.getBalancerV2PoolDescriptor(poolId)[0] == 0
+    assert [pricer.getBalancerQuoteWithinPoolAnalytcially(poolId, tokenIn, a, tokenOut) for a in amounts] == quotes
+    assert [pricer.getBalancerQuoteWithinPoolAnalytcially(poolId, tokenOut, q, tokenIn) for q in quotes] == reverseQuotes
+
+    ## adding it back caches it again
+    pricer.addBalancerV2Pool(tokenIn, tokenOut, poolId, {"from": techOps})
+    assert pricer.getBalancerV2PoolDescriptor(poolId) == descriptor
+
+    ## TechOps can refresh a registered pool
+    with brownie.reverts("Only TechOps"):
+      pricer.cacheBalancerV2Pool(tokenIn, tokenOut, poolId, {"from": accounts[1]})
+    with brownie.reverts("!BAL"):
+      pricer.cacheBalancerV2Pool(usdc.address, tokenOut, poolId, {"from": techOps})
+    pricer.cacheBalancerV2Pool(tokenIn, tokenOut, poolId, {"from": techOps})
+    assert pricer.getBalancerV2PoolDescriptor(poolId) == descriptor
+
+  ## a pool registered for several pairs keeps its descriptor until it is removed from all of them
+  ohm = pricer.OHM()
+  ohmPool = pricer.BALANCERV2_OHM_DAI_WETH_POOLID()
+  descriptor = pricer.getBalancerV2PoolDescriptor(ohmPool)
+  pricer.removeBalancerV2Pool(ohm, weth.address, ohmPool, {"from": techOps})
+  assert pricer.getBalancerV2PoolDescriptor(ohmPool) == descriptor
+  pricer.removeBalancerV2Pool(ohm, dai.address, ohmPool, {"from": techOps})
+  assert pricer.getBalancerV2PoolDescriptor(ohmPool)[0] == 0
+
+  ## pools added by TechOps are cached right away, e.g. the 3-token stable pool
+  stablePool = pricer.BALANCERV2_DAI_USDC_USDT_POOLID()
+  sell_amount = 50000 * oneE18
+  quote = pricer.getBalancerQuoteWithinPoolAnalytcially(stablePool, dai.address, sell_amount, usdc.address)
+  pricer.addBalancerV2Pool(dai.address, usdc.address, stablePool, {"from": techOps})
+  (cachedType, nTokens, decimals, _) = pricer.getBalancerV2PoolDescriptor(stablePool)
+  assert cachedType == 2 and nTokens == 3
+  assert pricer.getBalancerPriceAnalytically(dai.address, sell_amount, usdc.address) == quote
+
+def getAddressFromPoolId(poolId):
+  return "0x" + bytes(poolId)[:20].hex()
+
+"""
+    connector quotes read each pool once, e.g. auraBAL/graviAURA/WETH for both legs, and quote like pricing each leg on its own
+"""
+def test_balancer_connector_shared_pool_reads(oneE18, weth, usdc, aura, aurabal, pricer):
+  graviaura = pricer.GRAVIAURA()
+  ohm = pricer.OHM()
+  dai = pricer.DAI()
+  for (tokenIn, tokenOut, amountIn) in [(aurabal.address, graviaura, 1000 * oneE18), (graviaura, aurabal.address, 1000 * oneE18), (aura.address, usdc.address, 8000 * oneE18), (ohm, dai, 100 * 10**9), (usdc.address, aura.address, 0)]:
+    direct = pricer.getBalancerPriceAnalytically(tokenIn, amountIn, tokenOut)
+    leg = pricer.getBalancerPriceAnalytically(tokenIn, amountIn, weth.address)
+    withWeth = pricer.getBalancerPriceAnalytically(weth.address, leg, tokenOut) if leg > 0 else 0
+
+    assert pricer.getBalancerPriceWithConnectorAnalytically(tokenIn, amountIn, tokenOut, weth.address) == withWeth
+    assert pricer.getBalancerPricesWithConnectorAnalytically(tokenIn, amountIn, tokenOut, weth.address) == (direct, withWeth)
@@ -0,0 +1,85 @@
+import brownie
+from brownie import *
+
+import pytest
+
+"""
+    Differential tests: getCurvePriceAnalytically (CurveSwapSimulator StableSwap math over the indexed pool)
+    must match get_dy of the real Curve pool exactly
+"""
+
+DAI = "0x6B175474E89094C44Da98b954EedeAC495271d0F"
+USDC = "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48"
+USDT = "0xdAC17F958D2ee523a2206206994597C13D831ec7"
+FRAX = "0x853d955aCEf822Db058eb8505911ED77F175b99e"
+CVX = "0x4e3FBD56CD56c3e72c1403e103b45Db9da5B9D2B"
+BVE_CVX = "0xfd05D3C7fe2924020620A8bE4961bBaA747e6305"
+
+SWAPS = [
+  (DAI, USDC, 1 * 10**18),
+  (DAI, USDC, 10000000 * 10**18),
+  (USDC, USDT, 1000 * 10**6),
+  (USDT, DAI, 5000000 * 10**6),
+  (FRAX, USDC, 100 * 10**18),
+  (USDC, FRAX, 20000000 * 10**6),
+  (CVX, BVE_CVX, 1 * 10**18),
+  (CVX, BVE_CVX, 100000 * 10**18),
+  (BVE_CVX, CVX, 50000 * 10**18),
+]
+
+def pool_indices(pool, tokenIn, tokenOut):
+  coins = []
+  for k in range(4):
+    try:
+      coins.append(pool.coins(k))
+    except:
+      break
+  return (coins.index(tokenIn), coins.index(tokenOut))
+
+@pytest.mark.parametrize("tokenIn,tokenOut,amountIn", SWAPS)
+def test_curve_simulator_matches_get_dy(tokenIn, tokenOut, amountIn, pricer):
+  poolAddress = pricer.getCurvePool(tokenIn, tokenOut)
+  assert poolAddress != "0x0000000000000000000000000000000000000000"
+  pool = interface.ICurvePool(poolAddress)
+  (i, j) = pool_indices(pool, tokenIn, tokenOut)
+
+  (quotePool, quote) = pricer.getCurvePriceAnalytically(tokenIn, amountIn, tokenOut)
+  assert quotePool == poolAddress
+  assert quote == pool.get_dy(i, j, amountIn)
+
+"""
+    findOptimalSwap takes the Curve quote of an indexed pair from the simulator, with the pool & its fee
+"""
+def test_find_optimal_swap_indexed_curve(oneE18, pricer):
+  sell_amount = 1000 * oneE18
+  quote = pricer.findOptimalSwap(CVX, BVE_CVX, sell_amount)
+  (_, curveQuote) = pricer.getCurvePriceAnalytically(CVX, sell_amount, BVE_CVX)
+  assert quote[1] >= curveQuote
+  if quote[0] == 0: ## CURVE
+    assert quote[1] == curveQuote
+
+"""
+    Curve index is managed by TechOps, a removed pair falls back to the router
+"""
+def test_curve_index_management(oneE18, pricer):
+  techOps = accounts.at(pricer.TECH_OPS(), force=True)
+  zero = "0x0000000000000000000000000000000000000000"
+
+  with brownie.reverts("Only TechOps"):
+    pricer.removeCurvePool(DAI, USDC, {"from": accounts[0]})
+  with brownie.reverts("Only TechOps"):
+    pricer.addCurvePool(pricer.CURVE_3POOL(), 3, False, {"from": accounts[0]})
+
+  pricer.removeCurvePool(USDC, DAI, {"from": techOps})
+  assert pricer.getCurvePool(DAI, USDC) == zero
+  assert pricer.getCurvePriceAnalytically(DAI, oneE18, USDC) == (zero, 0)
+  assert pricer.getCurvePool(DAI, USDT) == pricer.CURVE_3POOL()
+  with brownie.reverts("!CRV"):
+    pricer.removeCurvePool(DAI, USDC, {"from": techOps})
+
+  with brownie.reverts("!nCRV"):
+    pricer.addCurvePool(pricer.CURVE_3POOL(), 5, False, {"from": techOps})
+  pricer.addCurvePool(pricer.CURVE_3POOL(), 3, False, {"from": techOps})
+  assert pricer.getCurvePool(DAI, USDC) == pricer.CURVE_3POOL()
+  ## pairs of other indexed pools are untouched
+  assert pricer.getCurvePool(FRAX, USDC) == pricer.CURVE_FRAXBP()
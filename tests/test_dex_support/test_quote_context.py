@@ -0,0 +1,58 @@
+import brownie
+from brownie import *
+
+import pytest
+
+"""
+    findOptimalSwapWithContext returns the findOptimalSwap quote and memoizes it in the context:
+    a request already in the context is served from it, a new one is quoted and appended
+"""
+def test_quote_context_memoizes(oneE18, weth, usdc, wbtc, pricer):
+  sell_amount = 1 * oneE18
+  quote = pricer.findOptimalSwap(weth.address, usdc.address, sell_amount)
+
+  ctx = ([], [], 0)
+  (supported, ctx) = pricer.isPairSupportedWithContext(weth.address, usdc.address, sell_amount, ctx)
+  assert supported
+  assert ctx[2] == 1
+  (supported, ctx) = pricer.isPairSupportedWithContext(weth.address, usdc.address, sell_amount, ctx)
+  assert supported
+  assert ctx[2] == 1
+
+  ## the venue found by the support check isn't a quote
+  (ctxQuote, ctx) = pricer.findOptimalSwapWithContext(weth.address, usdc.address, sell_amount, ctx)
+  assert ctx[2] == 2
+  assert ctxQuote == quote
+
+  ## a different amount is another request
+  (_, ctx) = pricer.findOptimalSwapWithContext(weth.address, usdc.address, sell_amount * 2, ctx)
+  (_, ctx) = pricer.findOptimalSwapWithContext(weth.address, wbtc.address, sell_amount, ctx)
+  assert ctx[2] == 4
+  (ctxQuote, ctx) = pricer.findOptimalSwapWithContext(weth.address, usdc.address, sell_amount, ctx)
+  assert ctx[2] == 4
+  assert ctxQuote == quote
+
+  ## a quoted request is supported as quoted
+  (supported, ctx) = pricer.isPairSupportedWithContext(weth.address, wbtc.address, sell_amount, ctx)
+  assert supported
+  assert ctx[2] == 4
+
+"""
+    isPairSupportedWithContext gives the same answer as isPairSupported, only a venue found is memoized
+"""
+def test_quote_context_unsupported_pair(oneE18, weth, pricer):
+  token = "0x0000000000000000000000000000000000000001"
+  (supported, ctx) = pricer.isPairSupportedWithContext(weth.address, token, oneE18, ([], [], 0))
+  assert supported == pricer.isPairSupported(weth.address, token, oneE18) == False
+  assert ctx[2] == 0
+
+"""
+    the swap executor hands back the context it was given, with the quote of the swap memoized
+"""
+def test_quote_context_from_swap(oneE18, weth, usdc, weth_whale, pricer, swapexecutor):
+  sell_amount = 1 * oneE18
+  weth.transfer(swapexecutor.address, sell_amount, {'from': weth_whale})
+  tx = swapexecutor.doOptimalSwapWithContext(weth.address, usdc.address, sell_amount, ([], [], 0), {'from': weth_whale})
+  (out, ctx) = tx.return_value
+  assert out > 0
+  assert ctx[2] == 1
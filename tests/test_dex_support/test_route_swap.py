@@ -0,0 +1,86 @@
+import brownie
+from brownie import *
+
+import pytest
+
+LOOKS = "0xf4d2888d29D722226FafA5d9B24F9164c092421E"
+WSTETH = "0x7f39C581F595B53c5cb19bD0b3f8dA6c935E2Ca0"
+NULL = "0x0000000000000000000000000000000000000000"
+
+"""
+    default connectors & their management by TechOps
+"""
+def test_route_connectors(weth, usdc, dai, wbtc, badger, quoter):
+  techOps = accounts.at(quoter.TECH_OPS(), force=True)
+  assert list(quoter.getConnectors()) == [weth.address, usdc.address, dai.address, wbtc.address, WSTETH]
+
+  with brownie.reverts("Only TechOps"):
+    quoter.addConnector(badger.address, {"from": accounts[0]})
+  with brownie.reverts("!dupConnector"):
+    quoter.addConnector(usdc.address, {"from": techOps})
+
+  quoter.addConnector(badger.address, {"from": techOps})
+  assert list(quoter.getConnectors()) == [weth.address, usdc.address, dai.address, wbtc.address, WSTETH, badger.address]
+
+  quoter.removeConnector(usdc.address, {"from": techOps})
+  assert list(quoter.getConnectors()) == [weth.address, dai.address, wbtc.address, WSTETH, badger.address]
+  with brownie.reverts("!connector"):
+    quoter.removeConnector(usdc.address, {"from": techOps})
+
+"""
+    two-hop route with mixed venues (e.g. UniV3 LOOKS-WETH then any venue WETH-WBTC) at least as good as findOptimalSwap
+"""
+def test_route_via_connector(oneE18, wbtc, weth, pricer, quoter):
+  sell_amount = 600000 * oneE18
+
+  route = quoter.findOptimalRoute(LOOKS, wbtc.address, sell_amount)
+  quote = pricer.findOptimalSwap(LOOKS, wbtc.address, sell_amount)
+  assert route[1] != NULL
+  assert route[0] == route[3][1]
+  if route[2][0] == 3: ## UNIV3
+    assert len(route[2][3]) == 1 ## UniV3 fee of the first leg
+  assert route[0] >= quote[1]
+
+  ## both legs carry their pool like findOptimalSwap quotes
+  for leg in [route[2], route[3]]:
+    assert len(leg[2]) >= 1
+    assert int(leg[2][0].hex(), 16) != 0
+
+"""
+    direct route when the pair is the most liquid one
+"""
+def test_route_direct(oneE18, weth, usdc, pricer, quoter):
+  sell_amount = 10 * oneE18
+
+  route = quoter.findOptimalRoute(weth.address, usdc.address, sell_amount)
+  quote = pricer.findOptimalSwap(weth.address, usdc.address, sell_amount)
+  assert route[0] >= quote[1]
+  if route[1] == NULL:
+    assert route[0] == route[2][1]
+
+"""
+    no route without any pool
+"""
+def test_route_no_pool(oneE18, weth, quoter):
+  route = quoter.findOptimalRoute(weth.address, "0x0000000000000000000000000000000000000001", oneE18)
+  assert route[0] == 0
+  assert route[1] == NULL
+
+"""
+    route of the pricer via a single connector, zero without pools from the connector to tokenOut, the direct swap for a null connector
+"""
+def test_route_via_single_connector(oneE18, weth, wbtc, pricer):
+  sell_amount = 600000 * oneE18
+
+  route = pricer.findOptimalRouteViaConnector(LOOKS, wbtc.address, sell_amount, weth.address)
+  assert route[0] > 0
+  assert route[1] == weth.address
+  assert route[0] == route[3][1]
+
+  route = pricer.findOptimalRouteViaConnector(weth.address, "0x0000000000000000000000000000000000000001", oneE18, wbtc.address)
+  assert route[0] == 0
+  assert route[1] == NULL
+
+  route = pricer.findOptimalRouteViaConnector(LOOKS, wbtc.address, sell_amount, NULL)
+  assert route[1] == NULL
+  assert route[0] == route[2][1]
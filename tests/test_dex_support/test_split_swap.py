@@ -0,0 +1,70 @@
+import brownie
+from brownie import *
+
+import pytest
+
+from helpers.pool_addresses import univ2_pair, sushi_pair, univ3_pool, UNIV2_FACTORY, UNIV2_POOL_INITCODE
+
+UNIV2_ROUTER = "0x7a250d5630B4cF539739dF2C5dAcb4c659F2488D"
+SUSHI_ROUTER = "0xd9e1cE17f2641f24aE83637ab66a2cca9C378B9F"
+
+def best_single_pool_quote(pricer, tokenIn, amountIn, tokenOut):
+  return max([
+    pricer.getUniPrice(UNIV2_ROUTER, tokenIn, tokenOut, amountIn),
+    pricer.getUniPrice(SUSHI_ROUTER, tokenIn, tokenOut, amountIn),
+    pricer.getUniV3Price(tokenIn, amountIn, tokenOut),
+    pricer.getBalancerPriceAnalytically(tokenIn, amountIn, tokenOut),
+  ])
+
+"""
+    findOptimalSplitSwap for a large sell: legs add up to the input & total, and beat the best single pool
+"""
+def test_split_swap_large_sell(oneE18, weth, usdc, pricer, quoter):
+  sell_amount = 10000 * oneE18
+
+  splitQuote = quoter.findOptimalSplitSwap(weth.address, usdc.address, sell_amount)
+  legs = splitQuote[1]
+  assert 1 < len(legs) <= quoter.SPLIT_MAX_LEGS()
+  assert sum([leg[1] for leg in legs]) == sell_amount
+  assert sum([leg[2] for leg in legs]) == splitQuote[0]
+  for leg in legs:
+    assert leg[0] in [1, 2, 3, 5] ## UNIV2 or SUSHI or UNIV3 or BALANCER
+    assert len(leg[3]) == 1
+    assert len(leg[4]) == (1 if leg[0] == 3 else 0)
+
+  assert splitQuote[0] > best_single_pool_quote(pricer, weth.address, sell_amount, usdc.address)
+
+"""
+    findOptimalSplitSwap for a small sell goes through a single pool with the best single pool quote
+"""
+def test_split_swap_small_sell(oneE18, weth, usdc, pricer, quoter):
+  sell_amount = 1 * oneE18 // 10
+
+  splitQuote = quoter.findOptimalSplitSwap(weth.address, usdc.address, sell_amount)
+  assert len(splitQuote[1]) >= 1
+  assert splitQuote[0] >= best_single_pool_quote(pricer, weth.address, sell_amount, usdc.address)
+
+"""
+    findOptimalSplitSwap without any pool for the pair
+"""
+def test_split_swap_no_pool(oneE18, weth, quoter):
+  splitQuote = quoter.findOptimalSplitSwap(weth.address, "0x0000000000000000000000000000000000000001", oneE18)
+  assert splitQuote[0] == 0
+  assert len(splitQuote[1]) == 0
+
+"""
+    pools of the split legs, derived once per pair, are the CREATE2 addresses of the UniV2 & Sushi pairs and UniV3 pools
+"""
+def test_split_swap_leg_pools(oneE18, weth, usdc, pricer, quoter):
+  splitQuote = quoter.findOptimalSplitSwap(weth.address, usdc.address, 10000 * oneE18)
+  for leg in splitQuote[1]:
+    pool = pricer.getAddressFromBytes32Msb(leg[3][0])
+    if leg[0] == 1:
+      assert pool.lower() == univ2_pair(weth.address, usdc.address).lower()
+    elif leg[0] == 2:
+      assert pool.lower() == sushi_pair(weth.address, usdc.address).lower()
+    elif leg[0] == 3:
+      assert pool.lower() == univ3_pool(weth.address, usdc.address, leg[4][0]).lower()
+
+  (pair, token0, token1) = pricer.pairForUniV2(UNIV2_FACTORY, weth.address, usdc.address, UNIV2_POOL_INITCODE)
+  assert (pair, token0, token1) == (univ2_pair(weth.address, usdc.address), usdc.address, weth.address)
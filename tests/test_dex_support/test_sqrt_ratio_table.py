@@ -0,0 +1,60 @@
+import brownie
+from brownie import *
+from brownie.test import given, strategy
+import pytest
+
+from helpers.pool_addresses import univ3_pool
+from helpers.univ3_math import MIN_TICK, MAX_TICK
+
+"""
+    TickMathTable#getSqrtRatioAtTick (partial products of the low tick bits read from a SqrtRatioTable)
+    must give exactly TickMath#getSqrtRatioAtTick, and the simulator fast path exactly simulateUniV3Swap
+"""
+
+LOOKS = "0xf4d2888d29D722226FafA5d9B24F9164c092421E"
+WETH = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+WBTC = "0x2260FAC5E5542a773Aa44fBCfeDf7C193bc2C599"
+USDC = "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48"
+
+@pytest.fixture(scope="module")
+def table():
+  return SqrtRatioTable.deploy({"from": accounts[0]})
+
+@pytest.fixture(scope="module")
+def tester():
+  return TickMathTableTester.deploy({"from": accounts[0]})
+
+def test_table_every_low_bits(table, tester):
+  ## every entry of the table, on both sides of tick zero
+  assert tester.firstMismatch(table, -2048, 1, 4097) == (False, 0)
+
+@pytest.mark.parametrize("tickSpacing", [1, 10, 60, 200])
+def test_table_tick_spacing(table, tester, tickSpacing):
+  ## contiguous usable ticks around the price of most pools, then a sparse sweep of the whole range
+  assert tester.firstMismatch(table, -1000 * tickSpacing, tickSpacing, 2001) == (False, 0)
+  minTick = -(-MIN_TICK // tickSpacing) * tickSpacing
+  step = tickSpacing * 997
+  assert tester.firstMismatch(table, minTick, step, (2 * MAX_TICK) // step + 1) == (False, 0)
+
+def test_table_bounds(table, tester):
+  for tick in [MIN_TICK, MIN_TICK + 1, -1, 0, 1, MAX_TICK - 1, MAX_TICK]:
+    assert tester.getSqrtRatioAtTickWithTable(table, tick) == tester.getSqrtRatioAtTick(tick)
+  for tick in [MIN_TICK - 1, MAX_TICK + 1]:
+    with brownie.reverts("T"):
+      tester.getSqrtRatioAtTickWithTable(table, tick)
+
+@given(tick=strategy("int24", min_value=MIN_TICK, max_value=MAX_TICK))
+def test_table_random_ticks(table, tester, tick):
+  assert tester.getSqrtRatioAtTickWithTable(table, tick) == tester.getSqrtRatioAtTick(tick)
+
+def test_simulator_with_table(table, pricer):
+  simulator = UniV3SwapSimulator.at(pricer.uniV3Simulator())
+  for (tokenIn, tokenOut, fee, amountIn) in [(LOOKS, WETH, 3000, 6000000 * 10**18), (WETH, LOOKS, 3000, 1000 * 10**18), (WETH, WBTC, 500, 5000 * 10**18), (USDC, WETH, 500, 10000000 * 10**6), (WETH, USDC, 3000, 1 * 10**18)]:
+    (token0, token1) = sorted([tokenIn, tokenOut], key=lambda t: int(t, 16))
+    zeroForOne = (token0 == tokenIn)
+    pool = univ3_pool(token0, token1, fee)
+    expected = simulator.simulateUniV3Swap(pool, token0, token1, zeroForOne, fee, amountIn)
+    assert simulator.simulateUniV3SwapWithTable(pool, zeroForOne, fee, amountIn, table) == expected
+
+  with brownie.reverts("!table"):
+    simulator.simulateUniV3SwapWithTable(univ3_pool(token0, token1, 3000), True, 3000, 10**18, ZERO_ADDRESS)
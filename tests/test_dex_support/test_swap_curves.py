@@ -0,0 +1,81 @@
+import brownie
+from brownie import chain
+import pytest
+
+from helpers.offchain_pricer import OffChainPricer
+from helpers.chain_state import ChainStateFetcher, quote_with_fetcher
+from helpers.swap_curves import find_swap_curves, best_curve, price_impact
+
+"""
+    findSwapCurves must quote every amount exactly like the single-amount component functions
+"""
+
+LOOKS = "0xf4d2888d29D722226FafA5d9B24F9164c092421E"
+
+AMOUNTS = [10**15, 10**17, 10**18, 10**19, 10**20, 10**21, 10**22, 10**23]
+
+def test_swap_curves_match_single_quotes(weth, wbtc, pricer, quoter):
+  curves = find_swap_curves(quoter, weth.address, wbtc.address, AMOUNTS)
+
+  for (i, amountIn) in enumerate(AMOUNTS):
+    assert curves[1][i] == pricer.getUniPrice(pricer.UNIV2_ROUTER(), weth.address, wbtc.address, amountIn)
+    assert curves[2][i] == pricer.getUniPrice(pricer.SUSHI_ROUTER(), weth.address, wbtc.address, amountIn)
+    assert curves[3][i] == pricer.getUniV3Price(weth.address, amountIn, wbtc.address)
+    assert curves[0][i] == pricer.getCurvePrice(pricer.CURVE_ROUTER(), weth.address, wbtc.address, amountIn)[1]
+
+def test_swap_curves_indexed_curve_pool(usdc, dai, pricer, quoter):
+  ## indexed pair: same Curve source as findOptimalSwap, i.e. native math in the indexed pool instead of the router
+  amounts = [a // 10**12 for a in AMOUNTS]
+  curves = find_swap_curves(quoter, usdc.address, dai.address, amounts)
+
+  for (i, amountIn) in enumerate(amounts):
+    (pool, quote) = pricer.getCurvePriceAnalytically(usdc.address, amountIn, dai.address)
+    assert pool == pricer.CURVE_3POOL()
+    assert curves[0][i] == quote
+    q = pricer.findOptimalSwap(usdc.address, dai.address, amountIn)
+    if q[0] == 0:
+      assert q[1] == quote
+
+def test_swap_curves_best_is_optimal_swap(weth, usdc, pricer, quoter):
+  token = LOOKS # LOOKS-WETH-USDC covers UNIV3 & UNIV3WITHWETH
+  amounts = [a * 600 for a in AMOUNTS]
+  best = best_curve(find_swap_curves(quoter, token, usdc.address, amounts))
+
+  for (i, amountIn) in enumerate(amounts):
+    assert best[i] == pricer.findOptimalSwap(token, usdc.address, amountIn)[1]
+
+def test_swap_curves_balancer(aura, weth, wbtc, pricer, quoter):
+  ## 1e18
+  amounts = [10**18, 10**20, 8000 * 10**18]
+  curves = find_swap_curves(quoter, aura.address, wbtc.address, amounts)
+
+  for (i, amountIn) in enumerate(amounts):
+    assert curves[5][i] == pricer.getBalancerPriceAnalytically(aura.address, amountIn, wbtc.address)
+    assert curves[6][i] == pricer.getBalancerPriceWithConnectorAnalytically(aura.address, amountIn, wbtc.address, weth.address)
+
+  ## bigger amounts give a worse average price
+  impact = price_impact(amounts, curves[6])
+  assert impact[0] == 0 and impact[1] >= 0 and impact[2] > impact[1]
+
+def test_swap_curves_offchain(weth, wbtc, quoter):
+  fetcher = ChainStateFetcher(block_identifier=chain.height)
+  offchain = OffChainPricer(fetcher.state)
+  quote_with_fetcher(offchain, fetcher, "find_swap_curves", weth.address, wbtc.address, AMOUNTS)
+  offchain_curves = find_swap_curves(offchain, weth.address, wbtc.address, AMOUNTS)
+
+  assert (offchain_curves == find_swap_curves(quoter, weth.address, wbtc.address, AMOUNTS)).all()
+
+def test_swap_curves_gas(weth, wbtc, pricerwrapper, quoterwrapper):
+  pricer = pricerwrapper
+  (gas_curves, _) = quoterwrapper.findSwapCurves(weth.address, wbtc.address, AMOUNTS)
+
+  gas_singles = 0
+  for amountIn in AMOUNTS:
+    gas_singles += pricer.findOptimalSwap(weth.address, wbtc.address, amountIn)[0]
+
+  print("findSwapCurves", gas_curves, "vs", len(AMOUNTS), "findOptimalSwap", gas_singles)
+  assert gas_curves < gas_singles
+
+def test_swap_curves_not_ascending(weth, wbtc, quoter):
+  with brownie.reverts("!asc"):
+    quoter.findSwapCurves(weth.address, wbtc.address, [10**18, 10**17])
@@ -2,6 +2,8 @@ import brownie
 from brownie import *
 import pytest
 
+from helpers.pool_addresses import univ3_pool
+
 """
     sortUniV3Pools quote for stablecoin A swapped to stablecoin B which try for in-range swap before full-simulation
     https://info.uniswap.org/#/tokens/0x6b175474e89094c44da98b954eedeac495271d0f
@@ -98,4 +100,65 @@ def test_only_curve_support(oneE18, usdc, badger, aura, pricerwrapper):
   ## not supported yet
   isBadgerAuraSupported = pricer.isPairSupported(badger.address, aura.address, sell_amount * 100)
   assert isBadgerAuraSupported == False
- 
\ No newline at end of file
+ 
+"""
+    simulateUniV3SwapBounded stops after given tick boundaries, its output & upper bound enclose the full simulation
+"""
+def test_simu_univ3_swap_bounded(weth, pricer):
+  simulator = UniV3SwapSimulator.at(pricer.uniV3Simulator())
+  looks = "0xf4d2888d29D722226FafA5d9B24F9164c092421E"
+  sell_amount = 6000000 * 10**18
+  (token0, token1) = sorted([looks, weth.address], key=lambda t: int(t, 16))
+  zeroForOne = (token0 == looks)
+
+  for fee in [3000, 10000]:
+    pool = univ3_pool(token0, token1, fee)
+    full = simulator.simulateUniV3Swap(pool, token0, token1, zeroForOne, fee, sell_amount)
+
+    unbounded = simulator.simulateUniV3SwapBounded(pool, zeroForOne, fee, sell_amount, 0, 0)
+    assert unbounded["truncated"] == False
+    assert unbounded["amountOut"] == full and unbounded["upperBound"] == full
+
+    bounded = simulator.simulateUniV3SwapBounded(pool, zeroForOne, fee, sell_amount, 2, 0)
+    if bounded["truncated"]:
+      assert bounded["ticksCrossed"] == 2
+      assert bounded["amountInRemaining"] > 0
+      assert bounded["amountOut"] <= full < bounded["upperBound"]
+    else:
+      assert bounded["amountOut"] == full
+
+"""
+    ranking pools best-first by their spot price upper bound gives the same quote & fee as fully simulating all of them
+"""
+def test_simu_univ3_spot_bound_ranking(weth, usdc, pricer):
+  looks = "0xf4d2888d29D722226FafA5d9B24F9164c092421E"
+  for (tokenIn, tokenOut, amountIn) in [(looks, weth.address, 600000 * 10**18), (looks, weth.address, 6000000 * 10**18), (weth.address, looks, 500 * 10**18), (usdc.address, looks, 100000 * 10**6)]:
+    (token0, token1) = sorted([tokenIn, tokenOut], key=lambda t: int(t, 16))
+    token0Price = (token0 == tokenIn)
+
+    (expectedQuote, expectedFee) = (0, 0)
+    for fee in [100, 500, 3000, 10000]:
+      pool = univ3_pool(token0, token1, fee)
+      (crossTicks, quote) = pricer.checkUniV3InRangeLiquidity(token0, token1, amountIn, fee, token0Price, pool)
+      if crossTicks:
+        quote = pricer.simulateUniV3Swap(token0, amountIn, token1, fee, token0Price, pool)
+      if quote > expectedQuote:
+        (expectedQuote, expectedFee) = (quote, fee)
+
+    assert pricer.sortUniV3Pools(tokenIn, amountIn, tokenOut) == (expectedQuote, expectedFee)
+
+"""
+    the fused simulation gives the same cross-ticks flag & quote as the in-range check followed by the full simulation
+"""
+def test_simu_univ3_swap_fused(oneE18, dai, usdc, usdt, tusd, weth, pricer):
+  looks = "0xf4d2888d29D722226FafA5d9B24F9164c092421E"
+  for (tokenIn, tokenOut, amountIn) in [(dai.address, usdc.address, 10000 * oneE18), (weth.address, usdt.address, 10 * oneE18), (usdc.address, usdt.address, 10000 * 1000000), (usdc.address, tusd.address, 10000 * 1000000), (looks, weth.address, 600000 * oneE18), (weth.address, looks, 500 * oneE18)]:
+    (token0, token1) = sorted([tokenIn, tokenOut], key=lambda t: int(t, 16))
+    token0Price = (token0 == tokenIn)
+
+    for fee in [100, 500, 3000, 10000]:
+      pool = univ3_pool(token0, token1, fee)
+      (crossTicks, quote) = pricer.checkUniV3InRangeLiquidity(token0, token1, amountIn, fee, token0Price, pool)
+      if crossTicks:
+        quote = pricer.simulateUniV3Swap(token0, amountIn, token1, fee, token0Price, pool)
+      assert pricer.simulateUniV3SwapFused(token0, token1, amountIn, fee, token0Price, pool) == (crossTicks, quote)
@@ -0,0 +1,75 @@
+import os
+
+import brownie
+from brownie import *
+from brownie.test import given
+from hypothesis import settings, strategies as st
+import pytest
+
+from helpers.univ3_math import MIN_TICK, MAX_TICK, get_sqrt_ratio_at_tick
+
+"""
+    Differential fuzz tests: UniV3SwapSimulator#simulateUniV3Swap must match an actual swap of the Uniswap V3 pool
+    (run with eth_call) bit by bit, on local pools of mock tokens with random price, fee tier & positions.
+    Each example checks every amount in both directions, FUZZ_EXAMPLES (default 100) examples run per test
+"""
+
+UNIV3_FACTORY = "0x1F98431c8aD98523631AE4a59f267346ea31F984"
+FUZZ_EXAMPLES = int(os.environ.get("FUZZ_EXAMPLES", 100))
+
+## (fee, tickSpacing): mainnet tiers & extra ones enabled on the fork to cover other tick spacings
+FEE_TIERS = [(100, 1), (500, 10), (3000, 60), (10000, 200), (250, 5), (1234, 30), (20000, 400)]
+
+@pytest.fixture(scope="module")
+def fee_tiers():
+  factory = interface.IUniswapV3Factory(UNIV3_FACTORY)
+  owner = accounts.at(factory.owner(), force=True)
+  tiers = []
+  for (fee, tickSpacing) in FEE_TIERS:
+    if factory.feeAmountTickSpacing(fee) == 0:
+      factory.enableFeeAmount(fee, tickSpacing, {"from": owner})
+    ## an already enabled fee keeps its own tick spacing
+    tiers.append((fee, factory.feeAmountTickSpacing(fee)))
+  return tiers
+
+@pytest.fixture(scope="module")
+def actor():
+  return UniV3PoolActor.deploy({"from": accounts[0]})
+
+@pytest.fixture(scope="module")
+def simulator():
+  return UniV3SwapSimulator.deploy({"from": accounts[0]})
+
+def _position(startTick, tickSpacing, offset, width):
+  """ initialized ticks must be multiples of the spacing within [MIN_TICK, MAX_TICK] """
+  minTick = -(-MIN_TICK // tickSpacing) * tickSpacing
+  maxTick = (MAX_TICK // tickSpacing) * tickSpacing
+  lower = min(max((startTick // tickSpacing + offset) * tickSpacing, minTick), maxTick - tickSpacing)
+  upper = min(lower + width * tickSpacing, maxTick)
+  return (lower, upper)
+
+@given(
+  tierIdx=st.integers(min_value=0, max_value=len(FEE_TIERS) - 1),
+  startTick=st.integers(min_value=-200000, max_value=200000),
+  positions=st.lists(st.tuples(st.integers(-300, 300), st.integers(1, 300), st.integers(10**6, 10**25)), min_size=1, max_size=6),
+  amounts=st.lists(st.integers(min_value=1, max_value=10**30), min_size=1, max_size=10),
+)
+@settings(max_examples=FUZZ_EXAMPLES)
+def test_univ3_simulator_matches_pool_swap(fee_tiers, actor, simulator, tierIdx, startTick, positions, amounts):
+  (fee, tickSpacing) = fee_tiers[tierIdx]
+  pool = actor.createPool(UNIV3_FACTORY, fee, get_sqrt_ratio_at_tick(startTick), {"from": accounts[0]}).return_value
+  for (offset, width, liquidity) in positions:
+    (lower, upper) = _position(startTick, tickSpacing, offset, width)
+    actor.mint(pool, lower, upper, liquidity, {"from": accounts[0]})
+
+  v3 = interface.IUniswapV3Pool(pool)
+  (token0, token1) = (v3.token0(), v3.token1())
+  for amountIn in amounts:
+    for zeroForOne in [True, False]:
+      try:
+        expected = actor.swapExactIn.call(pool, zeroForOne, amountIn)
+      except brownie.exceptions.VirtualMachineError:
+        ## the pool itself can't swap it (e.g. out of gas walking empty words), nothing to compare
+        continue
+      simulated = simulator.simulateUniV3Swap(pool, token0, token1, zeroForOne, fee, amountIn)
+      assert simulated == expected, (fee, tickSpacing, startTick, positions, amountIn, zeroForOne)
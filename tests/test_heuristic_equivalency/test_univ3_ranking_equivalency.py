@@ -0,0 +1,57 @@
+import brownie
+from brownie import *
+import pytest
+
+from helpers.pool_addresses import univ3_pool
+
+"""
+    Evaluates the Uniswap V3 fee tier ranking (spot price upper bound from slot0 & liquidity, then one fused simulation per pool)
+    in contrast to exhaustively quoting all fee tiers, i.e. in-range check then full simulation for every pool.
+    Both should lead to the same quote & fee while the ranking consumes less gas.
+
+    Note that tested routes depend on current liquidity state.
+"""
+
+LOOKS = "0xf4d2888d29D722226FafA5d9B24F9164c092421E"
+CRV = "0xD533a949740bb3306d119CC777fa900bA034cd52"
+WETH = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+USDC = "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48"
+DAI = "0x6B175474E89094C44Da98b954EedeAC495271d0F"
+WBTC = "0x2260FAC5E5542a773Aa44fBCfeDf7C193bc2C599"
+
+## pairs without a hardcoded single pool (see useSinglePoolInUniV3) so that all fee tiers are explored
+SWAPS = [
+  (LOOKS, WETH, 1000 * 10**18),
+  (LOOKS, WETH, 600000 * 10**18),
+  (LOOKS, WETH, 6000000 * 10**18),
+  (WETH, LOOKS, 500 * 10**18),
+  (USDC, LOOKS, 100000 * 10**6),
+  (CRV, WETH, 100000 * 10**18),
+  (WETH, CRV, 1 * 10**18),
+  (DAI, WBTC, 1000000 * 10**18),
+  (WBTC, DAI, 1 * 10**8),
+]
+
+def exhaustive_univ3_quote(pricerwrapper, tokenIn, amountIn, tokenOut):
+  (token0, token1) = sorted([tokenIn, tokenOut], key=lambda t: int(t, 16))
+  token0Price = (token0 == tokenIn)
+
+  (gasUsed, quote, fee) = (0, 0, 0)
+  for _fee in [100, 500, 3000, 10000]:
+    pool = univ3_pool(token0, token1, _fee)
+    (gas, crossTicks, outAmt) = pricerwrapper.checkUniV3InRangeLiquidity(token0, token1, amountIn, _fee, token0Price, pool)
+    gasUsed += gas
+    if crossTicks:
+      (gas, outAmt) = pricerwrapper.simulateUniV3Swap(token0, amountIn, token1, _fee, token0Price, pool)
+      gasUsed += gas
+    if outAmt > quote:
+      (quote, fee) = (outAmt, _fee)
+  return (gasUsed, quote, fee)
+
+@pytest.mark.parametrize("tokenIn,tokenOut,amountIn", SWAPS)
+def test_univ3_ranking_equivalency(tokenIn, tokenOut, amountIn, pricerwrapper):
+  (exhaustiveGas, expectedQuote, expectedFee) = exhaustive_univ3_quote(pricerwrapper, tokenIn, amountIn, tokenOut)
+  (rankedGas, quote, fee) = pricerwrapper.sortUniV3Pools(tokenIn, amountIn, tokenOut)
+
+  print(tokenIn, "->", tokenOut, amountIn, ": ranked", rankedGas, "exhaustive", exhaustiveGas)
+  assert (quote, fee) == (expectedQuote, expectedFee)
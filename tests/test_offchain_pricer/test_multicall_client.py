@@ -0,0 +1,58 @@
+import asyncio
+from brownie import chain, web3
+
+from helpers.multicall_client import MulticallQuoteClient
+from helpers.chain_state import ChainStateFetcher, quote_with_fetcher
+from helpers.offchain_pricer import OffChainPricer
+
+"""
+    The multicall client, run against the local dev node, must quote like the on-chain pricer
+    with only a handful of HTTP requests for the whole set of swaps
+"""
+
+LOOKS = "0xf4d2888d29D722226FafA5d9B24F9164c092421E"
+WETH = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+WBTC = "0x2260FAC5E5542a773Aa44fBCfeDf7C193bc2C599"
+USDC = "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48"
+DAI = "0x6b175474e89094c44da98b954eedeac495271d0f"
+AURA = "0xC0c293ce456fF0ED870ADd98a0828Dd4d2903DBF"
+CVX = "0x4e3fbd56cd56c3e72c1403e103b45db9da5b9d2b"
+CRV = "0xD533a949740bb3306d119CC777fa900bA034cd52"
+BADGER = "0x3472A5A71965499acd81997a54BBA8D852C6E53d"
+
+SWAPS = [
+  (WETH, WBTC, 10 * 10**18),
+  (WETH, USDC, 1 * 10**18),
+  (DAI, USDC, 50000 * 10**18),
+  (LOOKS, WETH, 600000 * 10**18),
+  (LOOKS, WBTC, 600000 * 10**18),
+  (AURA, WETH, 8000 * 10**18),
+  (AURA, WBTC, 8000 * 10**18),
+  (CVX, WETH, 10000 * 10**18),
+  (CRV, USDC, 10000 * 10**18),
+  (BADGER, WBTC, 1000 * 10**18),
+]
+
+def test_multicall_quotes(pricer):
+  client = MulticallQuoteClient(web3.provider.endpoint_uri, block=chain.height)
+  quotes = asyncio.run(client.quote_many(SWAPS))
+
+  for ((tokenIn, tokenOut, amountIn), quote) in zip(SWAPS, quotes):
+    onchain = pricer.findOptimalSwap(tokenIn, tokenOut, amountIn)
+    assert quote.name == onchain[0]
+    assert quote.amountOut == onchain[1]
+
+  print(client.stats)
+  assert client.stats["requests"] < client.stats["calls"]
+
+def test_multicall_fewer_requests_than_single_calls():
+  client = MulticallQuoteClient(web3.provider.endpoint_uri, block=chain.height)
+  asyncio.run(client.quote_many(SWAPS))
+
+  fetcher = ChainStateFetcher(block_identifier=chain.height)
+  offchain = OffChainPricer(fetcher.state)
+  for (tokenIn, tokenOut, amountIn) in SWAPS:
+    quote_with_fetcher(offchain, fetcher, "find_optimal_swap", tokenIn, tokenOut, amountIn)
+
+  print("multicall requests", client.stats["requests"], "in", client.stats["seconds"], "s vs", fetcher.calls, "single eth_call")
+  assert client.stats["requests"] * 10 < fetcher.calls
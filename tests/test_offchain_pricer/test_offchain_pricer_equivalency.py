@@ -0,0 +1,105 @@
+import pytest
+from brownie import chain
+
+from helpers.offchain_pricer import OffChainPricer, sort_tokens
+from helpers.chain_state import ChainStateFetcher, quote_with_fetcher
+from helpers.pool_addresses import univ2_pair, sushi_pair, univ3_pool
+
+"""
+    Differential tests: the off-chain reference pricer must agree bit-by-bit with OnChainPricingMainnet
+    when both read the same (forked) block
+"""
+
+LOOKS = "0xf4d2888d29D722226FafA5d9B24F9164c092421E"
+CULT = "0xf0f9d895aca5c8678f706fb8216fa22957685a13"
+TOKE = "0x2e9d63788249371f1DFC918a52f8d799F4a38C94"
+WETH = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+WBTC = "0x2260FAC5E5542a773Aa44fBCfeDf7C193bc2C599"
+USDC = "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48"
+DAI = "0x6b175474e89094c44da98b954eedeac495271d0f"
+AURA = "0xC0c293ce456fF0ED870ADd98a0828Dd4d2903DBF"
+BADGER = "0x3472A5A71965499acd81997a54BBA8D852C6E53d"
+CVX = "0x4e3fbd56cd56c3e72c1403e103b45db9da5b9d2b"
+BAL = "0xba100000625a3754423978a60c9317c58a424e3D"
+BVE_CVX = "0xfd05D3C7fe2924020620A8bE4961bBaA747e6305"
+
+SWAPS = [
+  (CULT, WETH, 100000000 * 10**18), ## UNIV2
+  (TOKE, WETH, 5000 * 10**18), ## UNIV2 & SUSHI
+  (AURA, WETH, 8000 * 10**18), ## BALANCER
+  (AURA, WBTC, 8000 * 10**18), ## BALANCERWITHWETH
+  (LOOKS, WETH, 600000 * 10**18), ## UNIV3 cross-ticks
+  (LOOKS, WBTC, 600000 * 10**18), ## UNIV3WITHWETH
+  (WETH, WBTC, 10 * 10**18), ## almost everything
+  (WETH, USDC, 1 * 10**18), ## single pool UNIV3 heuristic
+  (DAI, USDC, 50000 * 10**18), ## CURVE indexed 3pool
+  (CVX, BVE_CVX, 10000 * 10**18), ## CURVE indexed factory pool
+  (BADGER, WBTC, 1000 * 10**18),
+  (CVX, DAI, 10000 * 10**18),
+  (BAL, USDC, 1000 * 10**18),
+]
+
+def _pool_bytes32(pool):
+  return "0x" + pool[2:].lower() + "00" * 12
+
+def _offchain():
+  fetcher = ChainStateFetcher(block_identifier=chain.height)
+  return (OffChainPricer(fetcher.state), fetcher)
+
+@pytest.mark.parametrize("swap", SWAPS)
+def test_find_optimal_swap_equivalency(swap, pricer):
+  (tokenIn, tokenOut, amountIn) = swap
+  (offchain, fetcher) = _offchain()
+
+  quote = pricer.findOptimalSwap.call(tokenIn, tokenOut, amountIn, block_identifier=chain.height)
+  offchain_quote = quote_with_fetcher(offchain, fetcher, "find_optimal_swap", tokenIn, tokenOut, amountIn)
+
+  assert offchain_quote.name == quote[0]
+  assert offchain_quote.amountOut == quote[1]
+  assert [p.lower() for p in offchain_quote.pools] == [str(p).lower() for p in quote[2]]
+  assert offchain_quote.poolFees == list(quote[3])
+
+  ## every venue carries its route: UniV2 like pair, UniV3 pool & fee of each hop, Balancer pool id of each hop
+  pools = [str(p).lower() for p in quote[2]]
+  if quote[0] == 1:
+    assert pools == [_pool_bytes32(univ2_pair(tokenIn, tokenOut))] and len(quote[3]) == 0
+  elif quote[0] == 2:
+    assert pools == [_pool_bytes32(sushi_pair(tokenIn, tokenOut))] and len(quote[3]) == 0
+  elif quote[0] == 3:
+    assert pools == [_pool_bytes32(univ3_pool(tokenIn, tokenOut, quote[3][0]))]
+  elif quote[0] == 4:
+    assert pools == [_pool_bytes32(univ3_pool(tokenIn, WETH, quote[3][0])), _pool_bytes32(univ3_pool(WETH, tokenOut, quote[3][1]))]
+  elif quote[0] == 5:
+    assert len(pools) == 1 and pools[0] != "0x" + "00" * 32
+  elif quote[0] == 6:
+    assert len(pools) == 2 and "0x" + "00" * 32 not in pools
+
+@pytest.mark.parametrize("swap", SWAPS)
+def test_component_quotes_equivalency(swap, pricer):
+  (tokenIn, tokenOut, amountIn) = swap
+  (offchain, fetcher) = _offchain()
+  block = chain.height
+
+  assert quote_with_fetcher(offchain, fetcher, "get_uni_price", "univ2", tokenIn, tokenOut, amountIn) == pricer.getUniPrice(pricer.UNIV2_ROUTER(), tokenIn, tokenOut, amountIn, block_identifier=block)
+  assert quote_with_fetcher(offchain, fetcher, "get_uni_price", "sushi", tokenIn, tokenOut, amountIn) == pricer.getUniPrice(pricer.SUSHI_ROUTER(), tokenIn, tokenOut, amountIn, block_identifier=block)
+  assert quote_with_fetcher(offchain, fetcher, "get_univ3_price", tokenIn, amountIn, tokenOut) == pricer.getUniV3Price(tokenIn, amountIn, tokenOut, block_identifier=block)
+  assert quote_with_fetcher(offchain, fetcher, "get_balancer_price_analytically", tokenIn, amountIn, tokenOut) == pricer.getBalancerPriceAnalytically(tokenIn, amountIn, tokenOut, block_identifier=block)
+  (_, curveQuote) = pricer.getCurvePriceAnalytically(tokenIn, amountIn, tokenOut, block_identifier=block)
+  assert quote_with_fetcher(offchain, fetcher, "get_curve_price_analytically", tokenIn, amountIn, tokenOut)[1] == curveQuote
+
+"""
+    full cross-ticks simulation for every fee tier, with amounts small and large enough to walk many ticks
+"""
+@pytest.mark.parametrize("amountIn", [10**15, 10**18, 10**21, 10**24])
+def test_univ3_simulation_equivalency(amountIn, pricer):
+  (offchain, fetcher) = _offchain()
+  block = chain.height
+  (token0, token1) = sort_tokens(LOOKS, WETH)
+
+  for fee in [100, 500, 3000, 10000]:
+    if quote_with_fetcher(fetcher.state, fetcher, "univ3_pool", token0, token1, fee) is None:
+      continue
+    for token0Price in [True, False]:
+      offchain_out = quote_with_fetcher(offchain, fetcher, "simulate_univ3_swap", token0, amountIn, token1, fee, token0Price)
+      onchain_out = pricer.simulateUniV3Swap(token0, amountIn, token1, fee, token0Price, univ3_pool(token0, token1, fee), block_identifier=block)
+      assert offchain_out == onchain_out
@@ -0,0 +1,60 @@
+import pytest
+from brownie import chain
+
+from helpers.offchain_pricer import OffChainPricer, MissingPoolState
+from helpers.chain_state import ChainStateFetcher, quote_with_fetcher
+from helpers.snapshot import encode_snapshot, save_snapshot, load_snapshot, load_market_state, decode_snapshot, SnapshotVersionError
+
+"""
+    A snapshot captured on the fork must quote exactly like the on-chain pricer, with no node involved once loaded
+"""
+
+LOOKS = "0xf4d2888d29D722226FafA5d9B24F9164c092421E"
+WETH = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+WBTC = "0x2260FAC5E5542a773Aa44fBCfeDf7C193bc2C599"
+USDC = "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48"
+AURA = "0xC0c293ce456fF0ED870ADd98a0828Dd4d2903DBF"
+DAI = "0x6b175474e89094c44da98b954eedeac495271d0f"
+
+SWAPS = [
+  (WETH, WBTC, 10 * 10**18),
+  (DAI, USDC, 50000 * 10**18),
+  (LOOKS, WBTC, 600000 * 10**18),
+  (AURA, WBTC, 8000 * 10**18),
+]
+
+def _capture(path):
+  fetcher = ChainStateFetcher(block_identifier=chain.height)
+  offchain = OffChainPricer(fetcher.state)
+  for (tokenIn, tokenOut, amountIn) in SWAPS:
+    quote_with_fetcher(offchain, fetcher, "find_optimal_swap", tokenIn, tokenOut, amountIn)
+  save_snapshot(path, encode_snapshot(fetcher.state, SWAPS, block=chain.height))
+
+def test_snapshot_offline_quotes(tmp_path, pricer):
+  path = tmp_path / "snapshot.json"
+  _capture(path)
+
+  ## no fetcher from here on: a missing piece of state would raise MissingPoolState
+  offline = OffChainPricer(load_market_state(path))
+  for (tokenIn, tokenOut, amountIn) in SWAPS:
+    quote = pricer.findOptimalSwap(tokenIn, tokenOut, amountIn)
+    offline_quote = offline.find_optimal_swap(tokenIn, tokenOut, amountIn)
+    assert offline_quote.name == quote[0]
+    assert offline_quote.amountOut == quote[1]
+
+def test_snapshot_unknown_swap(tmp_path):
+  path = tmp_path / "snapshot.json"
+  _capture(path)
+
+  offline = OffChainPricer(load_market_state(path))
+  with pytest.raises(MissingPoolState):
+    offline.find_optimal_swap(WETH, WBTC, 11 * 10**18)
+
+def test_snapshot_version(tmp_path):
+  path = tmp_path / "snapshot.json"
+  _capture(path)
+
+  snapshot = load_snapshot(path)
+  snapshot["version"] = 0
+  with pytest.raises(SnapshotVersionError):
+    decode_snapshot(snapshot)
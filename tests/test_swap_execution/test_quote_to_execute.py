@@ -0,0 +1,61 @@
+import brownie
+from brownie import *
+
+import pytest
+
+"""
+    The Quote returned by findOptimalSwap carries its route (Curve pool, UniV2 like pair, Uniswap V3 pool & fee
+    of each hop or Balancer pool id of each hop), so it must be executable as is by OnChainSwapMainnet#doOptimalSwapWithQuote
+    without any further lookup. Note that the venue of each case depends on current liquidity state
+"""
+
+CULT = "0xf0f9d895aca5c8678f706fb8216fa22957685a13"
+TOKE = "0x2e9d63788249371f1DFC918a52f8d799F4a38C94"
+LOOKS = "0xf4d2888d29D722226FafA5d9B24F9164c092421E"
+USDI = "0x2a54ba2964c8cd459dc568853f79813a60761b58"
+WETH = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+WBTC = "0x2260FAC5E5542a773Aa44fBCfeDf7C193bc2C599"
+USDC = "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48"
+AURA = "0xC0c293ce456fF0ED870ADd98a0828Dd4d2903DBF"
+
+## (expected swap types, tokenIn, tokenOut, amountIn, whale fixture holding tokenIn)
+CASES = [
+  ([0], USDC, USDI, 1000 * 10**6, "usdc_whale"), ## CURVE
+  ([1], WETH, CULT, 1 * 10**18, "weth_whale"), ## UNIV2
+  ([1, 2], WETH, TOKE, 1 * 10**18, "weth_whale"), ## UNIV2 or SUSHI
+  ([3], WETH, LOOKS, 10 * 10**18, "weth_whale"), ## UNIV3
+  ([4], WBTC, LOOKS, 1 * 10**8, "wbtc_whale"), ## UNIV3WITHWETH
+  ([5], WETH, AURA, 10 * 10**18, "weth_whale"), ## BALANCER
+  ([6], AURA, WBTC, 8000 * 10**18, "aura_whale"), ## BALANCERWITHWETH
+]
+
+@pytest.mark.parametrize("swapTypes,tokenIn,tokenOut,sell_amount,whaleName", CASES)
+def test_quote_to_execute(request, pricer, swapexecutor, swapTypes, tokenIn, tokenOut, sell_amount, whaleName):
+  whale = request.getfixturevalue(whaleName)
+  quote = pricer.findOptimalSwap(tokenIn, tokenOut, sell_amount)
+  assert quote[0] in swapTypes
+  assert quote[1] > 0
+
+  ## route of the winning venue
+  if quote[0] == 0:
+    assert len(quote[2]) == 1 and len(quote[3]) == 1
+  elif quote[0] == 1 or quote[0] == 2:
+    assert len(quote[2]) == 1 and len(quote[3]) == 0
+  elif quote[0] == 3:
+    assert len(quote[2]) == 1 and len(quote[3]) == 1 and quote[3][0] in [100, 500, 3000, 10000]
+  elif quote[0] == 4:
+    assert len(quote[2]) == 2 and len(quote[3]) == 2 and quote[3][0] > 0 and quote[3][1] > 0
+  elif quote[0] == 5:
+    assert len(quote[2]) == 1 and quote[2][0] != "0x" + "00" * 32
+  elif quote[0] == 6:
+    assert len(quote[2]) == 2 and quote[2][0] != quote[2][1]
+
+  ## swap on chain with the quote as returned
+  slippageTolerance = 0.99
+  interface.ERC20(tokenIn).transfer(swapexecutor.address, sell_amount, {'from': whale})
+
+  minOutput = quote[1] * slippageTolerance
+  balBefore = interface.ERC20(tokenOut).balanceOf(whale)
+  swapexecutor.doOptimalSwapWithQuote(tokenIn, tokenOut, sell_amount, (quote[0], minOutput, quote[2], quote[3]), {'from': whale})
+  balAfter = interface.ERC20(tokenOut).balanceOf(whale)
+  assert (balAfter - balBefore) >= minOutput
@@ -0,0 +1,82 @@
+import brownie
+from brownie import *
+
+import pytest
+
+"""
+    test batch sell of several tokens in one transaction (OnChainSwapMainnet#doOptimalSwapBatch), directly or
+    through a shared WETH leg, with per-sell minOut in tokenOut (on its share of the shared leg) and skip-on-failure
+"""
+
+def _push_basket(oneE18, weth_whale, weth, wbtc, cvx, swapexecutor):
+  ## WETH is sold as is, CVX & WBTC bought with WETH first
+  for token in [cvx, wbtc]:
+    weth.transfer(swapexecutor.address, 1 * oneE18, {'from': weth_whale})
+    swapexecutor.doOptimalSwap(weth.address, token.address, 1 * oneE18, {'from': weth_whale})
+  sells = [(cvx.address, cvx.balanceOf(weth_whale), 0), (wbtc.address, wbtc.balanceOf(weth_whale), 0), (weth.address, 1 * oneE18, 0)]
+  cvx.transfer(swapexecutor.address, sells[0][1], {'from': weth_whale})
+  wbtc.transfer(swapexecutor.address, sells[1][1], {'from': weth_whale})
+  weth.transfer(swapexecutor.address, sells[2][1], {'from': weth_whale})
+  return sells
+
+def test_swap_batch_with_shared_leg(oneE18, weth_whale, weth, wbtc, cvx, usdc, pricer, swapexecutor):
+  sells = _push_basket(oneE18, weth_whale, weth, wbtc, cvx, swapexecutor)
+
+  ## quoted to WETH in one batch, then one WETH to USDC leg shared pro-rata, minOut of each sell is in USDC
+  quotes = pricer.findOptimalSwapBatch([cvx.address, wbtc.address], [weth.address, weth.address], [sells[0][1], sells[1][1]])
+  hopIn = quotes[0][1] + quotes[1][1] + sells[2][1]
+  expected = pricer.findOptimalSwap(weth.address, usdc.address, hopIn)[1]
+  slippageTolerance = 0.99
+  minOuts = [int(amount * expected // hopIn * slippageTolerance * slippageTolerance) for amount in [quotes[0][1], quotes[1][1], sells[2][1]]]
+  sells = [(sells[i][0], sells[i][1], minOuts[i]) for i in range(3)]
+  minOutput = expected * slippageTolerance * slippageTolerance
+
+  balBefore = usdc.balanceOf(weth_whale)
+  tx = swapexecutor.doOptimalSwapBatch(sells, weth.address, usdc.address, minOutput, False, {'from': weth_whale})
+  (totalOut, amountsOut) = tx.return_value
+  balAfter = usdc.balanceOf(weth_whale)
+  assert (balAfter - balBefore) == totalOut >= minOutput
+  assert all(amountsOut[i] >= sells[i][2] for i in range(3))
+  assert totalOut - len(sells) <= sum(amountsOut) <= totalOut
+  assert weth.balanceOf(swapexecutor.address) == 0
+
+def test_swap_batch_shared_leg_min_out(oneE18, weth_whale, weth, wbtc, cvx, usdc, pricer, swapexecutor):
+  sells = _push_basket(oneE18, weth_whale, weth, wbtc, cvx, swapexecutor)
+
+  ## a sell of WETH itself is held to its minOut on its share of the shared leg
+  expected = pricer.findOptimalSwap(weth.address, usdc.address, sells[2][1])[1]
+  sells[2] = (sells[2][0], sells[2][1], expected * 10)
+  with brownie.reverts("!minOut"):
+    swapexecutor.doOptimalSwapBatch(sells, weth.address, usdc.address, 0, False, {'from': weth_whale})
+
+  wethBefore = weth.balanceOf(weth_whale)
+  tx = swapexecutor.doOptimalSwapBatch(sells, weth.address, usdc.address, 0, True, {'from': weth_whale})
+  (totalOut, amountsOut) = tx.return_value
+  assert amountsOut[2] == 0 and amountsOut[0] > 0 and amountsOut[1] > 0
+  assert weth.balanceOf(weth_whale) - wethBefore == sells[2][1]
+  assert weth.balanceOf(swapexecutor.address) == 0
+
+def test_swap_batch_shared_leg_without_route(oneE18, weth_whale, weth, wbtc, cvx, usdc, swapexecutor):
+  sells = _push_basket(oneE18, weth_whale, weth, wbtc, cvx, swapexecutor)
+
+  ## nothing quoted from WETH to a token without pools, fails before any sell even without minOut
+  noPoolToken = "0x000000000000000000000000000000000000dEaD"
+  with brownie.reverts("!hop"):
+    swapexecutor.doOptimalSwapBatch(sells, weth.address, noPoolToken, 0, True, {'from': weth_whale})
+
+def test_swap_batch_skip_on_failure(oneE18, weth_whale, weth, wbtc, cvx, usdc, pricer, swapexecutor):
+  sells = _push_basket(oneE18, weth_whale, weth, wbtc, cvx, swapexecutor)
+
+  ## unreachable minOut for CVX: skipped and sent back, the rest swapped directly to USDC
+  sells[0] = (sells[0][0], sells[0][1], 2**255)
+  with brownie.reverts("!minOut"):
+    swapexecutor.doOptimalSwapBatch(sells, ZERO_ADDRESS, usdc.address, 0, False, {'from': weth_whale})
+
+  cvxBefore = cvx.balanceOf(weth_whale)
+  balBefore = usdc.balanceOf(weth_whale)
+  tx = swapexecutor.doOptimalSwapBatch(sells, ZERO_ADDRESS, usdc.address, 0, True, {'from': weth_whale})
+  (totalOut, amountsOut) = tx.return_value
+  assert amountsOut[0] == 0 and amountsOut[1] > 0 and amountsOut[2] > 0
+  assert cvx.balanceOf(weth_whale) - cvxBefore == sells[0][1]
+  assert usdc.balanceOf(weth_whale) - balBefore == totalOut == amountsOut[1] + amountsOut[2]
+  assert usdc.balanceOf(swapexecutor.address) == 0
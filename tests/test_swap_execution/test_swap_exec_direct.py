@@ -0,0 +1,67 @@
+import brownie
+from brownie import *
+import eth_abi
+
+import pytest
+
+from helpers.pool_addresses import univ3_pool
+
+"""
+    Direct swaps in UniV2, Sushi & UniV3 pools (OnChainSwapMainnet#doOptimalDirectSwapWithQuote) give exactly the
+    output of the same swap through the router, for less gas as there is no approval nor router in between
+"""
+
+WETH = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+WBTC = "0x2260FAC5E5542a773Aa44fBCfeDf7C193bc2C599"
+USDC = "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48"
+
+## (name, tokenIn, tokenOut, amountIn, whale fixture holding tokenIn, poolFees)
+CASES = [
+  ("UNIV2", WETH, USDC, 1 * 10**18, "weth_whale", []),
+  ("SUSHI", WETH, USDC, 1 * 10**18, "weth_whale", []),
+  ("UNIV3", WBTC, USDC, 1 * 10**8, "wbtc_whale", [3000]),
+  ("UNIV3WITHWETH", WBTC, USDC, 1 * 10**8, "wbtc_whale", [500, 500]),
+]
+SWAP_TYPES = {"UNIV2": 1, "SUSHI": 2, "UNIV3": 3, "UNIV3WITHWETH": 4}
+
+_encode = getattr(eth_abi, "encode", None) or eth_abi.encode_abi
+
+@pytest.mark.parametrize("name,tokenIn,tokenOut,sell_amount,whaleName,poolFees", CASES)
+def test_direct_swap_against_router(request, swapexecutor, name, tokenIn, tokenOut, sell_amount, whaleName, poolFees):
+  whale = request.getfixturevalue(whaleName)
+  quote = (SWAP_TYPES[name], 0, [], poolFees)
+
+  chain.snapshot()
+  interface.ERC20(tokenIn).transfer(swapexecutor.address, sell_amount, {'from': whale})
+  tx_router = swapexecutor.doOptimalSwapWithQuote(tokenIn, tokenOut, sell_amount, quote, {'from': whale})
+  chain.revert()
+  interface.ERC20(tokenIn).transfer(swapexecutor.address, sell_amount, {'from': whale})
+  balBefore = interface.ERC20(tokenOut).balanceOf(whale)
+  tx_direct = swapexecutor.doOptimalDirectSwapWithQuote(tokenIn, tokenOut, sell_amount, quote, {'from': whale})
+  balAfter = interface.ERC20(tokenOut).balanceOf(whale)
+
+  print(name, "swap gas: router", tx_router.gas_used, "direct", tx_direct.gas_used, "saved", tx_router.gas_used - tx_direct.gas_used)
+  assert tx_direct.return_value == tx_router.return_value
+  assert (balAfter - balBefore) == tx_direct.return_value > 0
+  assert interface.ERC20(tokenIn).balanceOf(swapexecutor.address) == 0
+  assert tx_direct.gas_used < tx_router.gas_used
+
+def test_direct_swap_min_out(wbtc_whale, wbtc, usdc, pricer, swapexecutor):
+  sell_amount = 1 * 10**8
+  (pool, _, _) = pricer.pairForUniV2(pricer.UNIV2_FACTORY(), wbtc.address, usdc.address, pricer.UNIV2_POOL_INITCODE())
+  assert swapexecutor.getUniV2Pair(True, wbtc.address, usdc.address)[0] == pool
+  assert swapexecutor.getUniV3Pool(wbtc.address, usdc.address, 3000) == univ3_pool(wbtc.address, usdc.address, 3000)
+
+  wbtc.transfer(swapexecutor.address, sell_amount, {'from': wbtc_whale})
+  quote = pricer.findOptimalSwap(wbtc.address, usdc.address, sell_amount)
+  with brownie.reverts("!minOut"):
+    swapexecutor.doOptimalDirectSwapWithQuote(wbtc.address, usdc.address, sell_amount, (3, quote[1] * 10, [], [3000]), {'from': wbtc_whale})
+  with brownie.reverts("!minOut"):
+    swapexecutor.doOptimalDirectSwapWithQuote(wbtc.address, usdc.address, sell_amount, (1, quote[1] * 10, [], []), {'from': wbtc_whale})
+
+def test_univ3_callback_only_from_pool(wbtc_whale, wbtc, usdc, swapexecutor):
+  ## tokens waiting in the executor can't be pulled by a fake callback
+  wbtc.transfer(swapexecutor.address, 1 * 10**8, {'from': wbtc_whale})
+  data = _encode(["address", "address", "uint24"], [wbtc.address, usdc.address, 3000])
+  with brownie.reverts("!pool"):
+    swapexecutor.uniswapV3SwapCallback(1 * 10**8, 0, data, {'from': accounts[0]})
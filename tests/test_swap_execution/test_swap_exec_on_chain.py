@@ -133,4 +133,43 @@ def test_swap_in_balancer_single(oneE18, weth_whale, weth, usdc, pricer, swapexe
   balBefore = usdc.balanceOf(weth_whale)
   swapexecutor.doOptimalSwapWithQuote(weth.address, usdc.address, sell_amount, (5, minOutput, [weth2USDCPoolId], []), {'from': weth_whale})
   balAfter = usdc.balanceOf(weth_whale)
-  assert (balAfter - balBefore) >= minOutput
\ No newline at end of file
+  assert (balAfter - balBefore) >= minOutput
+"""
+    test split swap from token A to token B across several pools with a combined minOut
+"""
+def test_swap_split(oneE18, weth_whale, weth, usdc, quoter, swapexecutor):
+  ## 1e18
+  sell_amount = 1000 * oneE18
+
+  splitQuote = quoter.findOptimalSplitSwap(weth.address, usdc.address, sell_amount)
+  assert len(splitQuote[1]) > 0
+
+  ## swap on chain
+  slippageTolerance = 0.95
+  weth.transfer(swapexecutor.address, sell_amount, {'from': weth_whale})
+
+  minOutput = splitQuote[0] * slippageTolerance
+  balBefore = usdc.balanceOf(weth_whale)
+  swapexecutor.doSplitSwapWithQuote(weth.address, usdc.address, sell_amount, (minOutput, splitQuote[1]), {'from': weth_whale})
+  balAfter = usdc.balanceOf(weth_whale)
+  assert (balAfter - balBefore) >= minOutput
+
+"""
+    test route swap from token A to token B via the connector & venues picked by the quoter
+"""
+def test_swap_route(oneE18, aura_whale, aura, wbtc, quoter, swapexecutor):
+  ## 1e18
+  sell_amount = 1000 * oneE18
+
+  route = quoter.findOptimalRoute(aura.address, wbtc.address, sell_amount)
+  assert route[0] > 0
+
+  ## swap on chain
+  slippageTolerance = 0.95
+  aura.transfer(swapexecutor.address, sell_amount, {'from': aura_whale})
+
+  minOutput = route[0] * slippageTolerance
+  balBefore = wbtc.balanceOf(aura_whale)
+  swapexecutor.doRouteSwapWithQuote(aura.address, wbtc.address, sell_amount, (minOutput, route[1], route[2], route[3]), {'from': aura_whale})
+  balAfter = wbtc.balanceOf(aura_whale)
+  assert (balAfter - balBefore) >= minOutput